@@ -0,0 +1,446 @@
+"""
+benchmark.py
+
+    benchmarks for the stages of the model pipeline
+
+    Each stage runs in its own worker process, so the peak resident memory
+reported is the peak of the process that ran the stage. The stages are:
+
+    refresh: preprocess communities from a data repo (Setup.setup)
+    run: run the model for each community (Driver.run)
+    components: run each component for each community, without saving
+outputs (Driver.run_components)
+    summaries: save the summaries (Driver.save_summaries)
+    web: generate the html summaries (WebSummary.generate_all)
+    financial: financial functions on synthetic cash flows
+    results store: store and load synthetic results
+
+    The financial and results store stages use synthetic data. The other
+stages need a data repo, or a model set up from one. Offline, they are run
+against a small synthetic data repo (aaem.synthetic_data) in place of the
+real one.
+
+    Results can be saved as a baseline, and later results compared to it to
+flag regressions.
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+import resource
+from multiprocessing import Pool
+
+import yaml
+import numpy as np
+
+from aaem import __version__
+from aaem import synthetic_data
+
+BASELINE_FILE = 'benchmark_baseline.yaml'
+
+## fraction a time or peak memory can increase by, over the baseline,
+## before it is a regression
+DEFAULT_TOLERANCE = .25
+
+## times under this many seconds are not compared, they are too noisy
+MIN_COMPARED_SECONDS = .5
+
+SYNTHETIC_STAGES = ['financial', 'results store']
+
+def get_peak_rss ():
+    """get the peak resident memory of the current process
+
+    Returns
+    -------
+    float
+        peak resident memory (MB)
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        ## bytes on OS X, kilobytes elsewhere
+        return peak / 1024.0 / 1024.0
+    return peak / 1024.0
+
+def _stage_worker (work):
+    """run a benchmark stage, in a worker process
+
+    Parameters
+    ----------
+    work: tuple
+        (stage function, args)
+
+    Returns
+    -------
+    dict
+        stage results, see run_stage
+    """
+    function, args = work
+    start = time.time()
+    items, details = function(*args)
+    seconds = time.time() - start
+    results = {
+        'seconds': seconds,
+        'items': items,
+        'items per second': items / seconds if seconds > 0 else float('nan'),
+        'peak rss (MB)': get_peak_rss(),
+    }
+    if not details is None:
+        results['details'] = details
+    return results
+
+def run_stage (function, *args):
+    """run a benchmark stage in a new worker process
+
+    Parameters
+    ----------
+    function: function
+        module level function that runs the stage, and returns the number of
+    items (i.e. communities) processed, and a dict of details or None
+    *args:
+        arguments for function
+
+    Returns
+    -------
+    dict
+        'seconds', 'items', 'items per second', 'peak rss (MB)', and
+    'details' if there are any
+    """
+    pool = Pool(1)
+    try:
+        return pool.apply(_stage_worker, [(function, args)])
+    finally:
+        pool.terminate()
+        pool.join()
+
+def stage_refresh (model_root, data_repo, tag, communities, jobs):
+    """benchmark stage: preprocess communities from the data repo
+
+    Returns
+    -------
+    tuple
+        number of communities, None
+    """
+    from aaem.driver import Setup
+    setup = Setup(model_root, data_repo, sorted(communities), tag)
+    setup.setup(force = True, ng_coms = ['Barrow', 'Nuiqsut'], jobs = jobs)
+    return len(communities), None
+
+def stage_run (model_dir, communities, tag):
+    """benchmark stage: run the model for each community
+
+    Returns
+    -------
+    tuple
+        number of communities run, dict of seconds per community
+    """
+    from aaem.driver import Driver
+    driver = Driver(model_dir)
+    details = {}
+    for com in communities:
+        start = time.time()
+        driver.run(get_config(model_dir, com), get_global_config(model_dir),
+            tag = tag)
+        details[com] = time.time() - start
+    return len(communities), details
+
+def stage_components (model_dir, communities):
+    """benchmark stage: run the components for each community, without
+    saving any outputs
+
+    Returns
+    -------
+    tuple
+        number of communities run, dict of seconds per component
+    """
+    from aaem.driver import Driver, default_scalers
+    from aaem.community_data import CommunityData
+    from aaem.forecast import Forecast
+    from aaem.diagnostics import Diagnostics
+    driver = Driver(model_dir, profile = True)
+    global_config = driver.get_global_config(get_global_config(model_dir))
+    for com in communities:
+        diagnostics = Diagnostics()
+        community_data = CommunityData(get_config(model_dir, com),
+            global_config, diagnostics, default_scalers)
+        forecast = Forecast(community_data, diagnostics, default_scalers)
+        driver.run_components(community_data, forecast, diagnostics,
+            default_scalers, com)
+    timings = {}
+    for record in driver.profiler.pop_records():
+        component, step, seconds = record[1:4]
+        if step == 'run':
+            timings[component] = timings.get(component, 0) + seconds
+    return len(communities), timings
+
+def stage_summaries (model_dir, tag):
+    """benchmark stage: save the summaries for the results
+
+    Returns
+    -------
+    tuple
+        number of communities in the results, None
+    """
+    from aaem.driver import Driver
+    driver = Driver(model_dir)
+    driver.save_summaries(tag)
+    return len(driver.get_results_store(tag).keys()), None
+
+def stage_web (model_dir, tag):
+    """benchmark stage: generate the html summaries for the results
+
+    Returns
+    -------
+    tuple
+        number of communities in the results, None
+    """
+    from aaem_summaries.web import WebSummary
+    out = os.path.join(model_dir, 'results_' + tag, '__web_summaries')
+    if os.path.exists(out):
+        shutil.rmtree(out)
+    summary = WebSummary(model_dir, out, tag)
+    summary.generate_all()
+    return len(summary.results), None
+
+def stage_financial (projects, years = 30):
+    """benchmark stage: NPV, payment, and IRR of synthetic projects, as
+    AnnualSavings.calc_capital_cost_scenarios uses them
+
+    Returns
+    -------
+    tuple
+        number of projects, None
+    """
+    from aaem.components.annual_savings import financial
+    random = np.random.RandomState(0)
+    capital = random.uniform(1e5, 1e7, projects)
+    savings = random.uniform(1e3, 1e6, (projects, years))
+    costs = -financial.pmt(.05, years, capital)[:, None] * np.ones(years)
+    financial.npv(.03, savings - costs)
+    financial.irr(np.column_stack([-capital, savings]))
+    return projects, None
+
+class _SyntheticDiagnostics (object):
+    """diagnostics stand in for synthetic results"""
+    def __init__ (self):
+        self.messages = []
+
+class _SyntheticCommunityData (object):
+    """community data stand in for synthetic results"""
+    def __init__ (self, name, years):
+        self.diagnostics = _SyntheticDiagnostics()
+        self.data = {
+            'community': {'file id': name, 'prices': np.ones(years)},
+        }
+
+    def get_item (self, section, key):
+        return self.data[section][key]
+
+class _SyntheticComponent (object):
+    """component stand in for synthetic results"""
+    def __init__ (self, community_data, forecast, years):
+        self.cd = community_data.data['community']
+        self.forecast = forecast
+        self.diagnostics = community_data.diagnostics
+        self.annual_costs = np.ones(years)
+        self.annual_total_savings = np.ones(years)
+
+def stage_results_store (communities, components = 13, years = 30):
+    """benchmark stage: store synthetic results, and load them, all at once
+    and one component at a time
+
+    Returns
+    -------
+    tuple
+        number of communities, None
+    """
+    from aaem.results_store import ResultsStore
+    directory = tempfile.mkdtemp()
+    try:
+        store = ResultsStore(directory)
+        for i in range(communities):
+            cd = _SyntheticCommunityData('community ' + str(i), years)
+            forecast = {'population': np.ones(years)}
+            res = {'community data': cd, 'forecast': forecast}
+            for c in range(components):
+                res['component ' + str(c)] = \
+                    _SyntheticComponent(cd, forecast, years)
+            store.add(res)
+        store = ResultsStore(directory)
+        store.load_all()
+        for name in store.keys():
+            store.get(name, 'component 0')
+    finally:
+        shutil.rmtree(directory)
+    return communities, None
+
+def get_config (model_dir, community):
+    """get the config file for a community in a model directory"""
+    return os.path.join(model_dir, 'config', community + '.yaml')
+
+def get_global_config (model_dir):
+    """get the global config file in a model directory, or None"""
+    gc = os.path.join(model_dir, 'config', '__global_config.yaml')
+    if os.path.isfile(gc):
+        return gc
+    return None
+
+def run_benchmarks (model_root, data_repo = None, refresh_communities = [],
+        run_communities = [], tag = 'benchmark', jobs = 1, offline = False,
+        synthetic_size = 200):
+    """run the benchmark stages
+
+    Parameters
+    ----------
+    model_root: path
+        directory to set up the benchmark model in, or containing a model
+    set up in model_root/tag
+    data_repo: path, optional
+        data repo, if provided (or offline) the refresh stage is run
+    refresh_communities: list
+        communities to preprocess in the refresh stage
+    run_communities: list
+        communities (config file names) to run in the other stages
+    tag: str
+        tag used for the model directory and results
+    jobs: int
+        jobs for the refresh stage
+    offline: bool
+        if True, run every stage against a synthetic data repo, written to
+    a temporary directory, in place of data_repo
+    synthetic_size: int
+        number of projects or communities for the synthetic stages
+
+    Returns
+    -------
+    dict
+        stage name -> stage results, see run_stage, with 'version' for
+    the model version
+    """
+    results = {'version': __version__}
+    results['financial'] = run_stage(stage_financial, synthetic_size * 10)
+    results['results store'] = run_stage(stage_results_store, synthetic_size)
+
+    synthetic_repo = None
+    if offline:
+        synthetic_repo = tempfile.mkdtemp(prefix = 'aaem_benchmark_data_')
+        data_repo = synthetic_data.make_data_repo(synthetic_repo)
+    try:
+        model_dir = os.path.join(model_root, tag)
+        if not data_repo is None:
+            results['refresh'] = run_stage(stage_refresh,
+                model_root, data_repo, tag, refresh_communities, jobs)
+        if not os.path.isdir(os.path.join(model_dir, 'config')):
+            raise IOError, ('No model set up at ' + model_dir + ', provide '
+                'a data repo to set one up')
+
+        coms = [c for c in run_communities \
+            if os.path.isfile(get_config(model_dir, c))]
+        results_dir = os.path.join(model_dir, 'results_' + tag)
+        if os.path.exists(results_dir):
+            shutil.rmtree(results_dir)
+        results['run'] = run_stage(stage_run, model_dir, coms, tag)
+        results['components'] = run_stage(stage_components, model_dir, coms)
+        results['summaries'] = run_stage(stage_summaries, model_dir, tag)
+        results['web'] = run_stage(stage_web, model_dir, tag)
+    finally:
+        if not synthetic_repo is None:
+            shutil.rmtree(synthetic_repo, ignore_errors = True)
+    return results
+
+def save_baseline (results, baseline_file):
+    """save benchmark results as a baseline
+
+    Parameters
+    ----------
+    results: dict
+        results from run_benchmarks
+    baseline_file: path
+        yaml file to save
+    """
+    with open(baseline_file, 'w') as fd:
+        yaml.dump(results, fd, default_flow_style = False)
+
+def load_baseline (baseline_file):
+    """load a baseline saved with save_baseline
+
+    Parameters
+    ----------
+    baseline_file: path
+        yaml file
+
+    Returns
+    -------
+    dict
+        baseline results
+    """
+    with open(baseline_file, 'r') as fd:
+        return yaml.load(fd)
+
+def find_regressions (results, baseline, tolerance = DEFAULT_TOLERANCE):
+    """compare benchmark results to a baseline
+
+    Parameters
+    ----------
+    results: dict
+        results from run_benchmarks
+    baseline: dict
+        baseline results
+    tolerance: float
+        fraction times and peak memory may increase by
+
+    Returns
+    -------
+    list
+        messages describing each regression, empty if there are none
+    """
+    regressions = []
+    for stage in sorted(results):
+        if stage == 'version' or not stage in baseline:
+            continue
+        new = results[stage]
+        old = baseline[stage]
+        if new['items'] != old['items']:
+            ## not comparable
+            continue
+        for metric in ['seconds', 'peak rss (MB)']:
+            if metric == 'seconds' and old[metric] < MIN_COMPARED_SECONDS:
+                continue
+            if new[metric] > old[metric] * (1.0 + tolerance):
+                regressions.append(
+                    '%s: %s increased from %.2f to %.2f (%+.0f%%)' % (
+                        stage, metric, old[metric], new[metric],
+                        100.0 * (new[metric] / old[metric] - 1.0)
+                    )
+                )
+    return regressions
+
+def format_results (results):
+    """format benchmark results as a table
+
+    Parameters
+    ----------
+    results: dict
+        results from run_benchmarks
+
+    Returns
+    -------
+    str
+    """
+    stages = ['refresh', 'run', 'components', 'summaries', 'web'] + \
+        SYNTHETIC_STAGES
+    lines = ['%-14s %10s %8s %12s %14s' % \
+        ('stage', 'seconds', 'items', 'items/second', 'peak RSS (MB)')]
+    for stage in stages:
+        if not stage in results:
+            continue
+        r = results[stage]
+        lines.append('%-14s %10.2f %8d %12.2f %14.1f' % (stage, r['seconds'],
+            r['items'], r['items per second'], r['peak rss (MB)']))
+    if 'components' in results:
+        lines.append('')
+        lines.append('component run times (seconds):')
+        details = results['components']['details']
+        for comp in sorted(details, key = lambda c: -details[c]):
+            lines.append('  %-40s %8.3f' % (comp, details[comp]))
+    return '\n'.join(lines)
@@ -11,6 +11,9 @@ from aaem.cli.compare_command import CompareCommand
 from aaem.cli.refresh_command import RefreshCommand
 from aaem.cli.html_command import HtmlCommand
 from aaem.cli.get_data_command import GetDataCommand
+from aaem.cli.benchmark_command import BenchmarkCommand
+from aaem.cli.sensitivity_command import SensitivityCommand
+from aaem.cli.optimize_command import OptimizeCommand
 
 from datetime import datetime
 
@@ -29,6 +32,9 @@ class AaemCommand(pycommand.CommandBase):
         '  refresh      refresh the data in the model\n'
         '  summaries    create web summaries\n'
         '  get-data     create data needed for the model\n'
+        '  benchmark    benchmark the model pipeline\n'
+        '  sensitivity  run sensitivity (tornado) analyses\n'
+        '  optimize     size wind, solar, and hydropower projects\n'
     )
 
     commands = {
@@ -41,6 +47,9 @@ class AaemCommand(pycommand.CommandBase):
         'refresh': RefreshCommand,
         'summaries': HtmlCommand,
         'get-data': GetDataCommand,
+        'benchmark': BenchmarkCommand,
+        'sensitivity': SensitivityCommand,
+        'optimize': OptimizeCommand,
         }
 
     optionList = (
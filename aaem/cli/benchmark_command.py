@@ -0,0 +1,115 @@
+"""
+benchmark_command.py
+
+    A command for the cli to benchmark the model pipeline
+"""
+import pycommand
+from default_cases import __DEV_COMS__, __DEV_COMS_RUN__
+import os.path
+import cli_lib
+
+from aaem import benchmark
+
+
+class BenchmarkCommand(pycommand.CommandBase):
+    """
+    benchmark command class
+    """
+    usagestr = 'usage: benchmark <options> model_dir [data_repo]'
+    optionList = (
+            ('tag', ('t', '<tag>',
+                "tag for the benchmark model and results (default: benchmark)")),
+            ('jobs', ('j', '<number_of_jobs>',
+                'number of communities to preprocess at once (default: 1)')),
+            ('offline', ('o', False,
+                "use a synthetic data repo in place of a real one")),
+            ('baseline', ('b', '<baseline_file>',
+                "baseline to compare to (default: model_dir/" + \
+                benchmark.BASELINE_FILE + ")")),
+            ('save_baseline', ('s', False,
+                "save the results as the baseline")),
+            ('tolerance', ('r', '<fraction>',
+                "fraction times and memory may increase by before they are "
+                "regressions (default: " + str(benchmark.DEFAULT_TOLERANCE) +\
+                ")")),
+           )
+    description =('Benchmark the refresh, run, component, summaries, and '
+                  'html summaries stages using the development communities, '
+                  'and compare to a baseline.\n'
+                  'options: \n'
+                   "  " + str([o[0] + ': ' + o[1][2] + '. Use: --' +\
+                   o[0] + ' (-'+o[1][0]+') ' +  (o[1][1] if o[1][1] else "")  +\
+                   '' for o in optionList]).replace('[','').\
+                   replace(']','').replace(',','\n')
+                )
+
+    def run(self):
+        """
+        run the command
+        """
+        if self.args and os.path.isdir(self.args[0]):
+            model_root = os.path.abspath(self.args[0])
+        else:
+            msg = "BENCHMARK ERROR: needs a directory"
+            cli_lib.print_error_message(msg, BenchmarkCommand.usagestr)
+            return 0
+
+        data_repo = None
+        if len(self.args) > 1:
+            if not os.path.isdir(self.args[1]):
+                msg = "BENCHMARK ERROR: data repo is not a directory"
+                cli_lib.print_error_message(msg, BenchmarkCommand.usagestr)
+                return 0
+            data_repo = os.path.abspath(self.args[1])
+
+        tag = 'benchmark'
+        if not self.flags.tag is None:
+            tag = self.flags.tag
+
+        try:
+            jobs = 1
+            if not self.flags.jobs is None:
+                jobs = int(self.flags.jobs)
+            tolerance = benchmark.DEFAULT_TOLERANCE
+            if not self.flags.tolerance is None:
+                tolerance = float(self.flags.tolerance)
+        except ValueError:
+            msg = "FLAG ERROR: --jobs(-j) must be an integer, and " + \
+                "--tolerance(-r) a number"
+            cli_lib.print_error_message(msg, BenchmarkCommand.usagestr)
+            return 0
+
+        baseline_file = os.path.join(model_root, benchmark.BASELINE_FILE)
+        if not self.flags.baseline is None:
+            baseline_file = self.flags.baseline
+
+        try:
+            results = benchmark.run_benchmarks(model_root, data_repo,
+                __DEV_COMS__, __DEV_COMS_RUN__, tag, jobs,
+                not self.flags.offline is None)
+        except IOError as e:
+            cli_lib.print_error_message("BENCHMARK ERROR: " + str(e),
+                BenchmarkCommand.usagestr)
+            return 0
+
+        print benchmark.format_results(results)
+
+        if os.path.isfile(baseline_file):
+            regressions = benchmark.find_regressions(results,
+                benchmark.load_baseline(baseline_file), tolerance)
+            print
+            if len(regressions) == 0:
+                print 'No regressions from baseline ' + baseline_file
+            else:
+                print 'REGRESSIONS from baseline ' + baseline_file + ':'
+                for r in regressions:
+                    print '  ' + r
+
+        if self.flags.save_baseline:
+            benchmark.save_baseline(results, baseline_file)
+            print 'Saved baseline ' + baseline_file
+
+        if os.path.isfile(baseline_file) and not self.flags.save_baseline \
+                and len(regressions) > 0:
+            return 1
+        return 0
@@ -21,6 +21,13 @@ class HtmlCommand(pycommand.CommandBase):
     optionList = (
             ('alt_out', ('a', '<path>', "alternate output location")),
             ('force',('f', False, "force overwrite of existing directories")),
+            ('jobs', ('j', '<number_of_jobs>',
+                ('number of communities to generate summaries for at once '
+                '(default: number of CPUs)'))),
+            ('incremental', ('i', False,
+                ('only generate the pages whose results, templates, or '
+                'versions changed since they were generated in the existing '
+                'output directory'))),
            )
     description =('generate html summaries'
                     'options: \n'
@@ -58,13 +65,26 @@ class HtmlCommand(pycommand.CommandBase):
         else:
             out = self.flags.alt_out
 
+        jobs = None
+        if not self.flags.jobs is None:
+            try:
+                jobs = int(self.flags.jobs)
+            except ValueError:
+                msg = "FLAG ERROR: --jobs(-j) must be an integer"
+                cli_lib.print_error_message(msg, self.usagestr)
+                return 0
+
         force = True
         if self.flags.force is None:
             force = False
 
+        incremental = True
+        if self.flags.incremental is None:
+            incremental = False
+
         if os.path.exists(out) and force:
                 shutil.rmtree(out)
-        elif os.path.exists(out):
+        elif os.path.exists(out) and not incremental:
             msg =  "HTML ERROR: " + out + \
                         " exists. Use force flag (-f) to overwrite"
             cli_lib.print_error_message(msg, self.usagestr)
@@ -75,9 +95,16 @@ class HtmlCommand(pycommand.CommandBase):
         print "Generating Summaries..."
 
         #~ try:
-        ws.generate_all()
+        try:
+            ws.generate_all(jobs, incremental)
+        except RuntimeError as e:
+            cli_lib.print_error_message("HTML ERROR: " + str(e))
         try:
             pth = os.path.join(out, 'Barrow')
+            ## with incremental, Barrow is only generated again if it changed
+            if incremental and os.path.exists(pth):
+                shutil.rmtree(pth.replace('Barrow','Utqiagvik'),
+                    ignore_errors = True)
             os.rename(pth, pth.replace('Barrow','Utqiagvik'))
 
             pth = os.path.join(out, 'Utqiagvik', 'csv')
@@ -95,7 +122,10 @@ class HtmlCommand(pycommand.CommandBase):
                     with open(f,'w') as out_f:
                         out_f.write(text.replace('Barrow','Utqiagvik').replace('ctobrw','Barrow'))
                         #~ out_f.write()
+        except:
+            pass
 
+        try:
             f = os.path.join(out,'map.js')
             with open(f,'r') as in_f:
                 text = in_f.read()
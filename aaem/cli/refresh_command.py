@@ -22,7 +22,9 @@ class RefreshCommand(pycommand.CommandBase):
            ('force',('f', False, "force refresh of existing directory")),
            ('make_globals',
                 ('g', False, "make a separate config for global values")
-           )
+           ),
+           ('jobs', ('j', '<number_of_jobs>',
+                'number of communities to preprocess at once (default: 1)')),
     )
 
     description = ('Refresh the data from the data repo\n\n'
@@ -79,12 +81,22 @@ class RefreshCommand(pycommand.CommandBase):
         if self.flags.make_globals is None:
             make_globals = False
 
+        jobs = 1
+        if not self.flags.jobs is None:
+            try:
+                jobs = int(self.flags.jobs)
+            except ValueError:
+                msg = "FLAG ERROR: --jobs(-j) must be an integer"
+                cli_lib.print_error_message(msg, RefreshCommand.usagestr)
+                return 0
+
         #~ coms = ['Brevig Mission']
         my_setup = driver.Setup(model_root, repo, sorted(coms), tag)
         if not my_setup.setup(
                     force = force,
                     ng_coms=['Barrow','Nuiqsut'],
-                    make_globals = make_globals
+                    make_globals = make_globals,
+                    jobs = jobs
                 ):
             pth = os.path.join(model_root, my_setup.tag)
             msg = "REFRESH ERRO: " + pth + \
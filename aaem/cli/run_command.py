@@ -11,6 +11,7 @@ import sys
 import cli_lib
 
 from aaem import driver
+from aaem import diagnostics
 
 
 class RunCommand(pycommand.CommandBase):
@@ -31,6 +32,24 @@ class RunCommand(pycommand.CommandBase):
             ('global_config', ('g', '<global_configuration_file>', 
                 ('A configuration yaml file containing variables to apply'
                 ' all communities being run'))),
+            ('jobs', ('j', '<number_of_jobs>',
+                'number of communities to run at once (default: 1)')),
+            ('incremental', ('i', False,
+                ('only run communities whose configs, scalers, or model '
+                'version changed since they were last run in the existing '
+                'results directory'))),
+            ('profile', ('p', False,
+                ('save the time and memory used by each step of each '
+                'community run in profile.csv and profile_summary.csv '
+                'in the results directory'))),
+            ('diagnostics', ('D', '<level>',
+                ('only keep diagnostic messages of this level (NOTE, WARNING, '
+                'or ERROR) and above, and save the diagnostics of all '
+                'communities in runtime_diagnostics.csv in the results '
+                'directory instead of a file for each community'))),
+            ('slim', ('S', False,
+                ('store compact records of the results, the summary values and '
+                'yearly arrays of the components, in the binary results'))),
            )
     description =('Run model for given communities. (default = all communities)'
                     'options: \n'
@@ -62,6 +81,36 @@ class RunCommand(pycommand.CommandBase):
         if self.flags.force is None:
             force = False
         
+        incremental = True
+        if self.flags.incremental is None:
+            incremental = False
+        
+        profile = True
+        if self.flags.profile is None:
+            profile = False
+        
+        slim = True
+        if self.flags.slim is None:
+            slim = False
+        
+        diagnostics_level = None
+        if not self.flags.diagnostics is None:
+            diagnostics_level = self.flags.diagnostics.upper()
+            if not diagnostics_level in diagnostics.SEVERITY:
+                msg = "FLAG ERROR: --diagnostics(-D) must be one of " + \
+                    ', '.join(sorted(diagnostics.SEVERITY))
+                cli_lib.print_error_message(msg, RunCommand.usagestr)
+                return 0
+        
+        jobs = 1
+        if not self.flags.jobs is None:
+            try:
+                jobs = int(self.flags.jobs)
+            except ValueError:
+                msg = "FLAG ERROR: --jobs(-j) must be an integer"
+                cli_lib.print_error_message(msg, RunCommand.usagestr)
+                return 0
+        
         if os.path.isfile(base):
         #run script
             #~ print 'Runnint script ... need to reimplement'
@@ -79,7 +128,9 @@ class RunCommand(pycommand.CommandBase):
             base = script['global']['root']
             
             #~ ## print os.path.join(base, res_dir)
-            if os.path.exists(os.path.join(base, res_dir)) and force:
+            if incremental:
+                pass
+            elif os.path.exists(os.path.join(base, res_dir)) and force:
                 shutil.rmtree(os.path.join(base, res_dir))
             elif os.path.exists(os.path.join(base, res_dir)):
                 msg =  "RUN ERROR: " + os.path.join(base, res_dir) + \
@@ -88,33 +139,107 @@ class RunCommand(pycommand.CommandBase):
                 return 0
             
             # run
-            run_driver = driver.Driver(base)
+            run_driver = driver.Driver(base, profile, diagnostics_level, slim)
             
+            runs = []
+            run_coms = []
+            scenario_coms = []
+            monte_carlo_coms = []
             for com in script['communities']:
-                print 'community:', com['community'], 'name:', com['ID']
+                ## communities with a list of scenarios are run in batch
+                if 'scenarios' in com:
+                    scenario_coms.append(com)
+                    continue
+                if 'monte carlo' in com:
+                    monte_carlo_coms.append(com)
+                    continue
+                run_coms.append(com)
+                runs.append({
+                    'community_config': com['config'],
+                    'global_config': script['global']['global config'],
+                    'tag': script['global']['results tag'],
+                    'scalers': com['scalers'],
+                    'alt_save_name': com['ID']
+                })
+            
+            tag = script['global']['results tag']
+            changed = None
+            if incremental:
+                changed = run_driver.remove_stale_results(runs, tag)
+                results = run_driver.run_incremental(runs, jobs, tag)
+            else:
+                results = ((run, e, True) for run, e in \
+                    run_driver.run_parallel(runs, jobs))
+            ran_runs = []
+            for com, (run, e, ran) in zip(run_coms, results):
+                print 'community:', com['community'], 'name:', com['ID'], \
+                    '' if ran else '(unchanged)'
+                if ran and e is None:
+                    ran_runs.append(run)
+                if not e is None:
+                    print e
+                    msg = "RUN ERROR: "+ com['community'] + \
+                                " not a configured community/project"
+                    cli_lib.print_error_message(msg)
+            if incremental:
+                run_driver.compact_results(tag)
+                changed += run_driver.get_stored_names(ran_runs, tag)
+            
+            for com in scenario_coms:
+                print 'community:', com['community'], 'name:', com['ID'], \
+                    'scenarios:', len(com['scenarios'])
                 try:
-                    #~ print com['config']
-                    run_driver.run(
-                        com['config'],
-                        global_config = script['global']['global config'],
-                        tag = script['global']['results tag'],
-                        scalers = com['scalers'],
-                        alt_save_name = com['ID'])
+                    run_driver.run_scenarios(com['config'], com['scenarios'],
+                        script['global']['global config'],
+                        script['global']['results tag'], com['ID'])
+                except ValueError as e:
+                    cli_lib.print_error_message("RUN ERROR: " + str(e))
                 except (RuntimeError, IOError) as e:
                     print e
                     msg = "RUN ERROR: "+ com['community'] + \
                                 " not a configured community/project"
                     cli_lib.print_error_message(msg)
+            
+            for com in monte_carlo_coms:
+                levels = (com['monte carlo'] or {}).get('levels', None)
+                print 'community:', com['community'], 'name:', com['ID'], \
+                    'monte carlo samples:', \
+                    (com['monte carlo'] or {}).get('samples', 1000), \
+                    '' if levels is None else '(stratified in to ' + \
+                        str(levels) + ' levels, percentiles are coarse-grained)'
+                try:
+                    run_driver.run_monte_carlo(com['config'],
+                        com['monte carlo'] or {},
+                        script['global']['global config'],
+                        script['global']['results tag'], com['ID'], jobs)
+                except (RuntimeError, IOError) as e:
+                    print e
+                    msg = "RUN ERROR: "+ com['community'] + \
+                                " not a configured community/project"
+                    cli_lib.print_error_message(msg)
+                except ValueError as e:
+                    cli_lib.print_error_message("MONTE CARLO ERROR: " + \
+                        com['ID'] + ": " + str(e))
+            
+            if len(runs) == 0 or changed == []:
+                run_driver.save_metadata(script['global']['results tag'])
+                run_driver.save_profile(script['global']['results tag'])
+                return 0
                 
             # save Summaries
             try:
-                run_driver.save_summaries(script['global']['results tag'])
+                run_driver.save_summaries(script['global']['results tag'],
+                    changed)
             except IOError as e :
                 #~ print e
                 msg = "RUN ERROR: No valid communities/projects provided"
                 cli_lib.print_error_message(msg)
                 return 0
+            if not diagnostics_level is None:
+                run_driver.save_bulk_diagnostics(
+                    script['global']['results tag'])
             run_driver.save_metadata(script['global']['results tag'])
+            run_driver.save_profile(script['global']['results tag'])
                     
         else:
             # run regular
@@ -194,7 +319,9 @@ class RunCommand(pycommand.CommandBase):
                     scalers[key] = float(item[1])                                    
                 
             ## results exist?
-            if os.path.exists(os.path.join(base, rd)) and force:
+            if incremental:
+                pass
+            elif os.path.exists(os.path.join(base, rd)) and force:
                 shutil.rmtree(os.path.join(base, rd))
             elif os.path.exists(os.path.join(base, rd)):
                 msg =  "RUN ERROR: " + os.path.join(base, rd) + \
@@ -204,38 +331,65 @@ class RunCommand(pycommand.CommandBase):
             
             ## Run 
             #~ print sorted(coms)
-            run_driver = driver.Driver(base)
+            run_driver = driver.Driver(base, profile, diagnostics_level, slim)
+            runs = []
             for com in sorted(coms):
+                pth = os.path.join(base,'config',com + '.yaml')
+                runs.append({
+                    'community_config': pth,
+                    'global_config': global_config,
+                    'tag': tag,
+                    'scalers': scalers
+                })
+                
+            changed = None
+            if incremental:
+                changed = run_driver.remove_stale_results(runs, tag)
+                results = run_driver.run_incremental(runs, jobs, tag)
+            else:
+                results = ((run, e, True) for run, e in \
+                    run_driver.run_parallel(runs, jobs))
+            ran_runs = []
+            for com, (run, e, ran) in zip(sorted(coms), results):
                 if com == 'Barrow':
-                    print 'Utqiagvik'
+                    print 'Utqiagvik', '' if ran else '(unchanged)'
                 else:
-                    print com
-                try:
-                    pth = os.path.join(base,'config',com + '.yaml')
-                    run_driver.run(
-                        pth, 
-                        global_config = global_config,
-                        tag = tag, 
-                        scalers = scalers
-                    )
-                                    
-                except (RuntimeError, IOError) as e:
+                    print com, '' if ran else '(unchanged)'
+                if ran and e is None:
+                    ran_runs.append(run)
+                if not e is None:
                     print e
                     msg = "RUN ERROR: "+ com + \
                                     " not a configured community/project"
                     cli_lib.print_error_message(msg)
+            if incremental:
+                run_driver.compact_results(tag)
+                changed += run_driver.get_stored_names(ran_runs, tag)
+            
+            if changed == []:
+                run_driver.save_metadata(tag)
+                run_driver.save_profile(tag)
+                sys.stdout = sout
+                return 0
             
             # save summaries
             try:
-                run_driver.save_summaries(tag)
+                run_driver.save_summaries(tag, changed)
             except IOError as e:
                 print e
                 msg = "RUN ERROR: No valid communities/projects provided"
                 cli_lib.print_error_message(msg)
                 return 0
+            if not diagnostics_level is None:
+                run_driver.save_bulk_diagnostics(tag)
                 
             try:
                 name =  'Utqiagvik'
+                ## Barrow was run again
+                if os.path.isdir(os.path.join(base, rd, 'Barrow')) and \
+                        os.path.isdir(os.path.join(base, rd, 
+                                                    'Utqiagvik_Barrow')):
+                    shutil.rmtree(os.path.join(base, rd, 'Utqiagvik_Barrow'))
                 os.rename(os.path.join(base, rd, 'Barrow'),
                             os.path.join(base, rd, 'Utqiagvik_Barrow'))
                 for f_name in os.listdir(os.path.join(base, rd, 
@@ -268,6 +422,7 @@ class RunCommand(pycommand.CommandBase):
                 #~ print e
                 pass
             run_driver.save_metadata(tag)
+            run_driver.save_profile(tag)
             
         sys.stdout = sout
         
@@ -0,0 +1,145 @@
+"""
+sensitivity_command.py
+
+    A command for the cli to run sensitivity (tornado) analyses
+"""
+import pycommand
+from default_cases import __DEV_COMS_RUN__ as __DEV_COMS__
+import os.path
+import cli_lib
+
+from aaem import driver
+
+
+class SensitivityCommand(pycommand.CommandBase):
+    """
+    sensitivity command class
+    """
+    usagestr = ('usage: sensitivity path_to_model_run '
+                                    '[list_of_communities (with underscores)] ')
+    optionList = (
+            ('dev', ('d', False, "use only development communities")),
+            ('tag',('t', '<tag>', "tag for results directory")),
+            ('global_config', ('g', '<global_configuration_file>',
+                ('A configuration yaml file containing variables to apply'
+                ' all communities being run'))),
+            ('jobs', ('j', '<number_of_jobs>',
+                'number of communities to run at once (default: 1)')),
+            ('amount', ('a', '<fraction>',
+                'relative change of each input (default: .1)')),
+            ('components', ('c', '<components>',
+                ('comma separated list of components to change the inputs '
+                'of (default: all)'))),
+            ('no_prices', ('n', False, "do not change the community prices")),
+           )
+    description =('Run a sensitivity (tornado) analysis for given '
+                    'communities. (default = all communities) Each numeric '
+                    'input of the components, and each community price, is '
+                    'changed down and up, and the swing in the net present '
+                    'value and benefit cost ratio of each component is '
+                    'ranked.\n'
+                    'options: \n'
+                   "  " + str([o[0] + ': ' + o[1][2] + '. Use: --' +\
+                   o[0] + ' (-'+o[1][0]+') ' +  (o[1][1] if o[1][1] else "")  +\
+                   '' for o in optionList]).replace('[','').\
+                   replace(']','').replace(',','\n')
+                )
+
+    def run(self):
+        """
+        run the command
+        """
+        if self.args and os.path.isdir(self.args[0]):
+            base = os.path.abspath(self.args[0])
+        else:
+            msg = "SENSITIVITY ERROR: needs a directory"
+            cli_lib.print_error_message(msg, SensitivityCommand.usagestr)
+            return 0
+
+        try:
+            jobs = 1
+            if not self.flags.jobs is None:
+                jobs = int(self.flags.jobs)
+            settings = {}
+            if not self.flags.amount is None:
+                settings['amount'] = float(self.flags.amount)
+        except ValueError:
+            msg = "FLAG ERROR: --jobs(-j) must be an integer, and " + \
+                "--amount(-a) a number"
+            cli_lib.print_error_message(msg, SensitivityCommand.usagestr)
+            return 0
+        if not self.flags.no_prices is None:
+            settings['prices'] = False
+        if not self.flags.components is None:
+            settings['components'] = \
+                [c.strip() for c in self.flags.components.split(',')]
+
+        if self.flags.dev:
+            coms = __DEV_COMS__
+        elif len(self.args[1:]) != 0:
+            coms = self.args[1:]
+            if len(coms) == 1:
+                if coms[0][-1] == '*':
+                    coms = [c for c in cli_lib.get_config_coms(base) \
+                        if c.find(coms[0][:-1]) != -1]
+                else:
+                    coms = cli_lib.get_regional_coms(coms[0], base)
+            ## model thinks its barrow
+            if 'Utqiagvik' in coms:
+                coms[coms.index('Utqiagvik')] = 'Barrow'
+        else:
+            try:
+                coms = cli_lib.get_config_coms(base)
+            except OSError:
+                msg = ("SENSITIVITY ERROR: structure to run model does "
+                                        "not exist at provided path")
+                cli_lib.print_error_message(msg)
+                return 0
+
+        tag = ''
+        if not self.flags.tag is None:
+            tag = self.flags.tag
+
+        global_config = None
+        if not self.flags.global_config is None:
+            global_config = self.flags.global_config
+            if not os.path.isfile(global_config):
+                msg = 'FLAG ERROR: global config specified with option' + \
+                    ' --global(-g) is not a file'
+                cli_lib.print_error_message(msg, SensitivityCommand.usagestr)
+                return 0
+        if global_config is None:
+            gc = os.path.join(base, 'config', '__global_config.yaml')
+            if os.path.isfile(gc):
+                global_config = gc
+
+        run_driver = driver.Driver(base)
+        unknown = [c for c in settings.get('components', []) \
+            if not c in run_driver.comp_order]
+        if len(unknown) > 0:
+            msg = "FLAG ERROR: unknown components: " + ', '.join(unknown)
+            cli_lib.print_error_message(msg, SensitivityCommand.usagestr)
+            return 0
+
+        runs = []
+        for com in sorted(coms):
+            runs.append({
+                'community_config': os.path.join(base,'config',com + '.yaml'),
+                'settings': settings,
+                'global_config': global_config,
+                'tag': tag,
+            })
+
+        tables = {}
+        for com, (run, table, e) in zip(sorted(coms),
+                run_driver.run_sensitivity_parallel(runs, jobs)):
+            if e is None:
+                print 'sensitivity:', com
+                tables[com] = table
+            else:
+                print e
+                msg = "SENSITIVITY ERROR: "+ com + \
+                            " not a configured community/project"
+                cli_lib.print_error_message(msg)
+        run_driver.save_sensitivity_summary(tables, tag)
+        return 0
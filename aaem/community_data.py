@@ -7,17 +7,93 @@ from pandas import read_csv, DataFrame
 import yaml
 import os.path
 import numpy as np
-from importlib import import_module
 
 from aaem.defaults import base_order
 
 
 from defaults import base_structure, base_comments
 from diagnostics import Diagnostics
-from aaem.components import comp_lib, comp_order
+from aaem.components import comp_lib, comp_order, get_registry
 ## read in config IO stuff, it's two lines because it was too long for one
 from aaem.config_IO import read_config, merge_configs, save_config
-from aaem.config_IO import validate_dict
+from aaem.config_IO import validate_dict, validate_keys, layer_configs
+
+
+## config structure, built by load_structure
+_structure = None
+
+def load_structure ():
+    """get the structure of a valid config, from the base structure and 
+    the structure for each component. It is built once per process.
+    
+    Returns
+    -------
+    dict
+        the config structure, this is shared and should not be modified
+    """
+    global _structure
+    if not _structure is None:
+        return _structure
+    
+    structure = base_structure
+    registry = get_registry()
+    for comp in comp_lib:
+        structure = merge_configs(structure, registry[comp].config.structure)
+    _structure = structure
+    return structure
+
+
+class GlobalConfig (object):
+    """A global config loaded and validated once, that is shared by many 
+    CommunityData objects. Each CommunityData layers its community config over 
+    the shared base, so the shared base is never modified.
+    """
+    
+    def __init__ (self, global_config = None):
+        """A global config loaded and validated once
+        
+        Parameters
+        ----------
+        global_config: path to yaml file or dict, optional
+            config file of values to apply to many model instances
+        
+        Attributes
+        ----------
+        source: path, dict, or None
+            global_config argument
+        base: dict
+            config structure merged with the global config, shared by all 
+        model instances using this object
+        """
+        self.source = global_config
+        if global_config is None:
+            global_ = {}
+        elif type(global_config) is dict:
+            global_ = global_config
+        else:
+            global_ = read_config(global_config)
+        
+        structure = load_structure()
+        valid, reason = validate_keys(global_, structure)
+        if not valid:
+            raise StandardError, 'INVALID GLOBAL CONFIG FILE: ' + reason
+        
+        self.base = merge_configs(structure, global_)
+        
+    def layer (self, community_config):
+        """get a config for a model instance
+        
+        Parameters
+        ----------
+        community_config: dict
+            community config values
+            
+        Returns
+        -------
+        dict
+            new config with the community config values over the global ones
+        """
+        return layer_configs(self.base, community_config)
 
 
 class CommunityData (object):
@@ -36,9 +112,10 @@ class CommunityData (object):
         should match the format to be validated for the model to run, unless
         global_config is also provided, in which case all config values not 
         provided here have values in global_config
-        global_config: path to yaml file or dict, optional
+        global_config: path to yaml file, dict, or GlobalConfig, optional
             Optional second config file of values that can be applied to many
-        model instances
+        model instances. A GlobalConfig is shared without being re-read or 
+        modified.
         diag: Diagnostics, optional
             AAEM Diagnostics object for tracking messages from model
         scalers: Dict, optional
@@ -65,7 +142,12 @@ class CommunityData (object):
         if diag == None:
             self.diagnostics = Diagnostics()
             
-        if type(community_config) is dict and type(global_config) is dict:
+        if isinstance(global_config, GlobalConfig):
+            if type(community_config) is dict:
+                self.data = global_config.layer(community_config)
+            else:
+                self.data = global_config.layer(read_config(community_config))
+        elif type(community_config) is dict and type(global_config) is dict:
             self.data = merge_configs(self.load_structure(), global_config)
             self.data = merge_configs(self.data, community_config)
         else: 
@@ -139,14 +221,9 @@ class CommunityData (object):
                 
                         
         ## component spesifc plugins
+        registry = get_registry()
         for comp in comp_order:
-            config = import_module("aaem.components." + comp_lib[comp]).config
-            try:
-                plugins = config.plugins
-            except AttributeError:
-                continue
-                
-            for plugin in plugins:
+            for plugin in registry[comp].plugins:
                 plugin(self, community_config, global_config, scalers)
          
         convert = self.data['community']['diesel prices']
@@ -251,20 +328,7 @@ class CommunityData (object):
         """ 
 
         """
-        try:
-            return self.structure
-        except AttributeError:
-            pass
-        
-        structure = base_structure
-        
-        for comp in comp_lib:
-            module = \
-                import_module('aaem.components.' + comp_lib[comp] + '.config')
-            structure = merge_configs(structure, module.structure)
-            
-        self.structure = structure
-        return structure
+        return load_structure()
         
     def load_config (self, community_file, global_file = None):
         """ 
@@ -364,10 +428,10 @@ class CommunityData (object):
         s_order = ['community'] + comp_order
         i_order = {'community': base_order}
         comments = base_comments
+        registry = get_registry()
         for comp in comp_lib:
-            module = import_module('aaem.components.' + comp_lib[comp])
-            i_order[comp] = module.config.order
-            comments[comp] = module.config.comments
+            i_order[comp] = registry[comp].config.order
+            comments[comp] = registry[comp].config.comments
         
         save_config(fname,copy, 
             comments = comments,
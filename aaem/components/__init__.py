@@ -34,5 +34,28 @@ comp_order = ["Residential Energy Efficiency",
     ]
 
 
-    
+## component package name -> component name
+comp_packages = dict([(comp_lib[comp], comp) for comp in comp_lib])
 
+## process wide component registry, see registry.py. It is built on first 
+## use, because the component modules import aaem.components themselves
+from registry import ComponentInfo, build_registry, build_run_order
+__registry__ = None
+__run_order__ = None
+
+def get_registry ():
+    """get the component registry, component name -> ComponentInfo
+    """
+    global __registry__
+    if __registry__ is None:
+        __registry__ = build_registry(comp_lib, comp_order)
+    return __registry__
+
+def get_run_order ():
+    """get the names of the components, in an order that runs each component
+    after its prerequisites
+    """
+    global __run_order__
+    if __run_order__ is None:
+        __run_order__ = build_run_order(get_registry(), comp_order)
+    return __run_order__
@@ -11,6 +11,9 @@ import os.path
 from abc import ABCMeta, abstractmethod
 from pandas import DataFrame
 
+from aaem.price_series import get_price_series
+import financial
+
 
 class AnnualSavings (object):
     """
@@ -19,6 +22,15 @@ class AnnualSavings (object):
     """
     __metaclass__ = ABCMeta
 
+    ## attributes kept in compact records of the results, the scalars and
+    ## yearly arrays the summaries use. Components extend this list,
+    ## see aaem.results_store.ComponentRecord
+    record_attributes = [
+        'start_year', 'end_year', 'actual_end_year', 'actual_project_life',
+        'reason', 'irr', 'levelized_cost_of_energy', 'break_even_cost',
+        'diesel_prices', 'electricity_prices',
+    ]
+
     def calc_annual_total_savings (self):
         """
         calculate an array of annual savings values for the project
@@ -44,11 +56,13 @@ class AnnualSavings (object):
         post:
             self.annual_costs will be a numpy array of dollar values
         indicating the cost of the project per year.
+            self.capital_cost_scaler is cost_scaler
         """
         rate = rate / 100.0
         #~ print self.component_name, cost_scaler
+        self.capital_cost_scaler = cost_scaler
         self.capital_costs *= cost_scaler
-        cost_per_year = -np.pmt(rate, self.actual_project_life,
+        cost_per_year = -financial.pmt(rate, self.actual_project_life,
                                     self.capital_costs)
         cpi= self.forecast.cpi[:self.actual_project_life]
         self.annual_costs = cost_per_year * cpi# np.ones(self.actual_project_life)
@@ -82,17 +96,13 @@ class AnnualSavings (object):
         end = self.actual_project_life
 
 
-        # number of arrays as zero ($ value) until project start
-        yts = []#np.zeros((self.start_year - current_year)+1)
-
-        self.benefit_npv = np.npv(rate,
-                           np.append(yts, self.annual_total_savings[:end]))
-        self.cost_npv = np.npv(rate, np.append(yts, self.annual_costs[:end]))
+        self.benefit_npv = financial.npv(rate, self.annual_total_savings[:end])
+        self.cost_npv = financial.npv(rate, self.annual_costs[:end])
         self.benefit_cost_ratio = self.benefit_npv/self.cost_npv
-        self.net_npv = np.npv(rate,
-                       np.append(yts, self.annual_net_benefit[:end]))
+        self.net_npv = financial.npv(rate, self.annual_net_benefit[:end])
 
-    def calc_cost_of_energy (self, fuel_amount, maintenance = 0):
+    def calc_cost_of_energy (self, fuel_amount, maintenance = 0,
+            cost_npv = None):
         """
         calculates the cost of energy
         pre:
@@ -100,34 +110,33 @@ class AnnualSavings (object):
         units may vary (i.e. kWh, gal..) per year scaler, list, or np.array
             maintenance is the operation and maintenance cost per year as a
         scaler, list, or np.array
+            cost_npv is the NPV of the project costs, a number or np.array
+        of numbers for many scenarios, self.cost_npv is used if it is None
 
         post:
-            returns a price in $/[units of fuel_amount]
+            returns a price in $/[units of fuel_amount], or an np.array of
+        prices if cost_npv is an np.array
         """
-        yts = np.zeros((self.start_year - self.cd["current year"])+1)
+        if cost_npv is None:
+            cost_npv = self.cost_npv
+
+        ## years of zeros ($ value) until project start
+        delay = (self.start_year - self.cd["current year"]) + 1
 
         if not type(maintenance) in [list,np.ndarray]:
             maintenance = np.zeros(self.actual_project_life) +  maintenance
         else:
             maintenance = maintenance[:self.actual_project_life]
-        maintenance = np.array(maintenance)
-
-        maintenance_npv = np.npv((self.cd['discount rate']/100.0),
-                                    np.append(yts, maintenance))
-
 
         if not type(fuel_amount) in [list,np.ndarray]:
             fuel_amount = np.zeros(self.actual_project_life) + fuel_amount
         else:
             fuel_amount = fuel_amount[:self.actual_project_life]
 
-        fuel_npv = np.npv((self.cd['discount rate']/100.0),
-                                    np.append(yts, fuel_amount))
-
-
-        return (self.cost_npv + maintenance_npv)/ fuel_npv
+        return financial.cost_of_energy(self.cd['discount rate']/100.0,
+            cost_npv, maintenance, fuel_amount, delay)
 
-    def calc_levelized_costs (self, maintenance_costs):
+    def calc_levelized_costs (self, maintenance_costs, cost_npv = None):
         """
         calculate the levelized costs
         pre:
@@ -136,6 +145,7 @@ class AnnualSavings (object):
         must exitst and return numbers representing fuel saved, anenergy
         produced or a dict with 'MMBtu' and 'kWh' as keys whose values are
         numbers
+            cost_npv is passed to calc_cost_of_energy
         post:
             self.break_even_cost is the break even cost in $/gal
             self.levelized_cost_of_energy is the LCOE in $/kWh for
@@ -143,26 +153,95 @@ class AnnualSavings (object):
             for projectes with electricity efficciency and heating efficiency
         self.levelized_cost_of_energy is a dictonary wiht 'MMBtu' and 'kWh'
         as keys
+            self.levelized_maintenance_costs is maintenance_costs
+        """
+        self.levelized_maintenance_costs = maintenance_costs
+        self.break_even_cost, self.levelized_cost_of_energy = \
+            self.get_levelized_costs(maintenance_costs, cost_npv)
+
+    def get_levelized_costs (self, maintenance_costs, cost_npv = None):
+        """
+        get the levelized costs
+        pre:
+            see calc_levelized_costs
+        post:
+            returns the break even cost and the levelized cost of energy, as
+        calc_levelized_costs sets them
         """
         fuel_saved = self.get_fuel_total_saved()
-        self.break_even_cost = \
-            self.calc_cost_of_energy(fuel_saved, maintenance_costs)
+        break_even_cost = \
+            self.calc_cost_of_energy(fuel_saved, maintenance_costs, cost_npv)
 
         energy_produced = self.get_total_energy_produced ()
         if type(energy_produced) is dict:
             #~ print energy_produced['MMBtu']
-            self.levelized_cost_of_energy = {}
-            self.levelized_cost_of_energy['MMBtu'] = \
+            levelized_cost_of_energy = {}
+            levelized_cost_of_energy['MMBtu'] = \
                 self.calc_cost_of_energy(energy_produced['MMBtu'][0],
-                                         maintenance_costs)*\
+                                         maintenance_costs, cost_npv)*\
                                             energy_produced['MMBtu'][1]
-            self.levelized_cost_of_energy['kWh'] = \
+            levelized_cost_of_energy['kWh'] = \
                 self.calc_cost_of_energy(energy_produced['kWh'][0],
-                                         maintenance_costs)*\
+                                         maintenance_costs, cost_npv)*\
                                             energy_produced['kWh'][1]
         else:
-            self.levelized_cost_of_energy = \
-                self.calc_cost_of_energy(energy_produced, maintenance_costs)
+            levelized_cost_of_energy = self.calc_cost_of_energy(
+                energy_produced, maintenance_costs, cost_npv
+            )
+        return break_even_cost, levelized_cost_of_energy
+
+    def calc_capital_cost_scenarios (self, capital_scalers):
+        """
+        calculate the financial results of the project for many capital cost
+        scalers at once. Years are along the columns of the cost arrays, and
+        scenarios along the rows.
+        pre:
+            the component has been run with the financial model, so
+        calc_annual_costs, calc_npv, and calc_levelized_costs have been
+        called
+            capital_scalers is a list or np.array of capital cost scalers,
+        applied in the same way as scalers['capital costs'] in run
+        post:
+            returns a dict of np.arrays, one value per scaler, with the keys
+        'capital costs', 'benefit npv', 'cost npv', 'net npv',
+        'benefit cost ratio', 'irr', 'break even cost', and
+        'levelized cost of energy' or 'levelized cost of energy (MMBtu)' and
+        'levelized cost of energy (kWh)'
+        """
+        rate = self.cd['discount rate'] / 100.0
+        end = self.actual_project_life
+        ## annual costs are linear in the capital costs
+        relative = np.asarray(capital_scalers, dtype = float) / \
+            self.capital_cost_scaler
+
+        capital_costs = self.capital_costs * relative
+        annual_costs = relative[:, None] * self.annual_costs[:end][None, :]
+        annual_total_savings = self.annual_total_savings[:end]
+
+        results = {}
+        results['capital costs'] = capital_costs
+        results['benefit npv'] = \
+            np.zeros(len(relative)) + financial.npv(rate, annual_total_savings)
+        results['cost npv'] = financial.npv(rate, annual_costs)
+        results['net npv'] = financial.npv(rate,
+            annual_total_savings[None, :] - annual_costs)
+        results['benefit cost ratio'] = \
+            results['benefit npv'] / results['cost npv']
+        results['irr'] = financial.irr(np.column_stack(
+            [-capital_costs, np.tile(annual_total_savings, (len(relative), 1))]
+        ))
+
+        break_even_cost, levelized_cost_of_energy = self.get_levelized_costs(
+            self.levelized_maintenance_costs, results['cost npv']
+        )
+        results['break even cost'] = break_even_cost
+        if type(levelized_cost_of_energy) is dict:
+            for units in levelized_cost_of_energy:
+                results['levelized cost of energy (' + units + ')'] = \
+                    levelized_cost_of_energy[units]
+        else:
+            results['levelized cost of energy'] = levelized_cost_of_energy
+        return results
 
     def calc_internal_rate_of_return (self):
         """
@@ -172,9 +251,12 @@ class AnnualSavings (object):
         try:
             l = [-self.capital_costs] +\
                 self.annual_total_savings[:self.actual_project_life].tolist()
-            self.irr = np.irr(l)
-        except (AttributeError, ValueError, np.linalg.linalg.LinAlgError):
-            pass
+        except AttributeError:
+            return
+        l = np.array(l, dtype = float)
+        ## numpy.irr could not find the roots of cash flows with nan or inf
+        if np.isfinite(l).all():
+            self.irr = financial.irr(l)
 
     def set_project_life_details (self, start_year,project_life):
         """
@@ -206,76 +288,27 @@ class AnnualSavings (object):
         pre:
             community name should be in the community data.
         post:
-            self.diesel prices has prices for the project life
-        """
-        #~ prices = self.cd["diesel prices"]
-        #~ self.diesel_prices = prices.get_projected_prices(self.start_year,
-                                                         #~ self.end_year)
-        self.cd["diesel prices"].index = \
-            self.cd["diesel prices"].index.astype(int)
-        self.cd["diesel prices"] = self.cd["diesel prices"].astype(float)
-        self.diesel_prices = self.cd["diesel prices"].ix[self.start_year:]
-        self.diesel_prices.columns = ['prices']
-        start, end  = self.start_year, self.end_year
-
-
-        existing_len = len(self.diesel_prices.ix[start:end])
-        extend_by = (end + 1) - start - existing_len
-        if extend_by > 0:
-            extend = DataFrame(
-                index=range(
-                    self.diesel_prices.index[-1] + 1,
-                     self.diesel_prices.index[-1]+extend_by +1
-                ),
-                columns=['prices'])
-            extend['prices'] =  self.diesel_prices.iloc[-1]['prices']
-            self.diesel_prices = \
-                DataFrame( self.diesel_prices.ix[start:end]['prices']).\
-                append(extend)
-        else:
-            #  -1 to ensure same behavour
-            self.diesel_prices = \
-                DataFrame(self.diesel_prices['prices'].ix[start:end])
-        self.diesel_prices = self.diesel_prices['prices'].values
-
+            self.diesel prices has prices for the project life, the known
+        prices are extended with the last known price. It is a read only 
+        view of the price series shared by all components (see 
+        aaem.price_series)
+        """
+        self.diesel_prices = get_price_series(self.cd["diesel prices"]).\
+            get_range(self.start_year, self.end_year)
 
     def get_electricity_prices (self):
         """
-        """
-        self.cd["electric prices"].index = \
-            self.cd["electric prices"].index.astype(int)
-        self.cd["electric prices"] = \
-            self.cd["electric prices"].astype(float)
-        prices = self.cd["electric prices"]
-        self.electricity_prices = prices.ix[self.start_year:]
-
-        self.cd["electric prices"].index = self.cd["electric prices"].index.astype(int)
-        self.cd["electric prices"] = self.cd["electric prices"].astype(float)
-        self.electricity_prices = self.cd["electric prices"].ix[self.start_year:]
-        self.electricity_prices.columns = ['prices']
-        start, end  = self.start_year, self.end_year
-
-
-        existing_len = len(self.electricity_prices.ix[start:end])
-        extend_by = (end + 1) - start - existing_len
-        if extend_by > 0:
-            extend = DataFrame(
-                index=range(
-                    self.electricity_prices.index[-1] +1 ,
-                     self.electricity_prices.index[-1] + 1+extend_by
-                ),
-                columns=['prices'])
-            extend['prices'] =  self.electricity_prices.iloc[-1]['prices']
-            self.electricity_prices = \
-                DataFrame( self.electricity_prices.ix[start:end]['prices']).\
-                append(extend)
-        else:
-            #  -1 to ensure same behavour
-            self.electricity_prices = \
-                DataFrame(self.electricity_prices['prices'].ix[start:end])
-
-        self.electricity_prices = self.electricity_prices['prices'].values
+        get the electricity prices
 
+        pre:
+            community name should be in the community data.
+        post:
+            self.electricity_prices has prices for the project life, see
+        get_diesel_prices
+        """
+        self.electricity_prices = \
+            get_price_series(self.cd["electric prices"]).\
+            get_range(self.start_year, self.end_year)
 
     def save_additional_output(self, directory):
         """
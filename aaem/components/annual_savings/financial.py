@@ -0,0 +1,202 @@
+"""
+financial.py
+
+    vectorized financial functions used by the components. Cash flows are
+arrays with years along the last axis, so many projects or scenarios can be
+evaluated at once by stacking them along the first axis.
+"""
+import numpy as np
+
+## rates the IRR search looks for a sign change in NPV between, the roots
+## of the NPV are found between neighbouring rates
+IRR_SEARCH_RATES = np.unique(np.concatenate([
+    -np.logspace(-6, np.log10(0.999999), 60),
+    [0.0],
+    np.logspace(-6, 3, 120),
+]))
+
+def npv (rate, values, delay = 0):
+    """net present value of cash flows. The first value is not discounted,
+like numpy.npv
+
+    Parameters
+    ----------
+    rate: float
+        discount rate (decimal)
+    values: array
+        cash flows, years along the last axis
+    delay: int, optional
+        years before the first cash flow, the NPV is the same as for the
+    cash flows with delay zeros before them
+
+    Returns
+    -------
+    float or array
+        NPV of each set of cash flows
+    """
+    values = np.asarray(values, dtype = float)
+    discount = (1.0 + rate) ** -np.arange(delay, delay + values.shape[-1])
+    return values.dot(discount)
+
+def pmt (rate, nper, pv):
+    """payment per period to pay off a present value, at the end of each
+    period, like numpy.pmt with fv = 0
+
+    Parameters
+    ----------
+    rate: float
+        interest rate per period (decimal)
+    nper: int
+        number of periods
+    pv: float or array
+        present value(s)
+
+    Returns
+    -------
+    float or array
+        payment per period (negative for positive pv)
+    """
+    pv = np.asarray(pv, dtype = float)
+    if rate == 0:
+        return -pv / nper
+    temp = (1.0 + rate) ** nper
+    return -(pv * temp) * rate / (temp - 1.0)
+
+def cost_of_energy (rate, cost_npv, maintenance, amount, delay = 0):
+    """levelized cost of an amount of energy or fuel
+
+    Parameters
+    ----------
+    rate: float
+        discount rate (decimal)
+    cost_npv: float or array
+        NPV of the project costs, or an array of them for many scenarios
+    maintenance: array
+        operation and maintenance cost for each year
+    amount: array
+        energy or fuel generated, used or saved each year
+    delay: int, optional
+        years before the first year, see npv
+
+    Returns
+    -------
+    float or array
+        cost per unit of amount, for each cost_npv
+    """
+    return (cost_npv + npv(rate, maintenance, delay)) / \
+        npv(rate, amount, delay)
+
+def _search_discounts (years):
+    """discount factors of each of the IRR_SEARCH_RATES, for cash flows of
+    a number of years. Computed once for each number of years.
+
+    Parameters
+    ----------
+    years: int
+        number of years of cash flows
+
+    Returns
+    -------
+    array
+        discount factors (rates, years)
+    """
+    try:
+        return _SEARCH_DISCOUNTS[years]
+    except KeyError:
+        pass
+    with np.errstate(over = 'ignore'):
+        discounts = (1.0 + IRR_SEARCH_RATES[:, None]) ** \
+            -np.arange(years)[None, :]
+    _SEARCH_DISCOUNTS[years] = discounts
+    return discounts
+
+_SEARCH_DISCOUNTS = {}
+
+def _npv_and_derivative (rates, values):
+    """NPV of each row of values at a rate for each row, and its derivative
+    with respect to the rate
+
+    Parameters
+    ----------
+    rates: array
+        rates (m,)
+    values: array
+        cash flows (m, n)
+
+    Returns
+    -------
+    tuple
+        NPVs (m,), and derivatives (m,)
+    """
+    years = np.arange(values.shape[-1])
+    discounted = values * (1.0 + rates[:, None]) ** -years[None, :]
+    return discounted.sum(axis = -1), \
+        -(discounted * years[None, :]).sum(axis = -1) / (1.0 + rates)
+
+def irr (values, iterations = 100, tolerance = 1e-12):
+    """internal rate of return of sets of cash flows. For each set the
+    sign changes of the NPV are found on a grid of rates, and the root
+    closest to a rate of 0 is found with Newton's method, falling back to
+    bisection for steps outside of the sign change. This matches numpy.irr,
+    which returns the real root closest to 0, for cash flows with one root,
+    which includes all cash flows with one sign change.
+
+    Parameters
+    ----------
+    values: array
+        cash flows (n,), or (m, n) for m sets of cash flows
+    iterations: int, optional
+        maximum iterations
+    tolerance: float, optional
+        relative change in the rate the iterations stop at
+
+    Returns
+    -------
+    float or array
+        IRR of each set of cash flows, nan where there is none
+    """
+    values = np.asarray(values, dtype = float)
+    single = values.ndim == 1
+    values = np.atleast_2d(values)
+
+    with np.errstate(invalid = 'ignore', over = 'ignore'):
+        grid_npv = values.dot(_search_discounts(values.shape[-1]).T)
+
+        ## brackets [lo, hi] with a sign change
+        change = (grid_npv[:, :-1] * grid_npv[:, 1:]) <= 0
+    mid = np.abs((IRR_SEARCH_RATES[:-1] + IRR_SEARCH_RATES[1:]) / 2.0)
+    closest = np.where(change, mid[None, :], np.inf).argmin(axis = 1)
+    found = change[np.arange(values.shape[0]), closest] & \
+        (values != 0).any(axis = 1)
+
+    lo = IRR_SEARCH_RATES[closest]
+    hi = IRR_SEARCH_RATES[closest + 1]
+    lo_npv = grid_npv[np.arange(values.shape[0]), closest]
+    rate = (lo + hi) / 2.0
+    active = np.where(found)[0]
+    for i in range(iterations):
+        if len(active) == 0:
+            break
+        current = rate[active]
+        with np.errstate(divide = 'ignore', invalid = 'ignore'):
+            rate_npv, derivative = \
+                _npv_and_derivative(current, values[active])
+            same = (rate_npv * lo_npv[active]) > 0
+            lo[active] = np.where(same, current, lo[active])
+            lo_npv[active] = np.where(same, rate_npv, lo_npv[active])
+            hi[active] = np.where(same, hi[active], current)
+
+            step = current - rate_npv / derivative
+        inside = np.isfinite(step) & \
+            (step > np.minimum(lo[active], hi[active])) & \
+            (step < np.maximum(lo[active], hi[active]))
+        step = np.where(inside, step, (lo[active] + hi[active]) / 2.0)
+        step = np.where(rate_npv == 0, current, step)
+        rate[active] = step
+        done = np.abs(step - current) <= tolerance * (1.0 + np.abs(current))
+        active = active[~done]
+
+    result = np.where(found, rate, np.nan)
+    if single:
+        return result[0]
+    return result
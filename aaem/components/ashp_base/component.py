@@ -14,6 +14,7 @@ from aaem.forecast import Forecast
 from aaem.diagnostics import Diagnostics
 import aaem.constants as constants
 from config import COMPONENT_NAME, UNKNOWN
+import monthly
 
 class ASHPBase (AnnualSavings):
     """Air source heat pump base of the Alaska Affordable Energy Model: Base component
@@ -55,6 +56,13 @@ class ASHPBase (AnnualSavings):
         diagnostics module, see information on diagnostics Object
 
     """
+    ## attributes kept in compact records of the results, see
+    ## AnnualSavings.record_attributes
+    record_attributes = AnnualSavings.record_attributes + [
+        'average_cop', 'electric_consumption', 'heating_oil_saved',
+        'total_cap_required', 'monthly_value_table',
+    ]
+
     def __init__ (self, community_data, forecast,
                         diag = None, prerequisites = {}):
         """Class initialiser
@@ -108,54 +116,6 @@ class ASHPBase (AnnualSavings):
         # written in child classes
         pass
 
-    def calc_cop_per_month (self):
-        """calculate the coefficient of performance (COP) per month
-        COP = output/input
-
-        Attributes
-        ----------
-        monthly_value_table: DataFrame
-            DataFrame of monthly values related to ASHP systems
-        """
-        #find m & b from performance data
-        temp = self.comp_specs['performance data']['Temperature']
-        cop = self.comp_specs['performance data']['COP']
-        m, b = np.polyfit(temp,cop,1)
-        #~ print m, b
-        # apply to months
-        mtk = ['Avg. Temp (F) JUL','Avg. Temp (F) AUG','Avg. Temp (F) SEP',
-               'Avg. Temp (F) OCT','Avg. Temp (F) NOV','Avg. Temp (F) DEC',
-               'Avg. Temp (F) JAN','Avg. Temp (F) FEB','Avg. Temp (F) MAR',
-               'Avg. Temp (F) APR','Avg. Temp (F) MAY','Avg. Temp (F) JUN']
-        #~ print self.comp_specs['data']
-        monthly_temps = self.comp_specs['data'].ix[mtk].astype(float)
-
-        monthly_temps = monthly_temps.T
-
-        for c in monthly_temps.columns:
-            mon = c[-3:]
-            monthly_temps[mon] = monthly_temps[c]
-            del monthly_temps[c]
-
-        monthly_temps = monthly_temps.T
-        monthly_temps['Temperature'] =  monthly_temps["value"]
-        del monthly_temps['value']
-
-        monthly_cop =  m * monthly_temps + b
-
-        maxes = monthly_temps >= max(temp)
-        monthly_cop[maxes] = max(cop)
-        zeros =  monthly_temps < min(temp)
-        monthly_cop[zeros] = 0
-        monthly_cop['COP'] = monthly_cop['Temperature']
-        del monthly_cop['Temperature']
-
-        self.monthly_value_table = concat([monthly_temps,monthly_cop],axis = 1)
-        del monthly_temps
-        del monthly_cop
-        #~ print self.monthly_value_table
-
-
     def calc_heat_energy_produced_per_year (self):
         """Calculate the heat energy produced per year by ASHP system
         (TODO: Double check definition) defined in child components
@@ -163,126 +123,6 @@ class ASHPBase (AnnualSavings):
         #~ self.heat_energy_produced_per_year = None
         pass # depends on child to implement
 
-    def calc_heat_energy_produced_per_month (self):
-        """calc the mmbtu consumed per month
-
-        Attributes
-        ----------
-        monthly_value_table['mmbtu/mon']
-            mmbtu per month is added to the monthly_value_table
-        """
-        # mmbty/mon = mmbtu/year * montly%s
-        mtk = ['% Heating Load JUL','% Heating Load AUG','% Heating Load SEP',
-               '% Heating Load OCT','% Heating Load NOV','% Heating Load DEC',
-               '% Heating Load JAN','% Heating Load FEB','% Heating Load MAR',
-               '% Heating Load APR','% Heating Load MAY','% Heating Load JUN']
-        monthly_percents = self.comp_specs['data'].ix[mtk].astype(float).T
-        for c in monthly_percents.columns:
-            mon = c[-3:]
-            monthly_percents[mon] = monthly_percents[c]
-            del monthly_percents[c]
-        monthly_percents = monthly_percents.T
-        self.monthly_value_table['% of total heating'] = monthly_percents
-        del monthly_percents
-
-        self.monthly_value_table['mmbtu/mon'] = \
-                self.heat_energy_produced_per_year *\
-                self.monthly_value_table['% of total heating']
-
-        #~ print self.monthly_value_table
-
-    def calc_electric_energy_input_per_month (self):
-        """calculate kWh produced per month
-
-        Attributes
-        ----------
-        monthly_value_table['kWh consumed']
-            adds kWh consumed per month to the monthly_value_table
-        """
-        # mmbtu/mon -> kwh/mon / COP
-        #~ idx = self.monthly_value_table['COP'] > 0
-
-        self.monthly_value_table['kWh consumed'] = \
-                (self.monthly_value_table['mmbtu/mon']*\
-                constants.mmbtu_to_kWh / \
-                self.monthly_value_table['COP'] ).replace([np.inf,-np.inf],0)
-        pass
-
-    def calc_heating_oil_consumed_per_month (self):
-        """calculate heating oil consumed per month
-
-        Attributes
-        ----------
-        monthly_value_table['Heating Oil Consumed (gal)']
-            adds kWh consumed per month to the monthly_value_table
-        """
-        # per month if cop = 0 : consumption mmbtu -> gal / eff
-        idx = self.monthly_value_table['COP'] == 0
-
-        self.monthly_value_table["Heating Oil Consumed (gal)"] = 0
-        self.monthly_value_table["Heating Oil Consumed (gal)"][idx] = \
-                self.monthly_value_table['mmbtu/mon']*\
-                constants.mmbtu_to_gal_HF /\
-                self.cd['heating oil efficiency']
-
-    def calc_heating_oil_saved_per_month (self):
-        """calculate heating oil saved per month
-
-        Attributes
-        ----------
-        monthly_value_table['Heating Oil saved(gal)']
-            adds kWh consumed per month to the monthly_value_table
-        """
-        # for each month mmbtu -> gal /eff - heating_oil_consumed
-        #~ idx = self.monthly_value_table['COP'] == 0
-
-        self.monthly_value_table["Heating Oil Saved (gal)"] = \
-                self.monthly_value_table['mmbtu/mon']*\
-                constants.mmbtu_to_gal_HF /\
-                self.cd['heating oil efficiency'] - \
-                self.monthly_value_table["Heating Oil Consumed (gal)"]
-
-    def calc_electric_consumption (self):
-        """calculate the electric consumption for the year
-
-        Attributes
-        ----------
-        electric_consumption: float
-            estimated electric consumption for a year
-        """
-        self.electric_consumption = \
-            self.monthly_value_table['kWh consumed'].sum()
-
-    def calc_heating_oil_saved (self):
-        """Calculates heating oil saved per year with ASHP system
-
-        Attributes
-        ----------
-        heating_oil_saved : float
-            Savings  in heating oil from ASHP system per year
-        """
-        self.heating_oil_saved = \
-            self.monthly_value_table['Heating Oil Saved (gal)'].sum()
-
-    def calc_average_cop (self):
-        """Calculate average yearly coefficient of power(cop) of ASHP system
-
-        Attributes
-        ----------
-        average_cop : float
-            average yearly coefficient of power(cop) of ASHP system
-        """
-        self.monthly_value_table['mmbtu/mon'].sum()
-        consumed_Hoil =\
-            self.monthly_value_table['Heating Oil Consumed (gal)'].sum()
-
-        factor_1 = (self.monthly_value_table['COP'] *\
-                   self.monthly_value_table['% of total heating']).sum()
-        factor_2 = self.monthly_value_table['% of total heating']\
-                                    [self.monthly_value_table['COP'] > 0].sum()
-
-        self.average_cop = factor_1 / factor_2
-
     def calc_baseline_heating_oil_cost (self):
         """Calculate base line heating fuel cost
 
@@ -310,18 +150,36 @@ class ASHPBase (AnnualSavings):
         self.proposed_ashp_operation_cost = cost.tolist()
 
     def calc_ashp_system_parameters (self):
-        """Calls each of the functions for calculating the ASHP
-        operation parameters
+        """Calculate the ASHP operation parameters, using the vectorized
+        monthly performance functions (aaem.components.ashp_base.monthly)
+
+        Attributes
+        ----------
+        monthly_value_table: DataFrame
+            DataFrame of monthly values related to ASHP systems: temperature,
+            COP, % of total heating, mmbtu/mon, kWh consumed, and heating oil
+            consumed and saved (gal)
+        electric_consumption: float
+            estimated electric consumption for a year
+        heating_oil_saved : float
+            Savings  in heating oil from ASHP system per year
+        average_cop : float
+            average yearly coefficient of power(cop) of ASHP system
         """
-        self.calc_cop_per_month()
-        #~ self.calc_heat_energy_produced_per_year()
-        self.calc_heat_energy_produced_per_month()
-        self.calc_electric_energy_input_per_month()
-        self.calc_heating_oil_consumed_per_month()
-        self.calc_heating_oil_saved_per_month()
-        self.calc_electric_consumption()
-        self.calc_heating_oil_saved()
-        self.calc_average_cop()
+        temperatures, percents = \
+            monthly.get_climate_arrays([self.comp_specs['data']])
+        values = monthly.calc_monthly_values(
+            temperatures, percents,
+            self.heat_energy_produced_per_year,
+            self.cd['heating oil efficiency'],
+            self.comp_specs['performance data']
+        )
+        yearly = monthly.calc_yearly_values(values)
+
+        self.monthly_value_table = monthly.to_monthly_table(values)
+        self.electric_consumption = yearly['electric consumption'][0]
+        self.heating_oil_saved = yearly['heating oil saved'][0]
+        self.average_cop = yearly['average cop'][0]
 
     def run (self, scalers = {'capital costs':1.0}):
         """run placeholder for child components
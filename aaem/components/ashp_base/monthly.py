@@ -0,0 +1,205 @@
+"""
+monthly.py
+
+    vectorized monthly performance of air source heat pumps. The COP curve
+is fit once for each set of performance data, and the monthly values of
+many communities are found at once as arrays with a row for each community
+and a column for each month.
+"""
+import numpy as np
+from pandas import DataFrame
+
+import aaem.constants as constants
+
+## months of the monthly tables, in the order of the heating year
+MONTHS = ['JUL', 'AUG', 'SEP', 'OCT', 'NOV', 'DEC',
+          'JAN', 'FEB', 'MAR', 'APR', 'MAY', 'JUN']
+
+TEMPERATURE_KEYS = ['Avg. Temp (F) ' + m for m in MONTHS]
+HEATING_LOAD_KEYS = ['% Heating Load ' + m for m in MONTHS]
+
+## columns of the monthly value table
+MONTHLY_COLUMNS = [
+    'Temperature',
+    'COP',
+    '% of total heating',
+    'mmbtu/mon',
+    'kWh consumed',
+    'Heating Oil Consumed (gal)',
+    'Heating Oil Saved (gal)',
+]
+
+## (temperatures, COPs) -> (slope, intercept, min temp, max temp, max COP)
+_cop_fits = {}
+
+def fit_cop (performance_data):
+    """fit the COP of an air source heat pump as a line in temperature, the
+    fit is done once for each set of performance data
+
+    Parameters
+    ----------
+    performance_data: dict
+        'Temperature' and 'COP' lists
+
+    Returns
+    -------
+    tuple
+        (slope, intercept, min temperature, max temperature, max COP)
+    """
+    key = (tuple(performance_data['Temperature']),
+        tuple(performance_data['COP']))
+    try:
+        return _cop_fits[key]
+    except KeyError:
+        pass
+    temp = np.asarray(key[0], dtype = float)
+    cop = np.asarray(key[1], dtype = float)
+    m, b = np.polyfit(temp, cop, 1)
+    _cop_fits[key] = (m, b, temp.min(), temp.max(), cop.max())
+    return _cop_fits[key]
+
+def get_climate_arrays (climate_data):
+    """get the monthly temperatures and heating loads of communities
+
+    Parameters
+    ----------
+    climate_data: list
+        the 'data' DataFrame of the ASHP section of each community, with
+    a 'value' column indexed by key
+
+    Returns
+    -------
+    tuple
+        (temperatures, heating load fractions), arrays with a row for each
+    community and a column for each month. Missing values are nan
+    """
+    temperatures = np.empty((len(climate_data), len(MONTHS)))
+    percents = np.empty((len(climate_data), len(MONTHS)))
+    for row, data in enumerate(climate_data):
+        values = data['value']
+        temperatures[row] = values.reindex(TEMPERATURE_KEYS).astype(float)
+        percents[row] = values.reindex(HEATING_LOAD_KEYS).astype(float)
+    return temperatures, percents
+
+def calc_cop (temperatures, performance_data):
+    """calculate the COP per month
+
+    Parameters
+    ----------
+    temperatures: array
+        average monthly temperatures (F)
+    performance_data: dict
+        'Temperature' and 'COP' lists
+
+    Returns
+    -------
+    array
+        COP of each month, the max COP at or above the max performance
+    temperature, and 0 below the min performance temperature
+    """
+    m, b, min_temp, max_temp, max_cop = fit_cop(performance_data)
+    temperatures = np.asarray(temperatures, dtype = float)
+    cop = m * temperatures + b
+    with np.errstate(invalid = 'ignore'):
+        cop[temperatures >= max_temp] = max_cop
+        cop[temperatures < min_temp] = 0
+    return cop
+
+def calc_monthly_values (temperatures, percents, heat_energy_produced,
+        heating_oil_efficiency, performance_data):
+    """calculate the monthly performance of air source heat pumps
+
+    Parameters
+    ----------
+    temperatures: array
+        average monthly temperatures (F), a row for each community
+    percents: array
+        fraction of the yearly heating load for each month, a row for each
+    community
+    heat_energy_produced: float or array
+        heat energy produced per year (mmbtu) for each community
+    heating_oil_efficiency: float or array
+        efficiency of heating oil heating for each community
+    performance_data: dict
+        'Temperature' and 'COP' lists
+
+    Returns
+    -------
+    dict
+        column of MONTHLY_COLUMNS -> array of monthly values, a row for each
+    community
+    """
+    temperatures = np.atleast_2d(np.asarray(temperatures, dtype = float))
+    percents = np.atleast_2d(np.asarray(percents, dtype = float))
+    heat = np.asarray(heat_energy_produced, dtype = float).reshape(-1, 1)
+    efficiency = \
+        np.asarray(heating_oil_efficiency, dtype = float).reshape(-1, 1)
+
+    cop = calc_cop(temperatures, performance_data)
+    mmbtu = heat * percents
+    with np.errstate(divide = 'ignore', invalid = 'ignore'):
+        kWh = mmbtu * constants.mmbtu_to_kWh / cop
+    kWh[np.isinf(kWh)] = 0
+    ## heating oil used when it is too cold for the heat pump
+    heating_oil = mmbtu * constants.mmbtu_to_gal_HF / efficiency
+    consumed = np.where(cop == 0, heating_oil, 0.0)
+
+    return {
+        'Temperature': temperatures,
+        'COP': cop,
+        '% of total heating': percents,
+        'mmbtu/mon': mmbtu,
+        'kWh consumed': kWh,
+        'Heating Oil Consumed (gal)': consumed,
+        'Heating Oil Saved (gal)': heating_oil - consumed,
+    }
+
+def calc_yearly_values (monthly):
+    """calculate the yearly performance of air source heat pumps
+
+    Parameters
+    ----------
+    monthly: dict
+        monthly values from calc_monthly_values
+
+    Returns
+    -------
+    dict
+        'electric consumption' (kWh/year), 'heating oil saved' (gal/year),
+    and 'average cop' (the heating load weighted COP of the months the
+    heat pump is used), arrays with a value for each community
+    """
+    cop = monthly['COP']
+    percents = monthly['% of total heating']
+    with np.errstate(invalid = 'ignore', divide = 'ignore'):
+        average_cop = np.nansum(cop * percents, axis = 1) / \
+            np.nansum(np.where(cop > 0, percents, 0), axis = 1)
+    return {
+        'electric consumption': np.nansum(monthly['kWh consumed'], axis = 1),
+        'heating oil saved':
+            np.nansum(monthly['Heating Oil Saved (gal)'], axis = 1),
+        'average cop': average_cop,
+    }
+
+def to_monthly_table (monthly, row = 0):
+    """create the monthly value table of a community
+
+    Parameters
+    ----------
+    monthly: dict
+        monthly values from calc_monthly_values
+    row: int, optional
+        row of the community
+
+    Returns
+    -------
+    DataFrame
+        MONTHLY_COLUMNS indexed by month
+    """
+    table = DataFrame(
+        dict([(c, monthly[c][row]) for c in MONTHLY_COLUMNS]),
+        index = MONTHS,
+        columns = MONTHLY_COLUMNS
+    )
+    table.index.name = 'key'
+    return table
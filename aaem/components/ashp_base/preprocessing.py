@@ -9,6 +9,8 @@ import os.path
 from pandas import read_csv
 import shutil
 
+from aaem import data_repository
+
             
 ## preprocess the existing projects
 def preprocess (preprocessor, **kwargs):
@@ -31,15 +33,16 @@ def preprocess (preprocessor, **kwargs):
     
     start_year = preprocessor.data['community']['current year'] + 1
     
-    data = read_csv(
+    ids = [preprocessor.communities[0],preprocessor.aliases[0]]
+    if preprocessor.intertie_status == 'child':
+        ids = [preprocessor.communities[1],preprocessor.aliases[1]]
+    climate_data = data_repository.get_rows(
         os.path.join(preprocessor.data_dir, "ashp_climate_data.csv"),
+        ids,
         comment = '#',
         index_col = 0
     )
-    ids = [preprocessor.communities[0],preprocessor.aliases[0]]
-    if preprocessor.intertie_status == 'child':
-        ids = [preprocessor.communities[1],preprocessor.aliases[1]]
-    climate_data = data.ix[ids][data.ix[ids].isnull().all(1) == False]
+    climate_data = climate_data[climate_data.isnull().all(1) == False]
     climate_data =  climate_data.T
     climate_data.columns = ['value']
     climate_data.index.name = 'key'
@@ -67,6 +67,12 @@ class ASHPNonResidential (ashp_base.ASHPBase):
         for this component
 
     """
+    ## attributes kept in compact records of the results, see
+    ## AnnualSavings.record_attributes
+    record_attributes = ashp_base.ASHPBase.record_attributes + [
+        'heat_displaced_sqft',
+    ]
+
     def __init__ (self, community_data, forecast,
                         diag = None, prerequisites = {}):
         """Class initialiser
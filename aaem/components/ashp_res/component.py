@@ -66,6 +66,13 @@ class ASHPResidential (ashp_base.ASHPBase):
         for this component
 
     """
+    ## attributes kept in compact records of the results, see
+    ## AnnualSavings.record_attributes
+    record_attributes = ashp_base.ASHPBase.record_attributes + [
+        'electric_heat_energy_reduction', 'num_houses',
+        'peak_monthly_btu_hr_hh',
+    ]
+
     def __init__ (self, community_data, forecast,
                         diag = None, prerequisites = {}):
         """Class initialiser
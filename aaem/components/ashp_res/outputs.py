@@ -9,6 +9,8 @@ import os.path
 import numpy as np
 from pandas import DataFrame
 from config import COMPONENT_NAME
+from aaem.summary_collectors import RowCollector, RegionalCollector
+from aaem.summary_collectors import collect_rows, collect_regional_summary
 import aaem.constants as constants
 from aaem.components import comp_order, definitions
 
@@ -42,85 +44,106 @@ def communities_summary (coms, res_dir):
         location to save file
     
     """
-    out = []
-    for c in sorted(coms.keys()):
-        #~ it = coms[c]['community data'].intertie
-        #~ if it is None:
-            #~ it = 'parent'
-        #~ if it == 'child':
-            #~ continue
-        if c.find("_intertie") != -1:
-            continue
-        try:
-            
-            ashp = coms[c][COMPONENT_NAME]
-            
-            kw_excess = ashp.monthly_value_table['kWh consumed'].max()/\
-                                (24 * 31)
-            try:
-                peak_monthly_btu_hr_hh = ashp.peak_monthly_btu_hr_hh
-            except AttributeError:
-                peak_monthly_btu_hr_hh = 0
-                    
-            try:
-                #~ ashp.get_electricity_prices()
-                price =  ashp.electricity_prices[0]
-                #~ print float(ashp.electricity_prices.ix[ashp.start_year])
-            except AttributeError:
-                
-                price = 0
-           
-            intertie = ashp.cd['intertie']
-            if type(intertie) is list:
-                intertie  = intertie[0]
-            else:
-                intertie = ashp.cd['name']
-                
-            try:
-                levelized_cost = ashp.levelized_cost_of_energy
-            except AttributeError:
-                levelized_cost = 0
-                
-            try:
-                break_even = ashp.break_even_cost
-            except AttributeError:
-                break_even = 0
-                
-            ashp.get_diesel_prices()
-            diesel_price = float(ashp.diesel_prices[0].round(2))
-            hf_price = diesel_price + ashp.cd['heating fuel premium']   
-            
-            name = c
-            if name == 'Barrow':
-                name = 'Utqiagvik (Barrow)'
-            l = [name, 
-                 ashp.average_cop,
-                 ashp.num_houses,
-                 peak_monthly_btu_hr_hh,
-                 price,
-                 ashp.electric_consumption,
-                 kw_excess,
-                 ashp.heating_oil_saved,
-                 ashp.electric_heat_energy_reduction,
-                 diesel_price,
-                 hf_price,
-                 break_even,
-                 levelized_cost,
-                 ashp.get_NPV_benefits(),
-                 ashp.get_NPV_costs(),
-                 ashp.get_NPV_net_benefit(),
-                 ashp.irr,
-                 ashp.get_BC_ratio(),
-                 intertie,
-                 ashp.reason
-                ]
-            out.append(l)
-            
-        except (KeyError,AttributeError) as e:
-            #~ print c
-            #~ print e
-            pass
-    
+    save_communities_summary(
+        collect_rows(communities_summary_row, coms), res_dir)
+
+def communities_summary_row (c, results):
+    """Gets the row of the summary by community for a community
+
+    Parameters
+    ----------
+    c : str
+        community or project name
+    results : dictionary
+        results from the model for the community
+
+    Returns
+    -------
+    list or None
+        row of the summary, or None if the community is not in the summary
+    """
+    #~ it = results['community data'].intertie
+    #~ if it is None:
+        #~ it = 'parent'
+    #~ if it == 'child':
+        #~ continue
+    if c.find("_intertie") != -1:
+        return None
+
+    ashp = results[COMPONENT_NAME]
+
+    kw_excess = ashp.monthly_value_table['kWh consumed'].max()/\
+                        (24 * 31)
+    try:
+        peak_monthly_btu_hr_hh = ashp.peak_monthly_btu_hr_hh
+    except AttributeError:
+        peak_monthly_btu_hr_hh = 0
+
+    try:
+        #~ ashp.get_electricity_prices()
+        price =  ashp.electricity_prices[0]
+        #~ print float(ashp.electricity_prices.ix[ashp.start_year])
+    except AttributeError:
+
+        price = 0
+
+    intertie = ashp.cd['intertie']
+    if type(intertie) is list:
+        intertie  = intertie[0]
+    else:
+        intertie = ashp.cd['name']
+
+    try:
+        levelized_cost = ashp.levelized_cost_of_energy
+    except AttributeError:
+        levelized_cost = 0
+
+    try:
+        break_even = ashp.break_even_cost
+    except AttributeError:
+        break_even = 0
+
+    ashp.get_diesel_prices()
+    diesel_price = float(ashp.diesel_prices[0].round(2))
+    hf_price = diesel_price + ashp.cd['heating fuel premium']   
+
+    name = c
+    if name == 'Barrow':
+        name = 'Utqiagvik (Barrow)'
+    l = [name, 
+         ashp.average_cop,
+         ashp.num_houses,
+         peak_monthly_btu_hr_hh,
+         price,
+         ashp.electric_consumption,
+         kw_excess,
+         ashp.heating_oil_saved,
+         ashp.electric_heat_energy_reduction,
+         diesel_price,
+         hf_price,
+         break_even,
+         levelized_cost,
+         ashp.get_NPV_benefits(),
+         ashp.get_NPV_costs(),
+         ashp.get_NPV_net_benefit(),
+         ashp.irr,
+         ashp.get_BC_ratio(),
+         intertie,
+         ashp.reason
+        ]
+    return l
+
+def save_communities_summary (out, res_dir):
+    """Saves the summary by community
+
+    Parameters
+    ----------
+    out : list
+        rows of the summary, from communities_summary_row, sorted by
+        community
+    res_dir : path
+        location to save file
+    """
     cols =  ['Community',
              "ASHP Residential Average Coefficient of Performance (COP)",
              'Number Houses',
@@ -177,7 +200,15 @@ def communities_summary (coms, res_dir):
     
     fd.close()
     data.to_csv(f_name, mode='a')
-    
+
+
+REGIONAL_COLUMNS = ['Number of communities in region',
+    'Number of communities with cost effective projects',
+    'Investment needed for cost-effective projects ($)',
+    'Net benefit of cost-effective projects ($)',
+    'Heating oil displaced by cost-effective projects (gallons)',
+    'Additional capacity needed (kW)']
+
 def create_regional_summary (results):
     """Creates the regional summary
     
@@ -192,71 +223,54 @@ def create_regional_summary (results):
         pandas DataFrame containing regional results
     
     """
-    regions = {}
-    for c in results:
-        c_region = results[c]['community data'].get_item('community','region')
-        comp = results[c][COMPONENT_NAME]
-        #~ print comp
-        bc_ratio = comp.get_BC_ratio()
-        bc_ratio = (not type(bc_ratio) is str) and (not np.isinf(bc_ratio))\
-                                              and (bc_ratio > 1)
-        #~ print bc_ratio ,comp.get_BC_ratio()
-        #~ return
-        capex = round(comp.get_NPV_costs(),0)  if bc_ratio else 0
-        net_benefit = round(comp.get_NPV_net_benefit(),0)  if bc_ratio else 0
-        displaced_hoil = round(comp.heating_oil_saved,0) if bc_ratio else 0
-        
-        add_kW = round(comp.monthly_value_table['kWh consumed'].max()/\
-                                (24 * 31),0) if bc_ratio else 0
-        
-        
-        
-        if results[c]['community data'].intertie == 'parent' or \
-                                                            c.find('+') != -1:
-            continue
-        if c_region in regions.keys():
-            ## append entry
-            regions[c_region]['Number of communities in region'] +=1
-            k = 'Number of communities with cost effective projects'
-            regions[c_region][k] += 1 if bc_ratio else 0
-            k = 'Investment needed for cost-effective projects ($)'
-            regions[c_region][k] += capex 
-            k = 'Net benefit of cost-effective projects ($)'
-            regions[c_region][k] += net_benefit
-            k = 'Heating oil displaced by cost-effective projects (gallons)'
-            regions[c_region][k] += displaced_hoil
-            k = 'Additional capacity needed (kW)'
-            regions[c_region][k] += add_kW
-            
-        else:
-            ## set up "first" entry
-            regions[c_region] = {'Number of communities in region':1}
-            k = 'Number of communities with cost effective projects'
-            regions[c_region][k] = 1 if bc_ratio else 0
-            k = 'Investment needed for cost-effective projects ($)'
-            regions[c_region][k] = capex 
-            k = 'Net benefit of cost-effective projects ($)'
-            regions[c_region][k] = net_benefit
-            k = 'Heating oil displaced by cost-effective projects (gallons)'
-            regions[c_region][k] = displaced_hoil
-            k = 'Additional capacity needed (kW)'
-            regions[c_region][k] = add_kW
-            
-    cols = ['Number of communities in region',
-                        'Number of communities with cost effective projects',
-                        'Investment needed for cost-effective projects ($)',
-                        'Net benefit of cost-effective projects ($)',
-                        'Heating oil displaced by cost-effective projects (gallons)',
-                        'Additional capacity needed (kW)']
-                        
-    try:        
-        summary = DataFrame(regions).T[cols]
-    except KeyError:
-        summary = DataFrame(columns = cols)
-    
-    summary.ix['All Regions'] = summary.sum()  
-    return summary
-    
+    return collect_regional_summary(regional_summary_row,
+        REGIONAL_COLUMNS, results)
+
+def regional_summary_row (c, results):
+    """Gets what a community adds to the regional summary
+
+    Parameters
+    ----------
+    c : str
+        community or project name
+    results : dictionary
+        results from the model for the community
+
+    Returns
+    -------
+    tuple or None
+        (region, values in the order of REGIONAL_COLUMNS), or None if the
+        community is not counted
+    """
+    c_region = results['community data'].get_item('community','region')
+    comp = results[COMPONENT_NAME]
+    #~ print comp
+    bc_ratio = comp.get_BC_ratio()
+    bc_ratio = (not type(bc_ratio) is str) and (not np.isinf(bc_ratio))\
+                                          and (bc_ratio > 1)
+    #~ print bc_ratio ,comp.get_BC_ratio()
+    #~ return
+    capex = round(comp.get_NPV_costs(),0)  if bc_ratio else 0
+    net_benefit = round(comp.get_NPV_net_benefit(),0)  if bc_ratio else 0
+    displaced_hoil = round(comp.heating_oil_saved,0) if bc_ratio else 0
+
+    add_kW = round(comp.monthly_value_table['kWh consumed'].max()/\
+                            (24 * 31),0) if bc_ratio else 0
+
+
+    if results['community data'].intertie == 'parent' or \
+                                                        c.find('+') != -1:
+        return None
+    return c_region, [
+        1,
+        1 if bc_ratio else 0,
+        capex,
+        net_benefit,
+        displaced_hoil,
+        add_kW
+    ]
+
+
 def save_regional_summary (summary, res_dir):
     """Saves the summary by region:  __regional_residential_ashp_summary.csv
     
@@ -272,4 +286,18 @@ def save_regional_summary (summary, res_dir):
                 COMPONENT_NAME.lower().replace(' ','_').\
                     replace('(','').replace(')','') + '_summary.csv')
     summary.to_csv(f_name, mode='w', index_label='region')
-    
+
+def get_summary_collectors ():
+    """Gets the collectors for the summaries of the component, to make the
+    summaries in one pass over the results, see aaem.summary_collectors
+
+    Returns
+    -------
+    list
+        collectors for the summary by community, and the regional summary
+    """
+    return [
+        RowCollector(communities_summary_row, save_communities_summary),
+        RegionalCollector(regional_summary_row, REGIONAL_COLUMNS,
+            save_regional_summary),
+    ]
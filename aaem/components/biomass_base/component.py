@@ -54,6 +54,14 @@ class BiomassBase (AnnualSavings):
         diagnostics module, see information on diagnostics Object
 
     """
+    ## attributes kept in compact records of the results, see
+    ## AnnualSavings.record_attributes
+    record_attributes = AnnualSavings.record_attributes + [
+        'biomass_type', 'units', 'biomass_fuel_consumed',
+        'fuel_price_per_unit', 'heat_diesel_displaced', 'heat_displaced_sqft',
+        'max_boiler_output',
+    ]
+
     def __init__ (self, community_data, forecast,
                         diag = None, prerequisites = {}):
         """Class initialiser
@@ -6,8 +6,9 @@ Biomass base preprocessing
 
 """
 import os.path
-from pandas import read_csv
 import numpy as np
+
+from aaem import data_repository
     
 def preprocess (preprocessor, **kwargs):
     """preprocess data related to existing projects
@@ -35,12 +36,13 @@ def preprocess (preprocessor, **kwargs):
         ids = [preprocessor.communities[1],preprocessor.aliases[1]]
     
     
-    data = read_csv(
+    bio_data = data_repository.get_rows(
         os.path.join(preprocessor.data_dir,"biomass_resource_data.csv"),
+        ids,
         comment = '#',
         index_col = 0)
     
-    bio_data = data.ix[ids][data.ix[ids].isnull().all(1) == False]
+    bio_data = bio_data[bio_data.isnull().all(1) == False]
     
     if len(bio_data) != 0:
         bio_data = bio_data.iloc[0]
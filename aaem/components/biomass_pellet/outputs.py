@@ -9,10 +9,16 @@ import os.path
 import numpy as np
 from pandas import DataFrame
 from config import COMPONENT_NAME
+from aaem.summary_collectors import RowCollector, RegionalCollector
+from aaem.summary_collectors import collect_rows, collect_regional_summary
 import aaem.constants as constants
 from aaem.components import comp_order, definitions
 
 
+## biomass type and units of the component, used in the summary
+BIOMASS_TYPE = 'pellets'
+UNITS = 'tons'
+
 ## component summary
 def component_summary (results, res_dir):
     """Creates the regional and communities summary for the component in provided 
@@ -42,83 +48,105 @@ def communities_summary (coms, res_dir):
         location to save file
     
     """
-    out = []
-    for c in sorted(coms.keys()):
-        #~ it = coms[c]['community data'].intertie
-        #~ if it is None:
-            #~ it = 'parent'
-        #~ if it == 'child':
-            #~ continue
-        if c.find("_intertie") != -1:
-            continue
-        try:
-            
-           
-            biomass = coms[c][COMPONENT_NAME]
-            
-            
-            biomass.get_diesel_prices()
-            diesel_price = float(biomass.diesel_prices[0].round(2))
-            hf_price = diesel_price + biomass.cd['heating fuel premium']  
-            
-            try:
-                break_even = biomass.break_even_cost
-            except AttributeError:
-                break_even = 0
-               
-            
-            try:
-                levelized_cost = biomass.levelized_cost_of_energy
-            except AttributeError:
-                levelized_cost = 0
-            
-            
-            name = c
-            if name == 'Barrow':
-                name = 'Utqiagvik (Barrow)'
-            l = [name,  
-                 biomass.max_boiler_output,
-                 biomass.heat_displaced_sqft,
-                 biomass.biomass_fuel_consumed,
-                 biomass.fuel_price_per_unit,
-                 biomass.comp_specs['energy density'],
-                 biomass.heat_diesel_displaced,
-                 hf_price,
-                 break_even,
-                 levelized_cost,
-                 biomass.get_NPV_benefits(),
-                 biomass.get_NPV_costs(),
-                 biomass.get_NPV_net_benefit(),
-                 biomass.irr,
-                 biomass.get_BC_ratio(),
-                 biomass.reason
-                ]
-            out.append(l)
-            
-        except (KeyError,AttributeError) as e:
-            #~ print e
-            pass
+    save_communities_summary(
+        collect_rows(communities_summary_row, coms), res_dir)
+
+def communities_summary_row (c, results):
+    """Gets the row of the summary by community for a community
+
+    Parameters
+    ----------
+    c : str
+        community or project name
+    results : dictionary
+        results from the model for the community
+
+    Returns
+    -------
+    list or None
+        row of the summary, or None if the community is not in the summary
+    """
+    #~ it = results['community data'].intertie
+    #~ if it is None:
+        #~ it = 'parent'
+    #~ if it == 'child':
+        #~ continue
+    if c.find("_intertie") != -1:
+        return None
+
+
+    biomass = results[COMPONENT_NAME]
+
+
+    biomass.get_diesel_prices()
+    diesel_price = float(biomass.diesel_prices[0].round(2))
+    hf_price = diesel_price + biomass.cd['heating fuel premium']  
+
+    try:
+        break_even = biomass.break_even_cost
+    except AttributeError:
+        break_even = 0
+
+
     try:
-        cols = ['Community',
-            'Maximum Biomass Boiler Output [Btu/hr]',
-            'Biomass Heat Displacement square footage [Sqft]',
-            'Proposed ' + biomass.biomass_type + \
-                            " Consumed [" + biomass.units +"]",
-            'Price [$/' + biomass.units + ']',
-            "Energy Density [Btu/" + biomass.units + "]",
-            'Displaced Heating Oil by Biomass [Gal]',
-            "Heating Fuel Price - year 1 [$/gal]",
-            'Break Even Heating Fuel Price [$/gal]',
-            'Levelized Cost Of Energy [$/MMBtu]',
-            'Biomass pellet NPV benefits [$]',
-            'Biomass pellet NPV Costs [$]',
-            'Biomass pellet NPV Net benefit [$]',
-            'Biomass pellet Internal Rate of Return',
-            'Biomass pellet Benefit-cost ratio',
-            'notes'
-            ]
-    except UnboundLocalError:
+        levelized_cost = biomass.levelized_cost_of_energy
+    except AttributeError:
+        levelized_cost = 0
+
+
+    name = c
+    if name == 'Barrow':
+        name = 'Utqiagvik (Barrow)'
+    l = [name,  
+         biomass.max_boiler_output,
+         biomass.heat_displaced_sqft,
+         biomass.biomass_fuel_consumed,
+         biomass.fuel_price_per_unit,
+         biomass.comp_specs['energy density'],
+         biomass.heat_diesel_displaced,
+         hf_price,
+         break_even,
+         levelized_cost,
+         biomass.get_NPV_benefits(),
+         biomass.get_NPV_costs(),
+         biomass.get_NPV_net_benefit(),
+         biomass.irr,
+         biomass.get_BC_ratio(),
+         biomass.reason
+        ]
+    return l
+
+def save_communities_summary (out, res_dir):
+    """Saves the summary by community
+
+    Parameters
+    ----------
+    out : list
+        rows of the summary, from communities_summary_row, sorted by
+        community
+    res_dir : path
+        location to save file
+    """
+    if len(out) == 0:
         return
+    cols = ['Community',
+        'Maximum Biomass Boiler Output [Btu/hr]',
+        'Biomass Heat Displacement square footage [Sqft]',
+        'Proposed ' + BIOMASS_TYPE + \
+                        " Consumed [" + UNITS +"]",
+        'Price [$/' + UNITS + ']',
+        "Energy Density [Btu/" + UNITS + "]",
+        'Displaced Heating Oil by Biomass [Gal]',
+        "Heating Fuel Price - year 1 [$/gal]",
+        'Break Even Heating Fuel Price [$/gal]',
+        'Levelized Cost Of Energy [$/MMBtu]',
+        'Biomass pellet NPV benefits [$]',
+        'Biomass pellet NPV Costs [$]',
+        'Biomass pellet NPV Net benefit [$]',
+        'Biomass pellet Internal Rate of Return',
+        'Biomass pellet Benefit-cost ratio',
+        'notes'
+        ]
             
     data = DataFrame(out,columns = cols).set_index('Community')#.round(2)
     f_name = os.path.join(res_dir,
@@ -128,10 +156,10 @@ def communities_summary (coms, res_dir):
     fd.write(("# " + COMPONENT_NAME + " summary by community\n"
             '# Maximum Biomass Boiler Output [Btu/hr]:\n'
             '# Biomass Heat Displacement square footage [Sqft]: Non-residential area to heat with biomass\n'
-            '# Proposed ' + biomass.biomass_type + ""
-                "Consumed [" + biomass.units +"]: Proposed biomass fuel consumed\n"
-            '# Price [$/' + biomass.units + ']: Price of biomass fuel\n'
-            "# Energy Density [Btu/" + biomass.units + "]: Energy Density of fuel\n"
+            '# Proposed ' + BIOMASS_TYPE + ""
+                "Consumed [" + UNITS +"]: Proposed biomass fuel consumed\n"
+            '# Price [$/' + UNITS + ']: Price of biomass fuel\n'
+            "# Energy Density [Btu/" + UNITS + "]: Energy Density of fuel\n"
             '# Displaced Heating Oil by Biomass [Gal]: Estimated heating fuel displace by biomass heating\n'
             '# Heating Fuel Price - year 1 [$/gal]: ' + definitions.PRICE_HF + '\n'
             '# Break Even Heating Fuel Price [$/gal]: ' + definitions.BREAK_EVEN_COST_HF + '\n'
@@ -144,7 +172,14 @@ def communities_summary (coms, res_dir):
             '# notes: '+ definitions.NOTES +'\n'))
     fd.close()
     data.to_csv(f_name, mode='a')
-    
+
+
+REGIONAL_COLUMNS = ['Number of communities in region',
+    'Number of communities with cost effective projects',
+    'Investment needed for cost-effective projects ($)',
+    'Net benefit of cost-effective projects ($)',
+    'Heating oil displaced by cost-effective projects (gallons)']
+
 def create_regional_summary (results):
     """Creates the regional summary
     
@@ -159,63 +194,50 @@ def create_regional_summary (results):
         pandas DataFrame containing regional results
     
     """
-    regions = {}
-    for c in results:
-        c_region = results[c]['community data'].get_item('community','region')
-        comp = results[c][COMPONENT_NAME]
-        #~ print comp
-        bc_ratio = comp.get_BC_ratio()
-        bc_ratio = (not type(bc_ratio) is str) and (not np.isinf(bc_ratio))\
-                                              and (bc_ratio > 1)
-        #~ print bc_ratio ,comp.get_BC_ratio()
-        #~ return
-        capex = round(comp.get_NPV_costs(),0)  if bc_ratio else 0
-        net_benefit = round(comp.get_NPV_net_benefit(),0)  if bc_ratio else 0
-        displaced_hoil = round(comp.heat_diesel_displaced,0)  if bc_ratio else 0
-        
-        
-        
-        if results[c]['community data'].intertie == 'parent' or \
-                                                            c.find('+') != -1:
-            continue
-        if c_region in regions.keys():
-            ## append entry
-            regions[c_region]['Number of communities in region'] +=1
-            k = 'Number of communities with cost effective projects'
-            regions[c_region][k] += 1 if bc_ratio else 0
-            k = 'Investment needed for cost-effective projects ($)'
-            regions[c_region][k] += capex 
-            k = 'Net benefit of cost-effective projects ($)'
-            regions[c_region][k] += net_benefit
-            k = 'Heating oil displaced by cost-effective projects (gallons)'
-            regions[c_region][k] += displaced_hoil
-            
-        else:
-            ## set up "first" entry
-            regions[c_region] = {'Number of communities in region':1}
-            k = 'Number of communities with cost effective projects'
-            regions[c_region][k] = 1 if bc_ratio else 0
-            k = 'Investment needed for cost-effective projects ($)'
-            regions[c_region][k] = capex 
-            k = 'Net benefit of cost-effective projects ($)'
-            regions[c_region][k] = net_benefit
-            k = 'Heating oil displaced by cost-effective projects (gallons)'
-            regions[c_region][k] = displaced_hoil
-            
-    cols = ['Number of communities in region',
-            'Number of communities with cost effective projects',
-            'Investment needed for cost-effective projects ($)',
-            'Net benefit of cost-effective projects ($)',
-            'Heating oil displaced by cost-effective projects (gallons)']
-    
-    try:        
-        summary = DataFrame(regions).T[cols]
-    except KeyError:
-        summary = DataFrame(columns = cols)
-    
-    summary.ix['All Regions'] = summary.sum()  
-    return summary
-    
+    return collect_regional_summary(regional_summary_row,
+        REGIONAL_COLUMNS, results)
+
+def regional_summary_row (c, results):
+    """Gets what a community adds to the regional summary
+
+    Parameters
+    ----------
+    c : str
+        community or project name
+    results : dictionary
+        results from the model for the community
+
+    Returns
+    -------
+    tuple or None
+        (region, values in the order of REGIONAL_COLUMNS), or None if the
+        community is not counted
+    """
+    c_region = results['community data'].get_item('community','region')
+    comp = results[COMPONENT_NAME]
+    #~ print comp
+    bc_ratio = comp.get_BC_ratio()
+    bc_ratio = (not type(bc_ratio) is str) and (not np.isinf(bc_ratio))\
+                                          and (bc_ratio > 1)
+    #~ print bc_ratio ,comp.get_BC_ratio()
+    #~ return
+    capex = round(comp.get_NPV_costs(),0)  if bc_ratio else 0
+    net_benefit = round(comp.get_NPV_net_benefit(),0)  if bc_ratio else 0
+    displaced_hoil = round(comp.heat_diesel_displaced,0)  if bc_ratio else 0
+
+
+    if results['community data'].intertie == 'parent' or \
+                                                        c.find('+') != -1:
+        return None
+    return c_region, [
+        1,
+        1 if bc_ratio else 0,
+        capex,
+        net_benefit,
+        displaced_hoil
+    ]
+
+
 def save_regional_summary (summary, res_dir):
     """Saves the summary by region:  __regional_biomass_pellet_summary.csv
     
@@ -231,3 +253,18 @@ def save_regional_summary (summary, res_dir):
                 COMPONENT_NAME.lower().replace(' ','_').\
                     replace('(','').replace(')','') + '_summary.csv')
     summary.to_csv(f_name, mode='w', index_label='region')
+
+def get_summary_collectors ():
+    """Gets the collectors for the summaries of the component, to make the
+    summaries in one pass over the results, see aaem.summary_collectors
+
+    Returns
+    -------
+    list
+        collectors for the summary by community, and the regional summary
+    """
+    return [
+        RowCollector(communities_summary_row, save_communities_summary),
+        RegionalCollector(regional_summary_row, REGIONAL_COLUMNS,
+            save_regional_summary),
+    ]
@@ -59,6 +59,14 @@ class DieselEfficiency(AnnualSavings):
         diagnostics module, see information on diagnostics Object
 
     """
+    ## attributes kept in compact records of the results, see
+    ## AnnualSavings.record_attributes
+    record_attributes = AnnualSavings.record_attributes + [
+        'average_load', 'max_capacity', 'generation',
+        'baseline_diesel_efficiency', 'proposed_diesel_efficiency',
+        'baseline_generation_fuel_use', 'proposed_generation_fuel_use',
+    ]
+
     def __init__ (self, community_data, forecast,
                         diag = None, prerequisites = {}):
         """Class initialiser
@@ -180,7 +188,7 @@ class DieselEfficiency(AnnualSavings):
         self.generation = self.forecast.generation['generation diesel']\
                                 .ix[self.start_year:self.end_year].values
         self.average_load = \
-                self.forecast.yearly_average_diesel_load.ix[self.start_year]
+                self.forecast.get_average_diesel_load(self.start_year)
 
         #~ print 'self.average_load',self.average_load
 
@@ -9,6 +9,8 @@ import os.path
 import numpy as np
 from pandas import DataFrame
 from config import COMPONENT_NAME
+from aaem.summary_collectors import RowCollector, RegionalCollector
+from aaem.summary_collectors import collect_rows, collect_regional_summary
 import aaem.constants as constants
 from aaem.components import comp_order, definitions
 
@@ -42,90 +44,112 @@ def communities_summary (coms, res_dir):
         location to save file
     
     """
-    out = []
-    for c in sorted(coms.keys()):
-        it = coms[c]['community data'].intertie
-        if it is None:
-            it = 'parent'
-        if it == 'child' or c.find("+") != -1:
-            continue
-        #~ if c.find("_intertie") != -1:
-            #~ continue
-        try:
-            comp = coms[c][COMPONENT_NAME]
-            
-            comp.get_diesel_prices()
-            diesel_price = float(comp.diesel_prices[0].round(2))
-            try:
-                average_load = comp.average_load
-            except AttributeError:
-                average_load = np.nan
-            try:
-                current_capacity = comp.cd['total capacity']
-            except AttributeError:
-                current_capacity = np.nan
-            try:
-                max_capacity = comp.max_capacity
-            except AttributeError:
-                max_capacity = np.nan
-            try:
-                generation = comp.generation[0]
-            except AttributeError:
-                generation = np.nan
-            try:
-                baseline_eff = comp.baseline_diesel_efficiency
-            except AttributeError:
-                baseline_eff = np.nan
-            try:
-                proposed_eff = comp.proposed_diesel_efficiency
-            except AttributeError:
-                proposed_eff = np.nan
-            try:
-                baseline_fuel = comp.baseline_generation_fuel_use[0]
-            except AttributeError:
-                baseline_fuel = np.nan
-            try:
-                proposed_fuel = comp.proposed_generation_fuel_use[0]
-            except AttributeError:
-                proposed_fuel = np.nan
-            
-            try:
-                break_even_cost = comp.break_even_cost
-                levelized_cost_of_energy = comp.levelized_cost_of_energy
-            except AttributeError:
-                break_even_cost = np.nan
-                levelized_cost_of_energy = np.nan
-            
-            name = c
-            if name == 'Barrow':
-                name = 'Utqiagvik (Barrow)'
-            l = [name,  
-                 average_load,
-                 current_capacity,
-                 max_capacity,
-                 generation,
-                 
-                 baseline_eff,
-                 proposed_eff,
-                 baseline_fuel,
-                 proposed_fuel,
-                 diesel_price,
-                 
-                 break_even_cost,
-                 levelized_cost_of_energy,
-                 comp.get_NPV_benefits(),
-                 comp.get_NPV_costs(),
-                 comp.get_NPV_net_benefit(),
-                 comp.irr,
-                 comp.get_BC_ratio(),
-                 comp.reason
-                ]
-            out.append(l)
-            
-        except (KeyError,AttributeError) as e:
-            print e
-            pass
-    
+    save_communities_summary(
+        collect_rows(communities_summary_row, coms), res_dir)
+
+def communities_summary_row (c, results):
+    """Gets the row of the summary by community for a community
+
+    Parameters
+    ----------
+    c : str
+        community or project name
+    results : dictionary
+        results from the model for the community
+
+    Returns
+    -------
+    list or None
+        row of the summary, or None if the community is not in the summary
+    """
+    it = results['community data'].intertie
+    if it is None:
+        it = 'parent'
+    if it == 'child' or c.find("+") != -1:
+        return None
+    #~ if c.find("_intertie") != -1:
+        #~ continue
+    comp = results[COMPONENT_NAME]
+
+    comp.get_diesel_prices()
+    diesel_price = float(comp.diesel_prices[0].round(2))
+    try:
+        average_load = comp.average_load
+    except AttributeError:
+        average_load = np.nan
+    try:
+        current_capacity = comp.cd['total capacity']
+    except AttributeError:
+        current_capacity = np.nan
+    try:
+        max_capacity = comp.max_capacity
+    except AttributeError:
+        max_capacity = np.nan
+    try:
+        generation = comp.generation[0]
+    except AttributeError:
+        generation = np.nan
+    try:
+        baseline_eff = comp.baseline_diesel_efficiency
+    except AttributeError:
+        baseline_eff = np.nan
+    try:
+        proposed_eff = comp.proposed_diesel_efficiency
+    except AttributeError:
+        proposed_eff = np.nan
+    try:
+        baseline_fuel = comp.baseline_generation_fuel_use[0]
+    except AttributeError:
+        baseline_fuel = np.nan
+    try:
+        proposed_fuel = comp.proposed_generation_fuel_use[0]
+    except AttributeError:
+        proposed_fuel = np.nan
+
+    try:
+        break_even_cost = comp.break_even_cost
+        levelized_cost_of_energy = comp.levelized_cost_of_energy
+    except AttributeError:
+        break_even_cost = np.nan
+        levelized_cost_of_energy = np.nan
+
+    name = c
+    if name == 'Barrow':
+        name = 'Utqiagvik (Barrow)'
+    l = [name,  
+         average_load,
+         current_capacity,
+         max_capacity,
+         generation,
+
+         baseline_eff,
+         proposed_eff,
+         baseline_fuel,
+         proposed_fuel,
+         diesel_price,
+
+         break_even_cost,
+         levelized_cost_of_energy,
+         comp.get_NPV_benefits(),
+         comp.get_NPV_costs(),
+         comp.get_NPV_net_benefit(),
+         comp.irr,
+         comp.get_BC_ratio(),
+         comp.reason
+        ]
+    return l
+
+def save_communities_summary (out, res_dir):
+    """Saves the summary by community
+
+    Parameters
+    ----------
+    out : list
+        rows of the summary, from communities_summary_row, sorted by
+        community
+    res_dir : path
+        location to save file
+    """
     cols = ['Community', 'Average Load [kW]', 'Current Capacity [kW]',
             'Proposed Capacity [kW]', 'Generation - year 1[kWh]',
             
@@ -171,6 +195,13 @@ def communities_summary (coms, res_dir):
     fd.close()
     data.to_csv(f_name, mode='a')
 
+
+REGIONAL_COLUMNS = ['Number of communities/interties in region',
+    'Number of communities with cost effective projects',
+    'Investment needed for cost-effective projects ($)',
+    'Net benefit of cost-effective projects ($)',
+    'Generation diesel displaced by cost-effective projects (gallons)']
+
 def create_regional_summary (results):
     """Creates the regional summary
     
@@ -186,67 +217,52 @@ def create_regional_summary (results):
         containing regional results
     
     """
-    #~ print "start"
-    regions = {}
-    for c in results:
-        c_region = results[c]['community data'].get_item('community','region')
-        comp = results[c][COMPONENT_NAME]
-        #~ print comp
-        bc_ratio = comp.get_BC_ratio()
-        bc_ratio = (not type(bc_ratio) is str) and (not np.isinf(bc_ratio))\
-                                              and (bc_ratio > 1)
-        #~ print bc_ratio ,comp.get_BC_ratio()
-        #~ return
-        capex = round(comp.get_NPV_costs(),0)  if bc_ratio else 0
-        net_benefit = round(comp.get_NPV_net_benefit(),0)  if bc_ratio else 0
-       
-        displaced_fuel = \
-            round(comp.baseline_generation_fuel_use[0] - \
-                    comp.proposed_generation_fuel_use[0],0) if bc_ratio else 0
+    return collect_regional_summary(regional_summary_row,
+        REGIONAL_COLUMNS, results)
+
+def regional_summary_row (c, results):
+    """Gets what a community adds to the regional summary
+
+    Parameters
+    ----------
+    c : str
+        community or project name
+    results : dictionary
+        results from the model for the community
+
+    Returns
+    -------
+    tuple or None
+        (region, values in the order of REGIONAL_COLUMNS), or None if the
+        community is not counted
+    """
+    c_region = results['community data'].get_item('community','region')
+    comp = results[COMPONENT_NAME]
+    #~ print comp
+    bc_ratio = comp.get_BC_ratio()
+    bc_ratio = (not type(bc_ratio) is str) and (not np.isinf(bc_ratio))\
+                                          and (bc_ratio > 1)
+    #~ print bc_ratio ,comp.get_BC_ratio()
+    #~ return
+    capex = round(comp.get_NPV_costs(),0)  if bc_ratio else 0
+    net_benefit = round(comp.get_NPV_net_benefit(),0)  if bc_ratio else 0
+
+    displaced_fuel = \
+        round(comp.baseline_generation_fuel_use[0] - \
+                comp.proposed_generation_fuel_use[0],0) if bc_ratio else 0
+
+    if (results['community data'].intertie == 'child' or c.find('+') != -1):
+        #~ print c
+        return None
+    return c_region, [
+        1,
+        1 if bc_ratio else 0,
+        capex,
+        net_benefit,
+        displaced_fuel
+    ]
+
 
-        if (results[c]['community data'].intertie == 'child' or c.find('+') != -1):
-            #~ print c
-            continue
-        if c_region in regions.keys():
-            ## append entry
-            regions[c_region]['Number of communities/interties in region'] +=1
-            k = 'Number of communities with cost effective projects'
-            regions[c_region][k] += 1 if bc_ratio else 0
-            k = 'Investment needed for cost-effective projects ($)'
-            regions[c_region][k] += capex 
-            k = 'Net benefit of cost-effective projects ($)'
-            regions[c_region][k] += net_benefit
-            k = 'Generation diesel displaced by cost-effective projects (gallons)'
-            regions[c_region][k] += displaced_fuel
-            
-        else:
-            ## set up "first" entry
-            regions[c_region] = {'Number of communities/interties in region':1}
-            k = 'Number of communities with cost effective projects'
-            regions[c_region][k] = 1 if bc_ratio else 0
-            k = 'Investment needed for cost-effective projects ($)'
-            regions[c_region][k] = capex 
-            k = 'Net benefit of cost-effective projects ($)'
-            regions[c_region][k] = net_benefit
-            k = 'Generation diesel displaced by cost-effective projects (gallons)'
-            regions[c_region][k] = displaced_fuel
-            
-    cols = ['Number of communities/interties in region',
-            'Number of communities with cost effective projects',
-            'Investment needed for cost-effective projects ($)',
-            'Net benefit of cost-effective projects ($)',
-            'Generation diesel displaced by cost-effective projects (gallons)']
-    
-    try:        
-        summary = DataFrame(regions).T[cols]
-    except KeyError:
-        summary = DataFrame(columns = cols)
-    
-    
-    summary.ix['All Regions'] = summary.sum()                 
-    #~ print summary
-    return summary
-    
 def save_regional_summary (summary, res_dir):
     """Saves the summary by region:  __regional_diesel_efficiency_summary.csv
     
@@ -262,3 +278,18 @@ def save_regional_summary (summary, res_dir):
                 COMPONENT_NAME.lower().replace(' ','_').\
                     replace('(','').replace(')','') + '_summary.csv')
     summary.to_csv(f_name, mode='w', index_label='region')
+
+def get_summary_collectors ():
+    """Gets the collectors for the summaries of the component, to make the
+    summaries in one pass over the results, see aaem.summary_collectors
+
+    Returns
+    -------
+    list
+        collectors for the summary by community, and the regional summary
+    """
+    return [
+        RowCollector(communities_summary_row, save_communities_summary),
+        RegionalCollector(regional_summary_row, REGIONAL_COLUMNS,
+            save_regional_summary),
+    ]
@@ -63,6 +63,12 @@ class HeatRecovery (AnnualSavings):
         diagnostics module, see information on diagnostics Object
 
     """
+    ## attributes kept in compact records of the results, see
+    ## AnnualSavings.record_attributes
+    record_attributes = AnnualSavings.record_attributes + [
+        'proposed_heat_recovery',
+    ]
+
     def __init__ (self, community_data, forecast,
                         diag = None, prerequisites = {}):
         """Class initialiser
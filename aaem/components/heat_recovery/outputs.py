@@ -9,6 +9,8 @@ import os.path
 import numpy as np
 from pandas import DataFrame
 from config import COMPONENT_NAME
+from aaem.summary_collectors import RowCollector, RegionalCollector
+from aaem.summary_collectors import collect_rows, collect_regional_summary
 import aaem.constants as constants
 from aaem.components import comp_order, definitions
 
@@ -42,59 +44,81 @@ def communities_summary (coms, res_dir):
         location to save file
     
     """
-    out = []
-    for c in sorted(coms.keys()):
-        #~ it = coms[c]['community data'].intertie
-        #~ if it is None:
-            #~ it = 'parent'
-        #~ if it == 'child':
-            #~ continue
-        if c.find("_intertie") != -1:
-            continue
-        try:
-            
-            comp = coms[c][COMPONENT_NAME]
-            
-            comp.get_diesel_prices()
-            diesel_price = float(comp.diesel_prices[0].round(2))
-            hfp = comp.cd['heating fuel premium']
-            
-            proposed_hr = comp.proposed_heat_recovery
-            #~ eff = comp.cd["diesel generation efficiency"]
-            
-            try:
-                break_even_cost = comp.break_even_cost
-                levelized_cost_of_energy = comp.levelized_cost_of_energy
-            except AttributeError:
-                break_even_cost = np.nan
-                levelized_cost_of_energy = np.nan
-            
-            name = c
-            if name == 'Barrow':
-                name = 'Utqiagvik (Barrow)'
-            l = [name,  
-                 
-                 
-                 proposed_hr,
-                 diesel_price,
-                 hfp,
-                 diesel_price + hfp,
-                 #~ eff,
-                 break_even_cost,
-                 levelized_cost_of_energy,
-                 comp.get_NPV_benefits(),
-                 comp.get_NPV_costs(),
-                 comp.get_NPV_net_benefit(),
-                 comp.irr,
-                 comp.get_BC_ratio(),
-                 comp.reason
-                ]
-            out.append(l)
-            
-        except (KeyError,AttributeError) as e:
-            #~ print e
-            pass
-    
+    save_communities_summary(
+        collect_rows(communities_summary_row, coms), res_dir)
+
+def communities_summary_row (c, results):
+    """Gets the row of the summary by community for a community
+
+    Parameters
+    ----------
+    c : str
+        community or project name
+    results : dictionary
+        results from the model for the community
+
+    Returns
+    -------
+    list or None
+        row of the summary, or None if the community is not in the summary
+    """
+    #~ it = results['community data'].intertie
+    #~ if it is None:
+        #~ it = 'parent'
+    #~ if it == 'child':
+        #~ continue
+    if c.find("_intertie") != -1:
+        return None
+
+    comp = results[COMPONENT_NAME]
+
+    comp.get_diesel_prices()
+    diesel_price = float(comp.diesel_prices[0].round(2))
+    hfp = comp.cd['heating fuel premium']
+
+    proposed_hr = comp.proposed_heat_recovery
+    #~ eff = comp.cd["diesel generation efficiency"]
+
+    try:
+        break_even_cost = comp.break_even_cost
+        levelized_cost_of_energy = comp.levelized_cost_of_energy
+    except AttributeError:
+        break_even_cost = np.nan
+        levelized_cost_of_energy = np.nan
+
+    name = c
+    if name == 'Barrow':
+        name = 'Utqiagvik (Barrow)'
+    l = [name,  
+
+
+         proposed_hr,
+         diesel_price,
+         hfp,
+         diesel_price + hfp,
+         #~ eff,
+         break_even_cost,
+         levelized_cost_of_energy,
+         comp.get_NPV_benefits(),
+         comp.get_NPV_costs(),
+         comp.get_NPV_net_benefit(),
+         comp.irr,
+         comp.get_BC_ratio(),
+         comp.reason
+        ]
+    return l
+
+def save_communities_summary (out, res_dir):
+    """Saves the summary by community
+
+    Parameters
+    ----------
+    out : list
+        rows of the summary, from communities_summary_row, sorted by
+        community
+    res_dir : path
+        location to save file
+    """
     cols = ['Community',
         
             'Proposed Heat Recovery [gallons]',
@@ -132,7 +156,14 @@ def communities_summary (coms, res_dir):
 
     fd.close()
     data.to_csv(f_name, mode='a')
-    
+
+
+REGIONAL_COLUMNS = ['Number of communities in region',
+    'Number of communities with cost effective projects',
+    'Investment needed for cost-effective projects ($)',
+    'Net benefit of cost-effective projects ($)',
+    'Heating oil displaced by cost-effective projects (gallons)']
+
 def create_regional_summary (results):
     """Creates the regional summary
     
@@ -147,71 +178,58 @@ def create_regional_summary (results):
         pandas DataFrame containing regional results
     
     """
-    regions = {}
-    for c in results:
-        c_region = results[c]['community data'].get_item('community','region')
-        comp = results[c][COMPONENT_NAME]
-        #~ print comp
-        bc_ratio = comp.get_BC_ratio()
-        #~ print bc_ratio
-        bc_ratio = (not type(bc_ratio) is str) and (not np.isinf(bc_ratio))\
-                                              and (bc_ratio > 1)
-        #~ print bc_ratio
-        #~ print bc_ratio ,comp.get_BC_ratio()
-        #~ return
-        capex = round(comp.get_NPV_costs(),0)  if bc_ratio else 0
-        net_benefit = round(comp.get_NPV_net_benefit(),0)  if bc_ratio else 0
-        #~ try:
-        displaced_hoil = round(comp.proposed_heat_recovery,0) if bc_ratio else 0
-        #~ except AttributeError as e:
-            #~ print e
-            #~ displaced_hoil = 0
-        
-        #~ print displaced_hoil
-        
-        if results[c]['community data'].intertie == 'parent' or \
-            not c.find('heat_recovery') != -1:
-            #~ print c
-            continue
-        if c_region in regions.keys():
-            ## append entry
-            regions[c_region]['Number of communities in region'] +=1
-            k = 'Number of communities with cost effective projects'
-            regions[c_region][k] += 1 if bc_ratio else 0
-            k = 'Investment needed for cost-effective projects ($)'
-            regions[c_region][k] += capex 
-            k = 'Net benefit of cost-effective projects ($)'
-            regions[c_region][k] += net_benefit
-            k = 'Heating oil displaced by cost-effective projects (gallons)'
-            regions[c_region][k] += displaced_hoil
-            
-        else:
-            ## set up "first" entry
-            regions[c_region] = {'Number of communities in region':1}
-            k = 'Number of communities with cost effective projects'
-            regions[c_region][k] = 1 if bc_ratio else 0
-            k = 'Investment needed for cost-effective projects ($)'
-            regions[c_region][k] = capex 
-            k = 'Net benefit of cost-effective projects ($)'
-            regions[c_region][k] = net_benefit
-            k = 'Heating oil displaced by cost-effective projects (gallons)'
-            regions[c_region][k] = displaced_hoil
-            
-    
-    cols = ['Number of communities in region',
-            'Number of communities with cost effective projects',
-            'Investment needed for cost-effective projects ($)',
-            'Net benefit of cost-effective projects ($)',
-            'Heating oil displaced by cost-effective projects (gallons)']
-    try:        
-        summary = DataFrame(regions).T[cols]
-    except KeyError:
-        summary = DataFrame(columns = cols)
-    
-    
-    summary.ix['All Regions'] = summary.sum()  
-    return summary
-    
+    return collect_regional_summary(regional_summary_row,
+        REGIONAL_COLUMNS, results)
+
+def regional_summary_row (c, results):
+    """Gets what a community adds to the regional summary
+
+    Parameters
+    ----------
+    c : str
+        community or project name
+    results : dictionary
+        results from the model for the community
+
+    Returns
+    -------
+    tuple or None
+        (region, values in the order of REGIONAL_COLUMNS), or None if the
+        community is not counted
+    """
+    c_region = results['community data'].get_item('community','region')
+    comp = results[COMPONENT_NAME]
+    #~ print comp
+    bc_ratio = comp.get_BC_ratio()
+    #~ print bc_ratio
+    bc_ratio = (not type(bc_ratio) is str) and (not np.isinf(bc_ratio))\
+                                          and (bc_ratio > 1)
+    #~ print bc_ratio
+    #~ print bc_ratio ,comp.get_BC_ratio()
+    #~ return
+    capex = round(comp.get_NPV_costs(),0)  if bc_ratio else 0
+    net_benefit = round(comp.get_NPV_net_benefit(),0)  if bc_ratio else 0
+    #~ try:
+    displaced_hoil = round(comp.proposed_heat_recovery,0) if bc_ratio else 0
+    #~ except AttributeError as e:
+        #~ print e
+        #~ displaced_hoil = 0
+
+    #~ print displaced_hoil
+
+    if results['community data'].intertie == 'parent' or \
+        not c.find('heat_recovery') != -1:
+        #~ print c
+        return None
+    return c_region, [
+        1,
+        1 if bc_ratio else 0,
+        capex,
+        net_benefit,
+        displaced_hoil
+    ]
+
+
 def save_regional_summary (summary, res_dir):
     """Saves the summary by region:  __regional_heat_recovery_summary.csv
     
@@ -227,4 +245,18 @@ def save_regional_summary (summary, res_dir):
                 COMPONENT_NAME.lower().replace(' ','_').\
                     replace('(','').replace(')','') + '_summary.csv')
     summary.to_csv(f_name, mode='w', index_label='region')
-    
+
+def get_summary_collectors ():
+    """Gets the collectors for the summaries of the component, to make the
+    summaries in one pass over the results, see aaem.summary_collectors
+
+    Returns
+    -------
+    list
+        collectors for the summary by community, and the regional summary
+    """
+    return [
+        RowCollector(communities_summary_row, save_communities_summary),
+        RegionalCollector(regional_summary_row, REGIONAL_COLUMNS,
+            save_regional_summary),
+    ]
@@ -15,6 +15,8 @@ from config import UNKNOWN
 
 import copy
 
+from aaem import data_repository
+
 
 def preprocess (preprocessor, **kwargs):
     """preprocess data related to existing projects
@@ -103,11 +105,12 @@ def preprocess (preprocessor, **kwargs):
         'Est. current annual heating fuel gallons displaced',
         'Identified as priority by HR working group'
         ]
+    project_file = os.path.join(
+        preprocessor.data_dir, 
+        "heat_recovery_projects_potential.csv"
+    )
     project_data = read_csv(
-        os.path.join(
-            preprocessor.data_dir, 
-            "heat_recovery_projects_potential.csv"
-        ),
+        project_file,
         comment = '#',
         index_col = 0
     )[proj_cols]
@@ -140,7 +143,8 @@ def preprocess (preprocessor, **kwargs):
     del project_data['Est. current annual heating fuel gallons displaced']
     
     try:
-        project_data = project_data.ix[ids]
+        project_data = data_repository.get_rows(project_file, ids,
+            comment = '#', index_col = 0)[project_data.columns]
         #~ print project_data
         project_data = \
             project_data[project_data.isnull().all(1) == False]
@@ -59,6 +59,13 @@ class Hydropower (AnnualSavings):
         diagnostics module, see information on diagnostics Object
 
     """
+    ## attributes kept in compact records of the results, see
+    ## AnnualSavings.record_attributes
+    record_attributes = AnnualSavings.record_attributes + [
+        'average_load', 'load_offset_proposed', 'net_generation_proposed',
+        'captured_energy', 'generation_diesel_reduction', 'lost_heat_recovery',
+    ]
+
     def __init__ (self, community_data, forecast,
                         diag = None, prerequisites = {}):
         """Class initialiser
@@ -227,7 +234,7 @@ class Hydropower (AnnualSavings):
         self.generation = self.forecast.generation['generation diesel']\
                                                             [self.start_year]
         self.average_load = \
-                self.forecast.yearly_average_diesel_load.ix[self.start_year]
+                self.forecast.get_average_diesel_load(self.start_year)
         #~ print 'self.average_load',self.average_load
 
     def calc_generation_proposed (self):
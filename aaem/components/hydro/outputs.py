@@ -9,6 +9,8 @@ import os.path
 import numpy as np
 from pandas import DataFrame
 from config import COMPONENT_NAME
+from aaem.summary_collectors import RowCollector, RegionalCollector
+from aaem.summary_collectors import collect_rows, collect_regional_summary
 import aaem.constants as constants
 
 from aaem.components import comp_order, definitions
@@ -42,99 +44,122 @@ def communities_summary (coms, res_dir):
         location to save file
     
     """
-    out = []
-    for c in sorted(coms.keys()):
-        it = coms[c]['community data'].intertie
-        if it is None:
-            it = 'parent'
-        if it == 'child':
-            continue
-        try:
-            # ??? NPV or year one
-            hydro = coms[c]['Hydropower']
-            
-            start_yr = hydro.comp_specs['start year']
-            hydro.get_diesel_prices()
-            diesel_price = float(hydro.diesel_prices[0].round(2))
-            #~ print hydro.diesel_prices[0]
-            if hydro.comp_specs["name"] == 'none':
-                phase = hydro.comp_specs['phase']
-            else:
-                phase = "Reconnaissance"
-
-            name = hydro.comp_specs['name']
-            
-            average_load = hydro.average_load
-            proposed_load =  hydro.load_offset_proposed
-            
-            
-            heat_rec_opp = hydro.cd['heat recovery operational']
-            
-           
-            net_gen_hydro = hydro.net_generation_proposed
-            
-            captured_energy = hydro.captured_energy
-            
-            
-            lost_heat = hydro.lost_heat_recovery
-            electric_diesel_reduction= hydro.generation_diesel_reduction
-            
-            diesel_red = hydro.captured_energy - hydro.lost_heat_recovery
-            
-            eff = hydro.cd["diesel generation efficiency"]
-            
-            levelized_cost = hydro.levelized_cost_of_energy
-            break_even = hydro.break_even_cost
-            #~ except AttributeError:
-                #~ offset = 0
-                #~ net_gen_hydro = 0
-                #~ decbb = 0
-                #~ electric_diesel_reduction=0
-                #~ loss_heat = 0
-                
-                #~ diesel_red = 0
-                #~ eff = hydro.cd["diesel generation efficiency"]    
-                
-            #~ try:
-                #~ red_per_year = net_gen_hydro / eff
-            #~ except ZeroDivisionError:
-                #~ red_per_year = 0
-            
-            community = c
-            if community == 'Barrow':
-                community = 'Utqiagvik (Barrow)'
-            l = [name,  
-                name,
-                start_yr,
-                phase,
-
-                average_load, 
-                proposed_load,
-                net_gen_hydro,
-                
-                captured_energy, 
-                lost_heat, 
-                heat_rec_opp,
-                diesel_red, 
-                electric_diesel_reduction,
-                
-                eff,
-                diesel_price,
-                break_even,
-                levelized_cost,
-                hydro.get_NPV_benefits(),
-                hydro.get_NPV_costs(),
-                hydro.get_NPV_net_benefit(),
-                hydro.irr,
-                hydro.get_BC_ratio(),
-                hydro.reason
-            ]
-            out.append(l)
-        except (KeyError,AttributeError,TypeError) as e:
-            #~ print e
-            pass
-        
-    
+    save_communities_summary(
+        collect_rows(communities_summary_row, coms,
+        (KeyError,AttributeError,TypeError)), res_dir)
+
+def communities_summary_row (c, results):
+    """Gets the row of the summary by community for a community
+
+    Parameters
+    ----------
+    c : str
+        community or project name
+    results : dictionary
+        results from the model for the community
+
+    Returns
+    -------
+    list or None
+        row of the summary, or None if the community is not in the summary
+    """
+    it = results['community data'].intertie
+    if it is None:
+        it = 'parent'
+    if it == 'child':
+        return None
+    # ??? NPV or year one
+    hydro = results['Hydropower']
+
+    start_yr = hydro.comp_specs['start year']
+    hydro.get_diesel_prices()
+    diesel_price = float(hydro.diesel_prices[0].round(2))
+    #~ print hydro.diesel_prices[0]
+    if hydro.comp_specs["name"] == 'none':
+        phase = hydro.comp_specs['phase']
+    else:
+        phase = "Reconnaissance"
+
+    name = hydro.comp_specs['name']
+
+    average_load = hydro.average_load
+    proposed_load =  hydro.load_offset_proposed
+
+
+    heat_rec_opp = hydro.cd['heat recovery operational']
+
+
+    net_gen_hydro = hydro.net_generation_proposed
+
+    captured_energy = hydro.captured_energy
+
+
+    lost_heat = hydro.lost_heat_recovery
+    electric_diesel_reduction= hydro.generation_diesel_reduction
+
+    diesel_red = hydro.captured_energy - hydro.lost_heat_recovery
+
+    eff = hydro.cd["diesel generation efficiency"]
+
+    levelized_cost = hydro.levelized_cost_of_energy
+    break_even = hydro.break_even_cost
+    #~ except AttributeError:
+        #~ offset = 0
+        #~ net_gen_hydro = 0
+        #~ decbb = 0
+        #~ electric_diesel_reduction=0
+        #~ loss_heat = 0
+
+        #~ diesel_red = 0
+        #~ eff = hydro.cd["diesel generation efficiency"]    
+
+    #~ try:
+        #~ red_per_year = net_gen_hydro / eff
+    #~ except ZeroDivisionError:
+        #~ red_per_year = 0
+
+    community = c
+    if community == 'Barrow':
+        community = 'Utqiagvik (Barrow)'
+    l = [name,  
+        name,
+        start_yr,
+        phase,
+
+        average_load, 
+        proposed_load,
+        net_gen_hydro,
+
+        captured_energy, 
+        lost_heat, 
+        heat_rec_opp,
+        diesel_red, 
+        electric_diesel_reduction,
+
+        eff,
+        diesel_price,
+        break_even,
+        levelized_cost,
+        hydro.get_NPV_benefits(),
+        hydro.get_NPV_costs(),
+        hydro.get_NPV_net_benefit(),
+        hydro.irr,
+        hydro.get_BC_ratio(),
+        hydro.reason
+    ]
+    return l
+
+def save_communities_summary (out, res_dir):
+    """Saves the summary by community
+
+    Parameters
+    ----------
+    out : list
+        rows of the summary, from communities_summary_row, sorted by
+        community
+    res_dir : path
+        location to save file
+    """
     cols = ['Community',
             'Project Name',
             'Start Year',
@@ -196,6 +221,13 @@ def communities_summary (coms, res_dir):
 
     data.to_csv(f_name, mode='a')
 
+
+REGIONAL_COLUMNS = ['Number of communities/interties in region',
+    'Number of communities with cost effective projects',
+    'Investment needed for cost-effective projects ($)',
+    'Net benefit of cost-effective projects ($)',
+    'Generation diesel displaced by cost-effective projects (gallons)']
+
 def create_regional_summary (results):
     """Creates the regional summary
     
@@ -211,66 +243,51 @@ def create_regional_summary (results):
         containing regional results
     
     """
-    #~ print "start"
-    regions = {}
-    for c in results:
-        c_region = results[c]['community data'].get_item('community','region')
-        comp = results[c][COMPONENT_NAME]
-        #~ print comp
-        bc_ratio = comp.get_BC_ratio()
-        bc_ratio = (not type(bc_ratio) is str) and (not np.isinf(bc_ratio))\
-                                              and (bc_ratio > 1)
-        #~ print bc_ratio ,comp.get_BC_ratio()
-        #~ return
-        capex = round(comp.get_NPV_costs(),0)  if bc_ratio else 0
-        net_benefit = round(comp.get_NPV_net_benefit(),0)  if bc_ratio else 0
-       
-        displaced_fuel = \
-            round(comp.generation_diesel_reduction,0) if bc_ratio else 0
-
-        if not c.find('hydro') != -1:
-            #~ print c
-            continue
-        if c_region in regions.keys():
-            ## append entry
-            regions[c_region]['Number of communities/interties in region'] +=1
-            k = 'Number of communities with cost effective projects'
-            regions[c_region][k] += 1 if bc_ratio else 0
-            k = 'Investment needed for cost-effective projects ($)'
-            regions[c_region][k] += capex 
-            k = 'Net benefit of cost-effective projects ($)'
-            regions[c_region][k] += net_benefit
-            k = 'Generation diesel displaced by cost-effective projects (gallons)'
-            regions[c_region][k] += displaced_fuel
-            
-        else:
-            ## set up "first" entry
-            regions[c_region] = {'Number of communities/interties in region':1}
-            k = 'Number of communities with cost effective projects'
-            regions[c_region][k] = 1 if bc_ratio else 0
-            k = 'Investment needed for cost-effective projects ($)'
-            regions[c_region][k] = capex 
-            k = 'Net benefit of cost-effective projects ($)'
-            regions[c_region][k] = net_benefit
-            k = 'Generation diesel displaced by cost-effective projects (gallons)'
-            regions[c_region][k] = displaced_fuel
-            
-    try:
-        summary = DataFrame(regions).T[['Number of communities/interties in region',
-                        'Number of communities with cost effective projects',
-                        'Investment needed for cost-effective projects ($)',
-                        'Net benefit of cost-effective projects ($)',
-                    'Generation diesel displaced by cost-effective projects (gallons)']]
-    except KeyError:
-        summary = DataFrame(columns = ['Number of communities/interties in region',
-                        'Number of communities with cost effective projects',
-                        'Investment needed for cost-effective projects ($)',
-                        'Net benefit of cost-effective projects ($)',
-                    'Generation diesel displaced by cost-effective projects (gallons)'])
-    summary.ix['All Regions'] = summary.sum()                 
-    #~ print summary
-    return summary
-    
+    return collect_regional_summary(regional_summary_row,
+        REGIONAL_COLUMNS, results)
+
+def regional_summary_row (c, results):
+    """Gets what a community adds to the regional summary
+
+    Parameters
+    ----------
+    c : str
+        community or project name
+    results : dictionary
+        results from the model for the community
+
+    Returns
+    -------
+    tuple or None
+        (region, values in the order of REGIONAL_COLUMNS), or None if the
+        community is not counted
+    """
+    c_region = results['community data'].get_item('community','region')
+    comp = results[COMPONENT_NAME]
+    #~ print comp
+    bc_ratio = comp.get_BC_ratio()
+    bc_ratio = (not type(bc_ratio) is str) and (not np.isinf(bc_ratio))\
+                                          and (bc_ratio > 1)
+    #~ print bc_ratio ,comp.get_BC_ratio()
+    #~ return
+    capex = round(comp.get_NPV_costs(),0)  if bc_ratio else 0
+    net_benefit = round(comp.get_NPV_net_benefit(),0)  if bc_ratio else 0
+
+    displaced_fuel = \
+        round(comp.generation_diesel_reduction,0) if bc_ratio else 0
+
+    if not c.find('hydro') != -1:
+        #~ print c
+        return None
+    return c_region, [
+        1,
+        1 if bc_ratio else 0,
+        capex,
+        net_benefit,
+        displaced_fuel
+    ]
+
+
 def save_regional_summary (summary, res_dir):
     """Saves the summary by region:  __regional_hydropower_summary.csv
     
@@ -286,4 +303,19 @@ def save_regional_summary (summary, res_dir):
                 COMPONENT_NAME.lower().replace(' ','_').\
                     replace('(','').replace(')','') + '_summary.csv')
     summary.to_csv(f_name, mode='w', index_label='region')
-    
+
+def get_summary_collectors ():
+    """Gets the collectors for the summaries of the component, to make the
+    summaries in one pass over the results, see aaem.summary_collectors
+
+    Returns
+    -------
+    list
+        collectors for the summary by community, and the regional summary
+    """
+    return [
+        RowCollector(communities_summary_row, save_communities_summary,
+            (KeyError,AttributeError,TypeError)),
+        RegionalCollector(regional_summary_row, REGIONAL_COLUMNS,
+            save_regional_summary),
+    ]
@@ -12,6 +12,8 @@ from yaml import dump
 import shutil
 import copy
 
+from aaem import data_repository
+
 ## preprocess the existing projects
 def preprocess (preprocessor, **kwargs):
     """preprocess data related to existing projects
@@ -55,9 +57,8 @@ def preprocess (preprocessor, **kwargs):
     projects = []
     p_data = {}
  
-    project_data = read_csv(os.path.join(preprocessor.data_dir,
-        "hydro_projects_potential.csv"),
-        comment = '#',index_col = 0)
+    project_file = os.path.join(preprocessor.data_dir,
+        "hydro_projects_potential.csv")
         
     data_file = os.path.join(
         preprocessor.data_dir,
@@ -74,7 +75,8 @@ def preprocess (preprocessor, **kwargs):
     #~ print ids
     
     try:
-        project_data = project_data.ix[ids]
+        project_data = data_repository.get_rows(project_file, ids,
+            comment = '#', index_col = 0)
         #~ print project_data
         project_data = \
             project_data[project_data.isnull().all(1) == False]
@@ -14,6 +14,7 @@ from aaem.forecast import Forecast
 from aaem.diagnostics import Diagnostics
 import aaem.constants as constants
 from config import COMPONENT_NAME, UNKNOWN
+from inventory import BuildingInventory, FUEL_TYPES
 
 class CommunityBuildings (AnnualSavings):
     """Non-residential efficiency component of the Alaska Affordable Energy Model:
@@ -61,6 +62,16 @@ class CommunityBuildings (AnnualSavings):
         diagnostics module, see information on diagnostics Object
 
     """
+    ## attributes kept in compact records of the results, see
+    ## AnnualSavings.record_attributes
+    record_attributes = AnnualSavings.record_attributes + [
+        'num_buildings', 'total_sqft_to_retrofit', 'refit_cost_rate',
+        'buildings_df', 'elec_price', 'hoil_price', 'baseline_kWh_consumption',
+        'baseline_HF_consumption', 'baseline_fuel_Hoil_consumption',
+        'proposed_kWh_consumption', 'proposed_HF_consumption',
+        'proposed_fuel_Hoil_consumption', 'baseline_kWh_cost',
+        'baseline_HF_cost',
+    ]
 
     def __init__ (self, community_data, forecast,
                         diag = None, prerequisites = {}):
@@ -231,6 +242,11 @@ class CommunityBuildings (AnnualSavings):
             self.reason = "No buildings in community."
             return
 
+        self.inventory = BuildingInventory(
+            [self.comp_specs['building inventory']],
+            [self.comp_specs["consumption estimates"]]
+        )
+
         self.calc_total_sqft_to_retrofit()
 
         if calc_sqft_only:
@@ -384,36 +400,16 @@ class CommunityBuildings (AnnualSavings):
         total_sqft_to_retrofit : float
             sum of all building square footage
         """
-        sqft_ests = self.comp_specs["consumption estimates"]["Sqft"]
         data = self.comp_specs['building inventory']
+        for building_type in self.inventory.unknown_types[0]:
+            self.diagnostics.add_note(self.component_name,
+                "Building Type: " + str(building_type) +\
+                " not valid. Using 'other's estimates")
 
-        keys = set(data.T.keys())
-        #~ print keys
-        measure = "Square Feet"
-
-        for k in keys:
-            try:
-                # more than one item for each k
-                data.loc[:,measure].loc[k] = \
-                            data.loc[:,measure].loc[k].fillna(sqft_ests.ix[k])
-            except AttributeError:
-                # only one item
-                if np.isnan(data.ix[k][measure]):
-                    try:
-                        data[measure][k] = sqft_ests.ix[k]
-                    except KeyError:
-                        self.diagnostics.add_note(self.component_name,
-                            "Building Type: " + k +\
-                            " not valid. Using 'other's estimates")
-                        #~ print sqft_ests
-                        data.ix[k][measure] = sqft_ests.ix['Other']
-            except KeyError:
-                self.diagnostics.add_note(self.component_name,
-                 "Building Type: " + k + " not valid. Using 'other's estimates")
-                data.loc[:,measure].loc[k] = \
-                    data.loc[:,measure].loc[k].fillna(sqft_ests.ix['Other'])
-        #~ print data
-        self.total_sqft_to_retrofit = data[measure].sum()
+        self.inventory.estimate_square_feet()
+        self.inventory.update([data], ["Square Feet"])
+        self.total_sqft_to_retrofit = \
+            self.inventory.totals("Square Feet")[0]
 
 
     def calc_capital_costs (self):
@@ -427,19 +423,9 @@ class CommunityBuildings (AnnualSavings):
         """
         measure = "implementation cost"
         data = self.comp_specs['building inventory']
-        keys = data.T.keys()
-        d2 = data[["Square Feet", measure]].T.values.tolist()
-        d2.insert(0,keys.values.tolist())
-        d2 = np.array(d2).T # [key, sqft, $$]
-        keys = set(keys) # filter unique keys
-
-        for k in keys:
-            idx = np.logical_and(d2[:,0] == k, np.isnan(d2[:,2].astype(float)))
-            sqft = d2[idx,1].astype(np.float64)
-            d2[idx,2] = sqft * self.refit_cost_rate  #sqft * $$/sqft = $$
-
-        data[measure] = d2[:,2].astype(np.float64)
-        self.capital_costs = data[measure].sum()
+        self.inventory.estimate_implementation_cost(self.refit_cost_rate)
+        self.inventory.update([data], [measure])
+        self.capital_costs = self.inventory.totals(measure)[0]
 
     def calc_baseline_HF_consumption (self):
         """Calculate base line heating fuel consumption by type from known
@@ -462,50 +448,19 @@ class CommunityBuildings (AnnualSavings):
         baseline_fuel_biomass_consumption : float
             biomass consumption for heating (cords/year)
         """
-        HDD_ests = self.comp_specs["consumption estimates"]["HDD"]
-        gal_sf_ests = self.comp_specs["consumption estimates"]["Gal/sf"]
-
-        measure = "Fuel Oil"
         data = self.comp_specs['building inventory']
-        keys = data.T.keys()
-        keys = set(keys)
-        data["HDD ESTS"] = 0
-        data["GAL/SF"] = 0
-        for key in keys:
-            #~ print key
-            try:
-                data["HDD ESTS"].ix[key] = \
-                    self.cd["heating degree days"]/HDD_ests[key]
-                data["GAL/SF"].ix[key] = gal_sf_ests.ix[key]
-            except KeyError:
-                data["HDD ESTS"].ix[key] = \
-                    self.cd["heating degree days"]/HDD_ests.ix['Other']#unitless
-                data["GAL/SF"].ix[key] = gal_sf_ests.ix['Other'] # (gal)/sqft
-
-
-        idx = data[['Fuel Oil', "Natural Gas",
-                    'HW District','Propane',"Biomass"]].isnull().all(1)
-        if not self.cd['natural gas used']:
-            data['Fuel Oil'].ix[idx] = data[idx]['Square Feet'] * \
-                                       data[idx]['HDD ESTS'] * \
-                                       data[idx]['GAL/SF']
-        else:
-            data['Natural Gas'].ix[idx] = data[idx]['Square Feet'] * \
-                                       data[idx]['HDD ESTS'] * \
-                                       data[idx]['GAL/SF'] / \
-                                       constants.mmbtu_to_gal_HF *\
-                                       constants.mmbtu_to_Mcf
-        del data["GAL/SF"]
-        del data["HDD ESTS"]
-
-
-
-        self.baseline_fuel_Hoil_consumption = data['Fuel Oil'].fillna(0).sum()
-        self.baseline_fuel_lng_consumption = data['Natural Gas'].fillna(0).sum()
-        self.baseline_fuel_hr_consumption = data['HW District'].fillna(0).sum()
-        self.baseline_fuel_propane_consumption = data['Propane'].fillna(0).sum()
-        self.baseline_fuel_biomass_consumption = data['Biomass'].fillna(0).sum()
-
+        self.inventory.estimate_heating_fuel(
+            self.cd["heating degree days"],
+            self.cd['natural gas used']
+        )
+        self.inventory.update([data], ['Fuel Oil', 'Natural Gas'])
+
+        totals = self.inventory.totals
+        self.baseline_fuel_Hoil_consumption = totals('Fuel Oil')[0]
+        self.baseline_fuel_lng_consumption = totals('Natural Gas')[0]
+        self.baseline_fuel_hr_consumption = totals('HW District')[0]
+        self.baseline_fuel_propane_consumption = totals('Propane')[0]
+        self.baseline_fuel_biomass_consumption = totals('Biomass')[0]
 
         self.baseline_HF_consumption = \
             self.baseline_fuel_Hoil_consumption / constants.mmbtu_to_gal_HF +\
@@ -526,16 +481,10 @@ class CommunityBuildings (AnnualSavings):
         baseline_kWh_consumption : float
             baseline electricity consumption (kWh/year).
         """
-        kwh_sf_ests = self.comp_specs["consumption estimates"]["kWh/sf"]
-
         measure = "Electric"
         data = self.comp_specs['building inventory']
-        keys = data.T.keys()
-        local_inv = data[["Square Feet", measure]].T.values.tolist()
-        local_inv.insert(0,keys.values.tolist())
-        local_inv = np.array(local_inv).T
-        inv = local_inv
-
+        estimated = self.inventory.estimate_electric()
+        estimated_total = self.inventory.totals(estimated, skipna = False)[0]
 
         if not self.intertie_data is None:
             #~ print 'Loading intertie'
@@ -547,53 +496,14 @@ class CommunityBuildings (AnnualSavings):
             )
             intertie_component.run(calc_sqft_only = True)
 
-            it_inv = intertie_component.comp_specs['building inventory']
-            keys = it_inv['Building Type'].values
-
-            it_inv = it_inv[["Square Feet", measure]].T.values.tolist()
-            it_inv.insert(0,keys)
-            it_inv = np.array(it_inv).T
-            kwh_sf_ests = \
-                intertie_component.comp_specs['consumption estimates']["kWh/sf"]
-
-            inv = it_inv
-
-        #~ print inv
-        keys = set(keys)
-        keys.add('Average')
-
-        kwh_buildings = deepcopy(local_inv)
-
-        for k in keys:
-            try:
-                kwh_sf = kwh_sf_ests.ix[k] # (kWh)/sqft
-            except KeyError:
-                #~ print 'KeyError', k
-                kwh_sf = kwh_sf_ests.ix['Other'] # (kwh)/sqft
-
-            idx = np.logical_and(local_inv[:,0] == k,
-                                np.isnan(local_inv[:,2].astype(float)))
-            sqft = local_inv[idx, 1].astype(np.float64) #sqft
-            local_inv[idx, 2] = sqft * kwh_sf # kWh
+            ## the estimates and total are for the intertie
+            it_inv = intertie_component.inventory
+            estimated = self.inventory.estimate_electric(
+                [intertie_component.comp_specs['consumption estimates']]
+            )
+            estimated_total = \
+                it_inv.totals(it_inv.estimate_electric(), skipna = False)[0]
 
-        ## *** possibly could be done better, but is fine
-        if not self.intertie_data is None:
-            for k in keys:
-                try:
-                    kwh_sf = kwh_sf_ests.ix[k] # (kWh)/sqft
-                except KeyError:
-                    kwh_sf = kwh_sf_ests.ix['Other'] # (kwh)/sqft
-
-                idx = np.logical_and(inv[:,0] == k,
-                                    np.isnan(inv[:,2].astype(float)))
-                sqft = inv[idx, 1].astype(np.float64) #sqft
-                inv[idx, 2] = sqft * kwh_sf # kWh
-        else:
-            inv = local_inv
-        ### end ***
-
-
-        estimated_total = inv[:,2].astype(np.float64).sum()
         # Trend total
         try:
             if self.intertie_data is None:
@@ -610,20 +520,11 @@ class CommunityBuildings (AnnualSavings):
         except AttributeError:
             fc_total = estimated_total
 
-        #~ print fc_total, estimated_total
         ratio = fc_total/estimated_total
-        #~ print ratio
-        #~ print ratio
-        #~ print kwh_buildings
-        # step 1 & 2: loop if consumption known use; other wise scale:
-        for idx in range(len(kwh_buildings)):
-            if np.isnan(kwh_buildings[idx, 2].astype(float)):
-                kwh_buildings[idx, 2] = ratio * local_inv[idx, 2].astype(float)
-
-        #~ print data
-        #~ print kwh_buildings
-        data[measure] =  kwh_buildings[:,2].astype(np.float64)
-        self.baseline_kWh_consumption = data[measure].sum()
+        # known consumption is used, otherwise estimates are scaled
+        self.inventory.scale_electric(estimated, ratio)
+        self.inventory.update([data], [measure])
+        self.baseline_kWh_consumption = self.inventory.totals(measure)[0]
 
     def calc_proposed_HF_consumption (self):
         """Calculate proposed HF  consumption from known values and
@@ -646,41 +547,17 @@ class CommunityBuildings (AnnualSavings):
         """
         building_data = self.comp_specs['building inventory']
         percent_savings = self.comp_specs['cohort savings percent'] / 100.0
-        #~ fuel_type = 'Fuel Oil'
-        #~ try:
-        fuel_types = ['Fuel Oil',
-                      'Natural Gas',
-                      'HW District',
-                      'Propane',
-                      'Biomass']
-        for fuel_type in fuel_types:
-            fuel_vals = building_data[fuel_type + ' Post']
-            idx = fuel_vals.isnull()
-            fuel_vals[idx] = building_data[fuel_type][idx] *\
-                                                (1 - percent_savings)
-
-        #~ except TypeError:
-
-
-
-            #~ self.comp_specs['building inventory']["Fuel Oil Post"] = \
-                        #~ self.comp_specs['building inventory']["Fuel Oil"]*\
-                        #~ self.comp_specs['cohort savings multiplier']
-
-
-
+        self.inventory.estimate_proposed(FUEL_TYPES, percent_savings)
+        self.inventory.update([building_data],
+            [fuel_type + ' Post' for fuel_type in FUEL_TYPES])
 
         # by fuel type
-        self.proposed_fuel_Hoil_consumption = \
-                            building_data['Fuel Oil Post'].sum()
-        self.proposed_fuel_lng_consumption = \
-                            building_data['Natural Gas Post'].fillna(0).sum()
-        self.proposed_fuel_hr_consumption = \
-                            building_data['HW District Post'].fillna(0).sum()
-        self.proposed_fuel_propane_consumption = \
-                            building_data['Propane Post'].fillna(0).sum()
-        self.proposed_fuel_biomass_consumption = \
-                            building_data['Biomass Post'].fillna(0).sum()
+        totals = self.inventory.totals
+        self.proposed_fuel_Hoil_consumption = totals('Fuel Oil Post')[0]
+        self.proposed_fuel_lng_consumption = totals('Natural Gas Post')[0]
+        self.proposed_fuel_hr_consumption = totals('HW District Post')[0]
+        self.proposed_fuel_propane_consumption = totals('Propane Post')[0]
+        self.proposed_fuel_biomass_consumption = totals('Biomass Post')[0]
 
         # mmbtu
         self.proposed_HF_consumption = \
@@ -701,14 +578,12 @@ class CommunityBuildings (AnnualSavings):
         """
         building_data = self.comp_specs['building inventory']
         percent_savings = self.comp_specs['cohort savings percent'] / 100.0
-
-        elec_vals = building_data['Electric Post']
-        idx = elec_vals.isnull()
-        elec_vals[idx] = building_data['Electric'][idx] * (1 - percent_savings)
+        self.inventory.estimate_proposed(['Electric'], percent_savings)
+        self.inventory.update([building_data], ['Electric Post'])
 
         #kWh
-
-        self.proposed_kWh_consumption = elec_vals.sum()
+        self.proposed_kWh_consumption = \
+            self.inventory.totals('Electric Post')[0]
 
     def get_fuel_total_saved (self):
         """get total fuel saved
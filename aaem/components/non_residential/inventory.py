@@ -0,0 +1,330 @@
+"""
+inventory.py
+
+    vectorized building inventory for the Non-residential Efficiency
+component. The buildings of one or more communities are held as float column
+arrays, with the row of the consumption estimates for the type of each
+building found once, so the estimates for unknown values are found for all
+buildings at once.
+"""
+import numpy as np
+
+import aaem.constants as constants
+
+## heating fuel columns of the inventory, proposed values are in the columns
+## with ' Post' added
+FUEL_TYPES = ['Fuel Oil', 'Natural Gas', 'HW District', 'Propane', 'Biomass']
+
+## building type used for types without consumption estimates
+OTHER_TYPE = 'Other'
+
+
+class BuildingInventory (object):
+    """Building inventories of communities as float column arrays
+
+    Parameters
+    ----------
+    inventories: list
+        building inventory DataFrame of each community, indexed by building
+    type with float columns
+    estimates: list
+        consumption estimates DataFrame of each community, indexed by
+    building type with float columns
+
+    Attributes
+    ----------
+    types: np.array
+        building type of each building
+    groups: np.array
+        community (position in inventories) of each building
+    columns: dict
+        column -> np.array of values of each building
+    unknown_types: list
+        building types, of each community, without consumption estimates.
+    The 'Other' estimates are used for them
+    """
+
+    def __init__ (self, inventories, estimates):
+        """vectorized building inventory
+
+        Parameters
+        ----------
+        inventories: list
+            building inventory DataFrame of each community
+        estimates: list
+            consumption estimates DataFrame of each community
+        """
+        self.communities = len(inventories)
+        self.estimates = estimates
+        self.types = np.concatenate(
+            [np.asarray(i.index, dtype = object) for i in inventories])
+        self.groups = np.concatenate([np.zeros(len(i), dtype = int) + c \
+            for c, i in enumerate(inventories)])
+        names = []
+        for inventory in inventories:
+            names += [n for n in inventory.columns if not n in names]
+        self.columns = {}
+        for name in names:
+            self.columns[name] = np.concatenate([
+                i[name].values.astype(float) if name in i.columns \
+                    else np.zeros(len(i)) + np.nan \
+                for i in inventories])
+
+        self.unknown_types = [sorted(set(i.index).difference(e.index)) \
+            for i, e in zip(inventories, estimates)]
+        self.estimate_rows = self.find_estimate_rows(estimates)
+        self.estimate_cache = {}
+
+    def __len__ (self):
+        """get the number of buildings
+        """
+        return len(self.types)
+
+    def find_estimate_rows (self, estimates):
+        """find the row of the consumption estimates for each building
+
+        Parameters
+        ----------
+        estimates: list
+            consumption estimates DataFrame of each community
+
+        Returns
+        -------
+        list
+            for each community, an np.array with the estimates row of each of
+        its buildings
+
+        Raises
+        ------
+        KeyError
+            if a community has buildings without estimates and no 'Other'
+        estimates
+        """
+        rows = []
+        for community, ests in enumerate(estimates):
+            types, inverse = np.unique(
+                self.types[self.groups == community], return_inverse = True)
+            type_rows = ests.index.get_indexer(types)
+            if (type_rows == -1).any():
+                type_rows[type_rows == -1] = ests.index.get_loc(OTHER_TYPE)
+            rows.append(type_rows[inverse])
+        return rows
+
+    def get_estimate (self, column, estimates = None):
+        """get a consumption estimate for each building, from the estimates
+        for its type
+
+        Parameters
+        ----------
+        column: str
+            consumption estimates column, i.e. 'Sqft', 'HDD', 'Gal/sf', or
+        'kWh/sf'
+        estimates: list, optional
+            consumption estimates DataFrame of each community to use in place
+        of the inventory's estimates
+
+        Returns
+        -------
+        np.array
+            estimate for each building
+        """
+        if not estimates is None:
+            return np.concatenate([ests[column].values.astype(float)[r] \
+                for ests, r in zip(estimates,
+                    self.find_estimate_rows(estimates))])
+        try:
+            return self.estimate_cache[column]
+        except KeyError:
+            pass
+        self.estimate_cache[column] = np.concatenate([
+            ests[column].values.astype(float)[r] \
+                for ests, r in zip(self.estimates, self.estimate_rows)])
+        return self.estimate_cache[column]
+
+    def per_building (self, values):
+        """get the value for the community of each building
+
+        Parameters
+        ----------
+        values: float or array
+            value for all communities, or for each community
+
+        Returns
+        -------
+        float or np.array
+        """
+        if np.ndim(values) == 0:
+            return values
+        return np.asarray(values)[self.groups]
+
+    def fill (self, column, values):
+        """fill unknown (nan) values of a column
+
+        Parameters
+        ----------
+        column: str
+            inventory column
+        values: float or np.array
+            values to use for each building, only those where the column is
+        nan are used
+
+        Returns
+        -------
+        np.array
+            the filled column
+        """
+        filled = self.columns[column].copy()
+        unknown = np.isnan(filled)
+        filled[unknown] = (np.zeros(len(self)) + values)[unknown]
+        self.columns[column] = filled
+        return filled
+
+    def totals (self, values, skipna = True):
+        """sum the values of the buildings of each community
+
+        Parameters
+        ----------
+        values: str or np.array
+            inventory column, or value for each building
+        skipna: bool, optional
+            if True nan values are skipped, otherwise the total for a
+        community with a nan value is nan
+
+        Returns
+        -------
+        np.array
+            total for each community
+        """
+        if isinstance(values, basestring):
+            values = self.columns[values]
+        if skipna:
+            values = np.where(np.isnan(values), 0, values)
+        return np.bincount(
+            self.groups, values, minlength = self.communities)
+
+    def update (self, frames, columns):
+        """set columns of the inventory DataFrames of the communities
+
+        Parameters
+        ----------
+        frames: list
+            building inventory DataFrame of each community, with the
+        buildings in the order the inventory was created with
+        columns: list
+            columns to set
+        """
+        for community, frame in enumerate(frames):
+            idx = self.groups == community
+            for column in columns:
+                frame[column] = self.columns[column][idx]
+
+    def estimate_square_feet (self):
+        """estimate unknown building square footage from the 'Sqft'
+        estimates
+
+        Returns
+        -------
+        np.array
+            square feet of each building
+        """
+        return self.fill('Square Feet', self.get_estimate('Sqft'))
+
+    def estimate_implementation_cost (self, refit_cost_rate):
+        """estimate unknown refit implementation costs from the square
+        footage
+
+        Parameters
+        ----------
+        refit_cost_rate: float or array
+            refit cost ($/sqft) for all communities, or each community
+
+        Returns
+        -------
+        np.array
+            implementation cost of each building ($)
+        """
+        return self.fill('implementation cost',
+            self.columns['Square Feet'] * self.per_building(refit_cost_rate))
+
+    def estimate_heating_fuel (self, heating_degree_days, natural_gas_used):
+        """estimate the heating fuel of buildings without any known
+        heating fuel, as heating oil, or natural gas where it is used
+
+        Parameters
+        ----------
+        heating_degree_days: float or array
+            heating degree days for all communities, or each community
+        natural_gas_used: bool or array
+            if natural gas is used for all communities, or each community
+        """
+        no_fuel = np.ones(len(self), dtype = bool)
+        for fuel in FUEL_TYPES:
+            no_fuel &= np.isnan(self.columns[fuel])
+
+        gal = self.columns['Square Feet'] * \
+            self.per_building(heating_degree_days) / \
+            self.get_estimate('HDD') * self.get_estimate('Gal/sf')
+        gas = np.zeros(len(self), dtype = bool) | \
+            self.per_building(natural_gas_used)
+
+        fuel_oil = self.columns['Fuel Oil'].copy()
+        fuel_oil[no_fuel & ~gas] = gal[no_fuel & ~gas]
+        self.columns['Fuel Oil'] = fuel_oil
+
+        natural_gas = self.columns['Natural Gas'].copy()
+        natural_gas[no_fuel & gas] = gal[no_fuel & gas] / \
+            constants.mmbtu_to_gal_HF * constants.mmbtu_to_Mcf
+        self.columns['Natural Gas'] = natural_gas
+
+    def estimate_electric (self, estimates = None):
+        """estimate the electricity use of buildings, known values are used
+        where they exist
+
+        Parameters
+        ----------
+        estimates: list, optional
+            consumption estimates DataFrame of each community to use in place
+        of the inventory's estimates
+
+        Returns
+        -------
+        np.array
+            known or estimated electricity use of each building (kWh)
+        """
+        estimated = self.columns['Square Feet'] * \
+            self.get_estimate('kWh/sf', estimates)
+        known = self.columns['Electric']
+        return np.where(np.isnan(known), estimated, known)
+
+    def scale_electric (self, estimated, ratio):
+        """fill unknown electricity use with scaled estimates
+
+        Parameters
+        ----------
+        estimated: np.array
+            electricity use of each building from estimate_electric
+        ratio: float or array
+            scale for all communities, or each community
+
+        Returns
+        -------
+        np.array
+            electricity use of each building (kWh)
+        """
+        return self.fill('Electric', estimated * self.per_building(ratio))
+
+    def estimate_proposed (self, columns, percent_savings):
+        """estimate unknown proposed use, by reducing the baseline use by
+        the savings
+
+        Parameters
+        ----------
+        columns: list
+            baseline columns, the proposed values are in the columns with
+        ' Post' added
+        percent_savings: float or array
+            fraction of use saved, for all communities, or each community
+        """
+        remaining = 1 - self.per_building(percent_savings)
+        for column in columns:
+            self.fill(column + ' Post', self.columns[column] * remaining)
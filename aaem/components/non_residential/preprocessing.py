@@ -14,6 +14,8 @@ from pandas import read_csv, concat, DataFrame
 import numpy as np
 import copy
 
+from aaem import data_repository
+
 def get_number_buildings (community, data_dir, diagnostics):
     """Load # buildings from file
 
@@ -33,14 +35,16 @@ def get_number_buildings (community, data_dir, diagnostics):
     """
     datafile = os.path.join(data_dir, 'non-res_count.csv')
     try:
-        data = int(
-            read_csv(
-                datafile ,
-                comment = "#",
-                index_col = 0,
-                header = 0
-            ).ix[community]['Buildings'].sum()
-        )
+        data = data_repository.get_rows(
+            datafile ,
+            community,
+            comment = "#",
+            index_col = 0,
+            header = 0
+        )['Buildings']
+        if len(data) == 0:
+            raise KeyError, community[0]
+        data = int(data.sum())
     except (KeyError, ValueError):
         data = 0
         diagnostics.add_note("Non-residential Efficiency: Community ",
@@ -108,7 +112,8 @@ def get_building_inventory (community, data_dir, diagnostics, **kwargs):
         building inventory
     """
     datafile = os.path.join(data_dir, 'non-res_buildings.csv')
-    data = read_csv(datafile, comment = '#', index_col = 1)
+    data = data_repository.get_rows(datafile, community,
+        comment = '#', index_col = 1)
 
     order = ['int_index' , 'Building Type', 'Biomass',
         'Biomass Post', 'Electric', 'Electric Post', 'Fuel Oil',
@@ -118,7 +123,6 @@ def get_building_inventory (community, data_dir, diagnostics, **kwargs):
 
     #~ print community
     try:
-        data = data.ix[community]
         numbers = [i for i in order if not i in ['Building Type', 'int_index']]
         data[numbers] = data[numbers].replace(r'\S+', np.nan, regex=True)
         #~ print data
@@ -0,0 +1,144 @@
+"""
+registry
+--------
+
+    process wide registry of model components. The config, plugins,
+prerequisites, component class, and output functions of each component are
+resolved once per process, by aaem.components.get_registry, along with an
+order to run the components in that respects their prerequisites. Worker
+processes forked after the registry is built share it.
+"""
+from importlib import import_module
+
+
+class ComponentInfo (object):
+    """Everything the model needs from a component package
+
+    Parameters
+    ----------
+    name: str
+        component name, i.e. 'Wind Power'
+    package: str
+        component package name in aaem.components, i.e. 'wind_power'
+
+    Attributes
+    ----------
+    name: str
+        component name
+    package: str
+        component package name
+    module: module
+        the component package
+    config: module
+        the component config module
+    plugins: list
+        CommunityData plugin functions, may be empty
+    prereqs: list
+        names of prerequisite components
+    component: class
+        component class
+    component_summary: function or None
+        function to save the component summaries
+    create_regional_summary: function or None
+        function to create the regional summary
+    summary_collectors: function or None
+        function that returns the collectors for the component summaries,
+    see aaem.summary_collectors
+    """
+
+    def __init__ (self, name, package):
+        """resolve the component package
+
+        Parameters
+        ----------
+        name: str
+            component name, i.e. 'Wind Power'
+        package: str
+            component package name in aaem.components, i.e. 'wind_power'
+        """
+        self.name = name
+        self.package = package
+        self.module = import_module('aaem.components.' + package)
+        self.config = self.module.config
+        self.plugins = getattr(self.config, 'plugins', [])
+        self.prereqs = list(self.module.prereq_comps)
+        self.component = self.module.component
+        self.component_summary = getattr(self.module, 'component_summary', None)
+        self.create_regional_summary = \
+            getattr(self.module, 'create_regional_summary', None)
+        self.summary_collectors = \
+            getattr(self.module, 'get_summary_collectors', None)
+        self.web_summary_module = None
+
+    def get_web_summary (self):
+        """get the web summary function for the component from
+        aaem_summaries. aaem_summaries is only imported when this is called
+
+        Returns
+        -------
+        function
+            the components generate_web_summary function
+
+        Raises
+        ------
+        AttributeError
+            if there is no web summary function
+        """
+        if self.web_summary_module is None:
+            self.web_summary_module = import_module(
+                'aaem_summaries.components.' + self.package
+            ).summary
+        return self.web_summary_module.generate_web_summary
+
+
+def build_registry (comp_lib, comp_order):
+    """build the component registry
+
+    Parameters
+    ----------
+    comp_lib: dict
+        component name -> component package name
+    comp_order: list
+        preferred order of component names
+
+    Returns
+    -------
+    dict
+        component name -> ComponentInfo
+    """
+    return dict([(comp, ComponentInfo(comp, comp_lib[comp])) \
+        for comp in comp_order])
+
+def build_run_order (registry, comp_order):
+    """find an order to run components in, where every component runs after
+    its prerequisites. Components are kept in comp_order where possible.
+
+    Parameters
+    ----------
+    registry: dict
+        component name -> ComponentInfo
+    comp_order: list
+        preferred order of component names
+
+    Returns
+    -------
+    list
+        component names
+
+    Raises
+    ------
+    RuntimeError
+        if the prerequisites are circular or missing
+    """
+    order = []
+    remaining = list(comp_order)
+    while len(remaining) > 0:
+        for comp in remaining:
+            if set(registry[comp].prereqs).issubset(order):
+                order.append(comp)
+                remaining.remove(comp)
+                break
+        else:
+            raise RuntimeError, ('Component prerequisites cannot be '
+                'satisfied for: ' + str(remaining))
+    return order
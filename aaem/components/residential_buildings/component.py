@@ -60,6 +60,18 @@ class ResidentialBuildings(AnnualSavings):
         diagnostics module, see information on Diagnostics Object
 
     """
+    ## attributes kept in compact records of the results, see
+    ## AnnualSavings.record_attributes
+    record_attributes = AnnualSavings.record_attributes + [
+        'init_HH', 'init_HF', 'opportunity_HH', 'households',
+        'fuel_oil_percent', 'refit_cost_rate', 'savings_HF', 'hoil_price',
+        'baseline_kWh_consumption', 'baseline_HF_consumption',
+        'baseline_fuel_Hoil_consumption', 'baseline_fuel_wood_consumption',
+        'baseline_fuel_gas_consumption', 'baseline_fuel_LP_consumption',
+        'baseline_fuel_kWh_consumption', 'proposed_kWh_consumption',
+        'proposed_HF_consumption', 'proposed_fuel_Hoil_consumption',
+        'baseline_kWh_cost', 'baseline_HF_cost',
+    ]
 
     def __init__ (self, community_data, forecast,
                         diag = None, prerequisites = {}):
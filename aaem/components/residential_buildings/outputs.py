@@ -9,6 +9,8 @@ import os.path
 import numpy as np
 from pandas import DataFrame
 from config import COMPONENT_NAME
+from aaem.summary_collectors import RowCollector, RegionalCollector
+from aaem.summary_collectors import collect_rows, collect_regional_summary
 import aaem.constants as constants
 from aaem.components import comp_order, definitions
 
@@ -43,34 +45,57 @@ def communities_summary (coms, res_dir):
 
 
     """
-    out = []
-    for c in sorted(coms.keys()):
-        if c.find('+') != -1 or c.find("_intertie") != -1:
-            continue
-        try:
-            res = coms[c][COMPONENT_NAME]
-
-            name = c
-            if name == 'Barrow':
-                name = 'Utqiagvik (Barrow)'
-            out.append([name,
-                res.get_NPV_benefits(),res.get_NPV_costs(),
-                res.get_NPV_net_benefit(),res.irr,res.get_BC_ratio(),
-                res.hoil_price[0], res.init_HH, res.opportunity_HH,
-                res.break_even_cost, res.levelized_cost_of_energy,
-                res.baseline_fuel_Hoil_consumption[0]/constants.mmbtu_to_gal_HF,
-                (res.baseline_fuel_Hoil_consumption[0] - \
-                    res.proposed_fuel_Hoil_consumption[0])/\
-                        constants.mmbtu_to_gal_HF,
-                round(float(res.fuel_oil_percent)*100,2),
-                res.baseline_HF_consumption[0],
-                res.baseline_HF_consumption[0] - \
-                        res.proposed_HF_consumption[0],
-                ])
-        except (KeyError,AttributeError) as e :
-            #~ print e
-            pass
+    save_communities_summary(
+        collect_rows(communities_summary_row, coms), res_dir)
 
+def communities_summary_row (c, results):
+    """Gets the row of the summary by community for a community
+
+    Parameters
+    ----------
+    c : str
+        community or project name
+    results : dictionary
+        results from the model for the community
+
+    Returns
+    -------
+    list or None
+        row of the summary, or None if the community is not in the summary
+    """
+    if c.find('+') != -1 or c.find("_intertie") != -1:
+        return None
+    res = results[COMPONENT_NAME]
+
+    name = c
+    if name == 'Barrow':
+        name = 'Utqiagvik (Barrow)'
+    return [name,
+        res.get_NPV_benefits(),res.get_NPV_costs(),
+        res.get_NPV_net_benefit(),res.irr,res.get_BC_ratio(),
+        res.hoil_price[0], res.init_HH, res.opportunity_HH,
+        res.break_even_cost, res.levelized_cost_of_energy,
+        res.baseline_fuel_Hoil_consumption[0]/constants.mmbtu_to_gal_HF,
+        (res.baseline_fuel_Hoil_consumption[0] - \
+            res.proposed_fuel_Hoil_consumption[0])/\
+                constants.mmbtu_to_gal_HF,
+        round(float(res.fuel_oil_percent)*100,2),
+        res.baseline_HF_consumption[0],
+        res.baseline_HF_consumption[0] - \
+                res.proposed_HF_consumption[0],
+        ]
+
+def save_communities_summary (out, res_dir):
+    """Saves the summary by community
+
+    Parameters
+    ----------
+    out : list
+        rows of the summary, from communities_summary_row, sorted by
+        community
+    res_dir : path
+        location to save file
+    """
     cols = ['Community',
            'Residential Efficiency NPV Benefit',
            'Residential Efficiency NPV Cost',
@@ -113,6 +138,13 @@ def communities_summary (coms, res_dir):
     fd.close()
     data.to_csv(f_name, mode='a')
 
+
+REGIONAL_COLUMNS = ['Number of communities/interties in region',
+    'Number of communities with cost effective projects',
+    'Investment needed for cost-effective projects ($)',
+    'Net benefit of cost-effective projects ($)',
+    'Heating oil displaced yearly (gallons)']
+
 def create_regional_summary (results):
     """Creates the regional summary
 
@@ -128,66 +160,52 @@ def create_regional_summary (results):
         containing regional results
 
     """
-    #~ print "start"
-    regions = {}
-    for c in results:
-        c_region = results[c]['community data'].get_item('community','region')
-        comp = results[c][COMPONENT_NAME]
-        #~ print comp
-        bc_ratio = comp.get_BC_ratio()
-        bc_ratio = (not type(bc_ratio) is str) and (not np.isinf(bc_ratio))\
-                                              and (bc_ratio > 1)
-        #~ print bc_ratio ,comp.get_BC_ratio()
-        #~ return
-        capex = round(comp.get_NPV_costs(),0)  if bc_ratio else 0
-        net_benefit = round(comp.get_NPV_net_benefit(),0)  if bc_ratio else 0
-
-        displaced_fuel = \
-            round((comp.baseline_fuel_Hoil_consumption[0] - \
-                    comp.proposed_fuel_Hoil_consumption[0])/\
-                        constants.mmbtu_to_gal_HF, 0) if bc_ratio else 0
-
-        if (c.find('+') != -1 or c.find("_intertie") != -1):
-            #~ print c
-            continue
-        if c_region in regions.keys():
-            ## append entry
-            regions[c_region]['Number of communities/interties in region'] +=1
-            k = 'Number of communities with cost effective projects'
-            regions[c_region][k] += 1 if bc_ratio else 0
-            k = 'Investment needed for cost-effective projects ($)'
-            regions[c_region][k] += capex
-            k = 'Net benefit of cost-effective projects ($)'
-            regions[c_region][k] += net_benefit
-            k = 'Heating oil displaced yearly (gallons)'
-            regions[c_region][k] += displaced_fuel
-
-        else:
-            ## set up "first" entry
-            regions[c_region] = {'Number of communities/interties in region':1}
-            k = 'Number of communities with cost effective projects'
-            regions[c_region][k] = 1 if bc_ratio else 0
-            k = 'Investment needed for cost-effective projects ($)'
-            regions[c_region][k] = capex
-            k = 'Net benefit of cost-effective projects ($)'
-            regions[c_region][k] = net_benefit
-            k = 'Heating oil displaced yearly (gallons)'
-            regions[c_region][k] = displaced_fuel
-
-    cols = ['Number of communities/interties in region',
-            'Number of communities with cost effective projects',
-            'Investment needed for cost-effective projects ($)',
-            'Net benefit of cost-effective projects ($)',
-            'Heating oil displaced yearly (gallons)']
-
-    try:
-        summary = DataFrame(regions).T[cols]
-    except KeyError:
-        summary = DataFrame(columns = cols)
-
-    summary.ix['All Regions'] = summary.sum()
-    #~ print summary
-    return summary
+    return collect_regional_summary(regional_summary_row,
+        REGIONAL_COLUMNS, results)
+
+def regional_summary_row (c, results):
+    """Gets what a community adds to the regional summary
+
+    Parameters
+    ----------
+    c : str
+        community or project name
+    results : dictionary
+        results from the model for the community
+
+    Returns
+    -------
+    tuple or None
+        (region, values in the order of REGIONAL_COLUMNS), or None if the
+        community is not counted
+    """
+    c_region = results['community data'].get_item('community','region')
+    comp = results[COMPONENT_NAME]
+    #~ print comp
+    bc_ratio = comp.get_BC_ratio()
+    bc_ratio = (not type(bc_ratio) is str) and (not np.isinf(bc_ratio))\
+                                          and (bc_ratio > 1)
+    #~ print bc_ratio ,comp.get_BC_ratio()
+    #~ return
+    capex = round(comp.get_NPV_costs(),0)  if bc_ratio else 0
+    net_benefit = round(comp.get_NPV_net_benefit(),0)  if bc_ratio else 0
+
+    displaced_fuel = \
+        round((comp.baseline_fuel_Hoil_consumption[0] - \
+                comp.proposed_fuel_Hoil_consumption[0])/\
+                    constants.mmbtu_to_gal_HF, 0) if bc_ratio else 0
+
+    if (c.find('+') != -1 or c.find("_intertie") != -1):
+        #~ print c
+        return None
+    return c_region, [
+        1,
+        1 if bc_ratio else 0,
+        capex,
+        net_benefit,
+        displaced_fuel
+    ]
+
 
 def save_regional_summary (summary, res_dir):
     """Saves the summary by region
@@ -204,3 +222,18 @@ def save_regional_summary (summary, res_dir):
                 COMPONENT_NAME.lower().replace(' ','_').\
                     replace('(','').replace(')','') + '_summary.csv')
     summary.to_csv(f_name, mode='w', index_label='region')
+
+def get_summary_collectors ():
+    """Gets the collectors for the summaries of the component, to make the
+    summaries in one pass over the results, see aaem.summary_collectors
+
+    Returns
+    -------
+    list
+        collectors for the summary by community, and the regional summary
+    """
+    return [
+        RowCollector(communities_summary_row, save_communities_summary),
+        RegionalCollector(regional_summary_row, REGIONAL_COLUMNS,
+            save_regional_summary),
+    ]
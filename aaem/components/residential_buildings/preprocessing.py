@@ -9,6 +9,8 @@ import os
 from pandas import read_csv, concat, DataFrame
 import numpy as np
 
+from aaem import data_repository
+
 def preprocess(preprocessor, **kwargs):
     """Preprocess Residential data
     
@@ -25,13 +27,13 @@ def preprocess(preprocessor, **kwargs):
     data_file = os.path.join(preprocessor.data_dir, "res_model_data.csv")
     fuel_file = os.path.join(preprocessor.data_dir, "res_fuel_source.csv")
 
-    fuel_data = read_csv(fuel_file, index_col=0, comment = "#")
-    
     ids = [preprocessor.communities[0] , preprocessor.aliases[0]]
     if preprocessor.intertie_status == 'child':
        ids = [preprocessor.communities[1] , preprocessor.aliases[1]] 
     
-    fuel = fuel_data.ix[ids][fuel_data.ix[ids].isnull().all(1) == False].T
+    fuel = data_repository.get_rows(fuel_file, ids,
+        index_col=0, comment = "#")
+    fuel = fuel[fuel.isnull().all(1) == False].T
     
     fuel = fuel.ix[["Total", "Utility Gas", "LP", "Electricity", "Fuel Oil",
                     "Coal", "Wood", "Solar", "Other", "No fuel used"]]
@@ -79,11 +81,12 @@ def preprocess(preprocessor, **kwargs):
     if preprocessor.process_intertie:
         ids = preprocessor.communities + preprocessor.aliases
         #~ print ids
-        total_hh = read_csv(
+        total_hh = data_repository.get_rows(
             data_file, 
+            ids,
             index_col=0, 
             comment = "#"
-        )['Total Occupied'].ix[ids].sum()
+        )['Total Occupied'].sum()
         data['Total Occupied'] = int(total_hh)
 
      
@@ -59,6 +59,13 @@ class SolarPower (AnnualSavings):
         diagnostics module, see information on diagnostics Object
 
     """
+    ## attributes kept in compact records of the results, see
+    ## AnnualSavings.record_attributes
+    record_attributes = AnnualSavings.record_attributes + [
+        'average_load', 'proposed_load', 'generation_proposed',
+        'generation_fuel_used', 'fuel_displaced',
+    ]
+
     def __init__ (self, community_data, forecast,
                         diag = None, prerequisites = {}):
         """Class initialiser.
@@ -193,7 +200,7 @@ class SolarPower (AnnualSavings):
             #~ self.forecast.generation_by_type['generation diesel']\
             #~ [self.start_year]
         self.average_load = \
-                self.forecast.yearly_average_diesel_load.ix[self.start_year]
+                self.forecast.get_average_diesel_load(self.start_year)
         #~ print self.average_load
 
     def calc_proposed_generation (self):
@@ -9,11 +9,12 @@ import os.path
 import numpy as np
 from pandas import DataFrame
 from config import COMPONENT_NAME
+from aaem.summary_collectors import RowCollector, RegionalCollector
+from aaem.summary_collectors import collect_rows, collect_regional_summary
 import aaem.constants as constants
 from aaem.components import comp_order, definitions
 
 
-
 ## component summary
 def component_summary (results, res_dir):
     """Creates the regional and communities summary for the component in provided 
@@ -44,73 +45,93 @@ def communities_summary (coms, res_dir):
     
 
     """
-    out = []
-    for c in sorted(coms.keys()):
-        it = coms[c]['community data'].intertie
-        if it is None:
-            it = 'parent'
-        if it == 'child':
-            continue
-        try:
-            solar = coms[c][COMPONENT_NAME]
+    save_communities_summary(
+        collect_rows(communities_summary_row, coms), res_dir)
 
-            start_yr = solar.comp_specs['start year']
-            solar.get_diesel_prices()
-            diesel_price = float(solar.diesel_prices[0].round(2))
-            assumed_out = solar.comp_specs['output per 10kW solar PV']
-            average_load = solar.average_load
-            proposed_capacity = solar.proposed_load + 0
-            existing_capacity = solar.cd['solar capacity']
-            wind_capacity = solar.cd['wind capacity']
-           
-            try:
-                net_gen = solar.generation_proposed [0]
-                loss_heat = solar.fuel_displaced[0]
-                hr_op = solar.cd['heat recovery operational']
-                net_heating =   -1* loss_heat
-                eff = solar.cd["diesel generation efficiency"]
-                red_per_year = solar.generation_fuel_used[0]
-            except AttributeError:
-                net_gen = 0
-                loss_heat = 0
-                hr_op = solar.cd['heat recovery operational']
-                net_heating = 0
-                eff = solar.cd["diesel generation efficiency"]
-                red_per_year = 0
-                
-            try:
-                levelized_cost = solar.levelized_cost_of_energy
-            except AttributeError:
-                levelized_cost = 0
+def communities_summary_row (c, results):
+    """Gets the row of the summary by community for a community
 
-            try:
-                break_even = solar.break_even_cost
-            except AttributeError:
-                break_even = 0
-            
-            name = c
-            if name == 'Barrow':
-                name = 'Utqiagvik (Barrow)'
-            l = [name,  assumed_out, average_load, proposed_capacity, 
-                 existing_capacity, wind_capacity, net_gen, loss_heat, hr_op,
-                 net_heating, red_per_year, eff, diesel_price,
-                 break_even,
-                 levelized_cost,
-                 solar.get_NPV_benefits(),
-                 solar.get_NPV_costs(),
-                 solar.get_NPV_net_benefit(),
-                 solar.irr,
-                 solar.get_BC_ratio(),
-                 solar.reason
-                ]
-            out.append(l)
-            
-        except (KeyError,AttributeError) as e:
-            #~ print e
-            pass
-    
-    
-    
+    Parameters
+    ----------
+    c : str
+        community or project name
+    results : dictionary
+        results from the model for the community
+
+    Returns
+    -------
+    list or None
+        row of the summary, or None if the community is not in the summary
+    """
+    it = results['community data'].intertie
+    if it is None:
+        it = 'parent'
+    if it == 'child':
+        return None
+    solar = results[COMPONENT_NAME]
+
+    start_yr = solar.comp_specs['start year']
+    solar.get_diesel_prices()
+    diesel_price = float(solar.diesel_prices[0].round(2))
+    assumed_out = solar.comp_specs['output per 10kW solar PV']
+    average_load = solar.average_load
+    proposed_capacity = solar.proposed_load + 0
+    existing_capacity = solar.cd['solar capacity']
+    wind_capacity = solar.cd['wind capacity']
+
+    try:
+        net_gen = solar.generation_proposed [0]
+        loss_heat = solar.fuel_displaced[0]
+        hr_op = solar.cd['heat recovery operational']
+        net_heating =   -1* loss_heat
+        eff = solar.cd["diesel generation efficiency"]
+        red_per_year = solar.generation_fuel_used[0]
+    except AttributeError:
+        net_gen = 0
+        loss_heat = 0
+        hr_op = solar.cd['heat recovery operational']
+        net_heating = 0
+        eff = solar.cd["diesel generation efficiency"]
+        red_per_year = 0
+
+    try:
+        levelized_cost = solar.levelized_cost_of_energy
+    except AttributeError:
+        levelized_cost = 0
+
+    try:
+        break_even = solar.break_even_cost
+    except AttributeError:
+        break_even = 0
+
+    name = c
+    if name == 'Barrow':
+        name = 'Utqiagvik (Barrow)'
+    l = [name,  assumed_out, average_load, proposed_capacity, 
+         existing_capacity, wind_capacity, net_gen, loss_heat, hr_op,
+         net_heating, red_per_year, eff, diesel_price,
+         break_even,
+         levelized_cost,
+         solar.get_NPV_benefits(),
+         solar.get_NPV_costs(),
+         solar.get_NPV_net_benefit(),
+         solar.irr,
+         solar.get_BC_ratio(),
+         solar.reason
+        ]
+    return l
+
+def save_communities_summary (out, res_dir):
+    """Saves the summary by community
+
+    Parameters
+    ----------
+    out : list
+        rows of the summary, from communities_summary_row, sorted by
+        community
+    res_dir : path
+        location to save file
+    """
     cols = ['Community',
             'Assumed  Output per 10kW Solar PV Array',
             'Average Diesel Load [kw]',
@@ -173,7 +194,14 @@ def communities_summary (coms, res_dir):
         '# notes: '+ definitions.NOTES +'\n'))
     fd.close()
     data.to_csv(f_name, mode='a')
-    
+
+
+REGIONAL_COLUMNS = ['Number of communities/interties in region',
+    'Number of communities with cost effective projects',
+    'Investment needed for cost-effective projects ($)',
+    'Net benefit of cost-effective projects ($)',
+    'Generation diesel displaced by cost-effective projects (gallons)']
+
 def create_regional_summary (results):
     """Creates the regional summary
     
@@ -189,68 +217,54 @@ def create_regional_summary (results):
         containing regional results
     
     """
-    #~ print "start"
-    regions = {}
-    for c in results:
-        c_region = results[c]['community data'].get_item('community','region')
-        comp = results[c][COMPONENT_NAME]
-        #~ print comp
-        bc_ratio = comp.get_BC_ratio()
-        bc_ratio = (not type(bc_ratio) is str) and (not np.isinf(bc_ratio))\
-                                              and (bc_ratio > 1)
-        #~ print bc_ratio ,comp.get_BC_ratio()
-        #~ return
-        capex = round(comp.get_NPV_costs(),0)  if bc_ratio else 0
-        net_benefit = round(comp.get_NPV_net_benefit(),0)  if bc_ratio else 0
-       
-        #~ try:
-        displaced_fuel = \
-                round(comp.generation_fuel_used[0],0) if bc_ratio else 0
-        #~ except StandardError as e:
-            #~ print e
+    return collect_regional_summary(regional_summary_row,
+        REGIONAL_COLUMNS, results)
+
+def regional_summary_row (c, results):
+    """Gets what a community adds to the regional summary
+
+    Parameters
+    ----------
+    c : str
+        community or project name
+    results : dictionary
+        results from the model for the community
+
+    Returns
+    -------
+    tuple or None
+        (region, values in the order of REGIONAL_COLUMNS), or None if the
+        community is not counted
+    """
+    c_region = results['community data'].get_item('community','region')
+    comp = results[COMPONENT_NAME]
+    #~ print comp
+    bc_ratio = comp.get_BC_ratio()
+    bc_ratio = (not type(bc_ratio) is str) and (not np.isinf(bc_ratio))\
+                                          and (bc_ratio > 1)
+    #~ print bc_ratio ,comp.get_BC_ratio()
+    #~ return
+    capex = round(comp.get_NPV_costs(),0)  if bc_ratio else 0
+    net_benefit = round(comp.get_NPV_net_benefit(),0)  if bc_ratio else 0
+
+    #~ try:
+    displaced_fuel = \
+            round(comp.generation_fuel_used[0],0) if bc_ratio else 0
+    #~ except StandardError as e:
+        #~ print e
+
+    if (results['community data'].intertie == 'child' or c.find('+') != -1):
+        #~ print c
+        return None
+    return c_region, [
+        1,
+        1 if bc_ratio else 0,
+        capex,
+        net_benefit,
+        displaced_fuel
+    ]
+
 
-        if (results[c]['community data'].intertie == 'child' or c.find('+') != -1):
-            #~ print c
-            continue
-        if c_region in regions.keys():
-            ## append entry
-            regions[c_region]['Number of communities/interties in region'] +=1
-            k = 'Number of communities with cost effective projects'
-            regions[c_region][k] += 1 if bc_ratio else 0
-            k = 'Investment needed for cost-effective projects ($)'
-            regions[c_region][k] += capex 
-            k = 'Net benefit of cost-effective projects ($)'
-            regions[c_region][k] += net_benefit
-            k = 'Generation diesel displaced by cost-effective projects (gallons)'
-            regions[c_region][k] += displaced_fuel
-            
-        else:
-            ## set up "first" entry
-            regions[c_region] = {'Number of communities/interties in region':1}
-            k = 'Number of communities with cost effective projects'
-            regions[c_region][k] = 1 if bc_ratio else 0
-            k = 'Investment needed for cost-effective projects ($)'
-            regions[c_region][k] = capex 
-            k = 'Net benefit of cost-effective projects ($)'
-            regions[c_region][k] = net_benefit
-            k = 'Generation diesel displaced by cost-effective projects (gallons)'
-            regions[c_region][k] = displaced_fuel
-            
-    cols = ['Number of communities/interties in region',
-            'Number of communities with cost effective projects',
-            'Investment needed for cost-effective projects ($)',
-            'Net benefit of cost-effective projects ($)',
-            'Generation diesel displaced by cost-effective projects (gallons)']
-    
-    try:        
-        summary = DataFrame(regions).T[cols]
-    except KeyError:
-        summary = DataFrame(columns = cols)
-    
-    summary.ix['All Regions'] = summary.sum()                 
-    #~ print summary
-    return summary
-    
 def save_regional_summary (summary, res_dir):
     """Saves the summary by region
     
@@ -266,4 +280,18 @@ def save_regional_summary (summary, res_dir):
                 COMPONENT_NAME.lower().replace(' ','_').\
                     replace('(','').replace(')','') + '_summary.csv')
     summary.to_csv(f_name, mode='w', index_label='region')
-    
+
+def get_summary_collectors ():
+    """Gets the collectors for the summaries of the component, to make the
+    summaries in one pass over the results, see aaem.summary_collectors
+
+    Returns
+    -------
+    list
+        collectors for the summary by community, and the regional summary
+    """
+    return [
+        RowCollector(communities_summary_row, save_communities_summary),
+        RegionalCollector(regional_summary_row, REGIONAL_COLUMNS,
+            save_regional_summary),
+    ]
@@ -6,9 +6,10 @@ preprocessing functions for Solar Power component
 
 """
 import os.path
-from pandas import read_csv
 import numpy as np
 
+from aaem import data_repository
+
 
 
 
@@ -27,19 +28,19 @@ def preprocess (preprocessor, **kwargs):
     
     """
     
-    data = read_csv(
+    ids = [preprocessor.communities[0], preprocessor.aliases[0]]
+    #~ if preprocessor.intertie_status == 'child':
+        #~ ids = []
+    
+    data = data_repository.get_rows(
         os.path.join(preprocessor.data_dir,"solar_resource_data.csv"),
+        ids,
         comment = '#',
         index_col = 0
     )
-        
-    ids = [preprocessor.communities[0], preprocessor.aliases[0]]
-    #~ if preprocessor.intertie_status == 'child':
-        #~ ids = []
     
     solar_pv_output = \
-        float(data.ix[ids][data.ix[ids].isnull().all(1) == False]\
-        ['Output per 10kW Solar PV'])
+        float(data[data.isnull().all(1) == False]['Output per 10kW Solar PV'])
     
     return {
         'Solar Power': {
@@ -60,6 +60,16 @@ class Transmission (AnnualSavings):
         diagnostics module, see information on diagnostics Object
 
     """
+    ## attributes kept in compact records of the results, see
+    ## AnnualSavings.record_attributes
+    record_attributes = AnnualSavings.record_attributes + [
+        'connect_to_intertie', 'average_load', 'generation',
+        'annual_transmission_loss', 'intertie_generation_efficiency',
+        'intertie_diesel_prices', 'pre_intertie_generation',
+        'pre_intertie_generation_fuel_used', 'intertie_offset_generation',
+        'intertie_offset_generation_fuel_used', 'lost_heat_recovery',
+    ]
+
     def __init__ (self, community_data, forecast,
                         diag = None, prerequisites = {}):
         """Class initialiser.
@@ -187,7 +197,7 @@ class Transmission (AnnualSavings):
         #~ self.generation = self.forecast.generation_by_type['generation diesel']\
                                                             #~ [self.start_year]
         self.average_load = \
-                self.forecast.yearly_average_diesel_load.ix[self.start_year]
+                self.forecast.get_average_diesel_load(self.start_year)
 
     def get_intertie_values (self):
         """Get values from the community being connected to (second community)
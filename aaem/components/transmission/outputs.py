@@ -9,6 +9,8 @@ import os.path
 import numpy as np
 from pandas import DataFrame
 from config import COMPONENT_NAME
+from aaem.summary_collectors import RowCollector, RegionalCollector
+from aaem.summary_collectors import collect_rows, collect_regional_summary
 import aaem.constants as constants
 from aaem.components import comp_order, definitions
 
@@ -41,143 +43,161 @@ def communities_summary (coms, res_dir):
     res_dir :  path
         location to save file
     """
-    out = []
-    for c in sorted(coms.keys()):
-        it = coms[c]['community data'].intertie
-        if it is None:
-            it = 'parent'
-        if it == 'child':
-            continue
-        try:
-            # ??? NPV or year one
-            it = coms[c][COMPONENT_NAME]
-            connect_to = it.comp_specs['nearest community with lower price']
-                
-            if it.reason == 'Not a transmission project.':
-                continue
-            try:
-                if it.connect_to_intertie:
-                    connect_to += 'intertie'
-            except AttributeError:
-                pass
-                
-            start_yr = it.comp_specs['start year']
-            
-            dist = it.comp_specs['distance to community']
-            
-            it.get_diesel_prices()
-            diesel_price = float(it.diesel_prices[0].round(2))
-            
-            try:
-                diesel_price_it = float(it.intertie_diesel_prices[0].round(2))
-            except AttributeError:
-                diesel_price_it = np.nan
-            
-            
-            #~ if not it.comp_specs["project details"] is None:
-                #~ phase = it.comp_specs["project details"]['phase']
-            #~ else:
-            phase = "Reconnaissance"
-                
-                
-                
-            heat_rec_opp = it.cd['heat recovery operational']
-            
-            try:
-                generation_displaced = it.pre_intertie_generation[0]
-            except AttributeError:
-                generation_displaced = np.nan
-            
-            try:
-                generation_conserved = it.intertie_offset_generation[0]
-            except AttributeError:
-                generation_conserved = np.nan
-                    
-            try:
-                lost_heat = it.lost_heat_recovery[0]
-            except AttributeError:
-                lost_heat = np.nan
-                
-            try:
-                levelized_cost = it.levelized_cost_of_energy
-            except AttributeError:
-                levelized_cost = 0
-
-            try:
-                break_even = it.break_even_cost
-            except AttributeError:
-                break_even = 0
-            
-            eff = it.cd["diesel generation efficiency"]
-            try:
-                pre_price = it.pre_intertie_generation_fuel_used[0] * \
-                            diesel_price
-            except AttributeError:
-                pre_price = np.nan
-                
-            try:
-                post_price = it.intertie_offset_generation_fuel_used[0] * \
-                            diesel_price_it
-            except AttributeError:
-                post_price = np.nan
-                
-            try:
-                eff_it = it.intertie_generation_efficiency
-            except AttributeError:
-                eff_it = np.nan
-                
-            
-                
-            
-            try:
-                losses = it.annual_transmission_loss
-            except AttributeError:
-                losses = np.nan
-                
-            
-                
-            name = c
-            if name == 'Barrow':
-                name = 'Utqiagvik (Barrow)'
-            l = [name,  
-                connect_to,
-                start_yr,
-                phase,
-                dist,
-
-                generation_displaced,
-                generation_conserved,
-                
-                lost_heat,
-                heat_rec_opp,
-                
-                eff,
-                eff_it,
-                diesel_price,
-                diesel_price_it,
-                break_even,
-                losses,
-                
-                levelized_cost,
-
-                pre_price,
-                post_price,
-                pre_price - post_price,
-                
-
-                it.get_NPV_benefits(),
-                it.get_NPV_costs(),
-                it.get_NPV_net_benefit(),
-                it.irr,
-                it.get_BC_ratio(),
-                it.reason
-            ]
-            out.append(l)
-        except (KeyError,AttributeError) as e:
-            print e
-            pass
-        
-    
+    save_communities_summary(
+        collect_rows(communities_summary_row, coms), res_dir)
+
+def communities_summary_row (c, results):
+    """Gets the row of the summary by community for a community
+
+    Parameters
+    ----------
+    c : str
+        community or project name
+    results : dictionary
+        results from the model for the community
+
+    Returns
+    -------
+    list or None
+        row of the summary, or None if the community is not in the summary
+    """
+    it = results['community data'].intertie
+    if it is None:
+        it = 'parent'
+    if it == 'child':
+        return None
+    # ??? NPV or year one
+    it = results[COMPONENT_NAME]
+    connect_to = it.comp_specs['nearest community with lower price']
+
+    if it.reason == 'Not a transmission project.':
+        return None
+    try:
+        if it.connect_to_intertie:
+            connect_to += 'intertie'
+    except AttributeError:
+        pass
+
+    start_yr = it.comp_specs['start year']
+
+    dist = it.comp_specs['distance to community']
+
+    it.get_diesel_prices()
+    diesel_price = float(it.diesel_prices[0].round(2))
+
+    try:
+        diesel_price_it = float(it.intertie_diesel_prices[0].round(2))
+    except AttributeError:
+        diesel_price_it = np.nan
+
+
+    #~ if not it.comp_specs["project details"] is None:
+        #~ phase = it.comp_specs["project details"]['phase']
+    #~ else:
+    phase = "Reconnaissance"
+
+
+    heat_rec_opp = it.cd['heat recovery operational']
+
+    try:
+        generation_displaced = it.pre_intertie_generation[0]
+    except AttributeError:
+        generation_displaced = np.nan
+
+    try:
+        generation_conserved = it.intertie_offset_generation[0]
+    except AttributeError:
+        generation_conserved = np.nan
+
+    try:
+        lost_heat = it.lost_heat_recovery[0]
+    except AttributeError:
+        lost_heat = np.nan
+
+    try:
+        levelized_cost = it.levelized_cost_of_energy
+    except AttributeError:
+        levelized_cost = 0
+
+    try:
+        break_even = it.break_even_cost
+    except AttributeError:
+        break_even = 0
+
+    eff = it.cd["diesel generation efficiency"]
+    try:
+        pre_price = it.pre_intertie_generation_fuel_used[0] * \
+                    diesel_price
+    except AttributeError:
+        pre_price = np.nan
+
+    try:
+        post_price = it.intertie_offset_generation_fuel_used[0] * \
+                    diesel_price_it
+    except AttributeError:
+        post_price = np.nan
+
+    try:
+        eff_it = it.intertie_generation_efficiency
+    except AttributeError:
+        eff_it = np.nan
+
+
+    try:
+        losses = it.annual_transmission_loss
+    except AttributeError:
+        losses = np.nan
+
+
+    name = c
+    if name == 'Barrow':
+        name = 'Utqiagvik (Barrow)'
+    l = [name,  
+        connect_to,
+        start_yr,
+        phase,
+        dist,
+
+        generation_displaced,
+        generation_conserved,
+
+        lost_heat,
+        heat_rec_opp,
+
+        eff,
+        eff_it,
+        diesel_price,
+        diesel_price_it,
+        break_even,
+        losses,
+
+        levelized_cost,
+
+        pre_price,
+        post_price,
+        pre_price - post_price,
+
+
+        it.get_NPV_benefits(),
+        it.get_NPV_costs(),
+        it.get_NPV_net_benefit(),
+        it.irr,
+        it.get_BC_ratio(),
+        it.reason
+    ]
+    return l
+
+def save_communities_summary (out, res_dir):
+    """Saves the summary by community
+
+    Parameters
+    ----------
+    out : list
+        rows of the summary, from communities_summary_row, sorted by
+        community
+    res_dir : path
+        location to save file
+    """
     cols = ['Community to connect',
             'Community/Intertie to connect to',
             'Start Year',
@@ -258,7 +278,14 @@ def communities_summary (coms, res_dir):
     fd.close()
 
     data.to_csv(f_name, mode='a')
-    
+
+
+REGIONAL_COLUMNS = ['Number of communities/interties in region',
+    'Number of communities with cost effective projects',
+    'Investment needed for cost-effective projects ($)',
+    'Net benefit of cost-effective projects ($)',
+    'Generation diesel displaced by cost-effective projects (gallons)']
+
 def create_regional_summary (results):
     """Creates the regional summary
     
@@ -274,66 +301,52 @@ def create_regional_summary (results):
         containing regional results
     
     """
-    #~ print "start"
-    regions = {}
-    for c in results:
-        c_region = results[c]['community data'].get_item('community','region')
-        #~ print c, results[c].keys()
-        comp = results[c][COMPONENT_NAME]
-        #~ print comp
-        bc_ratio = comp.get_BC_ratio()
-        bc_ratio = (not type(bc_ratio) is str) and (not np.isinf(bc_ratio))\
-                                              and (bc_ratio > 1)
-        #~ print bc_ratio ,comp.get_BC_ratio()
-        #~ return
-        capex = round(comp.get_NPV_costs(),0)  if bc_ratio else 0
-        net_benefit = round(comp.get_NPV_net_benefit(),0)  if bc_ratio else 0
-       
-        displaced_fuel = \
-            round(comp.pre_intertie_generation_fuel_used[0] - comp.intertie_offset_generation_fuel_used[0] ,0) if bc_ratio else 0
-
-        if (results[c]['community data'].intertie == 'child' or c.find('+') != -1):
-            #~ print c
-            continue
-        if c_region in regions.keys():
-            ## append entry
-            regions[c_region]['Number of communities/interties in region'] +=1
-            k = 'Number of communities with cost effective projects'
-            regions[c_region][k] += 1 if bc_ratio else 0
-            k = 'Investment needed for cost-effective projects ($)'
-            regions[c_region][k] += capex 
-            k = 'Net benefit of cost-effective projects ($)'
-            regions[c_region][k] += net_benefit
-            k = 'Generation diesel displaced by cost-effective projects (gallons)'
-            regions[c_region][k] += displaced_fuel
-            
-        else:
-            ## set up "first" entry
-            regions[c_region] = {'Number of communities/interties in region':1}
-            k = 'Number of communities with cost effective projects'
-            regions[c_region][k] = 1 if bc_ratio else 0
-            k = 'Investment needed for cost-effective projects ($)'
-            regions[c_region][k] = capex 
-            k = 'Net benefit of cost-effective projects ($)'
-            regions[c_region][k] = net_benefit
-            k = 'Generation diesel displaced by cost-effective projects (gallons)'
-            regions[c_region][k] = displaced_fuel
-            
-    cols = ['Number of communities/interties in region',
-            'Number of communities with cost effective projects',
-            'Investment needed for cost-effective projects ($)',
-            'Net benefit of cost-effective projects ($)',
-            'Generation diesel displaced by cost-effective projects (gallons)']
-
-    try:        
-        summary = DataFrame(regions).T[cols]
-    except KeyError:
-        summary = DataFrame(columns = cols)
-        
-    summary.ix['All Regions'] = summary.sum()                 
-    #~ print summary
-    return summary
-    
+    return collect_regional_summary(regional_summary_row,
+        REGIONAL_COLUMNS, results)
+
+def regional_summary_row (c, results):
+    """Gets what a community adds to the regional summary
+
+    Parameters
+    ----------
+    c : str
+        community or project name
+    results : dictionary
+        results from the model for the community
+
+    Returns
+    -------
+    tuple or None
+        (region, values in the order of REGIONAL_COLUMNS), or None if the
+        community is not counted
+    """
+    c_region = results['community data'].get_item('community','region')
+    #~ print c, results.keys()
+    comp = results[COMPONENT_NAME]
+    #~ print comp
+    bc_ratio = comp.get_BC_ratio()
+    bc_ratio = (not type(bc_ratio) is str) and (not np.isinf(bc_ratio))\
+                                          and (bc_ratio > 1)
+    #~ print bc_ratio ,comp.get_BC_ratio()
+    #~ return
+    capex = round(comp.get_NPV_costs(),0)  if bc_ratio else 0
+    net_benefit = round(comp.get_NPV_net_benefit(),0)  if bc_ratio else 0
+
+    displaced_fuel = \
+        round(comp.pre_intertie_generation_fuel_used[0] - comp.intertie_offset_generation_fuel_used[0] ,0) if bc_ratio else 0
+
+    if (results['community data'].intertie == 'child' or c.find('+') != -1):
+        #~ print c
+        return None
+    return c_region, [
+        1,
+        1 if bc_ratio else 0,
+        capex,
+        net_benefit,
+        displaced_fuel
+    ]
+
+
 def save_regional_summary (summary, res_dir):
     """Saves the summary by region
     
@@ -349,4 +362,18 @@ def save_regional_summary (summary, res_dir):
                 COMPONENT_NAME.lower().replace(' ','_').\
                     replace('(','').replace(')','') + '_summary.csv')
     summary.to_csv(f_name, mode='w', index_label='region')
-    
+
+def get_summary_collectors ():
+    """Gets the collectors for the summaries of the component, to make the
+    summaries in one pass over the results, see aaem.summary_collectors
+
+    Returns
+    -------
+    list
+        collectors for the summary by community, and the regional summary
+    """
+    return [
+        RowCollector(communities_summary_row, save_communities_summary),
+        RegionalCollector(regional_summary_row, REGIONAL_COLUMNS,
+            save_regional_summary),
+    ]
@@ -6,9 +6,10 @@ preprocessing functions for The Transmission component
 
 """
 import os.path
-from pandas import read_csv
 import numpy as np
 
+from aaem import data_repository
+
     
 def preprocess (preprocessor, **kwargs):
     """preprocess wind power data 
@@ -24,12 +25,6 @@ def preprocess (preprocessor, **kwargs):
         preprocessed data
     
     """
-    data = read_csv(
-        os.path.join(preprocessor.data_dir,'transmission_distances.csv'),
-        comment = '#',
-        index_col = 0)
-      
-                
     if not preprocessor.process_intertie:
         if preprocessor.intertie_status == 'child':
             ids = [preprocessor.communities[1],preprocessor.aliases[1]]
@@ -38,7 +33,12 @@ def preprocess (preprocessor, **kwargs):
     else:
        ids = [preprocessor.communities[0],preprocessor.aliases[0]]
     
-    data = data.ix[ids][data.ix[ids].isnull().all(1) == False]
+    data = data_repository.get_rows(
+        os.path.join(preprocessor.data_dir,'transmission_distances.csv'),
+        ids,
+        comment = '#',
+        index_col = 0)
+    data = data[data.isnull().all(1) == False]
     
     try:
         max_savings = float(data['Maximum savings ($/kWh)'])
@@ -62,6 +62,16 @@ class WaterWastewaterSystems (AnnualSavings):
         diagnostics module, see information on diagnostics Object
 
     """
+    ## attributes kept in compact records of the results, see
+    ## AnnualSavings.record_attributes
+    record_attributes = AnnualSavings.record_attributes + [
+        'hdd', 'elec_price', 'hoil_price', 'baseline_kWh_consumption',
+        'baseline_HF_consumption', 'baseline_fuel_Hoil_consumption',
+        'proposed_kWh_consumption', 'proposed_HF_consumption',
+        'proposed_fuel_Hoil_consumption', 'savings_kWh_consumption',
+        'savings_fuel_Hoil_consumption', 'baseline_kWh_cost',
+        'baseline_HF_cost',
+    ]
 
     def __init__ (self, community_data, forecast,
                         diag = None, prerequisites = {}):
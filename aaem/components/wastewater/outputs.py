@@ -9,11 +9,12 @@ import os.path
 import numpy as np
 from pandas import DataFrame
 from config import COMPONENT_NAME
+from aaem.summary_collectors import RowCollector, RegionalCollector
+from aaem.summary_collectors import collect_rows, collect_regional_summary
 import aaem.constants as constants
 from aaem.components import comp_order, definitions
 
 
-
 ## component summary
 def component_summary (results, res_dir):
     """Creates the regional and communities summary for the component in provided 
@@ -42,42 +43,64 @@ def communities_summary (coms, res_dir):
     res_dir :  path
         location to save file
     """
-    out = []
-    for c in sorted(coms.keys()):
-        if c.find('+') != -1 or c.find("_intertie") != -1:
-            continue
-        try:
-            www = coms[c][COMPONENT_NAME]
-            try:
-                oil_p, elec_p =  www.hoil_price[0], www.elec_price[0]
-            except AttributeError:
-                oil_p, elec_p = 0,0
-            
-            savings = (www.baseline_HF_consumption -\
-                      www.proposed_HF_consumption) * constants.mmbtu_to_gal_HF
-            
-            name = c
-            if name == 'Barrow':
-                name = 'Utqiagvik (Barrow)'
-            
-            out.append([name,
-                www.get_NPV_benefits(),www.get_NPV_costs(),
-                www.get_NPV_net_benefit(),www.irr,www.get_BC_ratio(),
-                oil_p, elec_p ,
-                #~ www.num_buildings , www.refit_sqft_total,
-                www.break_even_cost,
-                www.levelized_cost_of_energy['MMBtu'],
-                www.levelized_cost_of_energy['kWh'],
-                www.baseline_HF_consumption[0] * constants.mmbtu_to_gal_HF,
-                www.baseline_kWh_consumption[0],
-                savings[0],
-                (www.baseline_kWh_consumption - www.proposed_kWh_consumption)[0]
-                ])
-        except (KeyError,AttributeError) as e:
-            #~ print c +":"+ str(e)
-            pass
-            
-            
+    save_communities_summary(
+        collect_rows(communities_summary_row, coms), res_dir)
+
+def communities_summary_row (c, results):
+    """Gets the row of the summary by community for a community
+
+    Parameters
+    ----------
+    c : str
+        community or project name
+    results : dictionary
+        results from the model for the community
+
+    Returns
+    -------
+    list or None
+        row of the summary, or None if the community is not in the summary
+    """
+    if c.find('+') != -1 or c.find("_intertie") != -1:
+        return None
+    www = results[COMPONENT_NAME]
+    try:
+        oil_p, elec_p =  www.hoil_price[0], www.elec_price[0]
+    except AttributeError:
+        oil_p, elec_p = 0,0
+
+    savings = (www.baseline_HF_consumption -\
+              www.proposed_HF_consumption) * constants.mmbtu_to_gal_HF
+
+    name = c
+    if name == 'Barrow':
+        name = 'Utqiagvik (Barrow)'
+
+    return [name,
+        www.get_NPV_benefits(),www.get_NPV_costs(),
+        www.get_NPV_net_benefit(),www.irr,www.get_BC_ratio(),
+        oil_p, elec_p ,
+        #~ www.num_buildings , www.refit_sqft_total,
+        www.break_even_cost,
+        www.levelized_cost_of_energy['MMBtu'],
+        www.levelized_cost_of_energy['kWh'],
+        www.baseline_HF_consumption[0] * constants.mmbtu_to_gal_HF,
+        www.baseline_kWh_consumption[0],
+        savings[0],
+        (www.baseline_kWh_consumption - www.proposed_kWh_consumption)[0]
+        ]
+
+def save_communities_summary (out, res_dir):
+    """Saves the summary by community
+
+    Parameters
+    ----------
+    out : list
+        rows of the summary, from communities_summary_row, sorted by
+        community
+    res_dir : path
+        location to save file
+    """
     cols = ['Community',
             'Water/Wastewater Efficiency NPV Benefit',
             'Water/Wastewater Efficiency NPV Cost',
@@ -124,6 +147,14 @@ def communities_summary (coms, res_dir):
     fd.close()
     data.to_csv(f_name, mode='a')
 
+
+REGIONAL_COLUMNS = ['Number of communities/interties in region',
+    'Number of communities with cost effective projects',
+    'Investment needed for cost-effective projects ($)',
+    'Net benefit of cost-effective projects ($)',
+    'Heating oil equiv. displaced yearly',
+    'kWh displaced yearly (kwh)']
+
 def create_regional_summary (results):
     """Creates the regional summary
     
@@ -139,77 +170,56 @@ def create_regional_summary (results):
         containing regional results
     
     """
-    #~ print "start"
-    regions = {}
-    for c in results:
-        c_region = results[c]['community data'].get_item('community','region')
-        comp = results[c][COMPONENT_NAME]
-        #~ print comp
-        bc_ratio = comp.get_BC_ratio()
-        bc_ratio = (not type(bc_ratio) is str) and (not np.isinf(bc_ratio))\
-                                              and (bc_ratio > 1)
-        #~ print bc_ratio ,comp.get_BC_ratio()
-        #~ return
-        capex = round(comp.get_NPV_costs(),0)  if bc_ratio else 0
-        net_benefit = round(comp.get_NPV_net_benefit(),0)  if bc_ratio else 0
-       
-        displaced_fuel = \
-            round((comp.baseline_HF_consumption -\
-                      comp.proposed_HF_consumption)[0] * constants.mmbtu_to_gal_HF ,0) if bc_ratio else 0
-                      
-        displaced_kWh = round(comp.baseline_kWh_consumption[0] -\
-                comp.proposed_kWh_consumption[0],0) if bc_ratio else 0
-
-        if (c.find('+') != -1 or c.find("_intertie") != -1):
-            #~ print c
-            continue
-        if c_region in regions.keys():
-            ## append entry
-            regions[c_region]['Number of communities/interties in region'] +=1
-            k = 'Number of communities with cost effective projects'
-            regions[c_region][k] += 1 if bc_ratio else 0
-            k = 'Investment needed for cost-effective projects ($)'
-            regions[c_region][k] += capex 
-            k = 'Net benefit of cost-effective projects ($)'
-            regions[c_region][k] += net_benefit
-            
-            k = 'Heating oil equiv. displaced yearly'
-            regions[c_region][k] += displaced_fuel
-            k = 'kWh displaced yearly (kwh)'
-            regions[c_region][k] += displaced_kWh
-            
-        else:
-            ## set up "first" entry
-            regions[c_region] = {'Number of communities/interties in region':1}
-            k = 'Number of communities with cost effective projects'
-            regions[c_region][k] = 1 if bc_ratio else 0
-            k = 'Investment needed for cost-effective projects ($)'
-            regions[c_region][k] = capex 
-            k = 'Net benefit of cost-effective projects ($)'
-            regions[c_region][k] = net_benefit
-            
-            k = 'Heating oil equiv. displaced yearly'
-            regions[c_region][k] = displaced_fuel
-            k = 'kWh displaced yearly (kwh)'
-            regions[c_region][k] = displaced_kWh
-            
-    cols = ['Number of communities/interties in region',
-            'Number of communities with cost effective projects',
-            'Investment needed for cost-effective projects ($)',
-            'Net benefit of cost-effective projects ($)',
-            'Heating oil equiv. displaced yearly',
-            'kWh displaced yearly (kwh)']
-                        
-                        
-    try:        
-        summary = DataFrame(regions).T[cols]
-    except KeyError:
-        summary = DataFrame(columns = cols)
-        
-    summary.ix['All Regions'] = summary.sum()                 
-    #~ print summary
-    return summary
-    
+    return collect_regional_summary(regional_summary_row,
+        REGIONAL_COLUMNS, results)
+
+def regional_summary_row (c, results):
+    """Gets what a community adds to the regional summary
+
+    Parameters
+    ----------
+    c : str
+        community or project name
+    results : dictionary
+        results from the model for the community
+
+    Returns
+    -------
+    tuple or None
+        (region, values in the order of REGIONAL_COLUMNS), or None if the
+        community is not counted
+    """
+    c_region = results['community data'].get_item('community','region')
+    comp = results[COMPONENT_NAME]
+    #~ print comp
+    bc_ratio = comp.get_BC_ratio()
+    bc_ratio = (not type(bc_ratio) is str) and (not np.isinf(bc_ratio))\
+                                          and (bc_ratio > 1)
+    #~ print bc_ratio ,comp.get_BC_ratio()
+    #~ return
+    capex = round(comp.get_NPV_costs(),0)  if bc_ratio else 0
+    net_benefit = round(comp.get_NPV_net_benefit(),0)  if bc_ratio else 0
+
+    displaced_fuel = \
+        round((comp.baseline_HF_consumption -\
+                  comp.proposed_HF_consumption)[0] * constants.mmbtu_to_gal_HF ,0) if bc_ratio else 0
+
+    displaced_kWh = round(comp.baseline_kWh_consumption[0] -\
+            comp.proposed_kWh_consumption[0],0) if bc_ratio else 0
+
+    if (c.find('+') != -1 or c.find("_intertie") != -1):
+        #~ print c
+        return None
+    return c_region, [
+        1,
+        1 if bc_ratio else 0,
+        capex,
+        net_benefit,
+        displaced_fuel,
+        displaced_kWh
+    ]
+
+
 def save_regional_summary (summary, res_dir):
     """Saves the summary by region
     
@@ -225,4 +235,18 @@ def save_regional_summary (summary, res_dir):
                 COMPONENT_NAME.lower().replace(' ','_').\
                     replace('(','').replace(')','') + '_summary.csv')
     summary.to_csv(f_name, mode='w', index_label='region')
-    
+
+def get_summary_collectors ():
+    """Gets the collectors for the summaries of the component, to make the
+    summaries in one pass over the results, see aaem.summary_collectors
+
+    Returns
+    -------
+    list
+        collectors for the summary by community, and the regional summary
+    """
+    return [
+        RowCollector(communities_summary_row, save_communities_summary),
+        RegionalCollector(regional_summary_row, REGIONAL_COLUMNS,
+            save_regional_summary),
+    ]
@@ -59,6 +59,15 @@ class WindPower(AnnualSavings):
         diagnostics module, see information on diagnostics Object
 
     """
+    ## attributes kept in compact records of the results, see
+    ## AnnualSavings.record_attributes
+    record_attributes = AnnualSavings.record_attributes + [
+        'average_load', 'generation', 'load_offset_proposed',
+        'generation_wind_proposed', 'net_generation_wind',
+        'electric_diesel_reduction', 'reduction_diesel_used',
+        'diesel_equiv_captured', 'loss_heat_recovery', 'cost_per_kw',
+    ]
+
     def __init__ (self, community_data, forecast,
                         diag = None, prerequisites = {}):
         """Class initialiser.
@@ -206,7 +215,7 @@ class WindPower(AnnualSavings):
         self.generation = self.forecast.generation['generation diesel']\
                                                             [self.start_year]
         self.average_load = \
-                self.forecast.yearly_average_diesel_load.ix[self.start_year]
+                self.forecast.get_average_diesel_load(self.start_year)
         #~ print 'self.average_load',self.average_load
 
     def calc_generation_wind_proposed (self):
@@ -9,6 +9,8 @@ import os.path
 import numpy as np
 from pandas import DataFrame
 from config import COMPONENT_NAME
+from aaem.summary_collectors import RowCollector, RegionalCollector
+from aaem.summary_collectors import collect_rows, collect_regional_summary
 import aaem.constants as constants
 from aaem.components import comp_order, definitions
 
@@ -43,95 +45,116 @@ def communities_summary (coms, res_dir):
     res_dir :  path
         location to save file
     """
-    #~ return
-    out = []
-    for c in sorted(coms.keys()):
-        it = coms[c]['community data'].intertie
-        if it is None:
-            it = 'parent'
-        if it == 'child':
-            continue
-        try:
-            # ??? NPV or year one
-            wind = coms[c][COMPONENT_NAME]
-            
-            start_yr = wind.comp_specs['start year']
-            wind.get_diesel_prices()
-            diesel_price = float(wind.diesel_prices[0].round(2))
-            phase = wind.comp_specs['phase']
-            average_load = wind.average_load
-            existing_load = wind.cd['wind capacity']
-            existing_solar = wind.cd['solar capacity']
-            wind_class = float(wind.comp_specs['wind class']) 
-            proposed_load =  wind.load_offset_proposed
-            cap_fac = float(wind.comp_specs['capacity factor'])
-            heat_rec_opp = wind.cd['heat recovery operational']
-            try:
-                #~ offset = wind.load_offset_proposed
-                net_gen_wind = wind.net_generation_wind
-                decbb = wind.diesel_equiv_captured
-                
-                
-                loss_heat = wind.loss_heat_recovery
-                electric_diesel_reduction=wind.electric_diesel_reduction
-                
-                diesel_red = wind.reduction_diesel_used
-                levelized_cost = wind.levelized_cost_of_energy
-                break_even = wind.break_even_cost
-                eff = wind.cd["diesel generation efficiency"]
-                
-            except AttributeError:
-                offset = 0
-                net_gen_wind = 0
-                decbb = 0
-                electric_diesel_reduction=0
-                loss_heat = 0
-                
-                diesel_red = 0
-                levelized_cost = 0
-                break_even = 0
-                eff = wind.cd["diesel generation efficiency"]    
-                
-            #~ try:
-                #~ red_per_year = net_gen_wind / eff
-            #~ except ZeroDivisionError:
-                #~ red_per_year = 0
-            
-            name = c
-            if name == 'Barrow':
-                name = 'Utqiagvik (Barrow)'
-            l = [name,  
-                start_yr,
-                phase,
-                wind_class, 
-                average_load, 
-                proposed_load,
-                existing_load,
-                existing_solar,
-                cap_fac,
-                net_gen_wind,
-                decbb, 
-                loss_heat, 
-                heat_rec_opp,
-                diesel_red, 
-                electric_diesel_reduction,
-                eff,
-                diesel_price,
-                break_even,
-                levelized_cost,
-                wind.get_NPV_benefits(),
-                wind.get_NPV_costs(),
-                wind.get_NPV_net_benefit(),
-                wind.irr,
-                wind.get_BC_ratio(),
-                wind.reason
-            ]
-            out.append(l)
-        except (KeyError,AttributeError) as e:
-            #~ print e
-            pass
-        
-    
+    save_communities_summary(
+        collect_rows(communities_summary_row, coms), res_dir)
+
+def communities_summary_row (c, results):
+    """Gets the row of the summary by community for a community
+
+    Parameters
+    ----------
+    c : str
+        community or project name
+    results : dictionary
+        results from the model for the community
+
+    Returns
+    -------
+    list or None
+        row of the summary, or None if the community is not in the summary
+    """
+    it = results['community data'].intertie
+    if it is None:
+        it = 'parent'
+    if it == 'child':
+        return None
+    # ??? NPV or year one
+    wind = results[COMPONENT_NAME]
+
+    start_yr = wind.comp_specs['start year']
+    wind.get_diesel_prices()
+    diesel_price = float(wind.diesel_prices[0].round(2))
+    phase = wind.comp_specs['phase']
+    average_load = wind.average_load
+    existing_load = wind.cd['wind capacity']
+    existing_solar = wind.cd['solar capacity']
+    wind_class = float(wind.comp_specs['wind class']) 
+    proposed_load =  wind.load_offset_proposed
+    cap_fac = float(wind.comp_specs['capacity factor'])
+    heat_rec_opp = wind.cd['heat recovery operational']
+    try:
+        #~ offset = wind.load_offset_proposed
+        net_gen_wind = wind.net_generation_wind
+        decbb = wind.diesel_equiv_captured
+
+
+        loss_heat = wind.loss_heat_recovery
+        electric_diesel_reduction=wind.electric_diesel_reduction
+
+        diesel_red = wind.reduction_diesel_used
+        levelized_cost = wind.levelized_cost_of_energy
+        break_even = wind.break_even_cost
+        eff = wind.cd["diesel generation efficiency"]
+
+    except AttributeError:
+        offset = 0
+        net_gen_wind = 0
+        decbb = 0
+        electric_diesel_reduction=0
+        loss_heat = 0
+
+        diesel_red = 0
+        levelized_cost = 0
+        break_even = 0
+        eff = wind.cd["diesel generation efficiency"]    
+
+    #~ try:
+        #~ red_per_year = net_gen_wind / eff
+    #~ except ZeroDivisionError:
+        #~ red_per_year = 0
+
+    name = c
+    if name == 'Barrow':
+        name = 'Utqiagvik (Barrow)'
+    l = [name,  
+        start_yr,
+        phase,
+        wind_class, 
+        average_load, 
+        proposed_load,
+        existing_load,
+        existing_solar,
+        cap_fac,
+        net_gen_wind,
+        decbb, 
+        loss_heat, 
+        heat_rec_opp,
+        diesel_red, 
+        electric_diesel_reduction,
+        eff,
+        diesel_price,
+        break_even,
+        levelized_cost,
+        wind.get_NPV_benefits(),
+        wind.get_NPV_costs(),
+        wind.get_NPV_net_benefit(),
+        wind.irr,
+        wind.get_BC_ratio(),
+        wind.reason
+    ]
+    return l
+
+def save_communities_summary (out, res_dir):
+    """Saves the summary by community
+
+    Parameters
+    ----------
+    out : list
+        rows of the summary, from communities_summary_row, sorted by
+        community
+    res_dir : path
+        location to save file
+    """
     cols = ['Community',
             'Start Year',
             'Project phase',
@@ -200,7 +223,14 @@ def communities_summary (coms, res_dir):
         
     fd.close()
     data.to_csv(f_name, mode='a')
-    
+
+
+REGIONAL_COLUMNS = ['Number of communities/interties in region',
+    'Number of communities with cost effective projects',
+    'Investment needed for cost-effective projects ($)',
+    'Net benefit of cost-effective projects ($)',
+    'Generation diesel displaced by cost-effective projects (gallons)']
+
 def create_regional_summary (results):
     """Creates the regional summary
     
@@ -216,65 +246,51 @@ def create_regional_summary (results):
         containing regional results
     
     """
-    #~ print "start"
-    regions = {}
-    for c in results:
-        c_region = results[c]['community data'].get_item('community','region')
-        comp = results[c][COMPONENT_NAME]
-        #~ print comp
-        bc_ratio = comp.get_BC_ratio()
-        bc_ratio = (not type(bc_ratio) is str) and (not np.isinf(bc_ratio))\
-                                              and (bc_ratio > 1)
-        #~ print bc_ratio ,comp.get_BC_ratio()
-        #~ return
-        capex = round(comp.get_NPV_costs(),0)  if bc_ratio else 0
-        net_benefit = round(comp.get_NPV_net_benefit(),0)  if bc_ratio else 0
-       
-        displaced_fuel = \
-            round(comp.electric_diesel_reduction,0) if bc_ratio else 0
-
-        if (results[c]['community data'].intertie == 'child' or c.find('+') != -1) and not c.find('wind') != -1:
-            #~ print c
-            continue
-        if c_region in regions.keys():
-            ## append entry
-            regions[c_region]['Number of communities/interties in region'] +=1
-            k = 'Number of communities with cost effective projects'
-            regions[c_region][k] += 1 if bc_ratio else 0
-            k = 'Investment needed for cost-effective projects ($)'
-            regions[c_region][k] += capex 
-            k = 'Net benefit of cost-effective projects ($)'
-            regions[c_region][k] += net_benefit
-            k = 'Generation diesel displaced by cost-effective projects (gallons)'
-            regions[c_region][k] += displaced_fuel
-            
-        else:
-            ## set up "first" entry
-            regions[c_region] = {'Number of communities/interties in region':1}
-            k = 'Number of communities with cost effective projects'
-            regions[c_region][k] = 1 if bc_ratio else 0
-            k = 'Investment needed for cost-effective projects ($)'
-            regions[c_region][k] = capex 
-            k = 'Net benefit of cost-effective projects ($)'
-            regions[c_region][k] = net_benefit
-            k = 'Generation diesel displaced by cost-effective projects (gallons)'
-            regions[c_region][k] = displaced_fuel
-            
-    cols = ['Number of communities/interties in region',
-            'Number of communities with cost effective projects',
-            'Investment needed for cost-effective projects ($)',
-            'Net benefit of cost-effective projects ($)',
-            'Generation diesel displaced by cost-effective projects (gallons)']
-    
-    try:        
-        summary = DataFrame(regions).T[cols]
-    except KeyError:
-        summary = DataFrame(columns = cols)
-   
-    summary.ix['All Regions'] = summary.sum()                 
-    #~ print summary
-    return summary
-    
+    return collect_regional_summary(regional_summary_row,
+        REGIONAL_COLUMNS, results)
+
+def regional_summary_row (c, results):
+    """Gets what a community adds to the regional summary
+
+    Parameters
+    ----------
+    c : str
+        community or project name
+    results : dictionary
+        results from the model for the community
+
+    Returns
+    -------
+    tuple or None
+        (region, values in the order of REGIONAL_COLUMNS), or None if the
+        community is not counted
+    """
+    c_region = results['community data'].get_item('community','region')
+    comp = results[COMPONENT_NAME]
+    #~ print comp
+    bc_ratio = comp.get_BC_ratio()
+    bc_ratio = (not type(bc_ratio) is str) and (not np.isinf(bc_ratio))\
+                                          and (bc_ratio > 1)
+    #~ print bc_ratio ,comp.get_BC_ratio()
+    #~ return
+    capex = round(comp.get_NPV_costs(),0)  if bc_ratio else 0
+    net_benefit = round(comp.get_NPV_net_benefit(),0)  if bc_ratio else 0
+
+    displaced_fuel = \
+        round(comp.electric_diesel_reduction,0) if bc_ratio else 0
+
+    if (results['community data'].intertie == 'child' or c.find('+') != -1) and not c.find('wind') != -1:
+        #~ print c
+        return None
+    return c_region, [
+        1,
+        1 if bc_ratio else 0,
+        capex,
+        net_benefit,
+        displaced_fuel
+    ]
+
+
 def save_regional_summary (summary, res_dir):
     """Saves the summary by region
     
@@ -290,4 +306,18 @@ def save_regional_summary (summary, res_dir):
                 COMPONENT_NAME.lower().replace(' ','_').\
                     replace('(','').replace(')','') + '_summary.csv')
     summary.to_csv(f_name, mode='w', index_label='region')
-    
+
+def get_summary_collectors ():
+    """Gets the collectors for the summaries of the component, to make the
+    summaries in one pass over the results, see aaem.summary_collectors
+
+    Returns
+    -------
+    list
+        collectors for the summary by community, and the regional summary
+    """
+    return [
+        RowCollector(communities_summary_row, save_communities_summary),
+        RegionalCollector(regional_summary_row, REGIONAL_COLUMNS,
+            save_regional_summary),
+    ]
@@ -13,6 +13,8 @@ from yaml import dump
 from config import UNKNOWN
 import aaem.constants as constants
 import copy
+
+from aaem import data_repository
     
 def preprocess (preprocessor, **kwargs):
     """preprocess wind power data 
@@ -29,14 +31,15 @@ def preprocess (preprocessor, **kwargs):
     
     """
 
-    wind_classes = read_csv(
+    ids = preprocessor.communities + preprocessor.aliases
+    wind_classes = data_repository.get_rows(
         os.path.join(preprocessor.data_dir, "wind_classes.csv"),
+        ids,
         comment = '#',
         index_col = 0
     )
                             
-    ids = preprocessor.communities + preprocessor.aliases
-    wind_class = wind_classes.ix[ids]['Assumed Wind Class'].max()
+    wind_class = wind_classes['Assumed Wind Class'].max()
     preprocessor.diagnostics.add_note( 'Wind Power',
         'Using max wind class for all communities in intertie')
     if np.isnan(wind_class):
@@ -101,9 +104,8 @@ def preprocess (preprocessor, **kwargs):
 
     p_data = {}
  
-    project_data = read_csv(os.path.join(preprocessor.data_dir,
-        "wind_projects_potential.csv"),
-        comment = '#',index_col = 0)
+    project_file = os.path.join(preprocessor.data_dir,
+        "wind_projects_potential.csv")
         
     data_file = os.path.join(
         preprocessor.data_dir,
@@ -116,7 +118,8 @@ def preprocess (preprocessor, **kwargs):
     if preprocessor.intertie_status == 'child':
         ids = []
     try:
-        project_data = project_data.ix[ids]
+        project_data = data_repository.get_rows(project_file, ids,
+            comment = '#', index_col = 0)
         #~ print project_data
         project_data = \
             project_data[project_data.isnull().all(1) == False]
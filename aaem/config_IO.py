@@ -4,13 +4,133 @@ from aaem.yaml_dataframe import dict_to_dataframe
 from pandas import DataFrame
 import aaem.yaml_dataframe as yd
 import copy
+import os
+import hashlib
+import tempfile
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
 
-def read_config (filename):
+from aaem import __version__
+
+## directory, next to each config file, for cached parsed configs
+CACHE_DIR = '__cache'
+
+def read_config (filename, use_cache = True):
     """
+    read a config yaml file, converting DataFrame items to DataFrames
+    
+    inputs:
+        filename: path to config .yaml file <string>
+        use_cache: (optional, default: True) use the parsed config cache in 
+            the '__cache' directory next to the file. Entries are keyed by 
+            the file name, contents and model version, so changing the file 
+            invalidates its entry. Entries that can not be read are 
+            ignored and replaced <bool>
+            
+    outputs:
+        returns the config dictionary, a new copy on every call
     """
     with open(filename, 'r') as conf_text:
-        conf = yaml.load(conf_text)
+        text = conf_text.read()
+    
+    if use_cache:
+        cache_file = get_cache_path(filename, text)
+        try:
+            with open(cache_file, 'rb') as cache:
+                return pickle.load(cache)
+        except Exception:
+            ## missing, partial, or from other versions of pandas/numpy,
+            ## the cache is only an optimization
+            pass
+    
+    conf = parse_config(text)
+    
+    if use_cache:
+        write_cache(cache_file, conf)
+    return conf
+    
+def get_cache_path (filename, text):
+    """
+    get the path of the parsed config cache entry for a config file
+    
+    inputs:
+        filename: path to config .yaml file <string>
+        text: contents of the file <string>
+        
+    outputs:
+        returns path to cache entry, '<file name>-<sha1 of version and 
+    contents>.pkl'
+    """
+    key = hashlib.sha1(__version__ + '\n' + text).hexdigest()
+    return os.path.join(
+        os.path.dirname(os.path.abspath(filename)), CACHE_DIR, 
+        os.path.basename(filename) + '-' + key + '.pkl'
+    )
+    
+def write_cache (cache_file, conf):
+    """
+    write a parsed config cache entry. The entry is written to a temporary 
+    file that is renamed, so partly written entries are never read. Older 
+    entries for the same config file are removed. Errors are ignored, the 
+    cache is only an optimization.
+    
+    inputs:
+        cache_file: path to cache entry <string>
+        conf: parsed config <dict>
+    """
+    directory = os.path.dirname(cache_file)
+    try:
+        os.makedirs(directory)
+    except OSError:
+        pass
+    temp = None
+    try:
+        fd, temp = tempfile.mkstemp(dir = directory, suffix = '.tmp')
+        with os.fdopen(fd, 'wb') as cache:
+            pickle.dump(conf, cache, pickle.HIGHEST_PROTOCOL)
+        os.rename(temp, cache_file)
+    except Exception:
+        if not temp is None:
+            try:
+                os.remove(temp)
+            except OSError:
+                pass
+        return
+    prune_cache(cache_file)
+    
+def prune_cache (cache_file):
+    """
+    remove the cache entries for older versions of a config file
     
+    inputs:
+        cache_file: path to the current cache entry <string>
+    """
+    directory, current = os.path.split(cache_file)
+    ## '<file name>-' of '<file name>-<sha1>.pkl'
+    prefix = current[:-len('.pkl') - 40]
+    for entry in os.listdir(directory):
+        if entry == current or not entry.startswith(prefix) or \
+                not entry.endswith('.pkl') or len(entry) != len(current):
+            continue
+        try:
+            os.remove(os.path.join(directory, entry))
+        except OSError:
+            pass
+
+def parse_config (text):
+    """
+    parse the text of a config yaml file
+    
+    inputs:
+        text: config yaml text <string>
+        
+    outputs:
+        returns the config dictionary, with items that are DataFrames 
+    converted to DataFrames
+    """
+    conf = yaml.load(text)
     
     for section in conf:
         for item in conf[section]:
@@ -174,6 +294,57 @@ def merge_configs (bottom, top):
     
     return bottom
 
+## leaf values of these types are shared, not copied, by layer_configs
+IMMUTABLE_TYPES = (str, unicode, int, long, float, bool, type(None), 
+    tuple, type)
+
+def layer_configs (base, top):
+    """merge two configs like merge_configs, with values in 'top' overwriting 
+    values in 'base', without ever modifying 'base'. Every dictionary in the 
+    result is new, immutable values are shared with 'base', and mutable 
+    values (i.e. DataFrames or lists) from 'base' are deep copied, so 'base' 
+    can be shared between many model instances. (copy.copy of a DataFrame 
+    shares its data in older versions of pandas.)
+    """
+    layered = {}
+    for section in base:
+        value = base[section]
+        if section in top:
+            if type(value) is dict and hasattr(top[section], 'keys'):
+                layered[section] = layer_configs(value, top[section])
+            else:
+                layered[section] = top[section]
+        elif type(value) is dict:
+            layered[section] = layer_configs(value, {})
+        elif isinstance(value, IMMUTABLE_TYPES):
+            layered[section] = value
+        else:
+            layered[section] = copy.deepcopy(value)
+    
+    for section in top:
+        if not section in base:
+            layered[section] = top[section]
+    
+    return layered
+    
+def validate_keys (to_validate, validator, level = 0):
+    """validate that all keys in a partial config (i.e. a global config) 
+    are in the config structure
+    """
+    unknown = set(to_validate.keys()) - set(validator.keys())
+    if len(unknown) != 0:
+        return False, 'Unknown keys level: ' + str(level) + \
+            ". See keys " + str(unknown)
+    
+    for section in to_validate:
+        if type(to_validate[section]) is dict and \
+                type(validator[section]) is dict:
+            boolean, reason = validate_keys(to_validate[section],
+                validator[section], level + 1)
+            if False == boolean:
+                return boolean, reason
+    return True, ''
+
 def validate_dict(to_validate, validator, level = 0):
     """validate a dictionarys structure
     """
@@ -0,0 +1,171 @@
+"""
+data_repository.py
+
+    process wide cache of the data files in the data repo used by the
+Preprocessor. Each file is read once per process, and any derived tables
+(cleaned up indexes, id lookups) are built once, so each Preprocessor only
+selects the rows it needs. Files are read again if they change on disk.
+
+    The tables returned are shared by every Preprocessor in the process, and
+should not be modified. Rows for a community are selected with get_rows,
+which uses a lookup of row positions by index label built once per table, so
+the whole table is not searched for each community. The selected rows are a
+new DataFrame that may be modified.
+"""
+import os
+from pandas import read_csv
+
+## (path, name, read_csv kwargs) -> ((mtime, size), table)
+_tables = {}
+
+## (path, name, read_csv kwargs) -> (table, index lookup)
+_lookups = {}
+
+def get_table (datafile, name = 'raw', build = None, **kwargs):
+    """get a table from a data file, reading the file and building the table
+    once per process
+
+    Parameters
+    ----------
+    datafile: path
+        csv file in the data repo
+    name: str, optional
+        name of the table, tables built from the same file with different
+    build functions need different names
+    build: function, optional
+        function to build the table from the DataFrame read from datafile,
+    if not provided the DataFrame is the table
+    **kwargs:
+        passed to pandas.read_csv
+
+    Returns
+    -------
+    object
+        the shared table
+    """
+    datafile = os.path.abspath(datafile)
+    stat = os.stat(datafile)
+    stamp = (stat.st_mtime, stat.st_size)
+    key = (datafile, name, tuple(sorted(kwargs.items())))
+    try:
+        cached_stamp, table = _tables[key]
+        if cached_stamp == stamp:
+            return table
+    except KeyError:
+        pass
+
+    if build is None:
+        table = read_csv(datafile, **kwargs)
+    else:
+        table = build(get_table(datafile, **kwargs))
+    _tables[key] = (stamp, table)
+    return table
+
+def get_rows (datafile, ids, name = 'raw', build = None, **kwargs):
+    """get the rows of a table with any of ids as their index label, like
+    get_table(...).ix[ids] with the rows for ids that are not in the table
+    left out
+
+    Parameters
+    ----------
+    datafile: path
+        csv file in the data repo
+    ids: list
+        index labels, rows are returned in the order of ids
+    name: str, optional
+        name of the table, see get_table
+    build: function, optional
+        function to build the table, see get_table
+    **kwargs:
+        passed to pandas.read_csv
+
+    Returns
+    -------
+    DataFrame
+        a copy of the selected rows, with no rows if none of ids are in
+    the table
+    """
+    table = get_table(datafile, name, build, **kwargs)
+    key = (os.path.abspath(datafile), name, tuple(sorted(kwargs.items())))
+    cached = _lookups.get(key, None)
+    if cached is None or not cached[0] is table:
+        ## new table, or the file changed
+        cached = (table, index_lookup(table))
+        _lookups[key] = cached
+    lookup = cached[1]
+
+    positions = []
+    for i in ids:
+        positions += lookup.get(i, [])
+    return table.iloc[positions].copy()
+
+def clear ():
+    """remove all cached tables
+    """
+    _tables.clear()
+    _lookups.clear()
+
+def first_part_index (data, sep = ','):
+    """set the index of a DataFrame to the part of each label before sep,
+    i.e. 'Adak, City of' -> 'Adak'
+
+    Parameters
+    ----------
+    data: DataFrame
+        data with string index
+    sep: str, optional
+        separator
+
+    Returns
+    -------
+    DataFrame
+        a copy of the data with the new index
+    """
+    data = data.copy()
+    data.index = [i.split(sep)[0] for i in data.index]
+    return data
+
+def id_lookup (data, columns):
+    """build a lookup of rows by any of their ids
+
+    Parameters
+    ----------
+    data: DataFrame
+        data, i.e. community_list.csv
+    columns: list
+        id columns, i.e. ['Community', 'GNIS', 'FIPS', 'Alias']
+
+    Returns
+    -------
+    dict
+        id -> sorted list of row positions with that id in any of columns
+    """
+    lookup = {}
+    for col in columns:
+        for pos, value in enumerate(data[col].values):
+            if value != value:
+                ## nan
+                continue
+            lookup.setdefault(value, set()).add(pos)
+    return dict([(k, sorted(lookup[k])) for k in lookup])
+
+def index_lookup (data):
+    """build a lookup of rows by index label
+
+    Parameters
+    ----------
+    data: DataFrame
+        data
+
+    Returns
+    -------
+    dict
+        index label -> list of row positions with that label
+    """
+    lookup = {}
+    for pos, label in enumerate(data.index):
+        if label != label:
+            ## nan
+            continue
+        lookup.setdefault(label, []).append(pos)
+    return lookup
@@ -3,89 +3,279 @@ diagnostics.py
 Ross Spicer
 
     module to track errors, warnings, and other diagnostic messages
+
+    Messages are kept in columns (time, module, type, text) rather than as a
+dictionary per message, module names and types are interned so each message
+only adds a reference to them, and messages below the minimum level of a
+Diagnostics object are dropped when they are added.
+
+    The diagnostics of many communities can be saved in one file, with
+save_bulk, and the diagnostics of any one community loaded from it, with
+load_bulk, without reading the rest of the file.
 """
 from pandas import DataFrame
 from datetime import datetime
+from array import array
+from cStringIO import StringIO
+import csv
+import os.path
+import time
+import yaml
+
+## severity of each type of message, messages of unknown types are always
+## kept
+SEVERITY = {'NOTE': 0, 'WARNING': 1, 'ERROR': 2}
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+## bulk diagnostics file, and its index, in a results directory
+BULK_FILE = 'runtime_diagnostics.csv'
+BULK_INDEX_FILE = 'runtime_diagnostics_index.yaml'
+BULK_COLUMNS = ['community', 'timestamp', 'module', 'type', 'text']
+
+## module names and message types, shared by all Diagnostics objects
+_names = {}
+
+def intern_name (name):
+    """
+    get the shared copy of a module name or message type
 
+    pre:
+        name: a module name or message type
+    post:
+        returns the shared copy of name
+    """
+    return _names.setdefault(name, name)
+
+def _encode (text):
+    """
+    encode text for the csv module
+    """
+    if isinstance(text, unicode):
+        return text.encode('utf-8')
+    return str(text)
 
 class Diagnostics (object):
     """
     this class keeps track of the errors and such for the model
     """
-    
-    def __init__ (self):
-        """ 
-        Class initialiser 
-        pre: none
-        post: 
-            self.messages will be an empty list 
-        """
-        self.messages = []
-        
+
+    def __init__ (self, level = 'NOTE'):
+        """
+        Class initialiser
+        pre:
+            level: (optional, default: 'NOTE') minimum type of message
+                ('NOTE', 'WARNING', or 'ERROR') to keep
+        post:
+            self.times, self.modules, self.types, and self.texts will be
+                empty
+        """
+        self.level = level
+        self.min_severity = SEVERITY[level]
+        self.times = array('d')
+        self.modules = []
+        self.types = []
+        self.texts = []
+
+    def __len__ (self):
+        """
+        number of messages
+        """
+        return len(self.texts)
+
+    def __setstate__ (self, state):
+        """
+        load pickled diagnostics, diagnostics pickled before messages were
+        kept in columns have a list of message dictionaries
+        """
+        if 'messages' in state:
+            messages = state.pop('messages')
+            self.__init__()
+            self.add_messages(messages)
+        self.__dict__.update(state)
+
     def add_message (self, module, type_code, text):
         """
         add a message to the message list
-        
-        pre: 
+
+        pre:
             module: is the name of the module where the message originated from
             type_code: what the type of message is
             text: the message
-        post: 
-            self.messages is appended to 
-        """
-        message = {}
-        message["timestamp"] = datetime.strftime(datetime.now(),
-                                                    "%Y-%m-%d %H:%M:%S") 
-        message["module"] = module 
-        message["type"] = type_code
-        message["text"] = text
-        self.messages.append(message)
-    
+        post:
+            the message is appended to the messages, if type_code is at or
+                above the minimum level
+        """
+        if SEVERITY.get(type_code, self.min_severity) < self.min_severity:
+            return
+        self.times.append(time.time())
+        self.modules.append(intern_name(module))
+        self.types.append(intern_name(type_code))
+        self.texts.append(text)
+
     def add_error (self, module, text):
         """
         add an error to the message list
         pre:
             module: is the component were error occurred
             text: the message
-        post: 
-            self.messages is appended to 
+        post:
+            the message is appended to the messages
         """
         self.add_message(module, "ERROR", text)
-       
+
     def add_warning (self, module, text):
         """
         add a warning to the message list
         pre:
             module: is the component were warning occurred
             text: the messege
-        post: 
-            self.messages is appended to 
+        post:
+            the message is appended to the messages, if warnings are kept
         """
         self.add_message(module, "WARNING", text)
-    
+
     def add_note (self, module, text):
         """
         add a Note to the message list
         pre:
             module: is the component were note occurred
             text: the messege
-        post: 
-            self.messages is appended to 
+        post:
+            the message is appended to the messages, if notes are kept
         """
         self.add_message(module, "NOTE", text)
-        
+
+    def add_messages (self, messages):
+        """
+        add message dictionaries, as returned by the messages property
+        pre:
+            messages: list of dictionaries with "timestamp" (formated with
+                TIMESTAMP_FORMAT), "module", "type", and "text"
+        post:
+            messages at or above the minimum level are appended
+        """
+        for message in messages:
+            if SEVERITY.get(message["type"], self.min_severity) < \
+                    self.min_severity:
+                continue
+            self.times.append(time.mktime(
+                time.strptime(message["timestamp"], TIMESTAMP_FORMAT)))
+            self.modules.append(intern_name(message["module"]))
+            self.types.append(intern_name(message["type"]))
+            self.texts.append(message["text"])
+
+    def extend (self, other):
+        """
+        add the messages from another Diagnostics object
+        pre:
+            other: Diagnostics
+        post:
+            messages from other at or above the minimum level are appended
+        """
+        for i in range(len(other)):
+            if SEVERITY.get(other.types[i], self.min_severity) < \
+                    self.min_severity:
+                continue
+            self.times.append(other.times[i])
+            self.modules.append(intern_name(other.modules[i]))
+            self.types.append(intern_name(other.types[i]))
+            self.texts.append(other.texts[i])
+
+    def get_timestamps (self):
+        """
+        get the time of each message as a string
+        pre:
+            none
+        post:
+            returns a list of timestamps formated with TIMESTAMP_FORMAT
+        """
+        ## messages are added in order, so the time is formatted once per
+        ## second rather than once per message
+        timestamps = []
+        last = None
+        for t in self.times:
+            second = int(t)
+            if second != last:
+                last = second
+                stamp = datetime.strftime(datetime.fromtimestamp(second),
+                                                        TIMESTAMP_FORMAT)
+            timestamps.append(stamp)
+        return timestamps
+
+    @property
+    def messages (self):
+        """
+        the messages as a list of dictionaries, with "timestamp", "module",
+        "type", and "text"
+        """
+        return [{"timestamp": s, "module": m, "type": t, "text": x} \
+            for s, m, t, x in zip(self.get_timestamps(), self.modules,
+                                                    self.types, self.texts)]
+
     def save_messages (self, file_path):
-        """ 
+        """
         save messages as csv file
         pre:
             none
         post:
             saved messages as csv file
         """
-        try:
-            df = DataFrame(self.messages).set_index("timestamp")
-            df[["module","type","text"]].to_csv(file_path)
-        except KeyError:
+        if len(self) == 0:
             fd = open(file_path, 'w')
             fd.write("No messages were generated...")
             fd.close()
+            return
+        df = DataFrame({"timestamp": self.get_timestamps(),
+                        "module": self.modules,
+                        "type": self.types,
+                        "text": self.texts}).set_index("timestamp")
+        df[["module","type","text"]].to_csv(file_path)
+
+def save_bulk (diagnostics, directory):
+    """
+    save the diagnostics of many communities in one file
+
+    pre:
+        diagnostics: iterable of (community name, Diagnostics)
+        directory: directory to save BULK_FILE and BULK_INDEX_FILE in
+    post:
+        BULK_FILE is saved, with a row for each message, and BULK_INDEX_FILE,
+            with the offset and length of the rows for each community
+    """
+    index = {}
+    with open(os.path.join(directory, BULK_FILE), 'wb') as fd:
+        writer = csv.writer(fd)
+        writer.writerow(BULK_COLUMNS)
+        for name, diag in diagnostics:
+            start = fd.tell()
+            name = _encode(name)
+            writer.writerows(zip([name] * len(diag), diag.get_timestamps(),
+                [_encode(m) for m in diag.modules],
+                [_encode(t) for t in diag.types],
+                [_encode(x) for x in diag.texts]))
+            index[name] = [start, fd.tell() - start]
+    with open(os.path.join(directory, BULK_INDEX_FILE), 'w') as fd:
+        yaml.dump(index, fd, default_flow_style = False)
+
+def load_bulk (directory, name):
+    """
+    load the diagnostics of a community saved with save_bulk
+
+    pre:
+        directory: directory with BULK_FILE and BULK_INDEX_FILE
+        name: community name
+    post:
+        returns the Diagnostics for the community, raises KeyError if
+            the community is not in the file
+    """
+    with open(os.path.join(directory, BULK_INDEX_FILE), 'r') as fd:
+        index = yaml.load(fd)
+    start, length = index[name]
+    with open(os.path.join(directory, BULK_FILE), 'rb') as fd:
+        fd.seek(start)
+        rows = csv.reader(StringIO(fd.read(length)))
+        diag = Diagnostics()
+        diag.add_messages([{"timestamp": r[1], "module": r[2],
+                            "type": r[3], "text": r[4]} for r in rows])
+    return diag
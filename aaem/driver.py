@@ -4,26 +4,32 @@ driver.py
     will run the model
 """
 from aaem import summaries, __version__, __download_url__
-from aaem.components import comp_lib, comp_order
-from community_data import CommunityData
+from aaem.components import comp_lib, comp_order, comp_packages
+from aaem.components import get_registry, get_run_order
+from community_data import CommunityData, GlobalConfig
 from forecast import Forecast
 from diagnostics import Diagnostics
+import diagnostics as diagnostics_lib
 from preprocessor import Preprocessor,  PreprocessorError
+from results_store import ResultsStore, pack_community, DIAGNOSTICS_BLOCK
+from run_manifest import RunManifest, run_key
+from profiler import Profiler
+import scenarios as scenario_lib
+import monte_carlo
+import sensitivity as sensitivity_lib
+import optimization as optimization_lib
 #~ import defaults
 
 import yaml
 import os.path
-from importlib import import_module
 from datetime import datetime
 import zipfile
 import shutil
-try:
-    import cPickle as pickle
-    #~ print "C Pickle"
-except ImportError:
-    import pickle
-    
-from pandas import read_csv
+import tempfile
+import copy
+from multiprocessing import Pool
+
+from pandas import read_csv, concat
 
 KEYS_FOR_GLOBAL = { 
     'community': [
@@ -163,12 +169,23 @@ class Driver (object):
             self.comp_lib: is a dictionary of components
             self.comp_order: list of the order of components to run
     """
-    def __init__ (self, model_root):
+    def __init__ (self, model_root, profile = False, diagnostics_level = None,
+        slim_results = False):
         """ 
         set up driver 
         
         input:
             model_root: path to model root <string>
+            profile: (optional, default: False) if true profile the 
+                communities run, see save_profile <bool>
+            diagnostics_level: (optional, default: None) if provided only 
+                diagnostic messages of this type ('NOTE', 'WARNING', or 
+                'ERROR') and above are kept, and the diagnostics are saved 
+                for all communities at once by save_bulk_diagnostics, 
+                instead of in a file for each community run <string>
+            slim_results: (optional, default: False) if true the binary 
+                results are stored as compact records of the summary values 
+                and yearly arrays, see results_store.slim_record <bool>
         
         output:
             none
@@ -183,8 +200,15 @@ class Driver (object):
             self.global_config: is the default global config directory
             self.comp_lib: is a dictionary of components
             self.comp_order: list of the order of components to run
+            self.registry: is the component registry
+            self.profiler: is the Profiler for runs
+            self.diagnostics_level: is the diagnostics level, or None
+            self.slim_results: results are stored as compact records
         """
         self.model_root = model_root
+        self.profiler = Profiler(profile)
+        self.diagnostics_level = diagnostics_level
+        self.slim_results = slim_results
         
         # default locations
         #~ self.config_dir = os.path.join(model_root, 'config')
@@ -196,14 +220,15 @@ class Driver (object):
                                             '__regional_multipliers.yaml')
                                             
         self.comp_lib = comp_lib
-        self.comp_order = comp_order
+        self.registry = get_registry()
+        self.comp_order = get_run_order()
         
     def get_prereqs(self, comp_name):
         """
         get the prerequisits for a component
         
         inputs:
-            comp_name: component name <string>
+            comp_name: component package name <string>
             
         outputs:
             returns list of prerequsite components
@@ -214,23 +239,14 @@ class Driver (object):
         postconditions:
             None
         """
-        try:
-            return self.preq_lib[comp_name]
-        except AttributeError:
-            self.preq_lib = {}
-        except KeyError:
-            pass
-            
-        self.preq_lib[comp_name] = \
-                    import_module("aaem.components." + comp_name).prereq_comps
-        return self.preq_lib[comp_name]
+        return self.registry[comp_packages[comp_name]].prereqs
     
     def get_component (self, comp_name):
         """
         get a component class
         
         inputs:
-            comp_name: component name <string>
+            comp_name: component package name <string>
             
         outputs:
             returns a component class
@@ -241,16 +257,31 @@ class Driver (object):
         postconditions:
             None
         """
+        return self.registry[comp_packages[comp_name]].component
+        
+    def get_global_config (self, global_config = None):
+        """
+        get a global config that is loaded once and shared between all
+        communities run by the driver
+        
+        inputs:
+            global_config: (optional) path to global config yaml file, or 
+                a GlobalConfig <string>
+        
+        outputs:
+            returns a GlobalConfig
+        """
+        if isinstance(global_config, GlobalConfig):
+            return global_config
         try:
-            return self.imported_comps[comp_name]
+            return self.global_configs[global_config]
         except AttributeError:
-            self.imported_comps = {}
+            self.global_configs = {}
         except KeyError:
             pass
-            
-        self.imported_comps[comp_name] = \
-                    import_module("aaem.components." + comp_name).component
-        return self.imported_comps[comp_name]
+        
+        self.global_configs[global_config] = GlobalConfig(global_config)
+        return self.global_configs[global_config]
         
     def setup_community (self, community_config, global_config, i_dir = None,
                           scalers = None):
@@ -279,7 +310,8 @@ class Driver (object):
         
         return cd, fc, diag
         
-    def run_components (self, cd, fc, diag, scalers):
+    def run_components (self, cd, fc, diag, scalers, name = None,
+        components = None, previous = None):
         """
         run enabled components
         
@@ -288,6 +320,13 @@ class Driver (object):
             fc: An initilized aaem.Forecast object <aaem.Forecast>
             diag: An initilized aaem.Diagnostis object <aaem.Diagnostics>
             cd, fc, and diag, should be for the same community
+            name: (optional) name of the community in the profile, if not 
+                provided the community data 'file id' is used <string>
+            components: (optional) components to run, the other components 
+                are taken from previous. Every component that depends on a 
+                component being run must also be run <list>
+            previous: (optional) a dictionary of excuted components for the 
+                same community, needed with components <dictionary>
         
         outputs:
             returns comps_used, a dictionary of excuted components
@@ -299,22 +338,31 @@ class Driver (object):
             none
             
         """
+        if name is None:
+            name = cd.get_item('community', 'file id')
+        measure = self.profiler.measure
         comps_used = {}
         for comp in self.comp_order:
+            if not components is None and not comp in components:
+                if comp in previous:
+                    comps_used[comp] = previous[comp]
+                continue
             if cd.get_item(comp, "enabled") == False:
                 continue
                 
             prereq = {}
-            pr_list = self.get_prereqs(self.comp_lib[comp])
+            info = self.registry[comp]
                 
-            for pr in pr_list:
+            for pr in info.prereqs:
                 prereq[pr] = comps_used[pr]
                 
-            CompClass = self.get_component(self.comp_lib[comp])
-            component = CompClass (cd, fc, diag, prereq)
-            component.run(scalers)
+            with measure(name, comp, '__init__'):
+                component = info.component(cd, fc, diag, prereq)
+            with measure(name, comp, 'run'):
+                component.run(scalers)
             ## faster to add this here than in each run func
-            component.calc_internal_rate_of_return()
+            with measure(name, comp, 'calc_internal_rate_of_return'):
+                component.calc_internal_rate_of_return()
             
             comps_used[comp] = component
         return comps_used
@@ -357,8 +405,11 @@ class Driver (object):
         except OSError:
             pass
             
-        summaries.community_forcast_summaries(
-            community, comps_used, forecast, directory)
+        profile_name = community if alt_name is None else alt_name
+        measure = self.profiler.measure
+        with measure(profile_name, 'forecast', 'save outputs'):
+            summaries.community_forcast_summaries(
+                community, comps_used, forecast, directory)
             
         directory = os.path.join(directory, "component_outputs/")
         #~ print directory
@@ -370,11 +421,12 @@ class Driver (object):
             
         for comp in comps_used:
             #~ continue
-            try:
-                comps_used[comp].save_csv_outputs(directory)
-                comps_used[comp].save_additional_output(directory)
-            except:
-                pass
+            with measure(profile_name, comp, 'save outputs'):
+                try:
+                    comps_used[comp].save_csv_outputs(directory)
+                    comps_used[comp].save_additional_output(directory)
+                except:
+                    pass
     
     def save_input_files (self, cd, community, tag = '', alt_name = None):
         """ 
@@ -409,6 +461,18 @@ class Driver (object):
             pass
         cd.save(os.path.join(directory,"config_used.yaml"))
     
+    def new_diagnostics (self):
+        """
+        get a diagnostics object for a community run
+        
+        outputs:
+            returns a Diagnostics, that keeps messages at or above 
+        self.diagnostics_level
+        """
+        if self.diagnostics_level is None:
+            return Diagnostics()
+        return Diagnostics(self.diagnostics_level)
+        
     def save_diagnostics (self, diag, community, tag = '', alt_name = None):
         """ 
         save the diagnostic
@@ -444,16 +508,53 @@ class Driver (object):
         diag.save_messages(os.path.join(directory, 
                     community.replace(" ","_") + "_runtime_diagnostics.csv"))
                     
+    def save_bulk_diagnostics (self, tag = ''):
+        """
+        save the diagnostics of every community in the results store in one 
+        file
+        
+        inputs:
+            tag: (optional) tag for results dir <string>
+            
+        outputs:
+            saves runtime_diagnostics.csv, and its index, in the results 
+        directory, see diagnostics.save_bulk
+        """
+        store = self.get_results_store(tag)
+        diagnostics_lib.save_bulk(
+            ((name, store.get(name, DIAGNOSTICS_BLOCK)) \
+                for name in store.keys()),
+            store.directory
+        )
+        
+    def save_community_diagnostics (self, name, tag = ''):
+        """
+        save the <name>_runtime_diagnostics.csv file for a community from 
+        the file saved by save_bulk_diagnostics
+        
+        inputs:
+            name: name the community results are stored under <string>
+            tag: (optional) tag for results dir <string>
+            
+        outputs:
+            saves the diagnostics in the communities results directory
+        """
+        directory = self.get_results_store(tag).directory
+        diag = diagnostics_lib.load_bulk(directory, name)
+        self.save_diagnostics(diag, name, tag)
+        
     def store_results (self, comps_used, tag = '',
         overwrite = False, name = None):
         """
-        store results in binary pickle file
+        store results in the binary results store
         
         inputs:
             comps_used: a dictionary of excuted components <dictionary>
             tag: (optional) tag for results dir <string>
             overwrite: (optional, default: False) if true overwrite the 
-                .pkl file <bool>
+                existing results <bool>
+            name: (optional) key to store results under, if not provided the
+                community data 'file id' is used <string>
             
         outputs:
             saves binary output
@@ -464,26 +565,70 @@ class Driver (object):
         postconditions:
             None
         """
+        self.store_packed_results(
+            self.pack_results(comps_used, name), tag, overwrite)
+        
+    def pack_results (self, comps_used, name = None):
+        """
+        pickle a results record the way it is stored in the binary 
+        results store
+        
+        inputs:
+            comps_used: a dictionary of excuted components <dictionary>
+            name: (optional) key to store results under, if not provided the
+                community data 'file id' is used <string>
+            
+        outputs:
+            returns the packed record, see results_store.pack_community
+        """
+        profile_name = name
+        if profile_name is None:
+            profile_name = \
+                comps_used['community data'].get_item('community', 'file id')
+        with self.profiler.measure(profile_name, 'results', 'pack'):
+            return pack_community(comps_used, name, self.slim_results)
+        
+    def store_packed_results (self, packed, tag = '', overwrite = False,
+        replace = False):
+        """
+        write a record created by pack_results to the binary results store
+        
+        inputs:
+            packed: a packed results record
+            tag: (optional) tag for results dir <string>
+            overwrite: (optional, default: False) if true overwrite the 
+                existing results <bool>
+            replace: (optional, default: False) if true replace results 
+                stored under the same name <bool>
+            
+        outputs:
+            saves binary output
+            returns the name the results are stored under
+        """
+        store = self.get_results_store(tag)
+        if overwrite:
+            store.clear()
+        return store.add_packed(packed, replace)
+        
+    def get_results_store (self, tag = ''):
+        """
+        get the binary results store for a results directory
+        
+        inputs:
+            tag: (optional) tag for results dir <string>
+            
+        outputs:
+            returns a ResultsStore
+        """
         if tag != '':
             tag = '_' + tag
         directory = os.path.join(self.model_root, 'results' + tag)
-        
-        if name == None:
-            name = comps_used['community data'].get_item('community', 'file id')
-
-        picklename = os.path.join(directory,'binary_results.pkl')
-        if overwrite:
-            mode = 'rb'
-        else:
-            mode = 'ab'
-        #~ print picklename
-        with open(picklename, mode) as pkl:
-            pickle.dump([name, comps_used], pkl, pickle.HIGHEST_PROTOCOL)
+        return ResultsStore(directory)
              
     def load_results (self, tag = ''):
         """
-            load a set of binary results from a piclkle file in the results 
-        directory
+            load a set of binary results from the results store in the 
+        results directory
         
         inputs:
             tag: (optional) tag for results dir <string>
@@ -497,29 +642,44 @@ class Driver (object):
         postconditions:
             None
         """
-        if tag != '':
-            tag = '_' + tag
-        directory = os.path.join(self.model_root, 'results' + tag)
+        return self.load_results_store(tag).load_all()
+        
+    def load_results_store (self, tag = ''):
+        """
+            get the binary results store for a results directory, raising
+        an IOError if there are no results stored
+        
+        inputs:
+            tag: (optional) tag for results dir <string>
+            
+        outputs:
+            returns a ResultsStore with results
+        """
+        store = self.get_results_store(tag)
         try:
-            os.makedirs(os.path.join(directory))
+            os.makedirs(store.directory)
         except OSError:
             pass
-        results = {}
-        picklename = os.path.join(directory,'binary_results.pkl')
-        with open(picklename, 'rb') as pkl:
-            while True:
-                try:
-                    temp = pickle.load(pkl)
-                    key = temp[0]
-                    i = 0
-                    while key in results.keys():
-                        key = key.split(' #')[0] + ' #' + str(i)
-                        i += 1
-                    
-                    results[key] = temp[1]
-                except:
-                    break
-        return results
+        if not store.exists():
+            raise IOError, "No results stored in " + store.directory
+        return store
+        
+    def load_result (self, name, component = None, tag = ''):
+        """
+            load the binary results for one community, or one of its 
+        components, without loading the rest of the results
+        
+        inputs:
+            name: name of community/project results are stored as <string>
+            component: (optional) component, 'community data', or 'forecast'
+                to load <string>
+            tag: (optional) tag for results dir <string>
+            
+        outputs:
+            returns a dictionary of the components for the community, or the 
+        component
+        """
+        return self.load_results_store(tag).get(name, component)
         
     def run (self, community_config, global_config = None, 
         tag = '', scalers = None, alt_save_name = None):
@@ -543,40 +703,59 @@ class Driver (object):
         postconditions:
             None
         """
+        comps_used = self.run_community(
+            community_config, global_config, tag, scalers, alt_save_name
+        )
+    
+        #~ print name 
+        #~ print 'rb', alt_save_name
+        self.store_results(comps_used, tag, name=alt_save_name)
+        
+    def run_community (self, community_config, global_config = None, 
+        tag = '', scalers = None, alt_save_name = None):
+        """
+        run the model for a community and save its output files, without 
+        storing the binary results
+        
+        inputs:
+            see run
+            
+        outputs:
+            the model is run for a community/project/assigned 'name', and 
+        the csv, config and diagnostic files are saved. 
+            returns comps_used, a dictionary of excuted components including 
+        the 'community data' and 'forecast'
+        """
         #~ print community_config
       
         if scalers is None:
             scalers = default_scalers
         
-        #~ if name is None:
-            #~ name = community
-        
-        temp = tag
-        #~ if img_dir is None:
-            #~ if temp != '':
-                #~ temp = '_' + tag
-            #~ img_dir = os.path.join(self.model_root, 'results' + temp, 'plots')
-        
         #~ cd, fc, diag = self.setup_community(community, i_dir, c_config, 
                                                     #~ g_config, c_mult, scalers)
                                                     
-        diagnostics = Diagnostics()
-        community_data = CommunityData( 
-            community_config, 
-            global_config, 
-            diagnostics,
-            scalers
-        )
+        measure = self.profiler.measure
+        profile_name = get_profile_name(community_config, alt_save_name)
+        diagnostics = self.new_diagnostics()
+        with measure(profile_name, 'community data', '__init__'):
+            community_data = CommunityData( 
+                community_config, 
+                self.get_global_config(global_config), 
+                diagnostics,
+                scalers
+            )
         name = community_data.get_item('community', 'file id')
         #~ print name
-        forecast = Forecast(community_data, diagnostics, scalers)
+        with measure(profile_name, 'forecast', '__init__'):
+            forecast = Forecast(community_data, diagnostics, scalers)
                                                     
         
         comps_used = self.run_components(
             community_data,
             forecast,
             diagnostics,
-            scalers
+            scalers,
+            profile_name
         )
         
         
@@ -585,39 +764,675 @@ class Driver (object):
         self.save_components_output(comps_used, name, forecast, tag, 
             alt_name=alt_save_name)
         #~ self.save_forecast_output(forecast, name, img_dir, plot, tag)
-        self.save_input_files(community_data, name, tag, alt_name=alt_save_name)
-        self.save_diagnostics(diagnostics, name, tag, alt_name=alt_save_name) 
+        with measure(profile_name, 'community data', 'save inputs'):
+            self.save_input_files(community_data, name, tag, 
+                alt_name=alt_save_name)
+        if self.diagnostics_level is None:
+            with measure(profile_name, 'diagnostics', 'save outputs'):
+                self.save_diagnostics(diagnostics, name, tag, 
+                    alt_name=alt_save_name) 
 
         
         comps_used['community data'] = community_data
         comps_used['forecast'] = forecast
+        return comps_used
+        
+    def run_scenarios (self, community_config, scenarios,
+        global_config = None, tag = '', alt_save_name = None):
+        """
+        run the model for a community for many scenarios, and save the
+        financial results of each component for each scenario. The
+        components are run once for each distinct set of 'diesel price',
+        'diesel price adder', and 'kWh consumption' scalers, and the
+        'capital costs' scalers are evaluated together for each run.
+
+        inputs:
+            community_config: path to community config yaml file <string>
+            scenarios: list of dictionaries of scalers, missing scalers
+                use the default_scalers <list>
+            global_config: (optional) alternate global confing
+                file <string>
+            tag: (optional) tag for results dir <string>
+            alt_save_name: (optional) name to save results under <string>
+
+        outputs:
+            saves <name>_scenarios.csv in the communities results directory
+            returns the scenario results as a DataFrame
+            
+        raises:
+            ValueError: if there are no scenarios
+        """
+        if len(scenarios) == 0:
+            raise ValueError, \
+                "No scenarios to run for " + str(community_config)
+        scenarios = [scenario_lib.fill_scalers(s, default_scalers) \
+            for s in scenarios]
+        global_config = self.get_global_config(global_config)
+
+        rows = []
+        for run_scalers, indices in scenario_lib.group_scenarios(scenarios):
+            scalers = dict(run_scalers)
+            scalers['capital costs'] = 1.0
+            diagnostics = self.new_diagnostics()
+            community_data = CommunityData(
+                community_config,
+                global_config,
+                diagnostics,
+                scalers
+            )
+            forecast = Forecast(community_data, diagnostics, scalers)
+            comps_used = self.run_components(
+                community_data,
+                forecast,
+                diagnostics,
+                scalers
+            )
+            rows += scenario_lib.evaluate_group(
+                comps_used, self.comp_order, scenarios, indices
+            )
+        name = community_data.get_item('community', 'file id')
+        table = scenario_lib.scenarios_to_dataframe(rows, self.comp_order)
+
+        if tag != '':
+            tag = '_' + tag
+        if alt_save_name is None:
+            save_name = name.replace(' ','_')
+        else:
+            save_name = alt_save_name.replace(' ','_')
+        directory = os.path.join(self.model_root, 'results' + tag, save_name)
+        try:
+            os.makedirs(directory)
+        except OSError:
+            pass
+        table.to_csv(os.path.join(directory, save_name + '_scenarios.csv'))
+        return table
+
+    def run_monte_carlo (self, community_config, settings,
+        global_config = None, tag = '', alt_save_name = None, jobs = 1):
+        """
+        run the model for a community for many samples of its scalers, and 
+        selected config values, drawn from distributions, and save 
+        statistics of the financial results of each component. See 
+        aaem.monte_carlo. 
+
+        inputs:
+            community_config: path to community config yaml file <string>
+            settings: Monte Carlo settings, see aaem.monte_carlo <dict>
+            global_config: (optional) alternate global confing
+                file <string>
+            tag: (optional) tag for results dir <string>
+            alt_save_name: (optional) name to save results under <string>
+            jobs: (optional, default: 1) number of worker processes to run 
+                the groups of samples in <int>
+
+        outputs:
+            saves <name>_monte_carlo.csv in the communities results directory
+            returns the statistics as a DataFrame
+        """
+        inputs, run_samples, capital_scalers = \
+            monte_carlo.draw_samples(settings, default_scalers)
+        groups = monte_carlo.group_samples(run_samples)
+        work = [(self.model_root, community_config, global_config, inputs,
+                run_values, capital_scalers[indices]) \
+            for run_values, indices in groups]
+
+        statistics = monte_carlo.MonteCarloStatistics(self.comp_order,
+            monte_carlo.get_levels(settings))
+        if jobs <= 1:
+            for w in work:
+                statistics.add(self.run_sample_group(*w[1:]))
+        else:
+            pool = Pool(min(jobs, max(len(work), 1)))
+            try:
+                for results in pool.imap_unordered(_monte_carlo_worker, work):
+                    statistics.add(results)
+            finally:
+                pool.terminate()
+                pool.join()
+        table = statistics.to_dataframe()
+
+        if alt_save_name is None:
+            save_name = get_profile_name(community_config)
+        else:
+            save_name = alt_save_name
+        save_name = save_name.replace(' ','_')
+        if tag != '':
+            tag = '_' + tag
+        directory = os.path.join(self.model_root, 'results' + tag, save_name)
+        try:
+            os.makedirs(directory)
+        except OSError:
+            pass
+        table.to_csv(os.path.join(directory, save_name + '_monte_carlo.csv'),
+            index = False)
+        return table
+
+    def run_sample_group (self, community_config, global_config, inputs,
+        run_values, capital_scalers):
+        """
+        run the components for a group of Monte Carlo samples, that share 
+        the inputs that need a run of the components, and evaluate the 
+        capital costs scalers of the samples
+
+        inputs:
+            community_config: path to community config yaml file <string>
+            global_config: alternate global confing file, or None <string>
+            inputs: run inputs from aaem.monte_carlo.draw_samples <list>
+            run_values: value of each run input for the group <tuple>
+            capital_scalers: capital costs scaler of each sample <np.array>
+
+        outputs:
+            returns the results of aaem.monte_carlo.evaluate_group
+        """
+        scalers, config = monte_carlo.get_run_inputs(inputs, run_values,
+            default_scalers)
+        diagnostics = self.new_diagnostics()
+        community_data = CommunityData(
+            community_config,
+            self.get_global_config(global_config),
+            diagnostics,
+            scalers
+        )
+        for section, key, value in config:
+            community_data.set_item(section, key, value)
+        forecast = Forecast(community_data, diagnostics, scalers)
+        comps_used = self.run_components(
+            community_data,
+            forecast,
+            diagnostics,
+            scalers
+        )
+        return monte_carlo.evaluate_group(comps_used, self.comp_order,
+            capital_scalers)
+
+    def run_sensitivity (self, community_config, settings = None,
+        global_config = None, tag = '', alt_save_name = None):
+        """
+        run a sensitivity (tornado) analysis for a community, and save the 
+        swing in the financial results of each component from changing 
+        each input down and up. The community data and forecast are loaded 
+        once, each change starts from a copy of the community data inputs, 
+        and a change to a component input only re-runs the component and 
+        the components that depend on it. See aaem.sensitivity. 
+
+        inputs:
+            community_config: path to community config yaml file <string>
+            settings: (optional) sensitivity settings, see 
+                aaem.sensitivity <dict>
+            global_config: (optional) alternate global confing
+                file <string>
+            tag: (optional) tag for results dir <string>
+            alt_save_name: (optional) name to save results under <string>
+
+        outputs:
+            saves <name>_sensitivity.csv in the communities results directory
+            returns the sensitivity results as a DataFrame
+        """
+        if settings is None:
+            settings = {}
+        scalers = default_scalers
+        diagnostics = self.new_diagnostics()
+        community_data = CommunityData(
+            community_config,
+            self.get_global_config(global_config),
+            diagnostics,
+            scalers
+        )
+        forecast = Forecast(community_data, diagnostics, scalers)
+        ## components fill estimates in to their sections of the community 
+        ## data (i.e. the Non-residential building inventory), so every run 
+        ## starts from a copy of the inputs
+        inputs = copy.deepcopy(community_data.data)
+        base = self.run_components(community_data, forecast, diagnostics,
+            scalers)
+        community_data.data = copy.deepcopy(inputs)
+        enabled = [c for c in self.comp_order if c in base]
+        base_results = sensitivity_lib.get_results(base, enabled)
+        
+        components = settings.get('components', None) or enabled
+        changes = sensitivity_lib.find_inputs(community_data,
+            [c for c in components if c in enabled], self.registry, settings)
+        rows = []
+        for section, key in changes:
+            if section == 'community':
+                rerun = enabled
+            else:
+                rerun = sensitivity_lib.get_dependents(self.registry, 
+                    self.comp_order, section)
+            amount = sensitivity_lib.get_amount(key, settings)
+            if section == 'community' and key == 'diesel prices':
+                base_value = 1.0
+            else:
+                base_value = inputs[section][key]
+            values = []
+            results = []
+            for factor in [1.0 - amount, 1.0 + amount]:
+                community_data.data = copy.deepcopy(inputs)
+                value = sensitivity_lib.change_input(
+                    community_data, section, key, factor)[0]
+                comps_used = self.run_components(community_data, 
+                    forecast, diagnostics, scalers, 
+                    components = rerun, previous = base)
+                values.append(value)
+                results.append(sensitivity_lib.get_results(comps_used, 
+                    [c for c in rerun if c in enabled]))
+            for comp, metric in results[0]:
+                low = results[0][comp, metric]
+                high = results[1][comp, metric]
+                rows.append({
+                    'component': comp, 'metric': metric, 
+                    'section': section, 'input': key, 
+                    'base value': base_value, 
+                    'low value': values[0], 'high value': values[1],
+                    'base result': base_results[comp, metric], 
+                    'low result': low, 'high result': high,
+                    'swing': abs(high - low),
+                })
+        table = sensitivity_lib.to_dataframe(rows, self.comp_order)
+        
+        save_name = get_profile_name(community_config, alt_save_name)
+        save_name = save_name.replace(' ','_')
+        if tag != '':
+            tag = '_' + tag
+        directory = os.path.join(self.model_root, 'results' + tag, save_name)
+        try:
+            os.makedirs(directory)
+        except OSError:
+            pass
+        table.to_csv(os.path.join(directory, save_name + '_sensitivity.csv'),
+            index = False)
+        return table
+
+    def run_sensitivity_parallel (self, runs, jobs):
+        """
+        run sensitivity analyses for many communities in a pool of worker 
+        processes
+        
+        inputs:
+            runs: list of dictionaries of keyword arguments for 
+                run_sensitivity <list>
+            jobs: number of worker processes <int>
+            
+        outputs:
+            yields (run, table, error) for each item in runs, in order. table 
+        is the DataFrame from run_sensitivity, or None, and error is None, or 
+        the RuntimeError/IOError that stoped the community from running.
+        """
+        if jobs <= 1:
+            for run in runs:
+                try:
+                    yield run, self.run_sensitivity(**run), None
+                except (RuntimeError, IOError) as e:
+                    yield run, None, e
+            return
+            
+        pool = Pool(min(jobs, max(len(runs), 1)))
+        try:
+            work = [(self.model_root, run) for run in runs]
+            for run, (table, error) in \
+                    zip(runs, pool.imap(_sensitivity_worker, work)):
+                yield run, table, error
+        finally:
+            pool.terminate()
+            pool.join()
+    
+    def save_sensitivity_summary (self, tables, tag = ''):
+        """
+        save the sensitivity results of many communities in one table
+        
+        inputs:
+            tables: dictionary of community/project name -> DataFrame from 
+                run_sensitivity <dict>
+            tag: (optional) tag for results dir <string>
         
+        outputs:
+            saves sensitivity_summary.csv in the results directory
+        """
+        if tag != '':
+            tag = '_' + tag
+        directory = os.path.join(self.model_root, 'results' + tag)
+        try:
+            os.makedirs(directory)
+        except OSError:
+            pass
+        rows = []
+        for name in sorted(tables):
+            table = tables[name].copy()
+            table.insert(0, 'community', name)
+            rows.append(table)
+        if len(rows) == 0:
+            return
+        concat(rows).to_csv(
+            os.path.join(directory, 'sensitivity_summary.csv'), index = False)
+
+    def run_optimization (self, community_config, settings = None,
+        global_config = None, tag = '', alt_save_name = None):
+        """
+        run a sizing optimization for the Wind Power, Solar Power, and 
+        Hydropower projects of a community, and save the net present value 
+        curve of each sizing input and its optimum. The community data, 
+        forecast, and prerequisite components are loaded or run once, and 
+        only the sized component is re-run for each size. See 
+        aaem.optimization. 
+
+        inputs:
+            community_config: path to community config yaml file <string>
+            settings: (optional) optimization settings, see 
+                aaem.optimization <dict>
+            global_config: (optional) alternate global confing
+                file <string>
+            tag: (optional) tag for results dir <string>
+            alt_save_name: (optional) name to save results under <string>
+
+        outputs:
+            saves <name>_optimization.csv in the communities results directory
+            returns the optimization results as a DataFrame
+        """
+        if settings is None:
+            settings = {}
+        scalers = default_scalers
+        diagnostics = self.new_diagnostics()
+        community_data = CommunityData(
+            community_config,
+            self.get_global_config(global_config),
+            diagnostics,
+            scalers
+        )
+        forecast = Forecast(community_data, diagnostics, scalers)
+        base = self.run_components(community_data, forecast, diagnostics,
+            scalers)
+        
+        components = settings.get('components', None) or \
+            optimization_lib.SIZING_INPUTS.keys()
+        rows = []
+        for comp in [c for c in self.comp_order if c in components]:
+            if not comp in base or not comp in optimization_lib.SIZING_INPUTS:
+                continue
+            for key in optimization_lib.SIZING_INPUTS[comp]:
+                sizes = optimization_lib.get_sizes(community_data, forecast,
+                    comp, key, settings)
+                for value in sizes:
+                    originals = optimization_lib.change_size(community_data,
+                        comp, key, value)
+                    try:
+                        comps_used = self.run_components(community_data, 
+                            forecast, diagnostics, scalers, 
+                            components = [comp], previous = base)
+                    finally:
+                        sensitivity_lib.restore_inputs(community_data, 
+                            originals)
+                    row = optimization_lib.get_result(comps_used.get(comp),
+                        comp)
+                    row.update({'component': comp, 'input': key, 
+                        'value': value})
+                    rows.append(row)
+        optimization_lib.find_optimum(rows, 
+            settings.get('minimum benefit cost ratio', None))
+        table = optimization_lib.to_dataframe(rows, self.comp_order)
+        
+        save_name = get_profile_name(community_config, alt_save_name)
+        save_name = save_name.replace(' ','_')
+        if tag != '':
+            tag = '_' + tag
+        directory = os.path.join(self.model_root, 'results' + tag, save_name)
+        try:
+            os.makedirs(directory)
+        except OSError:
+            pass
+        table.to_csv(os.path.join(directory, save_name + '_optimization.csv'),
+            index = False)
+        return table
+
+    def run_optimization_parallel (self, runs, jobs):
+        """
+        run sizing optimizations for many communities in a pool of worker 
+        processes
+        
+        inputs:
+            runs: list of dictionaries of keyword arguments for 
+                run_optimization <list>
+            jobs: number of worker processes <int>
+            
+        outputs:
+            yields (run, table, error) for each item in runs, in order. table 
+        is the DataFrame from run_optimization, or None, and error is None, or 
+        the RuntimeError/IOError that stoped the community from running.
+        """
+        if jobs <= 1:
+            for run in runs:
+                try:
+                    yield run, self.run_optimization(**run), None
+                except (RuntimeError, IOError) as e:
+                    yield run, None, e
+            return
+            
+        pool = Pool(min(jobs, max(len(runs), 1)))
+        try:
+            work = [(self.model_root, run) for run in runs]
+            for run, (table, error) in \
+                    zip(runs, pool.imap(_optimization_worker, work)):
+                yield run, table, error
+        finally:
+            pool.terminate()
+            pool.join()
     
-        #~ print name 
-        #~ print 'rb', alt_save_name
-        self.store_results(comps_used, tag, name=alt_save_name)
+    def save_optimization_summary (self, tables, tag = ''):
+        """
+        save the optimum sizes of many communities in one table
+        
+        inputs:
+            tables: dictionary of community/project name -> DataFrame from 
+                run_optimization <dict>
+            tag: (optional) tag for results dir <string>
+        
+        outputs:
+            saves optimization_summary.csv in the results directory
+        """
+        if tag != '':
+            tag = '_' + tag
+        directory = os.path.join(self.model_root, 'results' + tag)
+        try:
+            os.makedirs(directory)
+        except OSError:
+            pass
+        rows = []
+        for name in sorted(tables):
+            table = tables[name][tables[name]['optimum'] == True].copy()
+            del table['optimum']
+            table.insert(0, 'community', name)
+            rows.append(table)
+        if len(rows) == 0:
+            return
+        concat(rows).to_csv(
+            os.path.join(directory, 'optimization_summary.csv'), index = False)
+
+    def run_parallel (self, runs, jobs, manifest = None):
+        """
+            run the model for many communities in a pool of worker processes.
+        Each worker runs a community and saves its output files, and the 
+        binary results are written here, one community at a time, in the 
+        order of runs, so the results match a serial run.
+        
+        inputs:
+            runs: list of dictionaries of keyword arguments for run <list>
+            jobs: number of worker processes <int>
+            manifest: (optional) a RunManifest, if provided stored results 
+                with the same name are replaced, and each run is recorded 
+                in it <RunManifest>
+            
+        outputs:
+            yields (run, error) for each item in runs, in order, after its 
+        results are stored. error is None, or the RuntimeError/IOError 
+        that stoped the community from running.
+        """
+        replace = not manifest is None
+        
+        def store (run, packed):
+            try:
+                tag = run['tag']
+            except KeyError:
+                tag = ''
+            name = self.store_packed_results(packed, tag, replace = replace)
+            if replace:
+                manifest.record(run, name)
+        
+        if jobs <= 1:
+            for run in runs:
+                try:
+                    comps_used = self.run_community(**run)
+                    try:
+                        name = run['alt_save_name']
+                    except KeyError:
+                        name = None
+                    store(run, self.pack_results(comps_used, name))
+                    yield run, None
+                except (RuntimeError, IOError) as e:
+                    yield run, e
+            return
+            
+        pool = Pool(min(jobs, max(len(runs), 1)))
+        try:
+            options = (self.profiler.enabled, self.diagnostics_level,
+                self.slim_results)
+            work = [(self.model_root, run, options) for run in runs]
+            for run, (packed, error, records) in \
+                    zip(runs, pool.imap(_run_worker, work)):
+                self.profiler.add_records(records)
+                if error is None:
+                    store(run, packed)
+                yield run, error
+        finally:
+            pool.terminate()
+            pool.join()
+            
+    def get_run_manifest (self, tag = ''):
+        """
+        get the run manifest for a results directory
+        
+        inputs:
+            tag: (optional) tag for results dir <string>
+            
+        outputs:
+            returns a RunManifest
+        """
+        if tag != '':
+            tag = '_' + tag
+        directory = os.path.join(self.model_root, 'results' + tag)
+        return RunManifest(directory)
+        
+    def remove_stale_results (self, runs, tag = ''):
+        """
+        remove the stored results of runs recorded in the run manifest that 
+        are not in runs
+        
+        inputs:
+            runs: list of dictionaries of keyword arguments for run <list>
+            tag: (optional) tag for results dir <string>
+            
+        outputs:
+            returns the list of names of the removed results
+        """
+        manifest = self.get_run_manifest(tag)
+        store = self.get_results_store(tag)
+        keys = set([run_key(run) for run in runs])
+        removed = []
+        for key in manifest.keys():
+            if key in keys:
+                continue
+            name = manifest.get_name(key)
+            if name in store.keys():
+                store.remove(name)
+            manifest.remove(key)
+            removed.append(name)
+        return removed
+        
+    def run_incremental (self, runs, jobs, tag = ''):
+        """
+            run the model for the communities in runs whose inputs changed 
+        since they were last run in the results directory, and reuse the 
+        stored results for the rest. The inputs of each run are recorded in 
+        the results directories run manifest.
+        
+        inputs:
+            runs: list of dictionaries of keyword arguments for run, all with 
+                the same tag <list>
+            jobs: number of worker processes <int>
+            tag: (optional) tag for results dir <string>
+            
+        outputs:
+            yields (run, error, ran) for each item in runs, in order. error is
+        as in run_parallel, and ran is False if the stored results were 
+        reused. The replaced results are left in the results store until 
+        it is compacted, see compact_results
+        """
+        manifest = self.get_run_manifest(tag)
+        stored = set(self.get_results_store(tag).keys())
+        to_run = [not (manifest.is_current(run) and \
+            manifest.get_name(run_key(run)) in stored) for run in runs]
+        
+        results = self.run_parallel(
+            [run for run, r in zip(runs, to_run) if r], jobs, manifest
+        )
+        for run, r in zip(runs, to_run):
+            if r:
+                yield results.next() + (True,)
+            else:
+                yield run, None, False
+        
+    def compact_results (self, tag = ''):
+        """
+        rewrite the binary results store without the results replaced or 
+        removed by an incremental run, if there are any
+        
+        inputs:
+            tag: (optional) tag for results dir <string>
+            
+        outputs:
+            returns True if the results store was rewritten
+        """
+        return self.get_results_store(tag).compact()
+        
+    def get_stored_names (self, runs, tag = ''):
+        """
+        get the names the results of runs are stored under, as recorded in 
+        the run manifest
+        
+        inputs:
+            runs: list of dictionaries of keyword arguments for run <list>
+            tag: (optional) tag for results dir <string>
+            
+        outputs:
+            returns a list of names, for the runs that are recorded
+        """
+        manifest = self.get_run_manifest(tag)
+        keys = set(manifest.keys())
+        return [manifest.get_name(run_key(run)) for run in runs \
+            if run_key(run) in keys]
         
-    def run_many (self, directory):
+    def run_many (self, directory, jobs = 1):
         """
         run a list of communities using default options
         
         inputs:
             communities: a list of communities <list>
+            jobs: (optional, default: 1) number of worker processes <int>
         """
         
         communities = \
             [f for f in os.listdir( directory ) \
             if f.endswith('.yaml') or f.endswith('.yml')]
-        for c in communities:
-            try:
-                self.run(os.path.join(directory,c))
-            except (RuntimeError, IOError) as e:
-                print '------------------------'
-                print e
-                msg = "RUN ERROR: "+ c + \
-                                    " not a configured community/project"
-                print msg
-                print '------------------------'
+        runs = [{'community_config': os.path.join(directory,c)} \
+                for c in communities]
+        for run, e in self.run_parallel(runs, jobs):
+            if e is None:
+                continue
+            c = os.path.split(run['community_config'])[1]
+            print '------------------------'
+            print e
+            msg = "RUN ERROR: "+ c + \
+                                " not a configured community/project"
+            print msg
+            print '------------------------'
             
     def run_script(self):
         """
@@ -658,13 +1473,17 @@ class Driver (object):
                        "Date Run: " + ts + '\n' ))
 
             
-    def save_summaries (self, tag = ''):
+    def save_summaries (self, tag = '', changed = None):
         """
             save the summaries for the communities in a results directories 
-        binary results file
+        binary results file, streaming the results from the results store
         
         inputs:
             tag: (optional) tag for results dir <string>
+            changed: (optional) names of the results added, replaced, or 
+                removed by an incremental run, if provided only the summaries
+                fed by them are saved, see summaries.save_summaries_incremental
+                <list>
             
         outputs:
             sumamry files are saved
@@ -675,8 +1494,7 @@ class Driver (object):
         postconditions:
             None
         """
-        res = self.load_results(tag)
-        #~ print res
+        store = self.load_results_store(tag)
         if tag != '':
             tag = '_' + tag
         directory = os.path.join(self.model_root, 'results' + tag)
@@ -684,17 +1502,169 @@ class Driver (object):
             os.makedirs(os.path.join(directory))
         except OSError:
             pass
-        summaries.village_log(res,directory)
-        summaries.building_log(res,directory)
-        summaries.fuel_oil_log(res,directory)
-        summaries.forecast_comparison_log(res,directory)
-        summaries.electric_price_summary(res,directory)
-        summaries.call_comp_summaries(res,directory)
+        ## the summaries are made in one pass over the results, without
+        ## loading the results of every community at once
+        with self.profiler.measure('all communities', 
+                'summaries', 'save outputs'):
+            if changed is None:
+                summaries.save_summaries(store.iteritems(), directory)
+            else:
+                summaries.save_summaries_incremental(store, changed, 
+                    directory)
+        
+    def save_profile (self, tag = ''):
+        """
+        save the profile of the communities run, if profiling is enabled
+        
+        inputs:
+            tag: (optional) tag for results dir <string>
+            
+        outputs:
+            saves profile.csv, with the time and memory used by each step, 
+        and profile_summary.csv, with the totals per community and per 
+        component, in the results directory
+        """
+        if not self.profiler.enabled:
+            return
+        if tag != '':
+            tag = '_' + tag
+        self.profiler.save(os.path.join(self.model_root, 'results' + tag))
         
         
     
 
 
+## drivers used by _run_worker in a worker process, by model root and 
+## driver options
+_worker_drivers = {}
+
+def get_profile_name (community_config, alt_save_name = None):
+    """
+    get the name to use for a community in the profile, before its 
+    community data is loaded
+    
+    inputs:
+        community_config: path to community config file, or config <string>
+        alt_save_name: (optional) name results are saved under <string>
+        
+    outputs:
+        returns alt_save_name, or the config file name without the extension
+    """
+    if not alt_save_name is None:
+        return alt_save_name
+    try:
+        return os.path.splitext(os.path.split(community_config)[1])[0]
+    except AttributeError:
+        return community_config['community']['file id']
+
+def _run_worker (work):
+    """
+    run a community in a worker process for Driver.run_parallel
+    
+    inputs:
+        work: (model_root, run, options), where run is a dictionary of 
+            keyword arguments for Driver.run, and options are the profile,
+            diagnostics_level, and slim_results arguments for the Driver 
+            <tuple>
+            
+    outputs:
+        returns (packed, error, profile records), packed is the pickled 
+    results record or None, and error is None or the RuntimeError/IOError 
+    raised by the run
+    """
+    model_root, run, options = work
+    try:
+        worker_driver = _worker_drivers[model_root, options]
+    except KeyError:
+        ## one driver per worker process, so the global config is shared
+        worker_driver = Driver(model_root, *options)
+        _worker_drivers[model_root, options] = worker_driver
+    try:
+        comps_used = worker_driver.run_community(**run)
+    except (RuntimeError, IOError) as e:
+        return None, e, worker_driver.profiler.pop_records()
+    try:
+        name = run['alt_save_name']
+    except KeyError:
+        name = None
+    packed = worker_driver.pack_results(comps_used, name)
+    return packed, None, worker_driver.profiler.pop_records()
+
+
+def _monte_carlo_worker (work):
+    """
+    run the components for a group of Monte Carlo samples in a worker 
+    process for Driver.run_monte_carlo
+    
+    inputs:
+        work: (model_root, community_config, global_config, inputs, 
+            run_values, capital_scalers), see Driver.run_sample_group <tuple>
+            
+    outputs:
+        returns the results of aaem.monte_carlo.evaluate_group
+    """
+    model_root = work[0]
+    options = (False, None, False)
+    try:
+        worker_driver = _worker_drivers[model_root, options]
+    except KeyError:
+        worker_driver = Driver(model_root, *options)
+        _worker_drivers[model_root, options] = worker_driver
+    return worker_driver.run_sample_group(*work[1:])
+
+
+def _sensitivity_worker (work):
+    """
+    run a sensitivity analysis for a community in a worker process for 
+    Driver.run_sensitivity_parallel
+    
+    inputs:
+        work: (model_root, run), where run is a dictionary of keyword 
+            arguments for Driver.run_sensitivity <tuple>
+            
+    outputs:
+        returns (table, error), table is the DataFrame from run_sensitivity 
+    or None, and error is None or the RuntimeError/IOError raised by the run
+    """
+    model_root, run = work
+    options = (False, None, False)
+    try:
+        worker_driver = _worker_drivers[model_root, options]
+    except KeyError:
+        worker_driver = Driver(model_root, *options)
+        _worker_drivers[model_root, options] = worker_driver
+    try:
+        return worker_driver.run_sensitivity(**run), None
+    except (RuntimeError, IOError) as e:
+        return None, e
+
+
+def _optimization_worker (work):
+    """
+    run a sizing optimization for a community in a worker process for 
+    Driver.run_optimization_parallel
+    
+    inputs:
+        work: (model_root, run), where run is a dictionary of keyword 
+            arguments for Driver.run_optimization <tuple>
+            
+    outputs:
+        returns (table, error), table is the DataFrame from run_optimization 
+    or None, and error is None or the RuntimeError/IOError raised by the run
+    """
+    model_root, run = work
+    options = (False, None, False)
+    try:
+        worker_driver = _worker_drivers[model_root, options]
+    except KeyError:
+        worker_driver = Driver(model_root, *options)
+        _worker_drivers[model_root, options] = worker_driver
+    try:
+        return worker_driver.run_optimization(**run), None
+    except (RuntimeError, IOError) as e:
+        return None, e
+
+
 class Setup (object):
     """
     setup the structure needed to run the model
@@ -836,12 +1806,15 @@ class Setup (object):
         
         self.communities = [c for c in data['Community'].values]
         
-    def setup (self, force = False, ng_coms = [], make_globals = False):
+    def setup (self, force = False, ng_coms = [], make_globals = False,
+        jobs = 1):
         """
         run the setup functionality
         
         inputs:
             force: (optional) overwrirte existing files <boolean>
+            jobs: (optional, default: 1) number of worker processes to 
+                preprocess communities in <int>
             
         outputs:
             model structure is setup
@@ -858,43 +1831,41 @@ class Setup (object):
             self.load_communities()
         
         f_path = os.path.join(self.model_root, self.tag, 'config')
-        for community in self.communities:
-            #~ print community
-            #~ f_path = os.path.join(self.model_root, self.tag, 'config')
-            preprocessor = Preprocessor(community,
-                self.data_dir, 
-                diag = self.diagnostics, 
-                process_intertie = False)
-            self.diagnostics.add_note('Preprocessing ' + community, '---------')
-            if community in ng_coms:
-                preprocessor.run(show=True, ng_com=True)
-            else:
-                preprocessor.run(show=True)
-            
-            if  make_globals:
-                keys_to_split = KEYS_FOR_GLOBAL
-                preprocessor.save_config(f_path, keys_to_split)
-                f_name = os.path.join(f_path, '__global_config.yaml')
-                if not os.path.exists(f_name):
-                    preprocessor.save_global_congfig(f_name, keys_to_split)
+        ## the first community writes __global_config.yaml
+        work = [[self.data_dir, f_path, community, community in ng_coms,
+                make_globals, i == 0] \
+            for i, community in enumerate(self.communities)]
+        pool = None
+        staging = None
+        try:
+            if jobs <= 1:
+                results = (_setup_worker(w) for w in work)
             else:
-                preprocessor.save_config(f_path)
-            ## the intertie, if it exists
-            try:
-                preprocessor = Preprocessor(community,
-                    self.data_dir, 
-                    diag = self.diagnostics, 
-                    process_intertie = True)
-                self.diagnostics.add_note('Preprocessing ' + community,
-                    '---------')
-                preprocessor.run(show=True)
-                if  make_globals:
-                    keys_to_split = KEYS_FOR_GLOBAL
-                    preprocessor.save_config(f_path, keys_to_split)
-                else:
-                    preprocessor.save_config(f_path)
-            except PreprocessorError:
-                pass
+                ## workers save to their own directories, in the system 
+                ## temporary directory, which are merged in community order,
+                ## so configs saved by more than one community (i.e. 
+                ## interties) are the same as in a serial setup
+                staging = tempfile.mkdtemp(prefix = 'aaem_setup_')
+                for i, w in enumerate(work):
+                    w[1] = os.path.join(staging, str(i))
+                    os.makedirs(w[1])
+                pool = Pool(min(jobs, max(len(work), 1)))
+                results = pool.imap(_setup_worker, work)
+            for w, community_diagnostics in zip(work, results):
+                self.diagnostics.extend(community_diagnostics)
+                if w[1] == f_path:
+                    continue
+                for f_name in sorted(os.listdir(w[1])):
+                    dest = os.path.join(f_path, f_name)
+                    if os.path.exists(dest):
+                        os.remove(dest)
+                    shutil.move(os.path.join(w[1], f_name), dest)
+        finally:
+            if not pool is None:
+                pool.terminate()
+                pool.join()
+            if not staging is None:
+                shutil.rmtree(staging, ignore_errors = True)
         
         #~ self.setup_global_config()
         #~ ids = self.setup_input_files()
@@ -905,6 +1876,59 @@ class Setup (object):
         self.write_preprocessor_metadata(f_path)
         return True
     
+def _setup_worker (work):
+    """
+    preprocess a community, and its intertie if it exists, and save the 
+    configs, for Setup.setup. Runs in a worker process when setup uses more 
+    than one job
+    
+    inputs:
+        work: (data_dir, config_path, community, ng_com, make_globals, 
+            write_global) <list>
+            
+    outputs:
+        saves the community config files, and __global_config.yaml if 
+    write_global and make_globals are True 
+        returns the Diagnostics for the community
+    """
+    data_dir, f_path, community, ng_com, make_globals, write_global = work
+    diag = Diagnostics()
+    preprocessor = Preprocessor(community,
+        data_dir, 
+        diag = diag, 
+        process_intertie = False)
+    diag.add_note('Preprocessing ' + community, '---------')
+    if ng_com:
+        preprocessor.run(show=True, ng_com=True)
+    else:
+        preprocessor.run(show=True)
+    
+    if  make_globals:
+        keys_to_split = KEYS_FOR_GLOBAL
+        preprocessor.save_config(f_path, keys_to_split)
+        if write_global:
+            f_name = os.path.join(f_path, '__global_config.yaml')
+            preprocessor.save_global_congfig(f_name, keys_to_split)
+    else:
+        preprocessor.save_config(f_path)
+    ## the intertie, if it exists
+    try:
+        preprocessor = Preprocessor(community,
+            data_dir, 
+            diag = diag, 
+            process_intertie = True)
+        diag.add_note('Preprocessing ' + community,
+            '---------')
+        preprocessor.run(show=True)
+        if  make_globals:
+            keys_to_split = KEYS_FOR_GLOBAL
+            preprocessor.save_config(f_path, keys_to_split)
+        else:
+            preprocessor.save_config(f_path)
+    except PreprocessorError:
+        pass
+    return diag
+
 def script_validator (script_file):
     """
         validate a script(very basic), will raise a standard error if a problem 
@@ -8,6 +8,7 @@ created: 2015/09/18
 from community_data import CommunityData
 from diagnostics import Diagnostics
 import constants
+from year_series import YearSeries
 #~ import plot
 #~ import colors
 
@@ -18,6 +19,15 @@ import os.path
 
 #~ from datetime import datetime
 
+## forecast series -> (attribute, column or None for a Series)
+FORECAST_SERIES = {
+    'population': ('population', 'population'),
+    'consumption': ('consumption', 'consumption'),
+    'generation': ('generation', 'generation'),
+    'households': ('households', 'households'),
+    'average diesel load': ('yearly_average_diesel_load', None),
+}
+
 class Forecast (object):
     """ Class doc """
     
@@ -401,6 +411,58 @@ class Forecast (object):
             np.round(self.population / np.float64(peeps_per_house))
         self.households.columns = ["households"] 
         
+    def get_series (self, name):
+        """
+        get a forecast as an array backed YearSeries. Each series is built 
+        once, and is not updated if the forecast is changed in place
+        
+        pre:
+            name is a key of FORECAST_SERIES, and the forecast has been made
+        post:
+            returns a YearSeries. raises AttributeError if the forecast 
+        does not exist
+        """
+        try:
+            return self.series[name]
+        except AttributeError:
+            self.series = {}
+        except KeyError:
+            pass
+        
+        attribute, column = FORECAST_SERIES[name]
+        data = getattr(self, attribute)
+        if not column is None:
+            data = data[column]
+        self.series[name] = YearSeries(data)
+        return self.series[name]
+        
+    def __getstate__ (self):
+        """
+        get the state to pickle, without the series, which are rebuilt 
+        when needed
+        """
+        state = dict(self.__dict__)
+        state.pop('series', None)
+        return state
+        
+    def get_values (self, name, start, end = None):
+        """
+        get values from a forecast
+        
+        pre:
+            name is a key of FORECAST_SERIES
+            start is a year where start >= self.start_year
+            end(if provided) is a year where start <= end, years past the 
+        end of the forecast have the last value of the forecast
+        post:
+            returns the value for start, or a read only array of values for 
+        start to end
+        """
+        series = self.get_series(name)
+        if end is None:
+            return series.get(start)
+        return series.get_range(start, end)
+        
     def get_population (self, start, end = None):
         """
         get population values from the population forecast. 
@@ -411,26 +473,7 @@ class Forecast (object):
         post:
             returns a float or list of floats
         """
-        if end is None:
-            return self.population.ix[start].T.values[0]
-       
-        ## dynamic extension
-        existing_len = len(self.population.ix[start:end])
-        extend_by = (end + 1) - start - existing_len
-        if extend_by > 0:
-            extend = DataFrame(
-                index=range(
-                    self.population.index[-1] + 1,
-                    self.population.index[-1] + 1+extend_by
-                ), 
-                columns=['population'])
-            extend['population'] = self.population.iloc[-1]['population']
-            population = self.population.ix[start:end].append(extend)
-        
-        else:
-            # -1 to ensure same behavour
-            population = self.population.ix[start:end]
-        return population['population'].values  
+        return self.get_values('population', start, end)
     
     def get_consumption (self, start, end = None):
         """
@@ -442,29 +485,7 @@ class Forecast (object):
         post:
             returns a float or list of floats
         """
-        if end is None:
-            return self.consumption.ix[start]['consumption']
-       
-        ## dynamic extension
-        existing_len = len(self.consumption.ix[start:end])
-        extend_by = (end + 1) - start - existing_len
-        if extend_by > 0:
-            extend = DataFrame(
-                index=range(
-                    self.consumption.index[-1] +1,
-                    self.consumption.index[-1]+extend_by+1
-                ), 
-                columns=['consumption'])
-            extend['consumption'] = self.consumption.iloc[-1]['consumption']
-            consumption = \
-                DataFrame(self.consumption.ix[start:end]['consumption']).\
-                append(extend)
-        
-        else:
-            #  -1 to ensure same behavour
-            consumption = \
-                DataFrame(self.consumption['consumption'].ix[start:end])
-        return consumption['consumption'].values  
+        return self.get_values('consumption', start, end)
 
     def get_generation (self, start, end = None):
         """
@@ -476,28 +497,7 @@ class Forecast (object):
         post:
             returns a float or list of floats
         """
-        if end is None:
-            return self.generation.ix[start]['generation']
-       
-        ## dynamic extension
-        existing_len = len(self.generation.ix[start:end])
-        extend_by = (end + 1) - start - existing_len
-        if extend_by > 0:
-            extend = DataFrame(
-                index=range(
-                    self.generation.index[-1] + 1 ,
-                    self.generation.index[-1]+extend_by +1
-                ), 
-                columns=['generation'])
-            extend['generation'] = self.generation.iloc[-1]['generation']
-            generation = \
-                DataFrame(self.generation.ix[start:end]['generation']).\
-                append(extend)
-        
-        else:
-            generation = \
-                DataFrame(self.generation['generation'].ix[start:end])
-        return generation['generation'].values  
+        return self.get_values('generation', start, end)
 
     def get_households (self, start, end = None):
         """
@@ -509,26 +509,20 @@ class Forecast (object):
         post:
             returns a float or list of floats
         """
-        if end is None:
-            return self.households.ix[start].T.values[0]
-       
-        ## dynamic extension
-        existing_len = len(self.households.ix[start:end])
-        extend_by = (end + 1) - start - existing_len
-        if extend_by > 0:
-            extend = DataFrame(
-                index=range(
-                    self.households.index[-1] + 1,
-                    self.households.index[-1]+extend_by +1
-                ), 
-                columns=['households'])
-            extend['households'] = self.households.iloc[-1]['households']
-            households = self.households.ix[start:end].append(extend)
+        return self.get_values('households', start, end)
         
-        else:
-            # -1 to ensure same behavour
-            households = self.households.ix[start:end]
-        return households['households'].values  
+    def get_average_diesel_load (self, start, end = None):
+        """
+        get yearly average diesel load values (kW)
+        
+        pre:
+            start is a year where start >= self.start_year
+            end(if provided) is a year where start <= end
+        post:
+            returns a float or list of floats. raises AttributeError if 
+        there is no diesel generation forecast
+        """
+        return self.get_values('average diesel load', start, end)
         
     #~ def save_forecast (self, path, png_path = None, do_plots = False):
         #~ """
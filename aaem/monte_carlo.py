@@ -0,0 +1,377 @@
+"""
+Monte Carlo
+-----------
+    Module for Monte Carlo uncertainty runs over the scalers, and selected
+config values, of a community
+
+    Each input with a distribution is sampled with a seeded random number
+generator. As in the scenarios module, the 'capital costs' scaler only
+changes the financial results, so the capital costs of any number of samples
+are evaluated together, as arrays, from one run of the components. The other
+inputs ('diesel price', 'diesel price adder', 'kWh consumption', and config
+values) need a run of the components for each distinct value, so each
+sample with a distribution for any of them is a run of the components.
+
+    To bound the number of runs, the samples of the inputs that need a run
+can be stratified, by setting levels: the samples of each input are split, by
+rank, in to a number of equal sized levels, and each sample takes the mean of
+its level. The components are then run once for each distinct combination of
+levels, at most levels ** (number of inputs that need a run) times,
+regardless of the number of samples. Stratifying narrows the spread of the
+inputs (the means of the outer levels are not as far out as the outer
+samples), so the standard deviations and outer percentiles of the results are
+coarse-grained and understate the tails. The number of levels is saved with
+the statistics.
+
+    The financial results of the samples are reduced to statistics of the
+net present value, benefit cost ratio, and levelized cost of energy of each
+component. Nothing is saved for the individual samples.
+
+    The settings for a Monte Carlo run are a dictionary, i.e. from a run
+script:
+
+    samples: number of samples (default: 1000)
+    seed: seed for the random number generator (default: 0)
+    levels: number of levels to split the inputs that need a run of the
+        components in to (default: None, every sample is run)
+    scalers: scaler -> distribution, for any of the scalers
+    config: section -> key -> distribution, for config values
+
+    A distribution is a number, for a constant, or a dictionary with the
+'distribution' and its parameters, see DISTRIBUTIONS.
+"""
+import numpy as np
+from pandas import DataFrame
+
+## distribution -> (parameters, function(random state, parameters, size))
+DISTRIBUTIONS = {
+    'uniform': (['min', 'max'],
+        lambda rs, p, n: rs.uniform(p['min'], p['max'], n)),
+    'normal': (['mean', 'std'],
+        lambda rs, p, n: rs.normal(p['mean'], p['std'], n)),
+    'lognormal': (['mean', 'sigma'],
+        lambda rs, p, n: rs.lognormal(p['mean'], p['sigma'], n)),
+    'triangular': (['min', 'mode', 'max'],
+        lambda rs, p, n: rs.triangular(p['min'], p['mode'], p['max'], n)),
+}
+
+## scalers that only change the financial results
+FINANCIAL_SCALERS = ['capital costs']
+
+## financial results of the components that statistics are found for
+METRICS = ['net npv', 'benefit cost ratio', 'levelized cost of energy',
+    'levelized cost of energy (MMBtu)', 'levelized cost of energy (kWh)']
+
+PERCENTILES = [5, 25, 50, 75, 95]
+
+## levels is the number of levels the run inputs were stratified in to, or
+## empty if every sample was run
+STATISTIC_COLUMNS = ['component', 'metric', 'samples', 'mean', 'std'] + \
+    ['p' + str(p) for p in PERCENTILES] + ['levels']
+
+## metric for the fraction of samples with a benefit cost ratio over 1
+COST_EFFECTIVE_METRIC = 'fraction cost effective (benefit cost ratio > 1)'
+
+def sample_distribution (distribution, random_state, size):
+    """sample a distribution
+
+    Parameters
+    ----------
+    distribution: number or dict
+        a constant, or a dictionary with the 'distribution' and its
+    parameters
+    random_state: np.random.RandomState
+        random number generator
+    size: int
+        number of samples
+
+    Returns
+    -------
+    np.array
+        samples
+
+    Raises
+    ------
+    ValueError
+        if the distribution is not known, or is missing parameters
+    """
+    if not type(distribution) is dict:
+        return np.zeros(size) + float(distribution)
+    try:
+        parameters, sample = DISTRIBUTIONS[distribution['distribution']]
+    except KeyError:
+        raise ValueError, "Unknown distribution: " + str(distribution) + \
+            ". Distributions are " + ', '.join(sorted(DISTRIBUTIONS))
+    missing = [p for p in parameters if not p in distribution]
+    if len(missing) > 0:
+        raise ValueError, distribution['distribution'] + \
+            " distribution needs " + ', '.join(missing)
+    return np.asarray(sample(random_state, distribution, size), dtype = float)
+
+def stratify (values, levels):
+    """split samples, by rank, in to equal sized levels, and replace each
+    with the mean of its level
+
+    Parameters
+    ----------
+    values: np.array
+        samples
+    levels: int
+        number of levels
+
+    Returns
+    -------
+    np.array
+        samples, with at most levels distinct values
+    """
+    values = np.asarray(values, dtype = float)
+    levels = max(1, min(int(levels), len(values)))
+    order = np.argsort(values, kind = 'mergesort')
+    level = np.empty(len(values), dtype = int)
+    level[order] = np.arange(len(values)) * levels // len(values)
+    means = np.bincount(level, values) / np.bincount(level)
+    return means[level]
+
+def get_levels (settings):
+    """get the number of levels to stratify the run inputs in to
+
+    Parameters
+    ----------
+    settings: dict
+        Monte Carlo settings, see module documentation
+
+    Returns
+    -------
+    int or None
+        levels, or None if the run inputs are not stratified
+
+    Raises
+    ------
+    ValueError
+        if levels is less than 1
+    """
+    levels = settings.get('levels', None)
+    if levels is None:
+        return None
+    levels = int(levels)
+    if levels < 1:
+        raise ValueError, "levels must be at least 1"
+    return levels
+
+def draw_samples (settings, default_scalers):
+    """draw the samples for a Monte Carlo run
+
+    Parameters
+    ----------
+    settings: dict
+        Monte Carlo settings, see module documentation
+    default_scalers: dict
+        default values of all scalers
+
+    Returns
+    -------
+    tuple
+        (run inputs, run samples, capital scalers). run inputs is a list of
+    ('scaler', name) or ('config', section, key) for the inputs that need a
+    run of the components, run samples is an array with a row for each
+    sample and a column for each run input, and capital scalers is an array
+    of the 'capital costs' scaler of each sample
+
+    Raises
+    ------
+    ValueError
+        if a scaler is not known, a distribution is not valid, or levels is
+    less than 1
+    """
+    samples = int(settings.get('samples', 1000))
+    levels = get_levels(settings)
+    random_state = np.random.RandomState(settings.get('seed', 0))
+    scalers = settings.get('scalers', None) or {}
+    config = settings.get('config', None) or {}
+
+    unknown = [s for s in scalers if not s in default_scalers]
+    if len(unknown) > 0:
+        raise ValueError, "Unknown scalers: " + ', '.join(sorted(unknown))
+
+    ## drawn in a fixed order so a seed always gives the same samples
+    inputs = [('scaler', s) for s in sorted(default_scalers) \
+        if not s in FINANCIAL_SCALERS]
+    inputs += [('config', section, key) for section in sorted(config) \
+        for key in sorted(config[section])]
+    run_samples = np.empty((samples, len(inputs)))
+    for col, item in enumerate(inputs):
+        if item[0] == 'scaler':
+            distribution = scalers.get(item[1], default_scalers[item[1]])
+        else:
+            distribution = config[item[1]][item[2]]
+        values = sample_distribution(distribution, random_state, samples)
+        if type(distribution) is dict and not levels is None:
+            values = stratify(values, levels)
+        run_samples[:, col] = values
+
+    capital_scalers = sample_distribution(
+        scalers.get('capital costs', default_scalers['capital costs']),
+        random_state, samples)
+    return inputs, run_samples, capital_scalers
+
+def group_samples (run_samples):
+    """group samples by the inputs that need a run of the components
+
+    Parameters
+    ----------
+    run_samples: np.array
+        run samples from draw_samples
+
+    Returns
+    -------
+    list
+        [(run values, indices of samples in the group), ...]
+    """
+    if run_samples.shape[1] == 0:
+        return [((), np.arange(len(run_samples)))]
+    ## sort the rows, and split where they change (np.unique only finds
+    ## unique rows in numpy 1.13 and later)
+    order = np.lexsort(run_samples.T[::-1])
+    rows = run_samples[order]
+    starts = np.where(np.concatenate([[True],
+        (rows[1:] != rows[:-1]).any(1)]))[0]
+    return [(tuple(rows[s]), np.sort(indices)) \
+        for s, indices in zip(starts, np.split(order, starts[1:]))]
+
+def get_run_inputs (inputs, run_values, default_scalers):
+    """get the scalers and config values for a run of the components
+
+    Parameters
+    ----------
+    inputs: list
+        run inputs from draw_samples
+    run_values: tuple
+        value of each run input
+    default_scalers: dict
+        default values of all scalers
+
+    Returns
+    -------
+    tuple
+        (scalers, config values), scalers has all scalers, with a
+    'capital costs' scaler of 1, and config values is a list of
+    (section, key, value)
+    """
+    scalers = dict(default_scalers)
+    scalers['capital costs'] = 1.0
+    config = []
+    for item, value in zip(inputs, run_values):
+        if item[0] == 'scaler':
+            scalers[item[1]] = value
+        else:
+            config.append((item[1], item[2], value))
+    return scalers, config
+
+def evaluate_group (comps_used, comp_order, capital_scalers):
+    """evaluate the capital cost scalers of a group of samples on the
+    components run for the group
+
+    Parameters
+    ----------
+    comps_used: dict
+        excuted components for the group
+    comp_order: list
+        order of components in the results
+    capital_scalers: np.array
+        capital cost scaler of each sample in the group
+
+    Returns
+    -------
+    dict
+        component -> metric -> np.array with a value for each sample, for
+    the METRICS a component has
+    """
+    results = {}
+    for comp in comp_order:
+        try:
+            comp_results = comps_used[comp].calc_capital_cost_scenarios(
+                capital_scalers
+            )
+        except (KeyError, AttributeError):
+            ## not run, not a financial component, or not financially modeled
+            continue
+        results[comp] = dict([(m, np.asarray(comp_results[m], dtype = float))\
+            for m in METRICS if m in comp_results])
+    return results
+
+
+class MonteCarloStatistics (object):
+    """Collects the financial results of the samples of a Monte Carlo run,
+    and reduces them to statistics
+
+    Parameters
+    ----------
+    comp_order: list
+        order of components in the results
+    levels: int, optional
+        number of levels the run inputs were stratified in to, see
+    get_levels
+
+    Attributes
+    ----------
+    values: dict
+        component -> metric -> list of np.arrays of results
+    """
+
+    def __init__ (self, comp_order, levels = None):
+        """collector for Monte Carlo results
+
+        Parameters
+        ----------
+        comp_order: list
+            order of components in the results
+        levels: int, optional
+            number of levels the run inputs were stratified in to
+        """
+        self.comp_order = comp_order
+        self.levels = levels
+        self.values = {}
+
+    def add (self, results):
+        """add the results of a group of samples
+
+        Parameters
+        ----------
+        results: dict
+            results from evaluate_group
+        """
+        for comp in results:
+            metrics = self.values.setdefault(comp, {})
+            for metric in results[comp]:
+                metrics.setdefault(metric, []).append(results[comp][metric])
+
+    def to_dataframe (self):
+        """reduce the results to statistics
+
+        Returns
+        -------
+        DataFrame
+            a row per component and metric, with STATISTIC_COLUMNS. Only
+        finite values are used, and samples is the number of them. For the
+        COST_EFFECTIVE_METRIC only the mean is given
+        """
+        levels = np.nan if self.levels is None else self.levels
+        rows = []
+        for comp in [c for c in self.comp_order if c in self.values]:
+            for metric in [m for m in METRICS if m in self.values[comp]]:
+                values = np.concatenate(self.values[comp][metric])
+                finite = values[np.isfinite(values)]
+                row = [comp, metric, len(finite)]
+                if len(finite) > 0:
+                    row += [finite.mean(), finite.std()] + \
+                        list(np.percentile(finite, PERCENTILES))
+                else:
+                    row += [np.nan] * (2 + len(PERCENTILES))
+                rows.append(row + [levels])
+                if metric == 'benefit cost ratio':
+                    with np.errstate(invalid = 'ignore'):
+                        cost_effective = (values > 1).mean()
+                    rows.append([comp, COST_EFFECTIVE_METRIC, len(values),
+                        cost_effective] + \
+                        [np.nan] * (1 + len(PERCENTILES)) + [levels])
+        return DataFrame(rows, columns = STATISTIC_COLUMNS)
@@ -0,0 +1,242 @@
+"""
+Optimization
+------------
+    Module for sizing the renewable generation projects of a community
+
+    The Wind Power, Solar Power, and Hydropower components are re-run over a
+range of sizes, and the net present value and benefit cost ratio of each size
+is found. The community data, forecast, prices, and prerequisite components
+are loaded or run once for a community, only the sized component is re-run
+for each size. The optimum of each sizing input is the size with the largest
+net present value, of the sizes that meet the minimum benefit cost ratio if
+one is given.
+
+    Sizing inputs (SIZING_INPUTS):
+
+    Wind Power: 'proposed capacity' (kW), with the proposed generation found
+        from the capacity factor, and 'percent generation to offset' (%) of
+        the average diesel load, with the capacity found as it is for
+        communities without a known project
+    Solar Power: 'percent generation to offset' (%) of the average diesel
+        load
+    Hydropower: 'proposed capacity' (kW) of a known project, the proposed
+        generation and generation capital cost are scaled with the capacity
+
+    The settings for an optimization are a dictionary:
+
+    components: components to size (default: all enabled components in
+        SIZING_INPUTS)
+    fractions: 'proposed capacity' sizes, as fractions of the average diesel
+        load (default: FRACTIONS)
+    percents: 'percent generation to offset' sizes (default: PERCENTS)
+    values: component -> sizing input -> list of sizes, in place of the
+        defaults
+    minimum benefit cost ratio: smallest benefit cost ratio of an optimum
+        (default: None)
+"""
+import numpy as np
+from pandas import DataFrame
+
+UNKNOWN = "UNKNOWN"
+
+## component -> sizing inputs
+SIZING_INPUTS = {
+    'Wind Power': ['proposed capacity', 'percent generation to offset'],
+    'Solar Power': ['percent generation to offset'],
+    'Hydropower': ['proposed capacity'],
+}
+
+## component -> (capacity attribute (kW), generation attribute (kWh/year))
+SIZE_ATTRIBUTES = {
+    'Wind Power': ('load_offset_proposed', 'generation_wind_proposed'),
+    'Solar Power': ('proposed_load', 'generation_proposed'),
+    'Hydropower': ('load_offset_proposed', 'gross_generation_proposed'),
+}
+
+## default sizes, 5% to 150% of the average diesel load
+FRACTIONS = list(np.arange(1, 31) * .05)
+PERCENTS = list(np.arange(1, 31) * 5.0)
+
+OPTIMIZATION_COLUMNS = [
+    'component', 'input', 'value', 'capacity', 'generation',
+    'capital costs', 'net npv', 'benefit cost ratio', 'optimum',
+]
+
+def is_number (value):
+    """test if a config value is a known number
+
+    Parameters
+    ----------
+    value: any
+        config value
+
+    Returns
+    -------
+    bool
+    """
+    try:
+        return np.isfinite(float(value))
+    except (TypeError, ValueError):
+        return False
+
+def get_sizes (community_data, forecast, comp, key, settings):
+    """get the sizes to evaluate for a sizing input
+
+    Parameters
+    ----------
+    community_data: CommunityData
+        community data for the community
+    forecast: Forecast
+        forecast for the community
+    comp: str
+        component name
+    key: str
+        sizing input
+    settings: dict
+        optimization settings, see module documentation
+
+    Returns
+    -------
+    list
+        sizes, empty if the input can not be sized for the community (i.e.
+    there is no diesel generation, or no known hydropower project)
+    """
+    values = (settings.get('values', None) or {}).get(comp, {})
+    if key in values:
+        return list(values[key])
+    if key == 'percent generation to offset':
+        return list(settings.get('percents', PERCENTS))
+
+    if comp == 'Hydropower':
+        capacity = community_data.get_item(comp, 'proposed capacity')
+        if not is_number(capacity) or float(capacity) <= 0:
+            return []
+    try:
+        average_load = forecast.get_average_diesel_load(
+            community_data.get_item(comp, 'start year'))
+    except (AttributeError, KeyError, IndexError):
+        return []
+    if not is_number(average_load) or average_load <= 0:
+        return []
+    return [average_load * f for f in settings.get('fractions', FRACTIONS)]
+
+def change_size (community_data, comp, key, value):
+    """change the size of a component
+
+    Parameters
+    ----------
+    community_data: CommunityData
+        community data for the community, it is modified
+    comp: str
+        component name
+    key: str
+        sizing input
+    value: float
+        size
+
+    Returns
+    -------
+    list
+        originals, the values to restore with sensitivity.restore_inputs, as
+    a list of (section, key, value)
+    """
+    changes = [(key, value)]
+    if comp == 'Wind Power':
+        changes.append(('proposed generation', UNKNOWN))
+        if key == 'percent generation to offset':
+            changes.append(('proposed capacity', UNKNOWN))
+    elif comp == 'Hydropower':
+        ## keep the capacity factor and cost per kW of the known project
+        scale = value / float(community_data.get_item(comp, key))
+        for scaled in ['proposed generation', 'generation capital cost']:
+            original = community_data.get_item(comp, scaled)
+            if is_number(original):
+                changes.append((scaled, float(original) * scale))
+
+    originals = []
+    for change_key, change_value in changes:
+        originals.append(
+            (comp, change_key, community_data.get_item(comp, change_key)))
+        community_data.set_item(comp, change_key, change_value)
+    return originals
+
+def get_result (component, comp):
+    """get the size and financial results of a sized component
+
+    Parameters
+    ----------
+    component: AnnualSavings
+        excuted component, or None
+    comp: str
+        component name
+
+    Returns
+    -------
+    dict
+        'capacity' (kW), 'generation' (kWh/year, first year), 'capital costs',
+    'net npv', and 'benefit cost ratio', nan where a component does not have
+    a result
+    """
+    capacity, generation = SIZE_ATTRIBUTES[comp]
+    items = [
+        ('capacity', lambda: getattr(component, capacity)),
+        ('generation', lambda: np.atleast_1d(getattr(component,
+            generation))[0]),
+        ('capital costs', lambda: component.capital_costs),
+        ('net npv', lambda: component.get_NPV_net_benefit()),
+        ('benefit cost ratio', lambda: component.get_BC_ratio()),
+    ]
+    result = {}
+    for name, get in items:
+        try:
+            result[name] = float(get())
+        except (AttributeError, TypeError, ValueError, IndexError):
+            result[name] = np.nan
+    return result
+
+def find_optimum (rows, minimum_bc_ratio = None):
+    """mark the optimum size of each component and sizing input
+
+    Parameters
+    ----------
+    rows: list
+        dicts with keys from OPTIMIZATION_COLUMNS, except optimum, it is
+    added
+    minimum_bc_ratio: float, optional
+        smallest benefit cost ratio of an optimum
+    """
+    best = {}
+    for i, row in enumerate(rows):
+        row['optimum'] = False
+        npv = row['net npv']
+        if not np.isfinite(npv):
+            continue
+        if not minimum_bc_ratio is None and \
+                not row['benefit cost ratio'] >= minimum_bc_ratio:
+            continue
+        key = (row['component'], row['input'])
+        if not key in best or npv > rows[best[key]]['net npv']:
+            best[key] = i
+    for i in best.values():
+        rows[i]['optimum'] = True
+
+def to_dataframe (rows, comp_order):
+    """create the optimization table
+
+    Parameters
+    ----------
+    rows: list
+        dicts with keys from OPTIMIZATION_COLUMNS
+    comp_order: list
+        order of components in the results
+
+    Returns
+    -------
+    DataFrame
+        the net present value curve of each component and sizing input,
+    ordered by size
+    """
+    position = dict([(c, i) for i, c in enumerate(comp_order)])
+    rows = sorted(rows, key = lambda r: (position[r['component']],
+        SIZING_INPUTS[r['component']].index(r['input']), r['value']))
+    return DataFrame(rows, columns = OPTIMIZATION_COLUMNS)
@@ -12,16 +12,17 @@ import numpy as np
 #~ from forecast import growth
 from datetime import datetime
 from collections import Counter
-from importlib import import_module
 import copy
 
 import yaml
 
 
-from aaem.components import comp_lib, comp_order
+from aaem.components import comp_lib, comp_order, comp_packages
+from aaem.components import get_registry
 import aaem.yaml_dataframe as yd
 import aaem.constants as constants
 from aaem.config_IO import save_config
+from aaem import data_repository
 from aaem.defaults import base_order, base_comments
 
 GENERATION_AVG = .03
@@ -410,18 +411,7 @@ class Preprocessor (object):
         -------
         an AAEM component
         """
-        try:
-            return self.components_modules[component]
-        except AttributeError:
-            self.components_modules = {}
-        except KeyError:
-            pass
-
-        #~ print component
-        #~ print 'aaem.components.' + component
-        self.components_modules[component] = \
-            import_module('aaem.components.' + component)
-        return self.components_modules[component]
+        return get_registry()[comp_packages[component]].module
 
     def preprocess_component ( self, component, **kwargs):
         """Run the prerocess function for a component
@@ -461,9 +451,14 @@ class Preprocessor (object):
             any other names for communities
         """
         datafile = os.path.join(self.data_dir, "community_list.csv")
-        data = read_csv(datafile, comment = '#')
+        data = data_repository.get_table(datafile, comment = '#')
         id_cols = [c for c in data.columns if c != 'Energy Region']
-        ids = data[data[id_cols].isin(self.intertie).any(axis=1)]
+        lookup = data_repository.get_table(datafile, 'id lookup',
+            lambda d: data_repository.id_lookup(d, id_cols), comment = '#')
+        rows = set()
+        for community in self.intertie:
+            rows.update(lookup.get(community, []))
+        ids = data.iloc[sorted(rows)]
         if len(ids) != len(communities):
             #~ print ids, communities
             raise PreprocessorError, "Could not find community ID info"
@@ -489,7 +484,8 @@ class Preprocessor (object):
         """
         ## load file
         datafile = os.path.join(self.data_dir,"current_interties.csv")
-        data = read_csv(datafile, index_col=0, comment = "#").fillna("''")
+        data = data_repository.get_table(datafile, 'filled',
+            lambda d: d.fillna("''"), index_col=0, comment = "#")
 
         ### TODO: figure this out
         if community in ['Klukwan']:
@@ -530,7 +526,8 @@ class Preprocessor (object):
         """
         ## load file
         datafile = os.path.join(self.data_dir,"current_interties.csv")
-        data = read_csv(datafile, index_col=0, comment = "#").fillna("''")
+        data = data_repository.get_table(datafile, 'filled',
+            lambda d: d.fillna("''"), index_col=0, comment = "#")
 
         ## community is parent
         if community in data.index:
@@ -670,8 +667,8 @@ class Preprocessor (object):
             ids = kwargs['population_ids_to_use']
 
         ## load data & remove name of town
-        pops = read_csv(datafile, index_col = 1)
-        pops = pops.ix[ids].drop('place_name', axis = 1).sum()
+        pops = data_repository.get_rows(datafile, ids, index_col = 1)
+        pops = pops.drop('place_name', axis = 1).sum()
 
         ## set index to integers
         pops.index = pops.index.astype(int)
@@ -726,9 +723,6 @@ class Preprocessor (object):
         ###
         datafile = os.path.join(self.data_dir,
             "power-cost-equalization-pce-data.csv")
-        data = read_csv(datafile, index_col=1, comment = "#")
-        ## clean up index
-        data.index = [i.split(',')[0] for i in data.index]
 
         ## get ids
         if "ids_to_use" in kwargs:
@@ -753,8 +747,10 @@ class Preprocessor (object):
         if 'Newhalen' in ids and not "Iliamna" in ids:
             ids += ["Iliamna"]
 
-        ## get data
-        data = data.ix[ids][data.ix[ids].isnull().all(1) == False]
+        ## get data, from the table with the cleaned up index
+        data = data_repository.get_rows(datafile, ids, 'clean index',
+            data_repository.first_part_index, index_col=1, comment = "#")
+        data = data[data.isnull().all(1) == False]
 
         # filter out 'Purchased Power' from child communities as they
         # buy it from the parent so its counted there
@@ -866,9 +862,9 @@ class Preprocessor (object):
 
         ## setup data
         datafile = os.path.join(self.data_dir, "purchased_power_lib.csv")
-        data = read_csv(datafile, index_col=0, comment = '#')
-        data.index = [i.split(',')[0] for i in data.index] # reindex
-        data = data.ix[ids][data.ix[ids].isnull().all(1) == False]
+        data = data_repository.get_rows(datafile, ids, 'clean index',
+            data_repository.first_part_index, index_col=0, comment = '#')
+        data = data[data.isnull().all(1) == False]
         data= data.set_index('purchased_from')
 
         ### create purchased power lib
@@ -1172,9 +1168,9 @@ class Preprocessor (object):
         #~ print ids
 
 
-        generation = read_csv(datafile_generation, comment = '#', index_col=3)
+        generation = data_repository.get_rows(datafile_generation, ids,
+            comment = '#', index_col=3)
 
-        generation = generation.ix[ids]
         if any(generation['NET GENERATION (megawatthours)'] < 0):
             self.diagnostics.add_note("EIA Electricity",
                 "Negative generation values have been set to 0")
@@ -1182,7 +1178,7 @@ class Preprocessor (object):
             generation['NET GENERATION (megawatthours)'][idx] = 0
 
 
-        generation = generation.ix[ids].\
+        generation = generation.\
             groupby(['Year','Reported Fuel Type Code']).sum()[[
                 'TOTAL FUEL CONSUMPTION QUANTITY',
                 'ELECTRIC FUEL CONSUMPTION QUANTITY',
@@ -1191,9 +1187,10 @@ class Preprocessor (object):
                 'NET GENERATION (megawatthours)'
             ]]
 
-        sales = read_csv(datafile_sales, comment = '#', index_col=2)
+        sales = data_repository.get_rows(datafile_sales, ids, comment = '#',
+            index_col=2)
 
-        sales = sales.ix[ids].groupby('Data Year').sum()[[
+        sales = sales.groupby('Data Year').sum()[[
             'Residential Thousand Dollars','Residential Megawatthours',
             'Total Thousand Dollars','Total Megawatthours']]
 
@@ -1670,7 +1667,8 @@ class Preprocessor (object):
             heating degree days
         """
         datafile = os.path.join(self.data_dir, "heating_degree_days.csv")
-        data = read_csv(datafile, index_col=0, comment = "#", header=0)
+        data = data_repository.get_table(datafile, index_col=0,
+            comment = "#", header=0)
 
         ## community
         if self.community in data.index:
@@ -1753,13 +1751,14 @@ class Preprocessor (object):
             list of state regional goals
         """
         datafile = os.path.join(self.data_dir,'goals_community.csv')
-        data = read_csv(datafile, index_col=0, comment='#')
         #~ data.index = [i.replace(' (part)','') for i in data.index]
         idx = 1 if self.intertie_status == 'child' else 0
         ids = [self.community, self.aliases[idx]]
         ids = [ i for i in ids if i != '' ]
 
-        community = data.ix[ids][data.ix[ids].isnull().all(1) == False]
+        community = data_repository.get_rows(datafile, ids,
+            index_col=0, comment='#')
+        community = community[community.isnull().all(1) == False]
         community = community.T
         community = community[community.columns[0]]
         community = community[~community.isnull()]
@@ -1785,13 +1784,14 @@ class Preprocessor (object):
         status: bool
         """
         datafile = os.path.join(self.data_dir,"road_system.csv")
-        data = read_csv(datafile ,comment = '#',index_col = 0)
 
         idx = 1 if self.intertie_status == 'child' else 0
         ids = [self.community, self.aliases[idx]]
         ids = [ i for i in ids if type(i) is str ]
 
-        data = data.ix[ids][data.ix[ids].isnull().all(1) == False]
+        data = data_repository.get_rows(datafile, ids,
+            comment = '#', index_col = 0)
+        data = data[data.isnull().all(1) == False]
         status = data['On Road/SE'].values[0]
         status = True if status.lower() == 'yes' else False
 
@@ -1806,13 +1806,14 @@ class Preprocessor (object):
         DataFrame
         """
         datafile = os.path.join(self.data_dir, "diesel_powerhouse_data.csv")
-        data = read_csv(datafile, comment = '#', index_col = 0)
 
         idx = 1 if self.intertie_status == 'child' else 0
         ids = [self.community, self.aliases[idx]]
         ids = [ i for i in ids if type(i) is str ]
 
-        data = data.ix[ids][data.ix[ids].isnull().all(1) == False]
+        data = data_repository.get_rows(datafile, ids,
+            comment = '#', index_col = 0)
+        data = data[data.isnull().all(1) == False]
         if data.size == 0:
             data.ix[self.community] = 'N/a'
 
@@ -1880,12 +1881,13 @@ class Preprocessor (object):
         ids = [self.community, self.aliases[idx]]
         ids = [ i for i in ids if type(i) is str ]
 
-        data = read_csv(datafile_biomass, comment = '#', index_col = 0)
+        data = data_repository.get_rows(datafile_biomass, ids,
+            comment = '#', index_col = 0)
+        data = data[data.isnull().all(1) == False]
 
         try:
             set_as_0 = False
-            price_cord = float(data.ix[ids]\
-                [data.ix[ids].isnull().all(1) == False]['Biomass ($/Cord)'])
+            price_cord = float(data['Biomass ($/Cord)'])
             if np.isnan(price_cord):
                 set_as_0 = True
         except TypeError:
@@ -1897,8 +1899,7 @@ class Preprocessor (object):
 
         try:
             set_as_0 = False
-            price_pellet = float(data.ix[ids]\
-                [data.ix[ids].isnull().all(1) == False]['Pellets ($/ton)'])
+            price_pellet = float(data['Pellets ($/ton)'])
             if np.isnan(price_pellet):
                 set_as_0 = True
         except TypeError:
@@ -1909,22 +1910,28 @@ class Preprocessor (object):
                 "Could not find price. seting as $0")
             price_pellet = 0
 
-        data = read_csv(datafile_diesel, comment = '#', index_col = 0)
-        data.index = [c.split('-')[0] for c in data.index]
-        prices_diesel = data.ix[ids][data.ix[ids].isnull().all(1) == False].T
+        def diesel_rows (ids):
+            """get the diesel prices for ids"""
+            return data_repository.get_rows(datafile_diesel, ids,
+                'clean index',
+                lambda d: data_repository.first_part_index(d, '-'),
+                comment = '#', index_col = 0)
+        data = diesel_rows(ids)
+        prices_diesel = data[data.isnull().all(1) == False].T
         if prices_diesel.empty:
             if self.intertie_status == 'child':
-                prices_diesel = data.ix[[self.communities[0]]].T
+                prices_diesel = diesel_rows([self.communities[0]]).T
                 self.diagnostics.add_note('prices',
                     'using parents diesel prices')
                 ## dumb Nondalton, Ilimiana fix
                 if 'Nondalton' in self.communities:
-                    prices_diesel = data.ix[['Iliamna']].T
+                    prices_diesel = diesel_rows(['Iliamna']).T
             else:
                 communities = os.path.join(self.data_dir, "community_list.csv")
-                index = read_csv(communities, index_col=2, comment="#")
-                index = index.ix[self.regions[0]]['Community'].values
-                prices_diesel = DataFrame(data.ix[index].mean().T,
+                index = data_repository.get_rows(communities,
+                    [self.regions[0]], index_col=2, comment="#")
+                index = index['Community'].values
+                prices_diesel = DataFrame(diesel_rows(index).mean().T,
                     columns =['Regional Average'])
 
                 self.diagnostics.add_note('Community: Diesel Prices',
@@ -1935,12 +1942,13 @@ class Preprocessor (object):
 
 
 
-        data = read_csv(datafile_propane, comment = '#', index_col = 0)
+        data = data_repository.get_rows(datafile_propane, ids,
+            comment = '#', index_col = 0)
+        data = data[data.isnull().all(1) == False]
 
         try:
             set_as_0 = False
-            price_propane = float(data.ix[ids]\
-                [data.ix[ids].isnull().all(1) == False]['Propane ($/gallon)'])
+            price_propane = float(data['Propane ($/gallon)'])
             if np.isnan(price_propane):
                 set_as_0 = True
         except TypeError:
@@ -1963,7 +1971,6 @@ class Preprocessor (object):
             measured fuel price data
         """
         datafile = os.path.join(self.data_dir, "fuel-price-survey-data.csv")
-        fuel_prices = read_csv(datafile, index_col = 1)
 
         ids = self.GNIS_ids
         if not self.process_intertie:
@@ -1974,11 +1981,13 @@ class Preprocessor (object):
 
         ids = ids[0]
         #~ print ids
+        fuel_prices = data_repository.get_rows(datafile, [ids],
+            index_col = 1)
         current_year = self.data['community']['current year']
         fuel_prices = fuel_prices[fuel_prices['year'] < current_year]
         #~ data = []
         try:
-            data = fuel_prices.ix[ids].groupby('year').mean()[[
+            data = fuel_prices.groupby('year').mean()[[
                 'no_1_fuel_oil_price','no_2_fuel_oil_price']].mean(1)
 
             data = DataFrame(data)
@@ -2043,11 +2052,11 @@ class Preprocessor (object):
         datafile = os.path.join(self.data_dir,
             'renewable_generation_capacities.csv')
 
-        data = read_csv(datafile, comment = '#', index_col = 0)[
+        ## table with the needed columns, and '_' replaced in the index
+        build = lambda d: d[
             ['Resource Type','Resource Sub-Type',
             'Capacity (kW)','Average Expected Annual Generation (kWh)']
-        ]
-        data.index = [i.replace('_',' ') for i in data.index]
+        ].rename(index = lambda i: i.replace('_',' '))
         ids = self.communities + self.aliases
         #~ print ids
         if not self.process_intertie:
@@ -2059,7 +2068,8 @@ class Preprocessor (object):
                 ids = [self.communities[1], self.aliases[1]]
         ## cleanup ids
         ids = [i for i in ids if i != ""]
-        data = data.ix[ids]
+        data = data_repository.get_rows(datafile, ids, 'clean index', build,
+            comment = '#', index_col = 0)
 
         data = data.groupby(['Resource Type']).sum()
 
@@ -0,0 +1,46 @@
+"""
+price_series.py
+
+    array backed price series for the components. The prices of a community
+(i.e. the 'diesel prices' or 'electric prices' of the community data) are
+converted to arrays once, and the prices for the years of a project are
+slices of them. The series is shared by every component and summary using the
+same prices with get_price_series.
+"""
+import weakref
+
+from year_series import YearSeries
+
+
+## id of prices -> (weak reference to prices, YearSeries)
+_price_series = {}
+
+def get_price_series (prices):
+    """get the series for prices, it is created once for each prices
+    object, and is not updated if the prices are changed in place
+
+    Parameters
+    ----------
+    prices: DataFrame
+        prices indexed by year, in the first column
+
+    Returns
+    -------
+    YearSeries
+        prices of the first column as floats
+    """
+    key = id(prices)
+    try:
+        ref, series = _price_series[key]
+        if ref() is prices:
+            return series
+    except KeyError:
+        pass
+
+    def remove (ref):
+        if _price_series.get(key, (None, None))[0] is ref:
+            del _price_series[key]
+
+    series = YearSeries(prices.iloc[:, 0].astype(float))
+    _price_series[key] = (weakref.ref(prices, remove), series)
+    return series
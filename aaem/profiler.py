@@ -0,0 +1,188 @@
+"""
+profiler.py
+
+    opt in profiling of model runs. Records the wall time, CPU time, and
+change in resident memory of each step of running a community: loading the
+community data, the forecast, each components __init__, run, and
+calc_internal_rate_of_return, and each output writer.
+
+    Python 2 has no allocation tracing, so the change in the resident memory
+of the process is used as the allocation delta. Memory that is freed and
+reused in a step is not counted.
+"""
+import os
+import time
+import resource
+from contextlib import contextmanager
+
+from pandas import DataFrame
+
+PROFILE_FILE = 'profile.csv'
+PROFILE_SUMMARY_FILE = 'profile_summary.csv'
+
+COLUMNS = ['community', 'component', 'step', 'wall seconds', 'cpu seconds',
+    'memory delta (MB)']
+
+try:
+    _PAGE_SIZE = os.sysconf('SC_PAGE_SIZE')
+except (ValueError, AttributeError, OSError):
+    _PAGE_SIZE = 4096
+
+def get_cpu_time ():
+    """get the user + system CPU time of the current process
+
+    Returns
+    -------
+    float
+        seconds
+    """
+    times = os.times()
+    return times[0] + times[1]
+
+def get_rss ():
+    """get the current resident memory of the process. Where it is not
+    available the peak resident memory is used
+
+    Returns
+    -------
+    float
+        resident memory (MB)
+    """
+    try:
+        with open('/proc/self/statm', 'r') as statm:
+            return int(statm.read().split()[1]) * _PAGE_SIZE / 1024.0 / 1024.0
+    except (IOError, IndexError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+
+class Profiler (object):
+    """Records the time and memory used by each step of model runs
+
+    Parameters
+    ----------
+    enabled: bool, optional
+        if False nothing is recorded
+
+    Attributes
+    ----------
+    enabled: bool
+        profiling is enabled
+    records: list
+        one list of values, in the order of COLUMNS, for each step measured
+    """
+
+    def __init__ (self, enabled = True):
+        """Profiler for model runs
+
+        Parameters
+        ----------
+        enabled: bool, optional
+            if False nothing is recorded
+        """
+        self.enabled = enabled
+        self.records = []
+
+    @contextmanager
+    def measure (self, community, component, step):
+        """measure a step, use in a with statement
+
+        Parameters
+        ----------
+        community: str
+            community or project
+        component: str
+            component, or the part of the model, i.e. 'community data'
+        step: str
+            step, i.e. 'run'
+        """
+        if not self.enabled:
+            yield
+            return
+        wall = time.time()
+        cpu = get_cpu_time()
+        rss = get_rss()
+        try:
+            yield
+        finally:
+            self.records.append([community, component, step,
+                time.time() - wall, get_cpu_time() - cpu, get_rss() - rss])
+
+    def pop_records (self):
+        """get the records, and clear them, i.e. to send them from a worker
+        process to the parent process
+
+        Returns
+        -------
+        list
+            records
+        """
+        records = self.records
+        self.records = []
+        return records
+
+    def add_records (self, records):
+        """add records from another profiler
+
+        Parameters
+        ----------
+        records: list
+            records from pop_records
+        """
+        if self.enabled:
+            self.records += records
+
+    def to_dataframe (self):
+        """get the records as a DataFrame
+
+        Returns
+        -------
+        DataFrame
+            one row per step measured, with COLUMNS
+        """
+        return DataFrame(self.records, columns = COLUMNS)
+
+    def summarize (self):
+        """aggregate the records per community and per component
+
+        Returns
+        -------
+        DataFrame
+            totals for each community (component 'all components'), and each
+        component and step (community 'all communities'), with a 'calls'
+        column
+        """
+        data = self.to_dataframe()
+        measures = COLUMNS[3:]
+        data['calls'] = 1
+        measures = measures + ['calls']
+
+        by_community = data.groupby('community')[measures].sum()
+        by_community['component'] = 'all components'
+        by_community['step'] = 'all steps'
+        by_community = by_community.reset_index()
+
+        by_component = data.groupby(['component', 'step'])[measures].sum()
+        by_component['community'] = 'all communities'
+        by_component = by_component.reset_index()
+
+        columns = COLUMNS[:3] + measures
+        summary = by_community[columns].append(by_component[columns],
+            ignore_index = True)
+        return summary.sort_values('wall seconds', ascending = False)
+
+    def save (self, directory):
+        """save the records, and their summary, as csv files
+
+        Parameters
+        ----------
+        directory: path
+            directory to save PROFILE_FILE and PROFILE_SUMMARY_FILE in
+        """
+        try:
+            os.makedirs(directory)
+        except OSError:
+            pass
+        self.to_dataframe().to_csv(os.path.join(directory, PROFILE_FILE),
+            index = False)
+        self.summarize().to_csv(
+            os.path.join(directory, PROFILE_SUMMARY_FILE), index = False)
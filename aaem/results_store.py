@@ -0,0 +1,728 @@
+"""
+Results Store
+-------------
+    Module for storing and loading the binary results of model runs
+
+    Results are stored in two files in a results directory. The data file
+holds one pickled block for each component, the community data, the
+forecast, and the diagnostics of each community run. The index file holds
+the name of each community/project run, and the name, offset and length of
+each of its blocks, so any community, or any single component, can be loaded
+without unpickling the rest of the results.
+
+    Objects shared between the blocks of a community (the CommunityData,
+its sections, the Forecast, the Diagnostics and prerequisite components) are
+stored once and pickled as references in the other blocks.
+
+    Results may be packed as slim records, see slim_record. Each component
+is stored as a ComponentRecord of its summary values (NPV, B/C ratio, IRR,
+LCOE, break-even cost, ...) and the yearly arrays the summaries use, the
+community data is stored without the input tables only the components use,
+and the forecast with only the tables the summaries use. The summaries and
+web summaries are generated from slim results like they are from full
+results.
+"""
+import os.path
+import hashlib
+import numbers
+import numpy as np
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+try:
+    from cStringIO import StringIO
+except ImportError:
+    from StringIO import StringIO
+
+DATA_FILE = 'results_store.pkl'
+INDEX_FILE = 'results_store_index.pkl'
+
+## results file used before the results store, only ever read
+LEGACY_FILE = 'binary_results.pkl'
+
+DIAGNOSTICS_BLOCK = '__diagnostics'
+COMMUNITY_DATA_BLOCK = 'community data'
+NON_COMPONENT_BLOCKS = [COMMUNITY_DATA_BLOCK, 'forecast', DIAGNOSTICS_BLOCK]
+
+def _is_container (value):
+    """test if a value is an array, DataFrame, or other container, rather
+    than a scalar or string
+    """
+    return hasattr(value, '__len__') and not isinstance(value, basestring)
+
+def _is_community_data (value):
+    """test if a value is a CommunityData, without importing it
+    """
+    return type(value).__name__ == 'CommunityData'
+
+def _is_forecast (value):
+    """test if a value is a Forecast, without importing it
+    """
+    return type(value).__name__ == 'Forecast'
+
+def _is_record_value (value):
+    """test if a value can be kept in a record: a scalar, a string, a numeric
+    array, or a list, tuple, or dict of those
+    """
+    if value is None or isinstance(value, (basestring, bool, numbers.Number,
+            np.number, np.bool_)):
+        return True
+    if isinstance(value, np.ndarray):
+        return value.dtype.kind != 'O'
+    if isinstance(value, (list, tuple)):
+        return all([_is_record_value(v) for v in value])
+    if isinstance(value, dict):
+        return all([_is_record_value(v) for v in value.itervalues()])
+    return False
+
+## references to the community data and forecast kept in component records
+RECORD_REFERENCES = ['cd', 'comp_specs', 'forecast']
+
+## getters of the summary values and arrays saved in component records
+RECORD_GETTERS = [
+    'get_NPV_benefits',
+    'get_NPV_costs',
+    'get_NPV_net_benefit',
+    'get_BC_ratio',
+    'get_net_benefit',
+    'get_diesel_prices',
+    'get_electricity_prices',
+    'get_fuel_total_saved',
+]
+
+## community data input tables the summaries use, all other tables of the
+## component sections are only used by the components, and are not kept in
+## the slim community data
+RECORD_INPUT_TABLES = [
+    ('Non-residential Energy Efficiency', 'consumption estimates'),
+    ('Non-residential Energy Efficiency', 'building inventory'),
+]
+
+## forecast tables the summaries use
+RECORD_FORECAST_TABLES = ['population', 'consumption', 'generation']
+
+
+class ComponentRecord (object):
+    """Compact record of the results of a component, stored in place of the
+    component in slim results
+
+    Parameters
+    ----------
+    component: AnnualSavings
+        a run component
+
+    Attributes
+    ----------
+    component_class: str
+        name of the class of the component
+    summary: dict
+        getter name -> value, for the getters in RECORD_GETTERS that the
+    component has values for
+    cd: dict
+        community section of the community data
+    comp_specs: dict
+        component section of the community data
+    forecast: Forecast
+        the forecast
+
+    The attributes of the component in its record_attributes (see
+    AnnualSavings.record_attributes), i.e. its summary scalars and yearly
+    arrays, are also kept
+    """
+
+    def __init__ (self, component):
+        """record a component
+
+        Parameters
+        ----------
+        component: AnnualSavings
+            a run component
+        """
+        self.component_class = type(component).__name__
+        self.summary = {}
+        for getter in RECORD_GETTERS:
+            try:
+                self.summary[getter] = getattr(component, getter)()
+            except StandardError:
+                ## the component does not have the getter, or was not
+                ## run far enough to have the value
+                pass
+
+        for key in RECORD_REFERENCES + \
+                getattr(component, 'record_attributes', []):
+            ## attributes are missing when the component did not run far
+            ## enough to set them
+            if key in component.__dict__:
+                setattr(self, key, component.__dict__[key])
+
+    def __repr__ (self):
+        return '<ComponentRecord of ' + self.component_class + '>'
+
+    def get_value (self, getter):
+        """get a recorded summary value
+
+        Parameters
+        ----------
+        getter: str
+            name of the component getter, i.e. 'get_NPV_benefits'
+
+        Returns
+        -------
+        object
+            the value returned by the getter of the component
+
+        Raises
+        ------
+        AttributeError
+            if the component did not have a value for the getter
+        """
+        try:
+            return self.summary[getter]
+        except KeyError:
+            raise AttributeError, (self.component_class + ' record has no '
+                'value for ' + getter)
+
+    def get_NPV_benefits (self):
+        """get the NPV of the benefits"""
+        return self.get_value('get_NPV_benefits')
+
+    def get_NPV_costs (self):
+        """get the NPV of the costs"""
+        return self.get_value('get_NPV_costs')
+
+    def get_NPV_net_benefit (self):
+        """get the NPV of the net benefit"""
+        return self.get_value('get_NPV_net_benefit')
+
+    def get_BC_ratio (self):
+        """get the benefit/cost ratio"""
+        return self.get_value('get_BC_ratio')
+
+    def get_net_benefit (self):
+        """get the yearly net benefit"""
+        return self.get_value('get_net_benefit')
+
+    def get_diesel_prices (self):
+        """get the yearly diesel prices"""
+        return self.get_value('get_diesel_prices')
+
+    def get_electricity_prices (self):
+        """get the yearly electricity prices"""
+        return self.get_value('get_electricity_prices')
+
+    def get_fuel_total_saved (self):
+        """get the yearly fuel saved"""
+        return self.get_value('get_fuel_total_saved')
+
+
+def community_data_record (community_data):
+    """get a slim record of the community data
+
+    Parameters
+    ----------
+    community_data: CommunityData
+        community data of the results
+
+    Returns
+    -------
+    CommunityData
+        a copy of community_data, without its intertie CommunityData
+    objects, or the tables in its component sections that are not in
+    RECORD_INPUT_TABLES. The community section is kept
+    """
+    record = community_data.__class__.__new__(community_data.__class__)
+    record.__dict__ = dict([(key, None if _is_community_data(value) \
+        else value) for key, value in community_data.__dict__.iteritems() \
+        if key != 'new_intertie_data'])
+    record.data = {}
+    for section, items in community_data.data.iteritems():
+        record.data[section] = dict([(item, value) for item, value \
+            in items.iteritems() if section == 'community' or \
+            (section, item) in RECORD_INPUT_TABLES or \
+            _is_record_value(value)])
+    return record
+
+def forecast_record (forecast):
+    """get a slim record of the forecast
+
+    Parameters
+    ----------
+    forecast: Forecast
+        forecast of the results
+
+    Returns
+    -------
+    Forecast
+        a copy of forecast with the community data, the tables in
+    RECORD_FORECAST_TABLES, and its scalar, string, and array attributes
+    """
+    record = forecast.__class__.__new__(forecast.__class__)
+    record.__dict__ = dict([(key, value) for key, value \
+        in forecast.__dict__.iteritems() if key == 'cd' or \
+        key in RECORD_FORECAST_TABLES or _is_record_value(value)])
+    return record
+
+def slim_record (item):
+    """get a slim record of a component, the community data, or the
+    forecast to store
+
+    Parameters
+    ----------
+    item: object
+        a component, the CommunityData, the Forecast, or any other result
+
+    Returns
+    -------
+    object
+        a ComponentRecord of a component, see community_data_record and
+    forecast_record for the community data and forecast, or item if it is
+    not one of those
+    """
+    if _is_community_data(item):
+        return community_data_record(item)
+    if _is_forecast(item):
+        return forecast_record(item)
+    if hasattr(item, 'get_NPV_benefits'):
+        return ComponentRecord(item)
+    return item
+
+def pack_community (comps_used, name = None, slim = False):
+    """pickle the results for a community into blocks for a ResultsStore
+
+    Parameters
+    ----------
+    comps_used: dict
+        excuted components, with the 'community data' and 'forecast'
+    name: str, optional
+        name to store results under, if not provided the community data
+    'file id' is used
+    slim: bool, optional
+        if True, store slim records of the components, community data, and
+    forecast, see slim_record
+
+    Returns
+    -------
+    tuple
+        (name, blocks), where blocks is a list of (block name, pickled
+    block)
+    """
+    community_data = comps_used[COMMUNITY_DATA_BLOCK]
+    if name is None:
+        name = community_data.get_item('community', 'file id')
+
+    roots = [(key, comps_used[key]) for key in sorted(comps_used)]
+    roots.append((DIAGNOSTICS_BLOCK, community_data.diagnostics))
+
+    ## id of shared object -> (owner block, reference)
+    shared = {}
+    for key, obj in roots:
+        shared[id(obj)] = (key, ('block', key))
+    if slim:
+        records = [(key, slim_record(obj)) for key, obj in roots]
+        ## references to the original objects are still to their blocks
+        for key, obj in records:
+            shared[id(obj)] = (key, ('block', key))
+        roots = records
+        ## the containers kept in the community data record are stored once
+        record_data = dict(records)[COMMUNITY_DATA_BLOCK].data
+        for section in record_data:
+            for item, value in record_data[section].iteritems():
+                if _is_container(value):
+                    shared[id(value)] = (COMMUNITY_DATA_BLOCK,
+                        ('item', section, item))
+    shared[id(community_data.data)] = (COMMUNITY_DATA_BLOCK, ('data',))
+    for section in community_data.data:
+        shared[id(community_data.data[section])] = \
+            (COMMUNITY_DATA_BLOCK, ('section', section))
+
+    blocks = []
+    for key, obj in roots:
+        def persistent_id (item, key = key):
+            try:
+                owner, ref = shared[id(item)]
+            except KeyError:
+                return None
+            if owner == key:
+                return None
+            return ref
+
+        buf = StringIO()
+        pickler = pickle.Pickler(buf, pickle.HIGHEST_PROTOCOL)
+        pickler.persistent_id = persistent_id
+        pickler.dump(obj)
+        blocks.append((key, buf.getvalue()))
+    return name, blocks
+
+
+class ResultsStore (object):
+    """Indexed, random access binary results for a results directory
+
+    Parameters
+    ----------
+    directory: path
+        results directory
+
+    Attributes
+    ----------
+    directory: path
+        results directory
+    index: list
+        [name, [(block name, offset, length), ...]] for each community
+    or project stored, in the order they were stored
+    """
+
+    def __init__ (self, directory):
+        """Results store for a directory
+
+        Parameters
+        ----------
+        directory: path
+            results directory
+        """
+        self.directory = directory
+        self.data_file = os.path.join(directory, DATA_FILE)
+        self.index_file = os.path.join(directory, INDEX_FILE)
+        self.index = []
+        self.legacy = None
+
+        if os.path.isfile(self.index_file):
+            with open(self.index_file, 'rb') as idx:
+                self.index = pickle.load(idx)
+        elif os.path.isfile(os.path.join(directory, LEGACY_FILE)):
+            self.legacy = load_legacy_results(
+                os.path.join(directory, LEGACY_FILE)
+            )
+            self.index = [[k, [(b, None, None) for b in self.legacy[k]]] \
+                for k in self.legacy]
+
+        self.lookup = dict([(entry[0], i) for i, entry in \
+            enumerate(self.index)])
+
+    def exists (self):
+        """test if there are any stored results
+
+        Returns
+        -------
+        bool
+        """
+        return len(self.index) > 0
+
+    def clear (self):
+        """Remove all stored results
+        """
+        for f in [self.data_file, self.index_file]:
+            if os.path.isfile(f):
+                os.remove(f)
+        self.index = []
+        self.lookup = {}
+        self.legacy = None
+
+    def add (self, comps_used, name = None, replace = False, slim = False):
+        """Store the results for a community
+
+        Parameters
+        ----------
+        comps_used: dict
+            excuted components, with the 'community data' and 'forecast'
+        name: str, optional
+            name to store results under, if not provided the community data
+        'file id' is used
+        replace: bool, optional
+            if True, results already stored under name are replaced
+        slim: bool, optional
+            if True, store slim records, see pack_community
+
+        Returns
+        -------
+        str
+            name results were stored under
+        """
+        return self.add_packed(pack_community(comps_used, name, slim), replace)
+
+    def add_packed (self, packed, replace = False):
+        """Store the results for a community packed with pack_community
+
+        Parameters
+        ----------
+        packed: tuple
+            (name, blocks) as returned by pack_community
+        replace: bool, optional
+            if True, results already stored under name are replaced
+
+        Returns
+        -------
+        str
+            name results were stored under, if name is already used, and
+        replace is False, ' #<n>' is appended to it
+        """
+        if not self.legacy is None:
+            raise IOError, ('Results in ' + self.directory + ' use the '
+                'legacy format and cannot be added to')
+        name, blocks = packed
+
+        key = name
+        i = 0
+        while key in self.lookup and not replace:
+            key = key.split(' #')[0] + ' #' + str(i)
+            i += 1
+
+        entry = []
+        with open(self.data_file, 'ab') as data:
+            data.seek(0, os.SEEK_END)
+            for block, text in blocks:
+                entry.append((block, data.tell(), len(text)))
+                data.write(text)
+
+        if key in self.lookup:
+            ## the replaced blocks are left in the data file until compact
+            self.index[self.lookup[key]][1] = entry
+        else:
+            self.lookup[key] = len(self.index)
+            self.index.append([key, entry])
+        self.save_index()
+        return key
+
+    def remove (self, name):
+        """Remove the results for a community. The blocks are left in the
+        data file until compact is called
+
+        Parameters
+        ----------
+        name: str
+            a stored community or project
+        """
+        del self.index[self.lookup[name]]
+        self.lookup = dict([(entry[0], i) for i, entry in \
+            enumerate(self.index)])
+        self.save_index()
+
+    def unused_bytes (self):
+        """get the size of the blocks of replaced or removed results left in
+        the data file
+
+        Returns
+        -------
+        int
+        """
+        if not self.legacy is None or not os.path.isfile(self.data_file):
+            return 0
+        used = sum([b[2] for entry in self.index for b in entry[1]])
+        return os.path.getsize(self.data_file) - used
+
+    def compact (self):
+        """Rewrite the data file without the blocks of replaced or removed
+        results, if there are any
+
+        Returns
+        -------
+        bool
+            True if the data file was rewritten
+        """
+        if not self.legacy is None or not self.exists() or \
+                self.unused_bytes() == 0:
+            return False
+        temp_file = self.data_file + '.tmp'
+        index = []
+        with open(self.data_file, 'rb') as data, \
+                open(temp_file, 'wb') as out:
+            for name, entry in self.index:
+                new_entry = []
+                for block, offset, length in entry:
+                    data.seek(offset)
+                    new_entry.append((block, out.tell(), length))
+                    out.write(data.read(length))
+                index.append([name, new_entry])
+        os.rename(temp_file, self.data_file)
+        self.index = index
+        self.save_index()
+        return True
+
+    def save_index (self):
+        """save the index file
+        """
+        with open(self.index_file, 'wb') as idx:
+            pickle.dump(self.index, idx, pickle.HIGHEST_PROTOCOL)
+
+    def keys (self):
+        """get the names of the stored communities and projects
+
+        Returns
+        -------
+        list
+            names, in the order they were stored
+        """
+        return [entry[0] for entry in self.index]
+
+    def components (self, name):
+        """get the names of the components stored for a community
+
+        Parameters
+        ----------
+        name: str
+            a stored community or project
+
+        Returns
+        -------
+        list
+            component names
+        """
+        return [b[0] for b in self.index[self.lookup[name]][1] \
+            if not b[0] in NON_COMPONENT_BLOCKS]
+
+    def get (self, name, component = None):
+        """load the results for a community
+
+        Parameters
+        ----------
+        name: str
+            a stored community or project
+        component: str, optional
+            if provided only load this item(a component, 'community data',
+        or 'forecast') and what it references
+
+        Returns
+        -------
+        dict or object
+            dictionary of excuted components, with the 'community data' and
+        'forecast', like those stored, or the requested item
+        """
+        if not self.legacy is None:
+            if component is None:
+                return self.legacy[name]
+            return self.legacy[name][component]
+
+        blocks = dict([(b[0], b[1:]) for b in self.index[self.lookup[name]][1]])
+        loaded = {}
+        with open(self.data_file, 'rb') as data:
+            if not component is None:
+                return self._load_block(data, blocks, loaded, component)
+
+            return dict([(b, self._load_block(data, blocks, loaded, b)) \
+                for b in blocks if b != DIAGNOSTICS_BLOCK])
+
+    def digest (self, name):
+        """get a digest of the stored results for a community, without its
+        diagnostics, which change every time it is run
+
+        Parameters
+        ----------
+        name: str
+            a stored community or project
+
+        Returns
+        -------
+        str
+            hex digest, the same for results stored from the same
+        components
+        """
+        digest = hashlib.sha1()
+        if not self.legacy is None:
+            digest.update(pickle.dumps(self.legacy[name],
+                pickle.HIGHEST_PROTOCOL))
+            return digest.hexdigest()
+
+        entry = self.index[self.lookup[name]][1]
+        with open(self.data_file, 'rb') as data:
+            for block, offset, length in sorted(entry):
+                if block == DIAGNOSTICS_BLOCK:
+                    continue
+                data.seek(offset)
+                digest.update(block + '\0')
+                digest.update(data.read(length))
+        return digest.hexdigest()
+
+    def iteritems (self):
+        """iterate over the stored results without loading them all at once
+
+        Yields
+        ------
+        tuple
+            (name, dictionary of excuted components) in the order they were
+        stored
+        """
+        for name in self.keys():
+            yield name, self.get(name)
+
+    def load_all (self):
+        """load all of the stored results
+
+        Returns
+        -------
+        dict
+            results as a dictionary of communities
+        """
+        return dict(self.iteritems())
+
+    def _load_block (self, data, blocks, loaded, block):
+        """load a block and the blocks it references
+
+        Parameters
+        ----------
+        data: file
+            the open data file
+        blocks: dict
+            block name -> (offset, length) for a community
+        loaded: dict
+            blocks already loaded for the community
+        block: str
+            block to load
+
+        Returns
+        -------
+        object
+            the unpickled block
+        """
+        try:
+            return loaded[block]
+        except KeyError:
+            pass
+
+        def persistent_load (ref):
+            if ref[0] == 'block':
+                return self._load_block(data, blocks, loaded, ref[1])
+            community_data = self._load_block(data, blocks, loaded,
+                COMMUNITY_DATA_BLOCK)
+            if ref[0] == 'data':
+                return community_data.data
+            if ref[0] == 'item':
+                return community_data.data[ref[1]][ref[2]]
+            return community_data.data[ref[1]]
+
+        offset, length = blocks[block]
+        data.seek(offset)
+        unpickler = pickle.Unpickler(StringIO(data.read(length)))
+        unpickler.persistent_load = persistent_load
+        loaded[block] = unpickler.load()
+        return loaded[block]
+
+
+def load_legacy_results (picklename):
+    """load results from an append only pickle file used before the
+    results store
+
+    Parameters
+    ----------
+    picklename: path
+        path to binary_results.pkl
+
+    Returns
+    -------
+    dict
+        results as a dictionary of communities
+    """
+    results = {}
+    with open(picklename, 'rb') as pkl:
+        while True:
+            try:
+                temp = pickle.load(pkl)
+                key = temp[0]
+                i = 0
+                while key in results.keys():
+                    key = key.split(' #')[0] + ' #' + str(i)
+                    i += 1
+
+                results[key] = temp[1]
+            except:
+                break
+    return results
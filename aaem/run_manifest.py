@@ -0,0 +1,244 @@
+"""
+Run Manifest
+------------
+    Module for tracking the inputs of the communities in a results directory
+
+    The manifest records a digest of the inputs of each community run in a
+results directory (the community config and its intertie config, the configs
+of the community the Transmission component connects to, the global config,
+the scalers, and the model version), and the name its results are stored
+under. When the model is run again with the same inputs, the stored
+results can be reused.
+"""
+import os.path
+import hashlib
+import yaml
+
+from aaem import __version__
+from aaem.config_IO import read_config
+
+MANIFEST_FILE = 'run_manifest.yaml'
+
+def run_key (run):
+    """get the key a run is recorded under in the manifest
+
+    Parameters
+    ----------
+    run: dict
+        keyword arguments for Driver.run
+
+    Returns
+    -------
+    str
+        the runs alt_save_name, or community config
+    """
+    try:
+        if not run['alt_save_name'] is None:
+            return run['alt_save_name']
+    except KeyError:
+        pass
+    return str(run['community_config'])
+
+def get_intertie_config (community_config):
+    """get the path of the intertie config file CommunityData would load
+    for a community config file
+
+    Parameters
+    ----------
+    community_config: path
+        community config yaml file
+
+    Returns
+    -------
+    path or None
+        intertie config yaml file, if there is one
+    """
+    try:
+        intertie = read_config(community_config)['community']['intertie']
+        it_file = intertie[0].replace(' ','_').replace("'",'') + \
+            '_intertie.yaml'
+    except (KeyError, TypeError, IndexError, AttributeError):
+        return None
+    it_file = os.path.join(os.path.split(community_config)[0], it_file)
+    if os.path.isfile(it_file):
+        return it_file
+    return None
+
+def get_transmission_configs (community_config):
+    """get the paths of the config files of the community the Transmission
+    component loads with load_other_community for a community config file
+
+    Parameters
+    ----------
+    community_config: path
+        community config yaml file
+
+    Returns
+    -------
+    list
+        the other community's config yaml file, and its intertie config
+    yaml file, of those that exist
+    """
+    try:
+        config = read_config(community_config)
+        com = config['Transmission and Interties'][
+            'nearest community with lower price']
+    except (KeyError, TypeError):
+        return []
+    if com is None or com == '':
+        return []
+    intertie = config.get('community', {}).get('intertie', None)
+    if type(intertie) is list and com in intertie:
+        return []
+
+    path = os.path.join(os.path.split(community_config)[0],
+        str(com).replace(' ','_'))
+    files = []
+    for config_file in [path + '.yaml', path + '_intertie.yaml']:
+        if os.path.isfile(config_file):
+            files.append(config_file)
+    return files
+
+def run_digest (run):
+    """get a digest of the inputs to a run
+
+    Parameters
+    ----------
+    run: dict
+        keyword arguments for Driver.run
+
+    Returns
+    -------
+    str
+        hex digest
+    """
+    digest = hashlib.sha1()
+    digest.update(__version__)
+
+    community_config = run['community_config']
+    files = [community_config]
+    if type(community_config) is str and os.path.isfile(community_config):
+        files.append(get_intertie_config(community_config))
+        files += get_transmission_configs(community_config)
+    files.append(run.get('global_config', None))
+
+    for item in files:
+        digest.update('\0')
+        if type(item) is str and os.path.isfile(item):
+            with open(item, 'rb') as fd:
+                digest.update(fd.read())
+        else:
+            digest.update(repr(item))
+
+    scalers = run.get('scalers', None)
+    if not scalers is None:
+        scalers = sorted(scalers.items())
+    digest.update('\0' + repr(scalers))
+    return digest.hexdigest()
+
+
+class RunManifest (object):
+    """Digests of the inputs of the communities in a results directory
+
+    Parameters
+    ----------
+    directory: path
+        results directory
+
+    Attributes
+    ----------
+    directory: path
+        results directory
+    entries: dict
+        run key -> {'digest': input digest, 'name': name in results store}
+    """
+
+    def __init__ (self, directory):
+        """Run manifest for a directory
+
+        Parameters
+        ----------
+        directory: path
+            results directory
+        """
+        self.directory = directory
+        self.manifest_file = os.path.join(directory, MANIFEST_FILE)
+        self.entries = {}
+        if os.path.isfile(self.manifest_file):
+            with open(self.manifest_file, 'r') as fd:
+                self.entries = yaml.load(fd) or {}
+
+    def save (self):
+        """save the manifest file
+        """
+        try:
+            os.makedirs(self.directory)
+        except OSError:
+            pass
+        with open(self.manifest_file, 'w') as fd:
+            yaml.dump(self.entries, fd, default_flow_style = False)
+
+    def keys (self):
+        """get the recorded run keys
+
+        Returns
+        -------
+        list
+        """
+        return self.entries.keys()
+
+    def get_name (self, key):
+        """get the name the results of a recorded run are stored under
+
+        Parameters
+        ----------
+        key: str
+            run key
+
+        Returns
+        -------
+        str
+        """
+        return self.entries[key]['name']
+
+    def is_current (self, run):
+        """test if a run is recorded with the same inputs
+
+        Parameters
+        ----------
+        run: dict
+            keyword arguments for Driver.run
+
+        Returns
+        -------
+        bool
+        """
+        try:
+            entry = self.entries[run_key(run)]
+        except KeyError:
+            return False
+        return entry['digest'] == run_digest(run)
+
+    def record (self, run, name):
+        """record a run and save the manifest
+
+        Parameters
+        ----------
+        run: dict
+            keyword arguments for Driver.run
+        name: str
+            name the results of the run are stored under
+        """
+        self.entries[run_key(run)] = {'digest': run_digest(run), 'name': name}
+        self.save()
+
+    def remove (self, key):
+        """remove a run and save the manifest
+
+        Parameters
+        ----------
+        key: str
+            run key
+        """
+        del self.entries[key]
+        self.save()
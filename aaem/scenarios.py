@@ -0,0 +1,138 @@
+"""
+Scenarios
+---------
+    Module for evaluating many sets of scalers for a community at once
+
+    Scenarios are dictionaries of scalers, like those in run scripts. The
+scalers that change the inputs of the components ('diesel price',
+'diesel price adder', and 'kWh consumption') need a run of the components,
+so scenarios are grouped by them and the components are run once per group.
+The 'capital costs' scaler only changes the financial results, so all of the
+capital costs in a group are evaluated together, as arrays of scenarios, from
+the components of the groups run.
+"""
+import numpy as np
+from pandas import DataFrame
+
+## scalers that change the component inputs
+RUN_SCALERS = ['diesel price', 'diesel price adder', 'kWh consumption']
+
+SCENARIO_COLUMNS = [
+    'scenario', 'component', 'diesel price', 'diesel price adder',
+    'kWh consumption', 'capital costs scaler', 'capital costs',
+    'benefit npv', 'cost npv', 'net npv', 'benefit cost ratio', 'irr',
+    'break even cost', 'levelized cost of energy',
+    'levelized cost of energy (MMBtu)', 'levelized cost of energy (kWh)',
+]
+
+def fill_scalers (scenario, default_scalers):
+    """fill in the missing scalers of a scenario
+
+    Parameters
+    ----------
+    scenario: dict
+        scalers for a scenario, may be missing scalers
+    default_scalers: dict
+        default values of all scalers
+
+    Returns
+    -------
+    dict
+        scalers, with all keys of default_scalers
+    """
+    scalers = dict(default_scalers)
+    scalers.update(scenario)
+    return scalers
+
+def group_scenarios (scenarios):
+    """group scenarios by the scalers that require a run of the components
+
+    Parameters
+    ----------
+    scenarios: list
+        list of dicts of scalers, with all scalers
+
+    Returns
+    -------
+    list
+        [(run scalers, indices of scenarios in the group), ...] in the order
+    each group first appears in scenarios
+    """
+    groups = []
+    lookup = {}
+    for idx, scalers in enumerate(scenarios):
+        key = tuple([scalers[s] for s in RUN_SCALERS])
+        if not key in lookup:
+            lookup[key] = len(groups)
+            groups.append((dict(zip(RUN_SCALERS, key)), []))
+        groups[lookup[key]][1].append(idx)
+    return groups
+
+def evaluate_group (comps_used, comp_order, scenarios, indices):
+    """evaluate the capital cost scalers of a group of scenarios on the
+    components run for the group
+
+    Parameters
+    ----------
+    comps_used: dict
+        excuted components for the group
+    comp_order: list
+        order of components in the results
+    scenarios: list
+        list of dicts of scalers, with all scalers
+    indices: list
+        indices of the scenarios in the group
+
+    Returns
+    -------
+    list
+        list of dicts, one per component and scenario, with keys from
+    SCENARIO_COLUMNS
+    """
+    capital_scalers = np.array(
+        [scenarios[idx]['capital costs'] for idx in indices],
+        dtype = float
+    )
+    rows = []
+    for comp in comp_order:
+        try:
+            results = comps_used[comp].calc_capital_cost_scenarios(
+                capital_scalers
+            )
+        except (KeyError, AttributeError):
+            ## not run, not a financial component, or not financially modeled
+            continue
+        for i, idx in enumerate(indices):
+            row = {'scenario': idx, 'component': comp}
+            for scaler in RUN_SCALERS:
+                row[scaler] = scenarios[idx][scaler]
+            row['capital costs scaler'] = capital_scalers[i]
+            for key in results:
+                row[key] = results[key][i]
+            rows.append(row)
+    return rows
+
+def scenarios_to_dataframe (rows, comp_order):
+    """create the scenario table
+
+    Parameters
+    ----------
+    rows: list
+        rows from evaluate_group
+    comp_order: list
+        order of components in the results
+
+    Returns
+    -------
+    DataFrame
+        one row per scenario and component, ordered by scenario, then
+    component
+    """
+    position = dict([(c, i) for i, c in enumerate(comp_order)])
+    rows = sorted(rows, key = lambda r: (r['scenario'],
+        position[r['component']]))
+    table = DataFrame(rows, columns = SCENARIO_COLUMNS)
+    ## drop levelized cost columns that do not apply to any component
+    unused = [c for c in SCENARIO_COLUMNS \
+        if c.startswith('levelized') and table[c].isnull().all()]
+    return table.drop(unused, axis = 1).set_index('scenario')
@@ -0,0 +1,284 @@
+"""
+Sensitivity
+-----------
+    Module for sensitivity (tornado) analysis of the financial results of the
+components of a community
+
+    Each numeric input in the config section of a component, and each of the
+community prices, is changed down and up by a relative amount, one at a time,
+and the swing in the net present value and benefit cost ratio of the
+components is found. The community data and forecast are loaded once for a
+community and shared by all of the changes, each change starts from a copy of
+the community data inputs, as components fill estimates in to them. A change
+to a component input only re-runs the component, and the components that
+depend on it through the component prerequisites, the other components are
+reused from the base run. A change to a community price
+re-runs all of the components.
+
+    The settings for a sensitivity analysis are a dictionary:
+
+    amount: relative change of each input (default: .1, for +/- 10%)
+    amounts: input key -> relative change, for inputs with a different change
+    components: components to change the inputs of (default: all enabled)
+    exclude: input keys that are not changed (default: EXCLUDED_INPUTS)
+    prices: if the community prices are changed (default: True)
+"""
+import numpy as np
+from pandas import DataFrame
+
+## community prices that can be changed, 'diesel prices' is changed like the
+## 'diesel price' scaler, so it carries over in to the electric prices
+PRICE_INPUTS = [
+    'diesel prices',
+    'electric non-fuel price',
+    'residential non-PCE electric price',
+    'heating fuel premium',
+    'propane price',
+    'cordwood price',
+    'pellet price',
+    'natural gas price',
+]
+
+## component inputs that are not changed by default
+EXCLUDED_INPUTS = ['start year']
+
+## metric -> component function that returns it
+METRICS = [
+    ('net npv', 'get_NPV_net_benefit'),
+    ('benefit cost ratio', 'get_BC_ratio'),
+]
+
+SENSITIVITY_COLUMNS = [
+    'component', 'metric', 'rank', 'section', 'input', 'base value',
+    'low value', 'high value', 'base result', 'low result', 'high result',
+    'swing',
+]
+
+def is_numeric (value):
+    """test if a config value is a number that can be changed
+
+    Parameters
+    ----------
+    value: any
+        config value
+
+    Returns
+    -------
+    bool
+        True for ints and floats that are not bools, nan, or 0
+    """
+    if isinstance(value, bool) or not isinstance(value,
+            (int, long, float, np.integer, np.floating)):
+        return False
+    return np.isfinite(value) and value != 0
+
+def get_dependents (registry, run_order, comp):
+    """get a component and the components that depend on it
+
+    Parameters
+    ----------
+    registry: dict
+        component name -> ComponentInfo
+    run_order: list
+        order components are run in
+    comp: str
+        component name
+
+    Returns
+    -------
+    list
+        comp, and every component with comp as a direct or indirect
+    prerequisite, in run order
+    """
+    dependents = set([comp])
+    for name in run_order:
+        if len(dependents.intersection(registry[name].prereqs)) > 0:
+            dependents.add(name)
+    return [name for name in run_order if name in dependents]
+
+def find_inputs (community_data, components, registry, settings):
+    """find the inputs to change
+
+    Parameters
+    ----------
+    community_data: CommunityData
+        community data for the community
+    components: list
+        components to change the inputs of
+    registry: dict
+        component name -> ComponentInfo
+    settings: dict
+        sensitivity settings, see module documentation
+
+    Returns
+    -------
+    list
+        (section, key) of each input, the community prices are in the
+    'community' section
+    """
+    exclude = settings.get('exclude', EXCLUDED_INPUTS)
+    inputs = []
+    if settings.get('prices', True):
+        for key in PRICE_INPUTS:
+            value = community_data.get_item('community', key)
+            if key == 'diesel prices' or is_numeric(value):
+                inputs.append(('community', key))
+    for comp in components:
+        section = community_data.get_section(comp)
+        for key in registry[comp].config.order:
+            if key in exclude or not key in section:
+                continue
+            if is_numeric(section[key]):
+                inputs.append((comp, key))
+    return inputs
+
+def get_amount (key, settings):
+    """get the relative change of an input
+
+    Parameters
+    ----------
+    key: str
+        input key
+    settings: dict
+        sensitivity settings, see module documentation
+
+    Returns
+    -------
+    float
+    """
+    amounts = settings.get('amounts', None) or {}
+    return float(amounts.get(key, settings.get('amount', .1)))
+
+def change_value (value, factor):
+    """change a config value by a factor, ints stay ints and change by at
+    least 1
+
+    Parameters
+    ----------
+    value: int or float
+        config value
+    factor: float
+        factor to multiply the value by
+
+    Returns
+    -------
+    int or float
+        changed value
+    """
+    if isinstance(value, (int, long, np.integer)):
+        changed = int(round(value * factor))
+        if changed == value:
+            changed = value + int(np.sign(factor - 1) * np.sign(value))
+        return changed
+    return value * factor
+
+def change_input (community_data, section, key, factor):
+    """change an input of the community data
+
+    Parameters
+    ----------
+    community_data: CommunityData
+        community data for the community, it is modified
+    section: str
+        config section
+    key: str
+        config key
+    factor: float
+        factor to multiply the input by
+
+    Returns
+    -------
+    tuple
+        (changed value, originals), originals are the values to restore with
+    restore_inputs, as a list of (section, key, value). For 'diesel prices'
+    the changed value is the factor
+    """
+    if section == 'community' and key == 'diesel prices':
+        originals = [(section, k, community_data.get_item(section, k)) \
+            for k in ['diesel prices', 'electric prices']]
+        community_data.apply_scalers(
+            {'diesel price': factor, 'diesel price adder': 0}
+        )
+        return factor, originals
+
+    value = community_data.get_item(section, key)
+    originals = [(section, key, value)]
+    changed = change_value(value, factor)
+    community_data.set_item(section, key, changed)
+    if section == 'community' and key == 'electric non-fuel price':
+        ## electric prices are the non-fuel price plus the fuel price
+        prices = community_data.get_item(section, 'electric prices')
+        originals.append((section, 'electric prices', prices))
+        community_data.set_item(section, 'electric prices',
+            prices + (changed - value))
+    return changed, originals
+
+def restore_inputs (community_data, originals):
+    """restore the inputs changed by change_input
+
+    Parameters
+    ----------
+    community_data: CommunityData
+        community data for the community, it is modified
+    originals: list
+        (section, key, value) from change_input
+    """
+    for section, key, value in originals:
+        community_data.set_item(section, key, value)
+
+def get_results (comps_used, components):
+    """get the financial results of components
+
+    Parameters
+    ----------
+    comps_used: dict
+        excuted components
+    components: list
+        components to get the results of
+
+    Returns
+    -------
+    dict
+        (component, metric) -> value, nan where a component does not have
+    a numeric result
+    """
+    results = {}
+    for comp in components:
+        for metric, function in METRICS:
+            try:
+                value = float(getattr(comps_used[comp], function)())
+            except (KeyError, AttributeError, TypeError, ValueError):
+                value = np.nan
+            results[comp, metric] = value
+    return results
+
+def to_dataframe (rows, comp_order):
+    """create the sensitivity table
+
+    Parameters
+    ----------
+    rows: list
+        dicts with keys from SENSITIVITY_COLUMNS, except rank
+    comp_order: list
+        order of components in the results
+
+    Returns
+    -------
+    DataFrame
+        one row per component, metric, and input. Inputs are ranked by swing,
+    the absolute difference between the high and low results, for each
+    component and metric, and inputs that do not change a result are dropped
+    """
+    position = dict([(c, i) for i, c in enumerate(comp_order)])
+    metrics = [m for m, f in METRICS]
+    rows = [r for r in rows if np.isfinite(r['swing']) and r['swing'] > 0]
+    rows = sorted(rows, key = lambda r: (position[r['component']],
+        metrics.index(r['metric']), -r['swing'], r['section'], r['input']))
+    last = None
+    for row in rows:
+        if (row['component'], row['metric']) != last:
+            rank = 0
+            last = (row['component'], row['metric'])
+        rank += 1
+        row['rank'] = rank
+    return DataFrame(rows, columns = SENSITIVITY_COLUMNS)
@@ -2,24 +2,35 @@
 summaries.py
 ross spicer
 
-functions for the creation of log and summary files form model results 
+functions for the creation of log and summary files form model results
+
+    Each summary is made by a collector (see aaem.summary_collectors) that is
+given the results of one community at a time, so all of the summaries can be
+made in one pass over a results store, see get_summary_collectors and
+save_summaries. The functions that take a dictionary of results for all
+communities (building_log, village_log, ...) use the same collectors.
 """
 from pandas import DataFrame, read_csv, concat
 import os
+import yaml
 import numpy as np
-from importlib import import_module
 
 from constants import mmbtu_to_kWh, mmbtu_to_gal_HF
 from constants import mmbtu_to_gal_LP, mmbtu_to_Mcf, mmbtu_to_cords
-from aaem.components import comp_lib
+from aaem.components import comp_lib, get_registry
+from aaem.summary_collectors import SummaryCollector, RowCollector
+from aaem.summary_collectors import run_collectors
+from aaem.summary_collectors import run_collectors_incremental
 from copy import deepcopy
 
+SUMMARY_MANIFEST = 'summary_manifest.yaml'
+
 def building_log(coms, res_dir):
     """
     creates a log for the non-residental component buildings outputs by community
-    
+
     pre:
-        coms: the run model outputs: a dictionary 
+        coms: the run model outputs: a dictionary
                     {<"community_name">:
                         {'model':<a run driver object>,
                         'output dir':<a path to the given communities outputs>
@@ -27,121 +38,153 @@ def building_log(coms, res_dir):
                      ... repeated for each community
                     }
         res_dir: directory to save the log in
-    
+
     post:
-        a csv file "non-residential_summary.csv"log is saved in res_dir   
-    
+        a csv file "non-residential_summary.csv"log is saved in res_dir
+
     """
-    out = []
-    #~ print 'NRB LOG'
-    for c in sorted(coms.keys()):
-        if c.find('+') != -1 or c.find("_intertie") != -1:
+    run_collectors([get_building_log_collector()], coms.iteritems(), res_dir)
+
+def get_building_log_collector ():
+    """
+    get the collector for the non-residental component buildings log
+
+    pre:
+        none
+    post:
+        returns a RowCollector
+    """
+    return RowCollector(building_log_row, save_building_log,
+        (KeyError, AttributeError, ZeroDivisionError))
+
+def building_log_row (c, results):
+    """
+    get the row of the non-residental component buildings log for a community
+
+    pre:
+        c: community name
+        results: the run model outputs for the community
+    post:
+        returns (building types, row), or None if the community is not in the
+            log
+    """
+    if c.find('+') != -1 or c.find("_intertie") != -1:
+        return None
+    com = results['Non-residential Energy Efficiency']
+
+    #~ print  coms[c]['community data'].get_section('Non-residential Energy Efficiency')
+    types = results['community data'].get_item(
+        'Non-residential Energy Efficiency', "consumption estimates").index
+    estimates = deepcopy(com.comp_specs["building inventory"]).fillna(0)
+
+    estimates = estimates.set_index('Building Type')
+    estimates = estimates.astype(float)
+
+
+    #~ print estimates
+
+    num  = 0
+    try:
+
+        if 'Average' in set(estimates.ix['Average'].index):
+            num = len(estimates.ix['Average'])
+        else:
+            num = 1
+
+    except KeyError:
+        pass
+    estimates = estimates.groupby(estimates.index).sum()
+    try:
+        estimates.ix["Unknown"] =  estimates.ix["Average"]
+        estimates = estimates[estimates.index != "Average"]
+    except KeyError:
+        pass
+    count = []
+    act = []
+    est = []
+    elec = []
+    hf = []
+
+    #~ print types
+    for t in types:
+        if t in ['Water & Sewer',]:
             continue
         try:
-            com = coms[c]['Non-residential Energy Efficiency']
-            
-            #~ print  coms[c]['community data'].get_section('Non-residential Energy Efficiency')
-            types = coms[c]['community data'].get_item('Non-residential Energy Efficiency',
-                                                "consumption estimates").index
-            estimates = deepcopy(com.comp_specs["building inventory"]).fillna(0)
-            
-            estimates = estimates.set_index('Building Type')
-            estimates = estimates.astype(float)
-
-            
-            #~ print estimates
-            
-            num  = 0
-            try:
-                
-                if 'Average' in set(estimates.ix['Average'].index):
-                    num = len(estimates.ix['Average'])
-                else:
-                    num = 1
-                
-            except KeyError:
-                pass
-            estimates = estimates.groupby(estimates.index).sum()
-            try:
-                estimates.ix["Unknown"] =  estimates.ix["Average"] 
-                estimates = estimates[estimates.index != "Average"]
-            except KeyError:
-                pass
-            count = []
-            act = []
-            est = []
-            elec = []
-            hf = []
-            
-            #~ print types
-            for t in types:
-                if t in ['Water & Sewer',]:
-                    continue
-                try:
-                    n = 0
-                    sf_m = np.nan
-                    sf_e = np.nan
-                    elec_used = np.nan
-                    hf_used = np.nan
-                    if t == 'Average':
-                        
-                        n = num
-                        sf_e = estimates['Square Feet']['Unknown']
-                        hf_used = \
-                            estimates['Fuel Oil']['Unknown']/mmbtu_to_gal_HF + \
-                            estimates['Natural Gas']['Unknown']/mmbtu_to_Mcf + \
-                            estimates['Propane']['Unknown']/mmbtu_to_gal_LP + \
-                            estimates['HW District']['Unknown']/mmbtu_to_cords
-                        elec_used = estimates['Electric']['Unknown']/mmbtu_to_kWh
-                    else:
-                        n = com.buildings_df['count'][t]
-                        sf_e = estimates['Square Feet'][t]
-                        hf_used = \
-                            estimates['Fuel Oil'][t]/mmbtu_to_gal_HF + \
-                            estimates['Natural Gas'][t]/mmbtu_to_Mcf + \
-                            estimates['Propane'][t]/mmbtu_to_gal_LP + \
-                            estimates['HW District'][t]/mmbtu_to_gal_HF +\
-                            estimates['Biomass'][t]/mmbtu_to_cords
-                        #~ print hf_used
-                        elec_used = estimates['Electric'][t]/mmbtu_to_kWh
-                    
-                    
-                    sf_m = com.buildings_df['Square Feet'][t]
-                    
-                    
-                except KeyError as e:
-                    #~ print e
-                    pass
-                count.append(n)
-                act.append(sf_m)
-                est.append(sf_e)
-                elec.append(elec_used)
-                hf.append(hf_used)
-                
-            percent = com.buildings_df['Square Feet'].sum() /\
-                      estimates['Square Feet'].sum()
-            percent2 = float(com.buildings_df['count'].sum())/\
-                      (com.buildings_df['count'].sum()+num)
-            
-            if np.isnan(percent):
-                percent = 0.0
-                
-            if np.isnan(percent2):
-                percent2 = 0.0
-            
-            name = c
-            if name == 'Barrow':
-                name = 'Utqiagvik (Barrow)'
-            out.append([name,percent*100,percent2*100]+ count+act+est+elec+hf)
-            
-        except (KeyError,AttributeError, ZeroDivisionError)as e :
-            #~ print c +":"+ str(e)
+            n = 0
+            sf_m = np.nan
+            sf_e = np.nan
+            elec_used = np.nan
+            hf_used = np.nan
+            if t == 'Average':
+
+                n = num
+                sf_e = estimates['Square Feet']['Unknown']
+                hf_used = \
+                    estimates['Fuel Oil']['Unknown']/mmbtu_to_gal_HF + \
+                    estimates['Natural Gas']['Unknown']/mmbtu_to_Mcf + \
+                    estimates['Propane']['Unknown']/mmbtu_to_gal_LP + \
+                    estimates['HW District']['Unknown']/mmbtu_to_cords
+                elec_used = estimates['Electric']['Unknown']/mmbtu_to_kWh
+            else:
+                n = com.buildings_df['count'][t]
+                sf_e = estimates['Square Feet'][t]
+                hf_used = \
+                    estimates['Fuel Oil'][t]/mmbtu_to_gal_HF + \
+                    estimates['Natural Gas'][t]/mmbtu_to_Mcf + \
+                    estimates['Propane'][t]/mmbtu_to_gal_LP + \
+                    estimates['HW District'][t]/mmbtu_to_gal_HF +\
+                    estimates['Biomass'][t]/mmbtu_to_cords
+                #~ print hf_used
+                elec_used = estimates['Electric'][t]/mmbtu_to_kWh
+
+
+            sf_m = com.buildings_df['Square Feet'][t]
+
+
+        except KeyError as e:
+            #~ print e
             pass
-    #~ print out
-    try:
-        l = [n for n in types if n not in  ['Water & Sewer',]]
-    except UnboundLocalError:
+        count.append(n)
+        act.append(sf_m)
+        est.append(sf_e)
+        elec.append(elec_used)
+        hf.append(hf_used)
+
+    percent = com.buildings_df['Square Feet'].sum() /\
+              estimates['Square Feet'].sum()
+    percent2 = float(com.buildings_df['count'].sum())/\
+              (com.buildings_df['count'].sum()+num)
+
+    if np.isnan(percent):
+        percent = 0.0
+
+    if np.isnan(percent2):
+        percent2 = 0.0
+
+    name = c
+    if name == 'Barrow':
+        name = 'Utqiagvik (Barrow)'
+    return types, [name,percent*100,percent2*100]+ count+act+est+elec+hf
+
+def save_building_log (rows, res_dir):
+    """
+    save the non-residental component buildings log
+
+    pre:
+        rows: list of (building types, row) from building_log_row, sorted by
+            community
+        res_dir: directory to save the log in
+    post:
+        a csv file "non-residential_summary.csv"log is saved in res_dir, if
+            there are any rows
+    """
+    if len(rows) == 0:
         return
+    ## the building types of the last community are used, as they were
+    ## when this log was made from a dictionary of results
+    types = rows[-1][0]
+    out = [row for types_, row in rows]
+    l = [n for n in types if n not in  ['Water & Sewer',]]
     c = []
     e = []
     m = []
@@ -156,7 +199,7 @@ def building_log(coms, res_dir):
         ec.append("electricity used (mmbtu)")
         hf.append("heating fuel used (mmbtu)")
 
-    
+
     data = DataFrame(out,columns = ['community',
                                 '% sqft measured',
                                 '% buildings from inventory'] + l + l + l + l + l
@@ -172,15 +215,15 @@ def building_log(coms, res_dir):
              str(hf)[1:-1].replace("' ",'').replace("'",'') +'\n')
     fd.close()
     data.to_csv(f_name, mode='a')
-    
-    
-def village_log (coms, res_dir): 
+
+
+def village_log (coms, res_dir):
     """
         creates a log comparing the consumption and costs of the residential,
     non-residential, and water/wastewater components
-    
+
     pre:
-        coms: the run model outputs: a dictionary 
+        coms: the run model outputs: a dictionary
                     {<"community_name">:
                         {'model':<a run driver object>,
                         'output dir':<a path to the given communities outputs>
@@ -188,72 +231,101 @@ def village_log (coms, res_dir):
                      ... repeated for each community
                     }
         res_dir: directory to save the log in
-    
+
     post:
-        a csv file "village_sector_consumption_summary.csv"log is saved 
-    in res_dir   
-    
+        a csv file "village_sector_consumption_summary.csv"log is saved
+    in res_dir
+
+    """
+    run_collectors([get_village_log_collector()], coms.iteritems(), res_dir)
+
+def get_village_log_collector ():
+    """
+    get the collector for the village sector consumption log
+
+    pre:
+        none
+    post:
+        returns a RowCollector
+    """
+    return RowCollector(village_log_row, save_village_log, (AttributeError,))
+
+def village_log_row (c, results):
+    """
+    get the row of the village sector consumption log for a community
+
+    pre:
+        c: community name
+        results: the run model outputs for the community
+    post:
+        returns the row, or None if the community is not in the log
+    """
+    if c.find('+') != -1 or c.find("_intertie") != -1:
+        return None
+    start_year = results['community data'].get_item('community',
+                                                'current year')
+    #~ print coms[c]['forecast'].consumption.ix[start_year]['consumption']
+    consumption = \
+        int(results['forecast']\
+        .consumption.ix[start_year]['consumption'])
+    population = int(results['forecast'].population.ix[start_year])
+    try:
+        res = results['Residential Energy Efficiency']
+        res_con = [res.baseline_HF_consumption[0],
+                        res.baseline_kWh_consumption[0] / mmbtu_to_kWh]
+        res_cost = [res.baseline_HF_cost[0], res.baseline_kWh_cost[0]]
+    except KeyError:
+        res_con = [np.nan, np.nan]
+        res_cost = [np.nan, np.nan]
+    try:
+        com = results['Non-residential Energy Efficiency']
+        com_con = [com.baseline_HF_consumption,
+                    com.baseline_kWh_consumption / mmbtu_to_kWh]
+        com_cost = [com.baseline_HF_cost[0],com.baseline_kWh_cost[0]]
+    except KeyError:
+        com_con = [np.nan, np.nan]
+        com_cost = [np.nan, np.nan]
+    try:
+        ww = results['Water and Wastewater Efficiency']
+        ww_con = [ww.baseline_HF_consumption[0],
+                  ww.baseline_kWh_consumption[0] / mmbtu_to_kWh ]
+        ww_cost = [ww.baseline_HF_cost[0],ww.baseline_kWh_cost[0]]
+    except KeyError:
+        ww_con = [np.nan, np.nan]
+        ww_cost = [np.nan, np.nan]
+
+    name = c
+    if name == 'Barrow':
+        name = 'Utqiagvik (Barrow)'
+    return [name, consumption, population,
+         results['community data'].get_item('community','region')] +\
+         res_con + com_con + ww_con + res_cost + com_cost + ww_cost
+
+def save_village_log (out, res_dir):
+    """
+    save the village sector consumption log
+
+    pre:
+        out: rows from village_log_row, sorted by community
+        res_dir: directory to save the log in
+    post:
+        a csv file "village_sector_consumption_summary.csv"log is saved
+    in res_dir
     """
-    out = []
-    for c in sorted(coms.keys()):
-        if c.find('+') != -1 or c.find("_intertie") != -1:
-            continue
-        try:
-            start_year = coms[c]['community data'].get_item('community', 
-                                                        'current year')
-            #~ print coms[c]['forecast'].consumption.ix[start_year]['consumption']
-            consumption = \
-                int(coms[c]['forecast']\
-                .consumption.ix[start_year]['consumption'])
-            population = int(coms[c]['forecast'].population.ix[start_year])
-            try:
-                res = coms[c]['Residential Energy Efficiency']
-                res_con = [res.baseline_HF_consumption[0], 
-                                res.baseline_kWh_consumption[0] / mmbtu_to_kWh]
-                res_cost = [res.baseline_HF_cost[0], res.baseline_kWh_cost[0]]
-            except KeyError:
-                res_con = [np.nan, np.nan]
-                res_cost = [np.nan, np.nan]
-            try:
-                com = coms[c]['Non-residential Energy Efficiency']
-                com_con = [com.baseline_HF_consumption,
-                            com.baseline_kWh_consumption / mmbtu_to_kWh]
-                com_cost = [com.baseline_HF_cost[0],com.baseline_kWh_cost[0]]
-            except KeyError:
-                com_con = [np.nan, np.nan]
-                com_cost = [np.nan, np.nan]
-            try:
-                ww = coms[c]['Water and Wastewater Efficiency']
-                ww_con = [ww.baseline_HF_consumption[0],
-                          ww.baseline_kWh_consumption[0] / mmbtu_to_kWh ]
-                ww_cost = [ww.baseline_HF_cost[0],ww.baseline_kWh_cost[0]]
-            except KeyError:
-                ww_con = [np.nan, np.nan]
-                ww_cost = [np.nan, np.nan]
-                
-            name = c
-            if name == 'Barrow':
-                name = 'Utqiagvik (Barrow)'
-            t = [name, consumption, population, 
-                 coms[c]['community data'].get_item('community','region')] +\
-                 res_con + com_con + ww_con + res_cost + com_cost + ww_cost 
-            out.append(t)
-        except AttributeError:
-            pass
     start_year = 2017
     data = DataFrame(out,columns = ['community', 'consumption year 1 (kWh)',
                     'Population', 'Region',
-                    'Residential Heat (MMBTU)', 
+                    'Residential Heat (MMBTU)',
                     'Residential Electricity (MMBTU)',
-                    'Non-Residential Heat (MMBTU)', 
+                    'Non-Residential Heat (MMBTU)',
                     'Non-Residential Electricity (MMBTU)',
-                    'Water/Wastewater Heat (MMBTU)', 
+                    'Water/Wastewater Heat (MMBTU)',
                     'Water/Wastewater Electricity (MMBTU)',
-                    'Residential Heat (cost ' + str(start_year)+')', 
+                    'Residential Heat (cost ' + str(start_year)+')',
                     'Residential Electricity (cost ' + str(start_year)+')',
                     'Non-Residential Heat (cost ' + str(start_year)+')',
                     'Non-Residential Electricity (cost ' + str(start_year)+')',
-                    'Water/Wastewater Heat (cost ' + str(start_year)+')', 
+                    'Water/Wastewater Heat (cost ' + str(start_year)+')',
                     'Water/Wastewater Electricity (cost ' + str(start_year)+')',
                     ]
                     ).set_index('community')
@@ -262,78 +334,132 @@ def village_log (coms, res_dir):
     #~ fd.write("# summary of consumption and cost\n")
     #~ fd.close()
     data.to_csv(f_name, mode='w')
-    
+
 def fuel_oil_log (coms, res_dir):
     """
-    create a 
-    
+    create a log of the fuel oil used by utilities, and for heating, by
+    community
+
+    pre:
+        coms: the run model outputs: a dictionary of communities
+        res_dir: directory to save the log in
+    post:
+        a csv file "fuel_oil_summary.csv" is saved in res_dir
     """
-    out = []
-    for c in sorted(coms.keys()):
-        if c+"_intertie" in coms.keys():
-            continue
+    run_collectors([FuelOilCollector()], coms.iteritems(), res_dir)
+
+
+class FuelOilCollector (SummaryCollector):
+    """
+    collects the fuel oil log. The heating oil of an intertie
+    ("<community>_intertie") is from the components of the community it is
+    named for, and communities with an intertie are left out, so the values
+    needed are kept for each community and the rows are found when saving
+    """
+
+    def __init__ (self):
+        """
+        Class initialiser
+        pre:
+            none
+        post:
+            self.names, self.generation and self.heating are empty
+        """
+        self.names = set()
+        ## community -> (intertie status, efficiency, diesel generation)
+        self.generation = {}
+        ## community -> (start year, residential, non-residential, and
+        ## water/wastewater heating oil)
+        self.heating = {}
+
+    def add (self, name, results):
+        """
+        add the results for a community, see SummaryCollector.add
+        """
+        self.names.add(name)
         try:
-            it = coms[c]['community data'].intertie
+            it = results['community data'].intertie
             if it is None:
                 it = 'parent'
-                
-            if c.find("_intertie") == -1:
-                res = coms[c]['Residential Energy Efficiency']
-                com = coms[c]['Non-residential Energy Efficiency']
-                wat = coms[c]['Water and Wastewater Efficiency']
-            else:
-                k = c.replace("_intertie","")
-                res = coms[k]['Residential Energy Efficiency']
-                com = coms[k]['Non-residential Energy Efficiency']
-                wat = coms[k]['Water and Wastewater Efficiency']
-            
-            eff = coms[c]['community data'].get_item("community",
+            eff = results['community data'].get_item("community",
                                             "diesel generation efficiency")
             if eff == 0:
                 eff = np.nan
-            
-            year = res.start_year
-
             try:
-                elec = float(coms[c]['forecast'].generation[\
-                                "generation diesel"][year]) / eff
+                diesel = results['forecast'].generation["generation diesel"]
             except KeyError:
+                diesel = None
+            self.generation[name] = (it, eff, diesel)
+        except (KeyError, AttributeError):
+            pass
+        try:
+            res = results['Residential Energy Efficiency']
+            com = results['Non-residential Energy Efficiency']
+            wat = results['Water and Wastewater Efficiency']
+            self.heating[name] = (res.start_year,
+                res.baseline_fuel_Hoil_consumption[0],
+                com.baseline_fuel_Hoil_consumption,
+                wat.baseline_fuel_Hoil_consumption [0])
+        except (KeyError, AttributeError):
+            pass
+
+    def get_rows (self):
+        """
+        get the rows of the log
+
+        pre:
+            all communities have been added
+        post:
+            returns the rows, sorted by community
+        """
+        out = []
+        for c in sorted(self.generation.keys()):
+            if c+"_intertie" in self.names:
+                continue
+            k = c.replace("_intertie","")
+            if not k in self.heating:
+                continue
+            it, eff, diesel = self.generation[c]
+            year, res, com, wat = self.heating[k]
+
+            try:
+                elec = float(diesel[year]) / eff
+            except (KeyError, TypeError):
                 elec = 0
             if it == 'child' or np.isnan(elec):
                 elec = 0
 
-            res = res.baseline_fuel_Hoil_consumption[0]
-            com = com.baseline_fuel_Hoil_consumption 
-            wat = wat.baseline_fuel_Hoil_consumption [0] 
-            
             total = res + com + wat + elec
             name = c
             if name == 'Barrow':
                 name = 'Utqiagvik (Barrow)'
             out.append([name,elec,res,com,wat,total])
-            
-        except (KeyError,AttributeError) as e:
-            #~ print e
-            pass
-    data = DataFrame(out,columns = ['community','Utility diesel (gallons)',
+        return out
+
+    def save (self, res_dir):
+        """
+        save the log, see SummaryCollector.save
+        """
+        data = DataFrame(self.get_rows(),
+                        columns = ['community','Utility diesel (gallons)',
                                     'Residential Heating oil (gallons)',
                                     'Non-residential Heating Oil (gallons)',
                                     'Water/wastewater heating oil (gallons)',
                                     'Total (gallons)']
-                    ).set_index('community').round(2)
-    f_name = os.path.join(res_dir,'fuel_oil_summary.csv')
-    #~ fd = open(f_name,'w')
-    #~ fd.write("# fuel_oil summary by community\n")
-    #~ fd.close()
-    data.to_csv(f_name, mode='w')
-    
+                        ).set_index('community').round(2)
+        f_name = os.path.join(res_dir,'fuel_oil_summary.csv')
+        #~ fd = open(f_name,'w')
+        #~ fd.write("# fuel_oil summary by community\n")
+        #~ fd.close()
+        data.to_csv(f_name, mode='w')
+
 def forecast_comparison_log (coms, res_dir):
     """
-        creates a table of results for each community comparing the forecast 
+        creates a table of results for each community comparing the forecast
     consumption results and the component consumtption results
-    
+
     pre:
-        coms: the run model outputs: a dictionary 
+        coms: the run model outputs: a dictionary
                     {<"community_name">:
                         {'model':<a run driver object>,
                         'output dir':<a path to the given communities outputs>
@@ -341,58 +467,77 @@ def forecast_comparison_log (coms, res_dir):
                      ... repeated for each community
                     }
         res_dir: directory to save the log in
-        
+
     post:
         a csv file "forecast_comparsion_summary.csv"log is saved in res_dir
     """
-    out = []
-    for c in sorted(coms.keys()):
-        
+    run_collectors([ForecastComparisonCollector()], coms.iteritems(), res_dir)
+
+
+class ForecastComparisonCollector (SummaryCollector):
+    """
+    collects the forecast comparison log. The component consumption of an
+    intertie includes the consumption of each community on it, so the
+    values needed are kept for each community and the rows are found when
+    saving
+    """
+
+    def __init__ (self):
+        """
+        Class initialiser
+        pre:
+            none
+        post:
+            self.forecasts and self.consumption are empty
+        """
+        ## community -> (intertie list, first year, forecast residential,
+        ## non-residential, and total consumption), for parents only
+        self.forecasts = {}
+        ## community -> (residential start year, residential kWh,
+        ## non-residential kWh, water/wastewater start year,
+        ## water/wastewater kWh) or None if they are not available
+        self.consumption = {}
+
+    def add (self, name, results):
+        """
+        add the results for a community, see SummaryCollector.add
+        """
+        try:
+            ires = results['Residential Energy Efficiency']
+            icom = results['Non-residential Energy Efficiency']
+            iwat = results['Water and Wastewater Efficiency']
+            try:
+                self.consumption[name] = (ires.start_year,
+                    ires.baseline_kWh_consumption,
+                    icom.baseline_kWh_consumption,
+                    iwat.start_year, iwat.baseline_kWh_consumption)
+            except AttributeError:
+                self.consumption[name] = None
+        except KeyError:
+            pass
+
         try:
-            it = coms[c]['community data'].intertie
+            it = results['community data'].intertie
             if it is None:
                 it = 'parent'
             if it == 'child':
-                continue
+                return
             try:
-                it_list = coms[c]['community data'].intertie_list
-                it_list = [c] + list(set(it_list).difference(["''"]))
+                it_list = results['community data'].intertie_list
+                it_list = [name] + list(set(it_list).difference(["''"]))
             except AttributeError:
-                it_list = [c]
+                it_list = [name]
             #~ print it_list
-            res = coms[c]['Residential Energy Efficiency']
-            com = coms[c]['Non-residential Energy Efficiency']
-            wat = coms[c]['Water and Wastewater Efficiency']
-            fc = coms[c]['forecast']
-            
+            res = results['Residential Energy Efficiency']
+            com = results['Non-residential Energy Efficiency']
+            wat = results['Water and Wastewater Efficiency']
+            fc = results['forecast']
+
             first_year = max([res.start_year,
                               com.start_year,
                               wat.start_year,
                               fc.consumption.index[0]])
-                              
-            res_kwh = 0
-            com_kwh = 0
-            wat_kwh = 0
-            
-            for ic in it_list:
-                try:
-                    ires = coms[ic]['Residential Energy Efficiency']
-                    icom = coms[ic]['Non-residential Energy Efficiency']
-                    iwat = coms[ic]['Water and Wastewater Efficiency']
-                except KeyError:
-                    continue
-                res_kwh +=  ires.baseline_kWh_consumption[first_year - ires.start_year]
-                com_kwh +=  icom.baseline_kWh_consumption
-                wat_kwh +=  iwat.baseline_kWh_consumption[first_year - iwat.start_year]
-            
-            
-            comp_res = float(res_kwh)
-            comp_wat = float(wat_kwh)
-            comp_com = float(com_kwh)
-            
-            comp_non_res = float(com_kwh + wat_kwh)
-            comp_total = float(com_kwh + wat_kwh + res_kwh)
-            
+
             #~ print fc.consumption_to_save.ix[first_year]
             #~ print ""
             fc_res = float(fc.consumption.ix[first_year]\
@@ -401,96 +546,177 @@ def forecast_comparison_log (coms, res_dir):
                             ['consumption non-residential'])
             if np.isnan(fc_non_res):
                 fc_non_res = 0
-            
+
             fc_total = float(fc.consumption.ix[first_year]\
                                     ['consumption'])
-            
+
             if np.isnan(fc_total):
                 fc_total = 0
-            
+            self.forecasts[name] = \
+                (it_list, first_year, fc_res, fc_non_res, fc_total)
+        except (KeyError,AttributeError) as e:
+            #~ print e
+            pass
+
+    def get_rows (self):
+        """
+        get the rows of the log
+
+        pre:
+            all communities have been added
+        post:
+            returns the rows, sorted by community
+        """
+        out = []
+        for c in sorted(self.forecasts.keys()):
+            it_list, first_year, fc_res, fc_non_res, fc_total = \
+                self.forecasts[c]
+
+            res_kwh = 0
+            com_kwh = 0
+            wat_kwh = 0
+
+            skip = False
+            for ic in it_list:
+                if not ic in self.consumption:
+                    continue
+                if self.consumption[ic] is None:
+                    skip = True
+                    break
+                res_start, ires_kwh, icom_kwh, wat_start, iwat_kwh = \
+                    self.consumption[ic]
+                res_kwh +=  ires_kwh[first_year - res_start]
+                com_kwh +=  icom_kwh
+                wat_kwh +=  iwat_kwh[first_year - wat_start]
+            if skip:
+                continue
+
+            comp_res = float(res_kwh)
+            comp_wat = float(wat_kwh)
+            comp_com = float(com_kwh)
+
+            comp_non_res = float(com_kwh + wat_kwh)
+            comp_total = float(com_kwh + wat_kwh + res_kwh)
+
             res_diff = fc_res - comp_res
             non_res_diff = fc_non_res - comp_non_res
             total_diff = fc_total - comp_total
-            
+
             res_per = (abs(res_diff)/ (fc_res + comp_res))*100.0
             non_res_per = (abs(non_res_diff)/ (fc_non_res + comp_non_res))*100.0
             total_per = (abs(total_diff)/ (fc_total + comp_total))*100.0
-            
+
             name = c
             if name == 'Barrow':
                 name = 'Utqiagvik (Barrow)'
-            
+
             out.append([name,fc_res,comp_res,res_diff,res_per,
                           fc_non_res,comp_com,comp_wat,comp_non_res,
                           non_res_diff,non_res_per,
                           fc_total,comp_total,total_diff,total_per])
-            
-        except (KeyError,AttributeError) as e:
-            #~ print e
-            pass
-    data = DataFrame(out,columns = \
-       ['community',
-        'Forecast (trend line) Residential Consumption [kWh]',
-        'Forecast (modeled) Residential Consumption [kWh]',
-        'Difference Residential Consumption [kWh]',
-        'Percent Difference Residential Consumption [%]',
-        'Forecast (trend line) Non-Residential Consumption [kWh]',
-        'Forecast (modeled) Non-Residential (non-residential) Consumption [kWh]',
-       'Forecast (modeled) Non-Residential (water/wastewater) Consumption [kWh]',
-        'Forecast (modeled) Non-Residential Consumption [kWh]',
-        'Difference Non-Residential Consumption [kWh]',
-        'Percent Difference Non-Residential Consumption [%]',
-        'Forecast (trend line) Total Consumption [kWh]',
-        'Forecast (modeled) Total Consumption [kWh]',
-        'Difference Total Consumption [kWh]',
-        'Percent Difference Total Consumption [%]']
-                    ).set_index('community').round(2)
-    f_name = os.path.join(res_dir,
-                'forecast_component_consumption_comparison_summary.csv')
-    #~ fd = open(f_name,'w')
-    #~ fd.write(("# comparison of forecast kWh consumption vs."
-             #~ " component kWh consumption summary by community\n"))
-    #~ fd.close()
-    data.to_csv(f_name, mode='w')
-    
-def electric_price_summary (coms, res_dir):    
+        return out
+
+    def save (self, res_dir):
+        """
+        save the log, see SummaryCollector.save
+        """
+        data = DataFrame(self.get_rows(),columns = \
+           ['community',
+            'Forecast (trend line) Residential Consumption [kWh]',
+            'Forecast (modeled) Residential Consumption [kWh]',
+            'Difference Residential Consumption [kWh]',
+            'Percent Difference Residential Consumption [%]',
+            'Forecast (trend line) Non-Residential Consumption [kWh]',
+            'Forecast (modeled) Non-Residential (non-residential) Consumption [kWh]',
+           'Forecast (modeled) Non-Residential (water/wastewater) Consumption [kWh]',
+            'Forecast (modeled) Non-Residential Consumption [kWh]',
+            'Difference Non-Residential Consumption [kWh]',
+            'Percent Difference Non-Residential Consumption [%]',
+            'Forecast (trend line) Total Consumption [kWh]',
+            'Forecast (modeled) Total Consumption [kWh]',
+            'Difference Total Consumption [kWh]',
+            'Percent Difference Total Consumption [%]']
+                        ).set_index('community').round(2)
+        f_name = os.path.join(res_dir,
+                    'forecast_component_consumption_comparison_summary.csv')
+        #~ fd = open(f_name,'w')
+        #~ fd.write(("# comparison of forecast kWh consumption vs."
+                 #~ " component kWh consumption summary by community\n"))
+        #~ fd.close()
+        data.to_csv(f_name, mode='w')
+
+def electric_price_summary (coms, res_dir):
     """
+    creates a summary of the forecasted electricity prices by community
+
+    pre:
+        coms: the run model outputs: a dictionary of communities
+        res_dir: directory to save the summary in
+    post:
+        a csv file "electric_prices_summary.csv" may be saved in res_dir
     """
-    out = None
-    for c in sorted(coms.keys()):
-        #~ print c
-        #~ print dir(coms[c]['community data'])
-        try:
-            if c.find('+') != -1:
-                continue
-            it = coms[c]['community data'].intertie
-            if it is None:
-                it = 'parent'
-            if it == 'child':
-                continue
-            base_cost = float(coms[c]['community data'].get_item("community",
-                                            "electric non-fuel price"))
-            prices = deepcopy(coms[c]['community data'].get_item("community",
-                                            "electric prices"))
-            name = c
-            if name == 'Barrow':
-                name = 'Utqiagvik (Barrow)'
-            prices[name] = prices[prices.columns[0]]#'price']
-            #~ del prices[prices.columns[0]]
-            prices = prices.T
-            prices["base cost"] = base_cost
-            if out is None:
-                out = prices
-            else:
-                out = concat([out,prices])
-            
-            #~ print out
-        except (KeyError, TypeError) as e:
-            #~ print e
-            continue
-    if out is None:
+    run_collectors([get_electric_price_collector()], coms.iteritems(),
+                                                                    res_dir)
+
+def get_electric_price_collector ():
+    """
+    get the collector for the electric price summary
+
+    pre:
+        none
+    post:
+        returns a RowCollector
+    """
+    return RowCollector(electric_price_row, save_electric_price_summary,
+        (KeyError, TypeError))
+
+def electric_price_row (c, results):
+    """
+    get the prices for a community
+
+    pre:
+        c: community name
+        results: the run model outputs for the community
+    post:
+        returns a DataFrame with a row of prices, or None if the community is
+            not in the summary
+    """
+    #~ print dir(coms[c]['community data'])
+    if c.find('+') != -1:
+        return None
+    it = results['community data'].intertie
+    if it is None:
+        it = 'parent'
+    if it == 'child':
+        return None
+    base_cost = float(results['community data'].get_item("community",
+                                    "electric non-fuel price"))
+    prices = deepcopy(results['community data'].get_item("community",
+                                    "electric prices"))
+    name = c
+    if name == 'Barrow':
+        name = 'Utqiagvik (Barrow)'
+    prices[name] = prices[prices.columns[0]]#'price']
+    #~ del prices[prices.columns[0]]
+    prices = prices.T
+    prices["base cost"] = base_cost
+    return prices
+
+def save_electric_price_summary (rows, res_dir):
+    """
+    save the electric price summary
+
+    pre:
+        rows: DataFrames from electric_price_row, sorted by community
+        res_dir: directory to save the summary in
+    post:
+        a csv file "electric_prices_summary.csv" is saved in res_dir, if
+            there are any rows
+    """
+    if len(rows) == 0:
         return
-        
+    out = concat(rows)
+
     f_name = os.path.join(res_dir,
                 'electric_prices_summary.csv')
     #~ fd = open(f_name,'w')
@@ -498,15 +724,15 @@ def electric_price_summary (coms, res_dir):
     #~ fd.close()
     out.index = [i.replace('_',' ') for i in out.index]
     out = out.drop_duplicates()
-    
+
     out[[out.columns[-1]] + out.columns[:-1].tolist()].to_csv(f_name, mode='w')
 
 def genterate_npv_summary (coms, res_dir):
     """
     generate a log of the npv results
-    
+
     pre:
-        coms: the run model outputs: a dictionary 
+        coms: the run model outputs: a dictionary
                     {<"community_name">:
                         {'model':<a run driver object>,
                         'output dir':<a path to the given communities outputs>
@@ -514,40 +740,68 @@ def genterate_npv_summary (coms, res_dir):
                      ... repeated for each community
                     }
         res_dir: directory to save the log in
-        
+
     post:
         summary may be saved
     """
-    for community in coms:
-        #~ print community
-        components = coms[community]
-        npvs = []
-        for comp in components:
-            try:
-                npvs.append([comp, 
-                         components[comp].get_NPV_benefits(),
-                         components[comp].get_NPV_costs(),
-                         components[comp].get_NPV_net_benefit(),
-                         components[comp].get_BC_ratio()
-                        ])
-            except AttributeError:
-                pass
+    run_collectors([get_npv_summary_collector()], coms.iteritems(), res_dir)
+
+def get_npv_summary_collector ():
+    """
+    get the collector for the npv summaries of each community
 
-        name = community
-        if name == 'Barrow':
-            name = 'Utqiagvik (Barrow)'
+    pre:
+        none
+    post:
+        returns a RowCollector
+    """
+    return RowCollector(npv_summary_row, save_npv_summaries, ())
+
+def npv_summary_row (community, components):
+    """
+    get the npv results of each component for a community
 
+    pre:
+        community: community name
+        components: the run model outputs for the community
+    post:
+        returns (community, list of npv results for each component)
+    """
+    npvs = []
+    for comp in components:
+        try:
+            npvs.append([comp,
+                     components[comp].get_NPV_benefits(),
+                     components[comp].get_NPV_costs(),
+                     components[comp].get_NPV_net_benefit(),
+                     components[comp].get_BC_ratio()
+                    ])
+        except AttributeError:
+            pass
+    return community, npvs
+
+def save_npv_summaries (rows, res_dir):
+    """
+    save the npv summary of each community in its directory
+
+    pre:
+        rows: list of (community, npv results) from npv_summary_row
+        res_dir: results directory
+    post:
+        summaries are saved
+    """
+    for community, npvs in rows:
         f_name = os.path.join(res_dir,community.replace(' ','_'),
                                 community.replace(' ','_') + '_npv_summary.csv')
-        cols = ['Component', 
+        cols = ['Component',
                 community +': NPV Benefits',
-                community +': NPV Cost', 
+                community +': NPV Cost',
                 community +': NPV Net Benefit',
                 community +': Benefit Cost Ratio']
         npvs = DataFrame(npvs,
                          columns = cols).set_index('Component')
         npvs.to_csv(f_name)
-        
+
 def community_forcast_summaries (community,  components, forecast, res_dir):
     """generate community forecast summary
     """
@@ -851,29 +1105,57 @@ def community_forcast_summaries (community,  components, forecast, res_dir):
         
 def consumption_summary (coms, res_dir):
     """ Function doc """
-    consumption = []
-    for community in coms:
-        if 1 != len(community.split('+')):
-            continue
-        it = coms[community]['community data'].intertie
-        region = \
-            coms[community]['community data'].get_item('community','region')
-        if it is None:
-            it = 'parent'
-        if it == 'child':
-            continue
-        fc = coms[community]['forecast']
-        try:
-            
-            name = community
-            if name == 'Barrow':
-                name = 'Utqiagvik (Barrow)'
-            con = fc.consumption.ix[2010:2040].values.T[0].tolist()
-            consumption.append([name, region] + con)
-        except AttributeError as e:
-            #~ print community, e
-            continue
+    run_collectors([get_consumption_summary_collector()], coms.iteritems(),
+                                                                    res_dir)
 
+def get_consumption_summary_collector ():
+    """
+    get the collector for the kWh consumption summary
+
+    pre:
+        none
+    post:
+        returns a RowCollector
+    """
+    return RowCollector(consumption_summary_row, save_consumption_summary,
+        (AttributeError,))
+
+def consumption_summary_row (community, results):
+    """
+    get the row of the kWh consumption summary for a community
+
+    pre:
+        community: community name
+        results: the run model outputs for the community
+    post:
+        returns the row, or None if the community is not in the summary
+    """
+    if 1 != len(community.split('+')):
+        return None
+    it = results['community data'].intertie
+    region = \
+        results['community data'].get_item('community','region')
+    if it is None:
+        it = 'parent'
+    if it == 'child':
+        return None
+    fc = results['forecast']
+    name = community
+    if name == 'Barrow':
+        name = 'Utqiagvik (Barrow)'
+    con = fc.consumption.ix[2010:2040].values.T[0].tolist()
+    return [name, region] + con
+
+def save_consumption_summary (consumption, res_dir):
+    """
+    save the kWh consumption summary
+
+    pre:
+        consumption: rows from consumption_summary_row, sorted by community
+        res_dir: directory to save the summary in
+    post:
+        a csv file "kwh_consumption_summary.csv" is saved in res_dir
+    """
     f_name = os.path.join(res_dir,'kwh_consumption_summary.csv')
     cols = ['Community', 'region'] + [str(y) for y in range(2010,2041)]
     summary = DataFrame(consumption,
@@ -881,11 +1163,11 @@ def consumption_summary (coms, res_dir):
     summary.to_csv(f_name)
 
 def call_comp_summaries (coms, res_dir):
-    """ 
-        calls summary fils that may exist in each component 
-    
+    """
+        calls summary fils that may exist in each component
+
     pre:
-        coms: the run model outputs: a dictionary 
+        coms: the run model outputs: a dictionary
                     {<"community_name">:
                         {'model':<a run driver object>,
                         'output dir':<a path to the given communities outputs>
@@ -893,23 +1175,89 @@ def call_comp_summaries (coms, res_dir):
                      ... repeated for each community
                     }
         res_dir: directory to save the log in
-        
+
     post:
         summaries may be saved
     """
-    genterate_npv_summary(coms, res_dir)
-    consumption_summary(coms, res_dir)
-    
+    run_collectors(
+        [get_npv_summary_collector(), get_consumption_summary_collector()] +\
+            get_component_summary_collectors(),
+        coms.iteritems(), res_dir)
+
+def get_component_summary_collectors ():
+    """
+    get the collectors for the summaries that may exist in each component
+
+    pre:
+        none
+    post:
+        returns a list of SummaryCollectors
+    """
+    collectors = []
+    registry = get_registry()
     for comp in comp_lib:
-        try:
-            log = import_module("aaem.components." +comp_lib[comp]).\
-                                                        component_summary
-            log(coms, res_dir)
-        except AttributeError as e:
-            #~ print e
+        summary_collectors = registry[comp].summary_collectors
+        if summary_collectors is None:
             continue
-            
+        collectors += summary_collectors()
+    return collectors
 
-    
-           
-    
+def get_summary_collectors ():
+    """
+    get the collectors for all of the summaries
+
+    pre:
+        none
+    post:
+        returns a list of SummaryCollectors, for the logs in this module and
+            the summaries of each component
+    """
+    return [
+        get_village_log_collector(),
+        get_building_log_collector(),
+        FuelOilCollector(),
+        ForecastComparisonCollector(),
+        get_electric_price_collector(),
+        get_npv_summary_collector(),
+        get_consumption_summary_collector(),
+    ] + get_component_summary_collectors()
+
+def save_summaries (results, res_dir):
+    """
+    save all of the summaries in one pass over the results
+
+    pre:
+        results: iterable of (community name, the run model outputs for the
+            community), i.e. ResultsStore.iteritems()
+        res_dir: directory to save the summaries in
+    post:
+        summaries are saved
+    """
+    run_collectors(get_summary_collectors(), results, res_dir)
+
+def save_summaries_incremental (store, changed, res_dir):
+    """
+    save only the summaries fed by the communities whose results changed.
+    The communities that contributed to each summary are recorded in 
+    summary_manifest.yaml in res_dir, summaries not recorded there are all
+    saved
+
+    pre:
+        store: ResultsStore with the results of all communities
+        changed: list of the names of the communities/projects whose results
+            were added, replaced, or removed since the summaries were saved
+        res_dir: directory to save the summaries in
+    post:
+        the affected summaries are saved, summary_manifest.yaml is updated,
+        and the names of the saved summaries are returned
+    """
+    manifest_file = os.path.join(res_dir, SUMMARY_MANIFEST)
+    contributors = {}
+    if os.path.isfile(manifest_file):
+        with open(manifest_file, 'r') as fd:
+            contributors = yaml.load(fd) or {}
+    contributors, saved = run_collectors_incremental(get_summary_collectors,
+        store, changed, contributors, res_dir)
+    with open(manifest_file, 'w') as fd:
+        yaml.dump(contributors, fd, default_flow_style = False)
+    return saved
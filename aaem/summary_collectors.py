@@ -0,0 +1,383 @@
+"""
+summary_collectors.py
+
+    collectors for the summaries of model results. A collector is given the
+results of one community at a time, in any order, keeps only what its
+summary needs, and saves the summary when all communities have been added.
+All of the summaries can be made in one pass over the results, i.e. a
+results store, without loading the results of every community at once. See
+summaries.get_summary_collectors and summaries.save_summaries.
+
+    Collectors report the communities that contributed to their summary, so
+when the results of some communities change only the summaries they fed,
+before or after the change, are made again (run_collectors_incremental).
+"""
+from abc import ABCMeta, abstractmethod
+
+from pandas import DataFrame
+
+
+class SummaryCollector (object):
+    """Base class for summary collectors, subclasses implement add and save
+    """
+    __metaclass__ = ABCMeta
+
+    @abstractmethod
+    def add (self, name, results):
+        """add the results for a community
+
+        Parameters
+        ----------
+        name: str
+            community or project name
+        results: dict
+            excuted components, with the 'community data' and 'forecast'
+        """
+
+    @abstractmethod
+    def save (self, res_dir):
+        """save the summary
+
+        Parameters
+        ----------
+        res_dir: path
+            results directory
+        """
+
+    def get_name (self):
+        """get a name for the summary, the same in every run
+
+        Returns
+        -------
+        str
+        """
+        return type(self).__module__ + '.' + type(self).__name__
+
+    def get_contributors (self):
+        """get the communities that contributed to the summary
+
+        Returns
+        -------
+        list or None
+            community or project names, or None if the summary depends on
+        every community
+        """
+        return None
+
+
+class RowCollector (SummaryCollector):
+    """Collects a summary table with a row for each community
+
+    Parameters
+    ----------
+    row: function
+        function(name, results) that returns the row for a community, or
+    None if the community is not in the summary. Communities where it raises
+    one of errors are left out of the summary
+    save_rows: function
+        function(rows, res_dir) that saves the summary, the rows are
+    sorted by community name
+    errors: tuple, optional
+        exceptions that leave a community out of the summary
+    """
+
+    def __init__ (self, row, save_rows, errors = (KeyError, AttributeError)):
+        """collector for a summary table"""
+        self.row = row
+        self.save_rows = save_rows
+        self.errors = errors
+        self.rows = []
+
+    def add (self, name, results):
+        """add the row for a community, see SummaryCollector.add"""
+        try:
+            row = self.row(name, results)
+        except self.errors:
+            return
+        if not row is None:
+            self.rows.append((name, row))
+
+    def get_name (self):
+        """get a name for the summary, see SummaryCollector.get_name"""
+        return self.save_rows.__module__ + '.' + self.save_rows.__name__
+
+    def get_contributors (self):
+        """get the communities with a row, see
+        SummaryCollector.get_contributors
+        """
+        return sorted([name for name, row in self.rows])
+
+    def get_rows (self):
+        """get the rows, sorted by community name
+
+        Returns
+        -------
+        list
+        """
+        return [row for name, row in sorted(self.rows, key = lambda r: r[0])]
+
+    def save (self, res_dir):
+        """save the summary, see SummaryCollector.save"""
+        self.save_rows(self.get_rows(), res_dir)
+
+
+class RegionalCollector (SummaryCollector):
+    """Collects a summary of totals by region
+
+    Parameters
+    ----------
+    contribution: function
+        function(name, results) that returns (region, values), where values
+    are added to the totals for the region in the order of columns, or None
+    if the community is not counted. If it raises one of errors the summary
+    is not saved
+    columns: list
+        column names
+    save_summary: function
+        function(summary, res_dir) that saves the summary DataFrame
+    errors: tuple, optional
+        exceptions that stop the summary from being saved
+    """
+
+    def __init__ (self, contribution, columns, save_summary,
+            errors = (KeyError, AttributeError)):
+        """collector for a regional summary"""
+        self.contribution = contribution
+        self.columns = columns
+        self.save_summary = save_summary
+        self.errors = errors
+        self.regions = {}
+        self.names = []
+        self.failed = False
+
+    def add (self, name, results):
+        """add the totals for a community, see SummaryCollector.add"""
+        if self.failed:
+            return
+        try:
+            contribution = self.contribution(name, results)
+        except self.errors:
+            self.failed = True
+            self.names.append(name)
+            return
+        if not contribution is None:
+            self.names.append(name)
+        add_to_regions(self.regions, self.columns, contribution)
+
+    def get_name (self):
+        """get a name for the summary, see SummaryCollector.get_name"""
+        return self.save_summary.__module__ + '.' + \
+            self.save_summary.__name__
+
+    def get_contributors (self):
+        """get the communities counted in the totals, and the one that
+        stopped the summary from being saved, see
+        SummaryCollector.get_contributors
+        """
+        return sorted(self.names)
+
+    def get_summary (self):
+        """get the summary
+
+        Returns
+        -------
+        DataFrame
+            totals for each region, and 'All Regions'
+        """
+        return regional_summary(self.regions, self.columns)
+
+    def save (self, res_dir):
+        """save the summary, unless a community could not be added, see
+        SummaryCollector.save
+        """
+        if self.failed:
+            return
+        self.save_summary(self.get_summary(), res_dir)
+
+
+def add_to_regions (regions, columns, contribution):
+    """add the contribution of a community to the regional totals
+
+    Parameters
+    ----------
+    regions: dict
+        region -> dict of column -> total
+    columns: list
+        column names
+    contribution: tuple or None
+        (region, values), as returned by the contribution function of a
+    RegionalCollector
+    """
+    if contribution is None:
+        return
+    region, values = contribution
+    if region in regions:
+        for column, value in zip(columns, values):
+            regions[region][column] += value
+    else:
+        regions[region] = dict(zip(columns, values))
+
+def regional_summary (regions, columns):
+    """create a regional summary table
+
+    Parameters
+    ----------
+    regions: dict
+        region -> dict of column -> total
+    columns: list
+        column names
+
+    Returns
+    -------
+    DataFrame
+        totals for each region, and 'All Regions'
+    """
+    try:
+        summary = DataFrame(regions).T[columns]
+    except KeyError:
+        summary = DataFrame(columns = columns)
+    summary.ix['All Regions'] = summary.sum()
+    return summary
+
+def collect_rows (row, results, errors = (KeyError, AttributeError)):
+    """get the rows of a summary table from a dictionary of results
+
+    Parameters
+    ----------
+    row: function
+        see RowCollector
+    results: dict
+        results from the model, with each community or project as key
+    errors: tuple, optional
+        see RowCollector
+
+    Returns
+    -------
+    list
+        rows sorted by community name
+    """
+    collector = RowCollector(row, None, errors)
+    for name in results:
+        collector.add(name, results[name])
+    return collector.get_rows()
+
+def collect_regional_summary (contribution, columns, results):
+    """create a regional summary from a dictionary of results
+
+    Parameters
+    ----------
+    contribution: function
+        see RegionalCollector, errors it raises are not caught
+    columns: list
+        column names
+    results: dict
+        results from the model, with each community or project as key
+
+    Returns
+    -------
+    DataFrame
+        totals for each region, and 'All Regions'
+    """
+    regions = {}
+    for name in results:
+        add_to_regions(regions, columns, contribution(name, results[name]))
+    return regional_summary(regions, columns)
+
+def run_collectors (collectors, results, res_dir):
+    """make the summaries of the collectors in one pass over the results
+
+    Parameters
+    ----------
+    collectors: list
+        SummaryCollectors
+    results: iterable
+        (name, results) for each community or project, i.e.
+    ResultsStore.iteritems()
+    res_dir: path
+        directory to save the summaries in
+
+    Returns
+    -------
+    dict
+        summary name -> the communities that contributed to it, see
+    SummaryCollector.get_contributors
+    """
+    for name, community_results in results:
+        for collector in collectors:
+            collector.add(name, community_results)
+    for collector in collectors:
+        collector.save(res_dir)
+    return dict([(c.get_name(), c.get_contributors()) for c in collectors])
+
+def run_collectors_incremental (get_collectors, results, changed,
+        contributors, res_dir):
+    """make again only the summaries fed by communities whose results
+    changed. A summary is made again if a changed community contributed to it
+    when it was last made, or contributes to it now. Only the results of the
+    communities that contribute to those summaries are loaded
+
+    Parameters
+    ----------
+    get_collectors: function
+        function() that returns new SummaryCollectors, in the same order
+    results: ResultsStore
+        stored results, with keys and get
+    changed: list
+        communities or projects whose results were added, replaced, or
+    removed since the summaries were last made
+    contributors: dict
+        summary name -> contributors, as returned by run_collectors, from
+    when the summaries were last made. Summaries without an entry are made
+    again
+    res_dir: path
+        directory to save the summaries in
+
+    Returns
+    -------
+    tuple
+        (contributors, made), contributors is the updated summary name ->
+    contributors, and made is the names of the summaries made again
+    """
+    changed = set(changed)
+    names = results.keys()
+    loaded = dict([(n, results.get(n)) for n in names if n in changed])
+
+    ## the summaries the changed communities contribute to now
+    probes = get_collectors()
+    for name in names:
+        if name in loaded:
+            for probe in probes:
+                probe.add(name, loaded[name])
+
+    collectors = []
+    needed = set()
+    for probe, collector in zip(probes, get_collectors()):
+        key = collector.get_name()
+        now = probe.get_contributors()
+        previous = contributors.get(key, None)
+        if not key in contributors or previous is None or now is None:
+            if len(changed) == 0 and key in contributors:
+                continue
+            needed.update(names)
+        else:
+            fed_by = set(previous).union(now)
+            if len(fed_by.intersection(changed)) == 0:
+                continue
+            needed.update(fed_by)
+        collectors.append(collector)
+
+    for name in names:
+        if not name in needed:
+            continue
+        try:
+            community_results = loaded[name]
+        except KeyError:
+            community_results = results.get(name)
+        for collector in collectors:
+            collector.add(name, community_results)
+
+    contributors = dict(contributors)
+    for collector in collectors:
+        collector.save(res_dir)
+        contributors[collector.get_name()] = collector.get_contributors()
+    return contributors, [c.get_name() for c in collectors]
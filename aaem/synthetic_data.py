@@ -0,0 +1,347 @@
+"""
+synthetic_data.py
+
+    a small synthetic data repo, so the whole model pipeline (refresh, run,
+summaries, and html summaries) can be run without the real data repo, i.e.
+by the offline benchmark and the tests
+
+    The data repo has every file the preprocessor and components read, with
+rows for the development communities (cli/default_cases.py __DEV_COMS__) and
+one intertie child for each of the development communities that are on an
+intertie. All values are made up, but are in sensible ranges so each
+component runs as it would for a real community.
+"""
+import os
+
+import yaml
+
+## the version written to the VERSION file of the synthetic data repo
+VERSION = 'synthetic'
+
+## years of data
+POPULATION_YEARS = range(2003, 2046)
+PCE_YEARS = range(2008, 2016)
+PRICE_YEARS = range(2016, 2051)
+
+## community, energy region, 2010 population, intertie parent or None
+COMMUNITIES = [
+    ('Adak', 'Aleutians', 326, None),
+    ('Bethel', 'Lower Yukon-Kuskokwim', 6080, None),
+    ('Oscarville', 'Lower Yukon-Kuskokwim', 70, 'Bethel'),
+    ('Craig', 'Southeast', 1201, None),
+    ('Klawock', 'Southeast', 755, 'Craig'),
+    ('Dillingham', 'Bristol Bay', 2329, None),
+    ('Aleknagik', 'Bristol Bay', 219, 'Dillingham'),
+    ('Haines', 'Southeast', 1713, None),
+    ('Skagway', 'Southeast', 920, 'Haines'),
+    ('Manley Hot Springs', 'Yukon-Koyukuk/Upper Tanana', 89, None),
+    ('Nome', 'Bering Straits', 3598, None),
+    ('Sand Point', 'Aleutians', 976, None),
+    ('Sitka', 'Southeast', 8881, None),
+    ('Tok', 'Yukon-Koyukuk/Upper Tanana', 1258, None),
+    ('Tanacross', 'Yukon-Koyukuk/Upper Tanana', 136, 'Tok'),
+    ('Yakutat', 'Southeast', 662, None),
+    ('Valdez', 'Copper River/Chugach', 3976, None),
+]
+
+REGIONS = sorted(set([c[1] for c in COMMUNITIES]))
+
+## communities with a renewable generation capacity, or a potential project
+HYDRO = ['Sitka', 'Haines']
+WIND = ['Nome', 'Sand Point']
+HEAT_RECOVERY = ['Bethel', 'Dillingham']
+
+MONTHS = ['JUL', 'AUG', 'SEP', 'OCT', 'NOV', 'DEC',
+          'JAN', 'FEB', 'MAR', 'APR', 'MAY', 'JUN']
+
+def get_gnis (community):
+    """get the synthetic GNIS id of a community"""
+    return 1400000 + [c[0] for c in COMMUNITIES].index(community)
+
+def get_fips (community):
+    """get the synthetic FIPS id of a community"""
+    return 200000 + 10 * [c[0] for c in COMMUNITIES].index(community)
+
+def write_csv (directory, name, header, rows):
+    """write a csv file in the data repo
+
+    Parameters
+    ----------
+    directory: path
+        data repo
+    name: str
+        file name
+    header: list
+        column names
+    rows: list
+        list of rows, each a list of values
+    """
+    def cell (value):
+        value = str(value)
+        if ',' in value:
+            value = '"' + value + '"'
+        return value
+    with open(os.path.join(directory, name), 'w') as fd:
+        fd.write(','.join([cell(h) for h in header]) + '\n')
+        for row in rows:
+            fd.write(','.join([cell(v) for v in row]) + '\n')
+
+def make_data_repo (directory):
+    """write a synthetic data repo
+
+    Parameters
+    ----------
+    directory: path
+        directory to write the data repo in, created if it does not exist
+
+    Returns
+    -------
+    path
+        the data repo directory
+    """
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+
+    with open(os.path.join(directory, 'VERSION'), 'w') as fd:
+        fd.write(VERSION + '\n')
+
+    names = [c[0] for c in COMMUNITIES]
+    scale = dict([(c[0], c[2] / 1000.0) for c in COMMUNITIES])
+    index = dict([(c[0], i) for i, c in enumerate(COMMUNITIES)])
+
+    ## ids and interties
+    write_csv(directory, 'community_list.csv',
+        ['Community', 'GNIS', 'Energy Region', 'FIPS', 'Alias'],
+        [[c[0], get_gnis(c[0]), c[1], get_fips(c[0]), ''] \
+            for c in COMMUNITIES])
+    parents = [c[3] for c in COMMUNITIES if not c[3] is None]
+    write_csv(directory, 'current_interties.csv',
+        ['Energy Provider', 'Plant Intertied', 'Other Community on Intertie'],
+        [[p, 'Yes', [c[0] for c in COMMUNITIES if c[3] == p][0]] \
+            for p in parents])
+    write_csv(directory, 'election-divisions.csv',
+        ['Community', 'Senate', 'House District'],
+        [[n, 'ABCDEFGHIJKLMNOPQRST'[index[n] % 20], index[n] % 40 + 1] \
+            for n in names])
+
+    ## population
+    rows = []
+    for c in COMMUNITIES:
+        rows.append([c[0], get_gnis(c[0])] + \
+            [int(c[2] * (1 + .005 * (y - 2010))) for y in POPULATION_YEARS])
+    write_csv(directory, 'population_projections.csv',
+        ['place_name', 'GNIS'] + POPULATION_YEARS, rows)
+
+    ## electric utility data
+    rows = []
+    for n in names:
+        sold = 4000000 * scale[n] / 12.0
+        hydro = .8 * sold if n in HYDRO else 0
+        diesel = 1.1 * sold - hydro
+        for year in PCE_YEARS:
+            for month in range(1, 13):
+                seasonal = 1 + .2 * abs(6.5 - month) / 5.5
+                rows.append([
+                    'synthetic utility', n, year, month,
+                    .55, .2, .35,
+                    round(.4 * sold * seasonal), round(.35 * sold * seasonal),
+                    round(.1 * sold * seasonal), round(.15 * sold * seasonal),
+                    0,
+                    round(diesel * seasonal / 13.5 * 4.0, 2),
+                    round(diesel * seasonal), round(.03 * sold * seasonal),
+                    round(hydro * seasonal), '', '', '', '', '', 0,
+                    round(diesel * seasonal / 13.5), 4.0
+                ])
+    write_csv(directory, 'power-cost-equalization-pce-data.csv',
+        ['utility', 'community_names', 'year', 'month', 'residential_rate',
+        'pce_rate', 'effective_rate', 'residential_kwh_sold',
+        'commercial_kwh_sold', 'community_kwh_sold', 'government_kwh_sold',
+        'unbilled_kwh', 'fuel_cost', 'diesel_kwh_generated',
+        'powerhouse_consumption_kwh', 'hydro_kwh_generated',
+        'other_1_kwh_generated', 'other_1_kwh_type', 'other_2_kwh_generated',
+        'other_2_kwh_type', 'purchased_from', 'kwh_purchased',
+        'fuel_used_gal', 'fuel_price'], rows)
+    write_csv(directory, 'purchased_power_lib.csv',
+        ['Community', 'purchased_from', 'Energy Source'], [])
+    write_csv(directory, 'diesel_powerhouse_data.csv',
+        ['Community', 'Waste Heat Recovery Opperational',
+        'Switchgear Suitable', 'Total Number of generators',
+        'Total Capacity (in kW)', 'Largest generator (in kW)', 'Sizing'],
+        [[n, 'Yes' if index[n] % 2 else 'No',
+            'Yes' if index[n] % 3 else 'No', 3,
+            int(1200 * scale[n]) + 100, int(500 * scale[n]) + 50,
+            'Good'] for n in names])
+    write_csv(directory, 'renewable_generation_capacities.csv',
+        ['Community', 'Resource Type', 'Resource Sub-Type', 'Capacity (kW)',
+        'Average Expected Annual Generation (kWh)'],
+        [[n, 'Hydro', 'Run of River', int(500 * scale[n]),
+            int(3200000 * scale[n])] for n in HYDRO] + \
+        [[n, 'Wind', 'Turbine', 100, 200000] for n in WIND])
+
+    ## climate and prices
+    write_csv(directory, 'heating_degree_days.csv',
+        ['Community', 'HDD in ARIS equations'],
+        [[n, 9000 + 300 * (index[n] % 10)] for n in names])
+    write_csv(directory, 'heating_fuel_premium.csv',
+        ['Region', 'Premium'],
+        [[r, .5 + .1 * i] for i, r in enumerate(REGIONS)])
+    write_csv(directory, 'diesel_fuel_prices.csv',
+        ['Community'] + PRICE_YEARS,
+        [[n] + [round(3.5 + .1 * (index[n] % 5) + .02 * (y - 2016), 3) \
+            for y in PRICE_YEARS] for n in names])
+    write_csv(directory, 'biomass_prices.csv',
+        ['Community', 'Biomass ($/Cord)', 'Pellets ($/ton)'],
+        [[n, 300, 400] for n in names])
+    write_csv(directory, 'propane_price_estimates.csv',
+        ['Community', 'Propane ($/gallon)'],
+        [[n, 6.5] for n in names])
+    write_csv(directory, 'fuel-price-survey-data.csv',
+        ['community', 'GNIS', 'year', 'no_1_fuel_oil_price',
+        'no_2_fuel_oil_price'],
+        [[n, get_gnis(n), y, 4.5 + .1 * (y - 2008), 4.4 + .1 * (y - 2008)] \
+            for n in names for y in PCE_YEARS])
+    with open(os.path.join(directory, 'regional_multipliers.yaml'), 'w') \
+            as fd:
+        yaml.dump(dict([(r, 1.1 + .05 * i) for i, r in enumerate(REGIONS)]),
+            fd, default_flow_style = False)
+    write_csv(directory, 'cpi.csv', ['Year', 'CPI multiplier'],
+        [[i, 1.0] for i in range(60)])
+
+    ## goals and the road system
+    write_csv(directory, 'goals_community.csv',
+        ['Community', 'Region', 'Priority 1', 'Priority 2'],
+        [[n, c, 'Lower energy costs', 'Energy efficiency'] \
+            for n, c, p, parent in COMMUNITIES])
+    write_csv(directory, 'goals_regional.csv',
+        ['Region', 'Name', 'Priority 1', 'Priority 2'],
+        [[r, r, 'Regional planning', 'Renewable energy'] for r in REGIONS])
+    write_csv(directory, 'road_system.csv',
+        ['Community', 'On Road/SE'],
+        [[n, 'Yes' if c in ['Southeast', 'Copper River/Chugach'] else 'No'] \
+            for n, c, p, parent in COMMUNITIES])
+
+    ## component data
+    write_csv(directory, 'ashp_climate_data.csv',
+        ['Community'] + ['Avg. Temp (F) ' + m for m in MONTHS] + \
+            ['% Heating Load ' + m for m in MONTHS] + \
+            ['Minimum Temp', 'Peak Month % of total'],
+        [[n] + [30 + 25 * abs(i - 6.5) / 6.5 - index[n] % 7 \
+                for i in range(12)] + \
+            [2, 3, 5, 8, 11, 14, 16, 14, 11, 8, 5, 3] + \
+            [-20 - index[n] % 10, 16] for n in names])
+    write_csv(directory, 'ashp_performance_data.csv',
+        ['Temperature', 'COP', 'Percent of Total Capacity'],
+        [[t, round(1 + .03 * (t + 15), 2), round(.5 + .01 * (t + 15), 2)] \
+            for t in range(-15, 50, 5)])
+    write_csv(directory, 'biomass_resource_data.csv',
+        ['Community', 'Sufficient Biomass for 30% of Non-residential buildings',
+        'Peak Month % of total', 'Capacity Factor'],
+        [[n, 'Yes' if index[n] % 2 else 'No', .15, .4] for n in names])
+    write_csv(directory, 'solar_resource_data.csv',
+        ['Community', 'Output per 10kW Solar PV'],
+        [[n, 7000 + 100 * (index[n] % 5)] for n in names])
+    write_csv(directory, 'transmission_distances.csv',
+        ['Community', 'Maximum savings ($/kWh)',
+        'Nearest Community with Lower Price Power', 'Distance to Community'],
+        [[n, .1, 'Sitka', 20 + 5 * index[n]] for n in names \
+            if n != 'Sitka'])
+    write_csv(directory, 'wind_classes.csv',
+        ['Community', 'Assumed Wind Class'],
+        [[n, 3 + index[n] % 5] for n in names])
+    write_csv(directory, 'wind_class_cf_assumptions.csv',
+        ['Wind Class', 'REF V-VI Net CF'],
+        [[c, .1 + .04 * c] for c in range(8)])
+    write_csv(directory, 'wind_kw_costs.csv',
+        ['kW', 'Cost per kW'],
+        [[100, 12000], [500, 9000], [1000, 7000], [5000, 5000]])
+    write_csv(directory, 'project_development_timeframes.csv',
+        ['Phase', 'Heat Recovery', 'Hydroelectric', 'Wind'],
+        [['Reconnaissance', 2, 6, 4], ['Feasibility', 1, 4, 3],
+        ['Design', 1, 2, 2]])
+    write_csv(directory, 'heat_recovery_projects_potential.csv',
+        ['Community', 'Project Name', 'Year of Feasibility Study Completion',
+        'Phase Completed', 'New/Repair/Extension',
+        'Total Round-trip Distance of Piping (feet)',
+        'Number of Buildings/Facilities', 'Buildings/Facilities to be Served',
+        'Proposed Gallons of Diesel Offset', 'Proposed Maximum Btu/hr',
+        'Total CAPEX', 'Source', 'Link', 'Notes',
+        'Est. current annual heating fuel gallons displaced',
+        'Identified as priority by HR working group'],
+        [[n, n + ' heat loop', 2014, 'Feasibility', 'New', 2000, 3,
+            'School, Clinic, Washeteria', 20000, 1500000, 900000,
+            'synthetic', 'none', 'none', '', 'Yes'] for n in HEAT_RECOVERY])
+    write_csv(directory, 'hydro_projects_potential.csv',
+        ['Community', 'Project', 'Stream', 'Phase Completed',
+        'AAEM Capacity (kW)', 'AAEM Generation (kWh)',
+        'Construction Cost (2014$)', 'Transmission Cost (current)',
+        'Source'],
+        [[n, n + ' hydro', 'Synthetic Creek', 'Feasibility',
+            int(800 * scale[n]), int(4000000 * scale[n]),
+            int(12000000 * scale[n]), 1000000, 'synthetic'] for n in HYDRO])
+    write_csv(directory, 'wind_projects_potential.csv',
+        ['Community', 'Phase', 'Proposed Capacity (kW)',
+        'Proposed Generation (kWh)', 'Distance to Resource (ft)',
+        'Generation Capital Cost', 'Transmission CAPEX',
+        'Operational Costs / year', 'Project Name', 'link', 'notes'],
+        [[n, 'Reconnaissance', 300, 700000, 5000, 2500000, 400000, 30000,
+            n + ' wind', 'synthetic', 'none'] for n in WIND])
+
+    ## buildings
+    write_csv(directory, 'res_model_data.csv',
+        ['Community', 'Energy Region', 'Year', 'Total Occupied',
+        'BEES Number', 'BEES Total Consumption (MMBtu)',
+        'Post-Retrofit Number', 'Total Consumption (MMBtu)',
+        'Pre-Retrofit Avg Area (SF)', 'Pre-Retrofit Avg EUI (MMBtu/sf)',
+        'Post-Retrofit Avg Area (SF)', 'Post-Retrofit Avg EUI (MMBtu/sf)',
+        'Post-Retrofit Avg. EUI Reduction', 'BEES Avg Area (SF)',
+        'BEES Avg EUI (MMBtu/sf)'],
+        [[n, c, 2010, int(p / 3.0), int(p / 60.0), int(p / 60.0) * 70,
+            int(p / 30.0), int(p / 30.0) * 90, 1400, .13, 1450, .09, .3,
+            1600, .08] \
+            for n, c, p, parent in COMMUNITIES])
+    write_csv(directory, 'res_fuel_source.csv',
+        ['Community', 'Total', 'Utility Gas', 'LP', 'Electricity',
+        'Fuel Oil', 'Coal', 'Wood', 'Solar', 'Other', 'No fuel used'],
+        [[n, 1, 0, .02, .03, .8, 0, .15, 0, 0, 0] for n in names])
+    write_csv(directory, 'non-res_count.csv',
+        ['Community', 'Buildings'],
+        [[n, int(20 * scale[n]) + 5] for n in names])
+    estimates = [('Office', 2000, 10000, .4, 8), ('School', 15000, 12000, .3,
+        9), ('Health care', 4000, 11000, .5, 15), ('Other', 2500, 10000, .35,
+        10)]
+    units = ['Sqft', 'HDD', 'Gal/sf', 'kWh/sf']
+    write_csv(directory, 'non-res_consumption_estimates.csv',
+        ['Building Type'] + units,
+        [['Estimate units'] + units, ['Lower Limit'] + [0] * 4,
+        ['Upper Limit'] + [1000000] * 4] + [list(e) for e in estimates])
+    rows = []
+    for n in names:
+        gnis = get_gnis(n)
+        rows.append([n, gnis, 'Office', '', '', int(30000 * scale[n]), '',
+            int(2000 * scale[n]), '', '', '', '', '', '', '',
+            int(3000 * scale[n]) + 500, ''])
+        rows.append([n, gnis, 'School', '', '', '', '', '', '', '', '', '',
+            '', '', '', '', 150000])
+        rows.append([n, gnis, 'Warehouse', '', '', '', '', '', '', '', '',
+            '', '', '', '', '', ''])
+    write_csv(directory, 'non-res_buildings.csv',
+        ['Community', 'GNIS', 'Building Type', 'Biomass', 'Biomass Post',
+        'Electric', 'Electric Post', 'Fuel Oil', 'Fuel Oil Post',
+        'HW District', 'HW District Post', 'Natural Gas', 'Natural Gas Post',
+        'Propane', 'Propane Post', 'Square Feet', 'implementation cost'],
+        rows)
+    write_csv(directory, 'water-wastewater_projects_potential.csv',
+        ['Community', 'System Type', 'HR Installed', 'Biomass', 'HF Used',
+        'HF w/Retro', 'kWh/yr', 'kWh/yr w/ retro', 'Implementation Cost',
+        'Year'],
+        [[n, ['Circulating/Gravity', 'Haul', 'Pressure/Gravity'][i % 3],
+            i % 2 == 0, False, '', '', '', '', '', 2010] \
+            for i, n in enumerate(names)])
+    write_csv(directory, 'water-wastewater_assumptions.csv',
+        ['System Type', 'HDD kWh', 'HDD HF', 'pop kWh', 'pop HF'],
+        [['Circulating/Gravity', 14.9, 1.3, 750, 50],
+        ['Circulating/Vac', 11.5, 1.0, 600, 40],
+        ['Haul', 2.3, .6, 120, 18],
+        ['Pressure/Gravity', 9.4, .8, 500, 35],
+        ['Wash/HB', 1.1, .4, 80, 10]])
+    return directory
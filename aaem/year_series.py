@@ -0,0 +1,123 @@
+"""
+year_series.py
+
+    array backed series of values indexed by year, i.e. prices or forecasts.
+A series is converted to arrays once, and the values for the years of a
+project are slices of them, extended past the last known year with the last
+known value.
+"""
+import numpy as np
+
+
+class YearSeries (object):
+    """Values indexed by year, extended past the last known year with the
+    last known value
+
+    Parameters
+    ----------
+    series: Series
+        values indexed by year
+
+    Attributes
+    ----------
+    years: np.array
+        known years
+    values: np.array
+        known values
+    extended: np.array
+        known values, followed by the last known value for as many years as
+    have been needed. Read only
+    """
+
+    def __init__ (self, series):
+        """array backed series
+
+        Parameters
+        ----------
+        series: Series
+            values indexed by year
+        """
+        self.years = np.asarray(series.index, dtype = int)
+        self.values = np.asarray(series.values)
+        self.contiguous = bool((np.diff(self.years) == 1).all())
+        self.extended = np.empty(0, dtype = self.values.dtype)
+        self.extend(2 * len(self.values))
+
+    def extend (self, length):
+        """extend the values with the last known value
+
+        Parameters
+        ----------
+        length: int
+            length extended needs to be at least
+        """
+        if len(self.extended) >= length:
+            return
+        length = max(length, 2 * len(self.values))
+        extended = np.empty(length, dtype = self.values.dtype)
+        extended[:len(self.values)] = self.values
+        extended[len(self.values):] = self.values[-1]
+        extended.flags.writeable = False
+        self.extended = extended
+
+    def get (self, year):
+        """get the value for a known year
+
+        Parameters
+        ----------
+        year: int
+            year
+
+        Returns
+        -------
+        value
+
+        Raises
+        ------
+        KeyError
+            if year is not a known year
+        """
+        if self.contiguous:
+            position = int(year) - self.years[0]
+        else:
+            position = np.searchsorted(self.years, year)
+        if position < 0 or position >= len(self.years) or \
+                self.years[position] != year:
+            raise KeyError, year
+        return self.values[position]
+
+    def get_range (self, start_year, end_year):
+        """get the values for a project
+
+        Parameters
+        ----------
+        start_year: int
+            first year of the project
+        end_year: int
+            last year of the project
+
+        Returns
+        -------
+        np.array
+            the known values from start_year to end_year, followed by the
+        last known value, for end_year - start_year + 1 years. When start_year
+        is a known year this is a read only view
+
+        Raises
+        ------
+        IndexError
+            if start_year is after the last known year
+        """
+        length = max(end_year - start_year + 1, 0)
+        first = np.searchsorted(self.years, start_year)
+        if first >= len(self.years):
+            raise IndexError, 'No values after ' + str(start_year)
+        if self.contiguous and self.years[first] == start_year:
+            self.extend(first + length)
+            return self.extended[first:first + length]
+
+        known = self.values[first:][self.years[first:] <= end_year]
+        values = np.empty(length, dtype = self.values.dtype)
+        values[:len(known)] = known
+        values[len(known):] = self.values[-1]
+        return values
@@ -0,0 +1,159 @@
+"""
+Page Manifest
+-------------
+    Module for tracking the inputs of the html summaries in a web summaries
+directory
+
+    The manifest records a fingerprint of the inputs of the pages of each
+community (the digests of its stored results, and of the results of its
+projects and intertie, the templates, the model, data, and summary versions,
+and the list of communities, which is in the navigation of every page) and
+of the aggregate pages (the index, regional, and tech summaries, and the
+static files), which depend on the results of every community. When the
+summaries are generated again, only the pages whose fingerprint changed are
+generated.
+"""
+import os
+import hashlib
+import yaml
+
+MANIFEST_FILE = 'page_manifest.yaml'
+
+## key the aggregate pages are recorded under
+AGGREGATE_KEY = '__aggregate'
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(__file__), 'templates')
+
+def get_template_digest (directory = TEMPLATE_DIR):
+    """get a digest of the templates and static files
+
+    Parameters
+    ----------
+    directory: path, optional
+        templates directory
+
+    Returns
+    -------
+    str
+        hex digest
+    """
+    digest = hashlib.sha1()
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for f_name in sorted(files):
+            if os.path.splitext(f_name)[1] == '.pyc':
+                continue
+            path = os.path.join(root, f_name)
+            digest.update(os.path.relpath(path, directory) + '\0')
+            with open(path, 'rb') as fd:
+                digest.update(fd.read())
+    return digest.hexdigest()
+
+def make_fingerprint (parts):
+    """get a fingerprint of the inputs to a set of pages
+
+    Parameters
+    ----------
+    parts: list
+        inputs, i.e. digests and versions, converted to strings with repr
+
+    Returns
+    -------
+    str
+        hex digest
+    """
+    digest = hashlib.sha1()
+    for part in parts:
+        digest.update(repr(part) + '\0')
+    return digest.hexdigest()
+
+
+class PageManifest (object):
+    """Fingerprints of the pages in a web summaries directory
+
+    Parameters
+    ----------
+    directory: path
+        web summaries directory
+
+    Attributes
+    ----------
+    directory: path
+        web summaries directory
+    entries: dict
+        community, or AGGREGATE_KEY -> fingerprint
+    """
+
+    def __init__ (self, directory):
+        """Page manifest for a directory
+
+        Parameters
+        ----------
+        directory: path
+            web summaries directory
+        """
+        self.directory = directory
+        self.manifest_file = os.path.join(directory, MANIFEST_FILE)
+        self.entries = {}
+        if os.path.isfile(self.manifest_file):
+            with open(self.manifest_file, 'r') as fd:
+                self.entries = yaml.load(fd) or {}
+
+    def save (self):
+        """save the manifest file
+        """
+        try:
+            os.makedirs(self.directory)
+        except OSError:
+            pass
+        with open(self.manifest_file, 'w') as fd:
+            yaml.dump(self.entries, fd, default_flow_style = False)
+
+    def keys (self):
+        """get the recorded communities, and AGGREGATE_KEY if the aggregate
+        pages are recorded
+
+        Returns
+        -------
+        list
+        """
+        return self.entries.keys()
+
+    def is_current (self, key, fingerprint):
+        """test if pages are recorded with the same fingerprint
+
+        Parameters
+        ----------
+        key: str
+            community or AGGREGATE_KEY
+        fingerprint: str
+            fingerprint of the inputs to the pages
+
+        Returns
+        -------
+        bool
+        """
+        return self.entries.get(key, None) == fingerprint
+
+    def record (self, key, fingerprint):
+        """record the fingerprint of pages, call save to save the manifest
+
+        Parameters
+        ----------
+        key: str
+            community or AGGREGATE_KEY
+        fingerprint: str
+            fingerprint of the inputs to the pages
+        """
+        self.entries[key] = fingerprint
+
+    def remove (self, key):
+        """remove the pages of a community or the aggregate pages from the
+        manifest, call save to save the manifest
+
+        Parameters
+        ----------
+        key: str
+            community or AGGREGATE_KEY
+        """
+        del self.entries[key]
@@ -1,22 +1,237 @@
-from jinja2 import Environment, PackageLoader
+from jinja2 import Environment, PackageLoader, FileSystemBytecodeCache
+from jinja2 import Markup
 import aaem.driver as driver
 from pandas import concat, DataFrame, read_csv
 import os
 import shutil
 
-from importlib import import_module
-from aaem.components import comp_lib, comp_order
+from aaem.components import comp_lib, comp_order, comp_packages
+from aaem.components import get_registry
 from aaem.constants import *
 from aaem import  __version__ as model_version
 from aaem_summaries import __file__, __version__
+from aaem_summaries.page_manifest import PageManifest, AGGREGATE_KEY
+from aaem_summaries.page_manifest import get_template_digest, make_fingerprint
 
-from datetime import datetime
+from datetime import datetime, timedelta
+from multiprocessing import Pool, cpu_count
+import traceback
 
 import numpy as np
 import yaml
-from pickle import PicklingError
 import copy
 
+## summary pages for the secondary nav for the community summaries, the
+## same for every page
+SUMMARY_PAGES = [{'name':'Summary', 'pages':['Overview',
+                                    'Financial and Demographic',
+                                    'Consumption',
+                                    'Generation',
+                                    'Potential Projects']},
+        {'name':'Efficiency Projects',
+         'pages':["Residential Energy Efficiency",
+                  "Non-residential Energy Efficiency",
+                  "Water and Wastewater Efficiency"]
+        },
+        {'name':'Electricity Projects',
+         'pages':["Wind Power",
+                 'Solar Power',
+                  'Hydropower',
+                 'Transmission and Interties',
+                 'Diesel Efficiency']
+        },
+        {'name':'Heating Projects',
+         'pages':['Biomass for Heat (Cordwood)',
+                  'Biomass for Heat (Pellet)',
+                  'Residential ASHP',
+                  'Non-Residential ASHP',
+                  'Heat Recovery']
+        }
+       ]
+
+## template environment, shared by the WebSummary objects in a process and
+## the worker processes forked from it
+_environment = None
+
+def get_environment ():
+    """get the template environment. It is made once per process, with all
+    of the templates compiled, so worker processes forked after it is made do
+    not compile them again. The bytecode of the compiled templates is cached
+    on disk (in the temporary directory), so later runs do not compile them
+    either. The templates are not checked for changes once loaded.
+
+    The navbar is the same on every page, except for the path to the root
+    directory, so it is rendered once, for pages in the root directory
+    (navbar_root) and in a community directory (navbar), and given to the
+    templates as globals.
+
+    Returns
+    -------
+    jinja2.Environment
+    """
+    global _environment
+    if _environment is None:
+        env = Environment(loader=PackageLoader('aaem_summaries','templates/'),
+            bytecode_cache = FileSystemBytecodeCache(),
+            auto_reload = False,
+            cache_size = -1)
+        for name in env.list_templates(extensions = ['html']):
+            env.get_template(name)
+        navbar = env.get_template('navbar.html')
+        env.globals['navbar_root'] = Markup(navbar.render(in_root = True))
+        env.globals['navbar'] = Markup(navbar.render(in_root = False))
+        _environment = env
+    return _environment
+
+## the WebSummary used by _community_summaries_worker in worker processes,
+## set before the workers are forked
+_worker_summary = None
+
+def _community_summaries_worker (com, summary = None):
+    """Generate the summaries for a community, in a worker process for
+    WebSummary.generate_community_summaries_parallel
+
+    Parameters
+    ----------
+    com: str
+        a community
+    summary: WebSummary, optional
+        defaults to the WebSummary the worker was forked with
+
+    Returns
+    -------
+    tuple
+        (community, seconds, error), error is None or the traceback of the
+    error that stopped the summaries from being generated
+    """
+    if summary is None:
+        summary = _worker_summary
+    start = datetime.now()
+    try:
+        summary.generate_community_summaries(com)
+    except StandardError:
+        return com, (datetime.now() - start).total_seconds(), \
+            traceback.format_exc()
+    return com, (datetime.now() - start).total_seconds(), None
+
+class StoredResults (object):
+    """Results of the communities in a results store, each community is
+    loaded with ResultsStore.get the first time it is used, so only the
+    results of the pages being generated are read
+
+    Parameters
+    ----------
+    results_store: ResultsStore
+        stored results
+
+    Attributes
+    ----------
+    loaded: dict
+        community or project -> results loaded so far
+    """
+
+    def __init__ (self, results_store):
+        """Results loaded as they are used
+
+        Parameters
+        ----------
+        results_store: ResultsStore
+            stored results
+        """
+        self.results_store = results_store
+        self.names = results_store.keys()
+        self.lookup = set(self.names)
+        self.loaded = {}
+
+    def __getitem__ (self, name):
+        """get the results of a community, loading them if needed
+
+        Parameters
+        ----------
+        name: str
+            a community or project
+
+        Returns
+        -------
+        dict
+            dictionary of excuted components, with the 'community data' and
+        'forecast'
+        """
+        try:
+            return self.loaded[name]
+        except KeyError:
+            pass
+        if not name in self.lookup:
+            raise KeyError, name
+        self.loaded[name] = self.results_store.get(name)
+        return self.loaded[name]
+
+    def __contains__ (self, name):
+        return name in self.lookup
+
+    def __iter__ (self):
+        return iter(self.names)
+
+    def __len__ (self):
+        return len(self.names)
+
+    def keys (self):
+        """get the communities and projects
+
+        Returns
+        -------
+        list
+        """
+        return list(self.names)
+
+    def iteritems (self):
+        """iterate over the results, loading them as needed
+
+        Yields
+        ------
+        tuple
+            (name, dictionary of excuted components)
+        """
+        for name in self.names:
+            yield name, self[name]
+
+
+class BadDataCommunities (object):
+    """Communities known to have missing/incomplete data (no utility info),
+    each community is checked the first time it is tested
+
+    Parameters
+    ----------
+    results: StoredResults
+        results of the communities
+    """
+
+    def __init__ (self, results):
+        """Bad data communities, checked as they are tested
+
+        Parameters
+        ----------
+        results: StoredResults
+            results of the communities
+        """
+        self.results = results
+        self.checked = {}
+
+    def __contains__ (self, com):
+        if com.find('+') != -1 or not com in self.results:
+            return False
+        try:
+            return self.checked[com]
+        except KeyError:
+            pass
+        try:
+            self.checked[com] = len(self.results[com]['community data'].\
+                get_item('community', 'utility info')) == 0
+        except StandardError:
+            self.checked[com] = False
+        return self.checked[com]
+
+
 class WebSummary(object):
     """Tool for generating HTML web summaries """
     def __init__ (self, model_root, directory, tag = ''):
@@ -46,22 +261,14 @@ class WebSummary(object):
               'Heat Recovery':set(),
               'Diesel Efficiency':set()}
         self.model_root = model_root
+        self.registry = get_registry()
         model = driver.Driver(self.model_root)
-        self.results = model.load_results(tag)
-        #~ print self.results
+        self.results_store = model.load_results_store(tag)
+        ## loaded as the pages that need them are generated
+        self.results = StoredResults(self.results_store)
         self.bad_data_msg = \
             "This community is known to have missing/incomplete data."
-        self.bad_data_coms = []
-        try:
-            for c in self.get_coms():
-                if len(self.results[c]['community data'].get_item('community',
-                    'utility info')) == 0:
-                    self.bad_data_coms.append(c)
-
-        except StandardError as e:
-            #~ print e
-            print "Could not analyze bad communities"
-            pass
+        self.bad_data_coms = BadDataCommunities(self.results)
         self.version = model_version
         self.version_summary = __version__
         try:
@@ -83,7 +290,7 @@ class WebSummary(object):
             #~ print e
             pass
         #~ print "fine"
-        self.env = Environment(loader=PackageLoader('aaem_summaries','templates/'))
+        self.env = get_environment()
         #~ print self.env.list_templates()
         self.component_html = self.env.get_template('component.html')
         self.general_summaries_html = self.env.get_template('demo.html')
@@ -93,49 +300,167 @@ class WebSummary(object):
         self.index_html = self.env.get_template('index.html')
         self.comp_redir_html = self.env.get_template('intertie_redir.html')
         self.tech_html = self.env.get_template('tech.html')
-        self.get_ratios_greater_than_limit()
 
     #### -----------------------------------------------------------------------
     #### Driving functions
     #### -----------------------------------------------------------------------
-    def generate_all (self):
-        """Generate all html summaries and support files"""
+    def generate_all (self, jobs = None, incremental = False):
+        """Generate all html summaries and support files
+
+        Parameters
+        ----------
+        jobs: int, optional
+            number of worker processes to generate the community summaries
+        in, defaults to the number of CPUs. Where processes can not be
+        forked the summaries are generated one at a time
+        incremental: bool, optional
+            if True, only the pages whose inputs changed since they were
+        generated in the directory are generated again, see
+        aaem_summaries.page_manifest
+
+        Raises
+        ------
+        RuntimeError
+            if the summaries for any community could not be generated, after
+        the summaries for all other communities are generated
+
+        Returns
+        -------
+        dict
+            community -> seconds taken to generate its summaries
+        """
         keys = sorted([k for k in self.results.keys() if k.find('+') == -1])
-        self.copy_static()
-        self.generate_tech_summaries()
-        self.create_index()
-        self.generate_regional_summaries()
+        manifest = PageManifest(self.directory)
+        fingerprints = self.get_fingerprints(keys)
+
+        if not incremental or \
+                not manifest.is_current(AGGREGATE_KEY,
+                                        fingerprints[AGGREGATE_KEY]):
+            ## the aggregate pages use the results of every community
+            self.get_ratios_greater_than_limit()
+            self.copy_static()
+            self.generate_tech_summaries()
+            self.create_index()
+            self.generate_regional_summaries()
+            manifest.record(AGGREGATE_KEY, fingerprints[AGGREGATE_KEY])
         #~ import sys
         #~ sys.exit()
+
+        if incremental:
+            for com in manifest.keys():
+                if com != AGGREGATE_KEY and not com in fingerprints:
+                    self.remove_community_summaries(com)
+                    manifest.remove(com)
+            changed = [com for com in keys \
+                if not manifest.is_current(com, fingerprints[com])]
+            print len(changed), 'of', len(keys), 'communities changed'
+            for com in changed:
+                self.remove_community_summaries(com)
+            keys = changed
+
+        if jobs is None:
+            jobs = cpu_count()
+
+        times = {}
+        failed = []
         try:
-            ### try Multiprocessing
-            os.fork
-            from multiprocessing import Process, Lock,active_children, cpu_count
+            for com, seconds, error in \
+                    self.generate_community_summaries_parallel(keys, jobs):
+                if error is None:
+                    times[com] = seconds
+                    manifest.record(com, fingerprints[com])
+                    print com, timedelta(seconds = seconds)
+                else:
+                    failed.append(com)
+                    print com, "failed"
+                    print error
+        finally:
+            manifest.save()
+        if len(failed) > 0:
+            raise RuntimeError, \
+                "Summaries could not be generated for: " + ', '.join(failed)
+        return times
+
+    def get_fingerprints (self, keys):
+        """get the fingerprints of the inputs to the pages of each
+        community, and to the aggregate pages
 
-            lock = Lock()
+        Parameters
+        ----------
+        keys: list
+            communities
 
-            for com in keys: #["Stebbins","Adak","Brevig_Mission"]:
-                while len(active_children()) >= cpu_count():
-                    continue
-                lock.acquire()
-                print com, "started"
-                lock.release()
-                Process(
-                    target=self.multiprocess_community_summaries,
-                    args=(com, lock)
-                ).start()
-
-            while len(active_children()) > 0:
-                continue
-        except (ImportError,
-            NotImplementedError,
-            PicklingError,
-            AttributeError):
-            ### do it one at a time.
-            for com in keys: #["Stebbins","Adak","Brevig_Mission"]:
-                start = datetime.now()
-                self.generate_community_summaries(com)
-                print com, datetime.now() - start
+        Returns
+        -------
+        dict
+            community, or AGGREGATE_KEY -> fingerprint
+        """
+        digests = sorted([(k, self.results_store.digest(k)) \
+            for k in self.results])
+        common = [get_template_digest(), self.version, self.data_version,
+            self.version_summary, self.get_cleaned_coms()]
+
+        fingerprints = {AGGREGATE_KEY: make_fingerprint(common + digests)}
+        for com in keys:
+            ## the pages for a community also show its projects, and its
+            ## intertie
+            fingerprints[com] = make_fingerprint(common + \
+                [d for d in digests if d[0].find(com) != -1])
+        return fingerprints
+
+    def remove_community_summaries (self, com):
+        """remove the summaries generated for a community
+
+        Parameters
+        ----------
+        com: str
+            a community or project
+        """
+        shutil.rmtree(os.path.join(self.directory, com.replace("'","")),
+            ignore_errors = True)
+
+    def generate_community_summaries_parallel (self, keys, jobs):
+        """Generate the community summaries in a pool of worker processes.
+        The workers are forked once, and share the results loaded here (all
+        of them, if the aggregate pages were generated), the results of other
+        communities are loaded by the workers as they are used. Each worker
+        is given batches of communities
+
+        Parameters
+        ----------
+        keys: list
+            communities
+        jobs: int
+            number of worker processes. If it is 1, or processes can not be
+        forked, the summaries are generated one at a time in this process
+
+        Yields
+        ------
+        tuple
+            (community, seconds, error) as each community is finished, error
+        is None or the traceback of the error that stopped the summaries for
+        the community from being generated
+        """
+        global _worker_summary
+        if jobs <= 1 or not hasattr(os, 'fork'):
+            for com in keys:
+                yield _community_summaries_worker(com, self)
+            return
+
+        jobs = min(jobs, max(len(keys), 1))
+        ## a few batches per worker, so a slow batch does not leave the
+        ## other workers idle at the end
+        chunksize = max(1, len(keys) // (jobs * 4))
+        _worker_summary = self
+        pool = Pool(jobs)
+        try:
+            for result in pool.imap_unordered(_community_summaries_worker,
+                    keys, chunksize):
+                yield result
+        finally:
+            _worker_summary = None
+            pool.terminate()
+            pool.join()
 
 
     #### -----------------------------------------------------------------------
@@ -1920,6 +2245,9 @@ class WebSummary(object):
         """copy all of the css and js stuff
         """
         pth = os.path.dirname(__file__)
+        for static in ['css', 'js', 'fonts']:
+            shutil.rmtree(os.path.join(self.directory, static),
+                ignore_errors = True)
         shutil.copytree(os.path.join(pth,'templates','css'),
                                         os.path.join(self.directory,'css'))
         shutil.copytree(os.path.join(pth,'templates','js'),
@@ -2097,25 +2425,6 @@ class WebSummary(object):
         plotting_table.insert(0,header)
         return plotting_table
 
-    def multiprocess_community_summaries (self, com, lock, log = True):
-        """Multi-processing helper
-
-        Parameters
-        ----------
-        com: str
-            a community
-        lock: Lock
-            a lock for multiprocessing
-        log: bool
-            log the data
-        """
-        start = datetime.now()
-        self.generate_community_summaries(com)
-        if log:
-            lock.acquire()
-            print com, datetime.now() - start
-            lock.release()
-
     def get_tech_summary(self, component):
         """get the tech summaries
 
@@ -2139,29 +2448,34 @@ class WebSummary(object):
 
         ## get regional summaries from main component
         self.tech_summaries[component] = \
-            import_module("aaem.components." + component).\
+            self.registry[comp_packages[component]].\
             create_regional_summary(self.results)
         return self.tech_summaries[component]
 
     def get_web_summary(self, component):
-        """
-        """
-        try:
-            return self.imported_summaries[component].generate_web_summary
-        except AttributeError as e:
-            #~ print e
-            self.imported_summaries = {}
-        except KeyError as e:
-            #~ print e
-            pass
+        """get a components generate_web_summary function
+
+        Parameters
+        ----------
+        component: str
+            component package name
 
-        self.imported_summaries[component] = \
-            import_module("aaem_summaries.components." + component).summary
-        return self.imported_summaries[component].generate_web_summary
+        Returns
+        -------
+        function
+        """
+        return self.registry[comp_packages[component]].get_web_summary()
 
     def get_cleaned_coms (self):
-        """ Function doc """
-        return sorted([k.replace("'",'') for k in self.get_coms()])
+        """get the communities, without quotes, for the navigation of every
+        page. Found once, as the results do not change
+        """
+        try:
+            return self.cleaned_coms
+        except AttributeError:
+            self.cleaned_coms = \
+                sorted([k.replace("'",'') for k in self.get_coms()])
+            return self.cleaned_coms
 
     def get_coms (self):
         return sorted([k for k in self.results.keys() if k.find('+') == -1])
@@ -2250,31 +2564,7 @@ class WebSummary(object):
         """
         get the summary pages for the secondary nav for the community summaries
         """
-        return [{'name':'Summary', 'pages':['Overview',
-                                            'Financial and Demographic',
-                                            'Consumption',
-                                            'Generation',
-                                            'Potential Projects']},
-                {'name':'Efficiency Projects',
-                 'pages':["Residential Energy Efficiency",
-                          "Non-residential Energy Efficiency",
-                          "Water and Wastewater Efficiency"]
-                },
-                {'name':'Electricity Projects',
-                 'pages':["Wind Power",
-                         'Solar Power',
-                          'Hydropower',
-                         'Transmission and Interties',
-                         'Diesel Efficiency']
-                },
-                {'name':'Heating Projects',
-                 'pages':['Biomass for Heat (Cordwood)',
-                          'Biomass for Heat (Pellet)',
-                          'Residential ASHP',
-                          'Non-Residential ASHP',
-                          'Heat Recovery']
-                }
-               ]
+        return SUMMARY_PAGES
 
     def get_viable_components (self, com, cutoff = 1):
         """ Function doc """
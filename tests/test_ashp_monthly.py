@@ -0,0 +1,56 @@
+import unittest
+
+import numpy as np
+
+from aaem.components.ashp_base import monthly
+
+
+class TestASHPMonthly(unittest.TestCase):
+    def setUp (self):
+        """
+        set up test
+        """
+        self.performance_data = {
+            'Temperature': [-13, -4, 5, 14, 23, 32, 41, 50, 59],
+            'COP': [1.1, 1.4, 1.7, 2.0, 2.3, 2.6, 2.9, 3.1, 3.3],
+        }
+        self.temperatures = np.array([
+            [55, 52, 45, 30, 10, -5, -20, -15, 0, 20, 40, 50],
+            [70, 60, 45, np.nan, 10, -5, -20, -15, 0, 20, 40, 50],
+        ])
+        self.percents = np.array([
+            [.01, .01, .03, .08, .13, .17, .19, .15, .12, .07, .03, .01],
+            [0, .01, .03, .08, .13, .17, .19, .15, .12, .07, .03, .17],
+        ])
+
+    def test_cop (self):
+        """
+        test the COP is the fit, limited by the performance data
+        """
+        cop = monthly.calc_cop([[-20, 59, 70, np.nan]], self.performance_data)
+        self.assertEqual(cop[0, 0], 0)
+        self.assertEqual(cop[0, 1], 3.3)
+        self.assertEqual(cop[0, 2], 3.3)
+        self.assertTrue(np.isnan(cop[0, 3]))
+        self.assertIs(monthly.fit_cop(self.performance_data),
+            monthly.fit_cop(dict(self.performance_data)))
+
+    def test_batch (self):
+        """
+        test communities evaluated together match those evaluated alone
+        """
+        together = monthly.calc_monthly_values(self.temperatures,
+            self.percents, [1000.0, 2000.0], .75, self.performance_data)
+        yearly = monthly.calc_yearly_values(together)
+        for row, heat in enumerate([1000.0, 2000.0]):
+            alone = monthly.calc_monthly_values(self.temperatures[row],
+                self.percents[row], heat, .75, self.performance_data)
+            for column in monthly.MONTHLY_COLUMNS:
+                np.testing.assert_array_equal(together[column][row],
+                    alone[column][0])
+            alone = monthly.calc_yearly_values(alone)
+            for key in yearly:
+                self.assertEqual(yearly[key][row], alone[key][0])
+        ## no heating oil is used when the heat pump runs
+        consumed = together['Heating Oil Consumed (gal)']
+        self.assertTrue((consumed[together['COP'] != 0] == 0).all())
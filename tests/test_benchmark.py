@@ -0,0 +1,47 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from aaem import benchmark
+from aaem.cli.default_cases import __DEV_COMS__, __DEV_COMS_RUN__
+
+
+def stage (seconds, rss, items = 10):
+    return {'seconds': seconds, 'items': items,
+        'items per second': items / seconds, 'peak rss (MB)': rss}
+
+class TestBenchmark(unittest.TestCase):
+    def test_find_regressions (self):
+        """
+        test benchmark.find_regressions
+        """
+        baseline = {'version': '1.0.0', 'run': stage(10.0, 100.0),
+            'web': stage(10.0, 100.0), 'financial': stage(.1, 100.0)}
+        results = {'version': '1.0.1', 'run': stage(11.0, 200.0),
+            'web': stage(20.0, 100.0, 5), 'financial': stage(.3, 100.0)}
+        regressions = benchmark.find_regressions(results, baseline, .25)
+        self.assertEqual(len(regressions), 1)
+        self.assertTrue(regressions[0].startswith('run: peak rss (MB)'))
+
+    def test_offline (self):
+        """
+        test the offline benchmark runs every stage, against the synthetic
+        data repo, for the development communities
+        """
+        model_root = tempfile.mkdtemp()
+        try:
+            results = benchmark.run_benchmarks(model_root,
+                refresh_communities = __DEV_COMS__,
+                run_communities = __DEV_COMS_RUN__, offline = True,
+                synthetic_size = 5)
+            web = os.path.join(model_root, 'benchmark',
+                'results_benchmark', '__web_summaries')
+            self.assertTrue(os.path.isfile(os.path.join(web, 'index.html')))
+        finally:
+            shutil.rmtree(model_root)
+        self.assertEqual(results['refresh']['items'], len(__DEV_COMS__))
+        for stage in ['run', 'components', 'summaries', 'web']:
+            self.assertEqual(results[stage]['items'], len(__DEV_COMS_RUN__))
+        for stage in benchmark.SYNTHETIC_STAGES:
+            self.assertTrue(stage in results)
@@ -0,0 +1,72 @@
+import unittest
+
+import numpy as np
+from pandas import DataFrame
+
+from aaem.components.non_residential.inventory import BuildingInventory
+
+
+class TestBuildingInventory(unittest.TestCase):
+    def setUp (self):
+        """
+        set up test
+        """
+        nan = np.nan
+        columns = ['Square Feet', 'Electric', 'Electric Post', 'Fuel Oil',
+            'Fuel Oil Post', 'Natural Gas', 'Natural Gas Post', 'HW District',
+            'HW District Post', 'Propane', 'Propane Post', 'Biomass',
+            'Biomass Post', 'implementation cost']
+        self.inventories = [
+            DataFrame([
+                [1000, nan, nan, nan, nan, nan, nan, nan, nan, nan, nan,
+                    nan, nan, nan],
+                [nan, 5000, nan, 300, nan, nan, nan, nan, nan, nan, nan,
+                    nan, nan, 100],
+                [nan, nan, nan, nan, nan, nan, nan, nan, nan, nan, nan,
+                    nan, nan, nan],
+            ], index = ['Office', 'School', 'Unknown'], columns = columns),
+            DataFrame([
+                [nan, nan, nan, nan, nan, nan, nan, nan, nan, nan, nan,
+                    nan, nan, nan],
+            ], index = ['Office'], columns = columns),
+        ]
+        self.estimates = [
+            DataFrame({'Sqft': [1500.0, 4000, 2000],
+                'HDD': [10000.0, 12000, 9000],
+                'Gal/sf': [.4, .3, .25], 'kWh/sf': [8.0, 9, 10]},
+                index = ['Office', 'School', 'Other']),
+        ] * 2
+
+    def test_estimates (self):
+        """
+        test unknown values are filled with the estimates for the building
+        type, or the 'Other' estimates
+        """
+        inventory = BuildingInventory(self.inventories, self.estimates)
+        self.assertEqual(inventory.unknown_types, [['Unknown'], []])
+        self.assertEqual(inventory.estimate_square_feet().tolist(),
+            [1000, 4000, 2000, 1500])
+        self.assertEqual(inventory.totals('Square Feet').tolist(),
+            [7000, 1500])
+        inventory.estimate_heating_fuel(9000, [False, True])
+        self.assertEqual(inventory.columns['Fuel Oil'][:3].tolist(),
+            [1000 * .9 * .4, 300, 2000 * .25])
+        self.assertTrue(np.isnan(inventory.columns['Fuel Oil'][3]))
+        self.assertFalse(np.isnan(inventory.columns['Natural Gas'][3]))
+
+    def test_batch (self):
+        """
+        test communities in one inventory match communities on their own
+        """
+        together = BuildingInventory(self.inventories, self.estimates)
+        alone = [BuildingInventory([i], [e]) \
+            for i, e in zip(self.inventories, self.estimates)]
+        for inventory in [together] + alone:
+            inventory.estimate_square_feet()
+            inventory.estimate_implementation_cost(5.0)
+            estimated = inventory.estimate_electric()
+            inventory.scale_electric(estimated, .5)
+            inventory.estimate_proposed(['Electric'], .25)
+        for column in ['implementation cost', 'Electric', 'Electric Post']:
+            self.assertEqual(together.totals(column).tolist(),
+                [a.totals(column)[0] for a in alone])
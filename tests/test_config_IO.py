@@ -0,0 +1,119 @@
+import os
+import shutil
+import tempfile
+import unittest
+from pandas import DataFrame
+
+from aaem.config_IO import layer_configs, merge_configs, validate_keys, \
+    read_config, get_cache_path, CACHE_DIR
+
+
+class TestLayerConfigs(unittest.TestCase):
+    def setUp (self):
+        """
+        set up test
+        """
+        self.base = {
+            'community': {'name': 'base', 'rate': 0.05,
+                'prices': DataFrame([1.0, 2.0])},
+            'Wind Power': {'enabled': True, 'costs': {'a': 1, 'b': 2}},
+        }
+        self.top = {
+            'community': {'name': 'top'},
+            'Wind Power': {'costs': {'b': 3}},
+            'Solar Power': {'enabled': False},
+        }
+
+    def test_matches_merge_configs (self):
+        """
+        test config_IO.layer_configs has the same values as merge_configs
+        """
+        layered = layer_configs(self.base, self.top)
+        merged = merge_configs(self.base, self.top)
+        self.assertEqual(sorted(layered.keys()), sorted(merged.keys()))
+        self.assertEqual(layered['community']['name'], 'top')
+        self.assertEqual(layered['Wind Power']['costs'], {'a': 1, 'b': 3})
+        self.assertEqual(layered['Solar Power'], {'enabled': False})
+
+    def test_base_is_not_modified (self):
+        """
+        test changes to a layered config do not change the base
+        """
+        layered = layer_configs(self.base, self.top)
+        layered['Wind Power']['enabled'] = False
+        layered['community']['prices'][0] = 10.0
+        self.assertTrue(self.base['Wind Power']['enabled'])
+        self.assertEqual(self.base['community']['prices'][0][0], 1.0)
+
+    def test_validate_keys (self):
+        """
+        test config_IO.validate_keys
+        """
+        self.assertTrue(validate_keys({'community': {'rate': 1}},
+            self.base)[0])
+        self.assertFalse(validate_keys({'community': {'typo': 1}},
+            self.base)[0])
+
+
+class TestReadConfigCache(unittest.TestCase):
+    def setUp (self):
+        """
+        set up test
+        """
+        self.directory = tempfile.mkdtemp()
+        self.config = os.path.join(self.directory, 'Adak.yaml')
+        self.write('community:\n  name: Adak\n')
+
+    def tearDown (self):
+        shutil.rmtree(self.directory)
+
+    def write (self, text):
+        """
+        write the test config
+        """
+        with open(self.config, 'w') as fd:
+            fd.write(text)
+        return get_cache_path(self.config, text)
+
+    def cache_entries (self):
+        """
+        get the files in the cache directory
+        """
+        return sorted(os.listdir(os.path.join(self.directory, CACHE_DIR)))
+
+    def test_cache_hit (self):
+        """
+        test config_IO.read_config reads a cache entry, as a new copy
+        """
+        conf = read_config(self.config)
+        self.assertEqual(self.cache_entries(),
+            [os.path.basename(get_cache_path(self.config,
+                'community:\n  name: Adak\n'))])
+        conf['community']['name'] = 'changed'
+        self.assertEqual(read_config(self.config)['community']['name'],
+            'Adak')
+
+    def test_invalidation (self):
+        """
+        test config_IO.read_config reads a changed file, and removes the
+        entry for the old contents
+        """
+        read_config(self.config)
+        entry = self.write('community:\n  name: Atka\n')
+        self.assertEqual(read_config(self.config)['community']['name'],
+            'Atka')
+        self.assertEqual(self.cache_entries(), [os.path.basename(entry)])
+
+    def test_corrupt_entry (self):
+        """
+        test config_IO.read_config replaces entries that can not be read
+        """
+        entry = get_cache_path(self.config, 'community:\n  name: Adak\n')
+        os.makedirs(os.path.dirname(entry))
+        with open(entry, 'wb') as fd:
+            fd.write('cpandas.core.missing_module\nThing\np0\n.')
+        self.assertEqual(read_config(self.config)['community']['name'],
+            'Adak')
+        self.assertEqual(read_config(self.config)['community']['name'],
+            'Adak')
+        self.assertEqual(self.cache_entries(), [os.path.basename(entry)])
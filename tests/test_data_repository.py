@@ -0,0 +1,62 @@
+import os.path
+import shutil
+import tempfile
+import unittest
+
+from aaem import data_repository
+
+
+class TestDataRepository(unittest.TestCase):
+    def setUp (self):
+        """
+        set up test
+        """
+        self.directory = tempfile.mkdtemp()
+        self.datafile = os.path.join(self.directory, 'community_list.csv')
+        with open(self.datafile, 'w') as fd:
+            fd.write('# comment\n'
+                'Community,GNIS,FIPS,Energy Region,Alias\n'
+                'Adak,1,2,Aleutians,\n'
+                'Bethel,3,4,Lower Yukon-Kuskokwim,Bethel City\n')
+
+    def tearDown (self):
+        data_repository.clear()
+        shutil.rmtree(self.directory)
+
+    def test_shared_table (self):
+        """
+        test data_repository.get_table reads a file once
+        """
+        data = data_repository.get_table(self.datafile, comment = '#')
+        self.assertTrue(
+            data is data_repository.get_table(self.datafile, comment = '#'))
+        self.assertEqual(list(data['Community']), ['Adak', 'Bethel'])
+
+    def test_id_lookup (self):
+        """
+        test data_repository.id_lookup finds rows by any id
+        """
+        lookup = data_repository.get_table(self.datafile, 'id lookup',
+            lambda d: data_repository.id_lookup(d,
+                ['Community', 'GNIS', 'FIPS', 'Alias']),
+            comment = '#')
+        self.assertEqual(lookup['Bethel City'], [1])
+        self.assertEqual(lookup[1], [0])
+        self.assertFalse('' in lookup)
+
+    def test_get_rows (self):
+        """
+        test data_repository.get_rows selects rows in the order of ids,
+        leaves out ids that are not in the table, and returns a copy
+        """
+        rows = data_repository.get_rows(self.datafile,
+            ['Bethel', 'Nome', 'Adak'], comment = '#', index_col = 0)
+        self.assertEqual(list(rows.index), ['Bethel', 'Adak'])
+        rows['GNIS'] = 0
+        table = data_repository.get_table(self.datafile,
+            comment = '#', index_col = 0)
+        self.assertEqual(list(table['GNIS']), [1, 3])
+        rows = data_repository.get_rows(self.datafile, ['Nome'],
+            comment = '#', index_col = 0)
+        self.assertEqual(len(rows), 0)
+        self.assertEqual(list(rows.columns), list(table.columns))
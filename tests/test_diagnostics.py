@@ -0,0 +1,70 @@
+import os.path
+import shutil
+import tempfile
+import unittest
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+
+from aaem.diagnostics import Diagnostics, save_bulk, load_bulk
+
+
+class TestDiagnostics(unittest.TestCase):
+    def test_level (self):
+        """
+        test messages below the level are dropped when added
+        """
+        diag = Diagnostics('WARNING')
+        diag.add_note('Forecast', 'a note')
+        diag.add_warning('Forecast', 'a warning')
+        diag.add_error('Wind Power', 'an error')
+        self.assertEqual(len(diag), 2)
+        self.assertEqual([m['type'] for m in diag.messages],
+            ['WARNING', 'ERROR'])
+
+        everything = Diagnostics()
+        everything.add_note('Forecast', 'a note')
+        everything.extend(diag)
+        self.assertEqual(len(everything), 3)
+
+    def test_pickle (self):
+        """
+        test diagnostics can be pickled, and diagnostics pickled as a list
+        of messages are loaded
+        """
+        diag = Diagnostics()
+        diag.add_note('Forecast', 'a note')
+        loaded = pickle.loads(pickle.dumps(diag, pickle.HIGHEST_PROTOCOL))
+        self.assertEqual(loaded.messages, diag.messages)
+
+        old = Diagnostics.__new__(Diagnostics)
+        old.__setstate__({'messages': diag.messages})
+        self.assertEqual(old.messages, diag.messages)
+
+    def test_bulk (self):
+        """
+        test the diagnostics of a community can be loaded from the bulk file
+        """
+        adak = Diagnostics()
+        adak.add_note('Forecast', 'a note, with a comma')
+        adak.add_warning('Wind Power', 'a warning\non two lines')
+        bethel = Diagnostics()
+        bethel.add_error('Solar Power', 'an error')
+
+        directory = tempfile.mkdtemp()
+        try:
+            save_bulk([('Adak', adak), ('Bethel', bethel),
+                ('Chefornak', Diagnostics())], directory)
+            self.assertEqual(load_bulk(directory, 'Adak').messages,
+                adak.messages)
+            self.assertEqual(load_bulk(directory, 'Bethel').messages,
+                bethel.messages)
+            self.assertEqual(len(load_bulk(directory, 'Chefornak')), 0)
+            self.assertRaises(KeyError, load_bulk, directory, 'Deering')
+
+            csv_file = os.path.join(directory, 'Adak.csv')
+            load_bulk(directory, 'Adak').save_messages(csv_file)
+            self.assertTrue(os.path.isfile(csv_file))
+        finally:
+            shutil.rmtree(directory)
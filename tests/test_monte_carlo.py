@@ -0,0 +1,117 @@
+import unittest
+
+import numpy as np
+
+from aaem import monte_carlo
+
+DEFAULT_SCALERS = {
+    'diesel price': 1.0,
+    'diesel price adder': 0.0,
+    'capital costs': 1.0,
+    'kWh consumption': 1.0,
+}
+
+SETTINGS = {
+    'samples': 200,
+    'seed': 3,
+    'levels': 4,
+    'scalers': {
+        'diesel price': {'distribution': 'normal', 'mean': 1.0, 'std': .1},
+        'capital costs': {'distribution': 'triangular',
+            'min': .9, 'mode': 1.0, 'max': 1.5},
+    },
+    'config': {
+        'Wind Power': {
+            'average load limit': {'distribution': 'uniform',
+                'min': 50, 'max': 150}
+        }
+    }
+}
+
+
+class TestMonteCarlo(unittest.TestCase):
+
+    def test_draw_samples (self):
+        """
+        test monte_carlo.draw_samples is reproducible with a seed, and run
+        inputs have at most levels values
+        """
+        inputs, run_samples, capital = \
+            monte_carlo.draw_samples(SETTINGS, DEFAULT_SCALERS)
+        inputs2, run_samples2, capital2 = \
+            monte_carlo.draw_samples(SETTINGS, DEFAULT_SCALERS)
+        self.assertEqual(inputs, inputs2)
+        self.assertTrue((run_samples == run_samples2).all())
+        self.assertTrue((capital == capital2).all())
+
+        self.assertEqual(run_samples.shape, (200, len(inputs)))
+        self.assertEqual(len(capital), 200)
+        self.assertTrue(len(np.unique(capital)) > 4)
+        col = inputs.index(('scaler', 'diesel price'))
+        self.assertEqual(len(np.unique(run_samples[:, col])), 4)
+        col = inputs.index(('config', 'Wind Power', 'average load limit'))
+        self.assertEqual(len(np.unique(run_samples[:, col])), 4)
+        col = inputs.index(('scaler', 'kWh consumption'))
+        self.assertTrue((run_samples[:, col] == 1.0).all())
+
+        groups = monte_carlo.group_samples(run_samples)
+        self.assertTrue(len(groups) <= 16)
+        indices = np.sort(np.concatenate([g[1] for g in groups]))
+        self.assertTrue((indices == np.arange(200)).all())
+
+    def test_unstratified (self):
+        """
+        test monte_carlo.draw_samples runs every sample unless levels is set,
+        so the spread of the run inputs is not narrowed
+        """
+        settings = dict(SETTINGS)
+        del settings['levels']
+        inputs, run_samples, capital = \
+            monte_carlo.draw_samples(settings, DEFAULT_SCALERS)
+        col = inputs.index(('scaler', 'diesel price'))
+        self.assertEqual(len(np.unique(run_samples[:, col])), 200)
+        self.assertEqual(len(monte_carlo.group_samples(run_samples)), 200)
+
+        inputs, stratified, capital = \
+            monte_carlo.draw_samples(SETTINGS, DEFAULT_SCALERS)
+        self.assertTrue(
+            stratified[:, col].std() < run_samples[:, col].std())
+        self.assertRaises(ValueError, monte_carlo.draw_samples,
+            {'levels': 0}, DEFAULT_SCALERS)
+
+    def test_unknown_scaler (self):
+        """
+        test monte_carlo.draw_samples raises ValueError for unknown scalers
+        and distributions
+        """
+        self.assertRaises(ValueError, monte_carlo.draw_samples,
+            {'scalers': {'fuel price': 1.0}}, DEFAULT_SCALERS)
+        self.assertRaises(ValueError, monte_carlo.draw_samples,
+            {'scalers': {'diesel price': {'distribution': 'beta'}}},
+            DEFAULT_SCALERS)
+
+    def test_statistics (self):
+        """
+        test monte_carlo.MonteCarloStatistics reduces the results of groups
+        """
+        stats = monte_carlo.MonteCarloStatistics(['Wind Power', 'Solar Power'])
+        stats.add({'Wind Power': {
+            'net npv': np.array([1.0, 2.0]),
+            'benefit cost ratio': np.array([.5, 2.0])}})
+        stats.add({'Wind Power': {
+            'net npv': np.array([3.0, np.nan]),
+            'benefit cost ratio': np.array([1.5, 3.0])}})
+        df = stats.to_dataframe()
+        self.assertEqual(list(df.columns), monte_carlo.STATISTIC_COLUMNS)
+        self.assertTrue(df['levels'].isnull().all())
+        npv = df[df['metric'] == 'net npv'].iloc[0]
+        self.assertEqual(npv['samples'], 3)
+        self.assertEqual(npv['mean'], 2.0)
+        self.assertEqual(npv['p50'], 2.0)
+        ce = df[df['metric'] == monte_carlo.COST_EFFECTIVE_METRIC].iloc[0]
+        self.assertEqual(ce['mean'], .75)
+        self.assertEqual(len(df), 3)
+
+        stats = monte_carlo.MonteCarloStatistics(['Wind Power'], 4)
+        stats.add({'Wind Power': {'net npv': np.array([1.0, 2.0])}})
+        self.assertEqual(list(stats.to_dataframe()['levels']), [4])
@@ -0,0 +1,82 @@
+import unittest
+
+import numpy as np
+
+from aaem import optimization
+from aaem.sensitivity import restore_inputs
+
+
+class FakeCommunityData (object):
+    def __init__ (self):
+        self.data = {
+            'Wind Power': {'start year': 2020, 'proposed capacity': 100.0,
+                'proposed generation': 250000.0},
+            'Hydropower': {'start year': 2020, 'proposed capacity': 500.0,
+                'proposed generation': 2000000.0,
+                'generation capital cost': 10000000.0},
+        }
+    
+    def get_item (self, section, key):
+        return self.data[section][key]
+    
+    def set_item (self, section, key, data):
+        self.data[section][key] = data
+
+
+class FakeForecast (object):
+    def get_average_diesel_load (self, year):
+        return 200.0
+
+
+class TestOptimization(unittest.TestCase):
+
+    def test_get_sizes (self):
+        """
+        test capacities are fractions of the average diesel load
+        """
+        cd = FakeCommunityData()
+        sizes = optimization.get_sizes(cd, FakeForecast(), 'Wind Power',
+            'proposed capacity', {'fractions': [.5, 1.0]})
+        self.assertEqual(sizes, [100.0, 200.0])
+        sizes = optimization.get_sizes(cd, FakeForecast(), 'Wind Power',
+            'percent generation to offset',
+            {'values': {'Wind Power': {'proposed capacity': [10]}}})
+        self.assertEqual(sizes, optimization.PERCENTS)
+        cd.set_item('Hydropower', 'proposed capacity', 'UNKNOWN')
+        self.assertEqual(optimization.get_sizes(cd, FakeForecast(),
+            'Hydropower', 'proposed capacity', {}), [])
+
+    def test_change_size (self):
+        """
+        test changing sizes, and restoring them
+        """
+        cd = FakeCommunityData()
+        originals = optimization.change_size(cd, 'Hydropower',
+            'proposed capacity', 250.0)
+        self.assertEqual(cd.get_item('Hydropower', 'proposed generation'),
+            1000000.0)
+        self.assertEqual(
+            cd.get_item('Hydropower', 'generation capital cost'), 5000000.0)
+        restore_inputs(cd, originals)
+        self.assertEqual(cd.data, FakeCommunityData().data)
+
+        optimization.change_size(cd, 'Wind Power',
+            'proposed capacity', 150.0)
+        self.assertEqual(cd.get_item('Wind Power', 'proposed generation'),
+            'UNKNOWN')
+
+    def test_find_optimum (self):
+        """
+        test the optimum is the largest net npv meeting the minimum benefit
+        cost ratio
+        """
+        rows = [{'component': 'Wind Power', 'input': 'proposed capacity',
+                'value': v, 'net npv': n, 'benefit cost ratio': b} \
+            for v, n, b in [(200, 50.0, 1.1), (100, 10.0, 1.5),
+                (300, np.nan, np.nan), (50, -5.0, .9)]]
+        optimization.find_optimum(rows)
+        self.assertEqual([r['value'] for r in rows if r['optimum']], [200])
+        optimization.find_optimum(rows, 1.2)
+        self.assertEqual([r['value'] for r in rows if r['optimum']], [100])
+        table = optimization.to_dataframe(rows, ['Wind Power'])
+        self.assertEqual(table['value'].tolist(), [50, 100, 200, 300])
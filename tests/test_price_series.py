@@ -0,0 +1,19 @@
+import unittest
+
+from pandas import DataFrame
+
+from aaem.price_series import get_price_series
+
+
+class TestPriceSeries(unittest.TestCase):
+    def test_shared (self):
+        """
+        test get_price_series shares a read only series for prices
+        """
+        prices = DataFrame({'prices': [1, 2, 3, 4]}, index = range(2016, 2020))
+        series = get_price_series(prices)
+        self.assertTrue(series is get_price_series(prices))
+        self.assertFalse(series is get_price_series(prices * 2))
+        values = series.get_range(2016, 2030)
+        self.assertEqual(values.dtype.kind, 'f')
+        self.assertFalse(values.flags.writeable)
@@ -0,0 +1,54 @@
+import os.path
+import shutil
+import tempfile
+import unittest
+
+from aaem.profiler import Profiler, PROFILE_FILE, PROFILE_SUMMARY_FILE
+
+
+class TestProfiler(unittest.TestCase):
+    def test_measure (self):
+        """
+        test Profiler.measure records steps only when enabled
+        """
+        profiler = Profiler()
+        with profiler.measure('Adak', 'Wind Power', 'run'):
+            pass
+        with profiler.measure('Adak', 'Solar Power', 'run'):
+            pass
+        self.assertEqual(len(profiler.records), 2)
+        self.assertEqual(profiler.records[0][:3], ['Adak', 'Wind Power', 'run'])
+
+        disabled = Profiler(False)
+        with disabled.measure('Adak', 'Wind Power', 'run'):
+            pass
+        disabled.add_records(profiler.records)
+        self.assertEqual(disabled.records, [])
+
+    def test_summarize (self):
+        """
+        test Profiler.summarize totals per community and per component
+        """
+        profiler = Profiler()
+        profiler.records = [
+            ['Adak', 'Wind Power', 'run', 1.0, 1.0, 0.0],
+            ['Adak', 'Solar Power', 'run', 2.0, 1.0, 0.0],
+            ['Bethel', 'Wind Power', 'run', 3.0, 1.0, 0.0],
+        ]
+        summary = profiler.summarize().set_index(['community', 'component'])
+        self.assertEqual(summary.loc[('Adak', 'all components'),
+            'wall seconds'], 3.0)
+        self.assertEqual(summary.loc[('all communities', 'Wind Power'),
+            'wall seconds'], 4.0)
+        self.assertEqual(summary.loc[('all communities', 'Wind Power'),
+            'calls'], 2)
+
+        directory = tempfile.mkdtemp()
+        try:
+            profiler.save(directory)
+            self.assertTrue(
+                os.path.isfile(os.path.join(directory, PROFILE_FILE)))
+            self.assertTrue(
+                os.path.isfile(os.path.join(directory, PROFILE_SUMMARY_FILE)))
+        finally:
+            shutil.rmtree(directory)
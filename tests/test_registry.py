@@ -0,0 +1,33 @@
+import unittest
+
+from aaem.components import comp_order, get_registry, get_run_order
+from aaem.components.registry import build_run_order
+
+
+class FakeInfo (object):
+    def __init__ (self, prereqs):
+        self.prereqs = prereqs
+
+
+class TestRegistry(unittest.TestCase):
+    def test_run_order (self):
+        """
+        test components run after their prerequisites
+        """
+        registry = get_registry()
+        order = get_run_order()
+        self.assertEqual(sorted(order), sorted(comp_order))
+        for comp in order:
+            for prereq in registry[comp].prereqs:
+                self.assertTrue(order.index(prereq) < order.index(comp))
+
+    def test_build_run_order (self):
+        """
+        test registry.build_run_order reorders and finds cycles
+        """
+        registry = {'a': FakeInfo(['b']), 'b': FakeInfo([]),
+            'c': FakeInfo([])}
+        self.assertEqual(build_run_order(registry, ['a', 'b', 'c']),
+            ['b', 'a', 'c'])
+        registry['b'] = FakeInfo(['a'])
+        self.assertRaises(RuntimeError, build_run_order, registry, ['a', 'b'])
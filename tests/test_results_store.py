@@ -0,0 +1,246 @@
+import os.path
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from aaem import benchmark, synthetic_data
+from aaem.driver import Driver, Setup
+from aaem.results_store import ResultsStore, ComponentRecord
+from aaem.results_store import NON_COMPONENT_BLOCKS
+
+
+class FakeDiagnostics (object):
+    def __init__ (self):
+        self.messages = []
+
+class FakeCommunityData (object):
+    def __init__ (self, name):
+        self.diagnostics = FakeDiagnostics()
+        self.data = {'community': {'file id': name}, 'Wind Power': {}}
+
+    def get_item (self, section, key):
+        return self.data[section][key]
+
+class FakeComponent (object):
+    record_attributes = ['npv', 'prices']
+
+    def __init__ (self, community_data, forecast, prereq = None):
+        self.cd = community_data.data['community']
+        self.forecast = forecast
+        self.diagnostics = community_data.diagnostics
+        self.prereq = prereq
+        self.npv = 10.0
+
+    def get_NPV_benefits (self):
+        return self.npv
+
+def make_results (name):
+    cd = FakeCommunityData(name)
+    fc = {'population': [1, 2, 3]}
+    wind = FakeComponent(cd, fc)
+    return {
+        'community data': cd,
+        'forecast': fc,
+        'Wind Power': wind,
+        'Solar Power': FakeComponent(cd, fc, wind),
+    }
+
+
+class TestResultsStore(unittest.TestCase):
+    def setUp (self):
+        """
+        set up test
+        """
+        self.directory = tempfile.mkdtemp()
+        store = ResultsStore(self.directory)
+        store.add(make_results('Adak'))
+        store.add(make_results('Bethel'))
+        store.add(make_results('Adak'))
+
+    def tearDown (self):
+        shutil.rmtree(self.directory)
+
+    def test_index (self):
+        """
+        test results_store.ResultsStore index
+        """
+        store = ResultsStore(self.directory)
+        self.assertEqual(store.keys(), ['Adak', 'Bethel', 'Adak #0'])
+        self.assertEqual(sorted(store.components('Bethel')),
+            ['Solar Power', 'Wind Power'])
+
+    def test_get_component (self):
+        """
+        test results_store.ResultsStore.get for one component
+        """
+        wind = ResultsStore(self.directory).get('Bethel', 'Wind Power')
+        self.assertEqual(wind.npv, 10.0)
+        self.assertEqual(wind.cd['file id'], 'Bethel')
+
+    def test_shared_references (self):
+        """
+        test that objects shared in a community are shared when loaded
+        """
+        res = ResultsStore(self.directory).get('Adak')
+        cd = res['community data']
+        self.assertTrue(res['Wind Power'].cd is cd.data['community'])
+        self.assertTrue(res['Wind Power'].forecast is res['forecast'])
+        self.assertTrue(res['Solar Power'].prereq is res['Wind Power'])
+        self.assertTrue(res['Solar Power'].diagnostics is cd.diagnostics)
+
+    def test_clear (self):
+        """
+        test results_store.ResultsStore.clear
+        """
+        store = ResultsStore(self.directory)
+        store.clear()
+        self.assertFalse(ResultsStore(self.directory).exists())
+
+    def test_replace_and_compact (self):
+        """
+        test replacing and removing results, then compacting the data file
+        """
+        store = ResultsStore(self.directory)
+        self.assertFalse(store.compact())
+        replacement = make_results('Bethel')
+        replacement['Wind Power'].npv = 20.0
+        self.assertEqual(store.add(replacement, replace = True), 'Bethel')
+        store.remove('Adak #0')
+        size = os.path.getsize(store.data_file)
+        self.assertTrue(store.unused_bytes() > 0)
+        self.assertTrue(store.compact())
+        self.assertTrue(os.path.getsize(store.data_file) < size)
+        self.assertEqual(store.unused_bytes(), 0)
+
+        store = ResultsStore(self.directory)
+        self.assertEqual(store.keys(), ['Adak', 'Bethel'])
+        self.assertEqual(store.get('Bethel', 'Wind Power').npv, 20.0)
+        self.assertEqual(store.get('Adak', 'Wind Power').npv, 10.0)
+
+    def test_digest (self):
+        """
+        test results_store.ResultsStore.digest changes with the results
+        """
+        store = ResultsStore(self.directory)
+        self.assertEqual(store.digest('Adak'), store.digest('Adak #0'))
+        replacement = make_results('Adak')
+        replacement['Wind Power'].npv = 20.0
+        store.add(replacement, replace = True)
+        self.assertNotEqual(store.digest('Adak'), store.digest('Adak #0'))
+
+    def test_slim (self):
+        """
+        test slim records keep only the record attributes and summary values
+        of the components, and share community data items
+        """
+        class CommunityData (FakeCommunityData):
+            pass
+        res = make_results('Adak')
+        intertie = CommunityData('Adak_intertie')
+        prices = [1.0, 2.0, 3.0]
+        res['community data'].data['Wind Power']['prices'] = prices
+        res['Wind Power'].intertie_data = intertie
+        res['Wind Power'].prices = prices
+
+        store = ResultsStore(self.directory)
+        name = store.add(res, 'Adak slim', slim = True)
+        self.assertTrue(res['Wind Power'].intertie_data is intertie)
+
+        loaded = ResultsStore(self.directory).get(name)
+        wind = loaded['Wind Power']
+        self.assertTrue(isinstance(wind, ComponentRecord))
+        self.assertEqual(wind.component_class, 'FakeComponent')
+        self.assertEqual(wind.npv, 10.0)
+        self.assertEqual(wind.get_NPV_benefits(), 10.0)
+        self.assertRaises(AttributeError, wind.get_BC_ratio)
+        self.assertFalse(hasattr(wind, 'intertie_data'))
+        self.assertFalse(hasattr(loaded['Solar Power'], 'prereq'))
+        self.assertTrue(wind.prices is \
+            loaded['community data'].data['Wind Power']['prices'])
+        self.assertTrue(wind.forecast is loaded['forecast'])
+
+
+class TestSlimResults(unittest.TestCase):
+    @classmethod
+    def setUpClass (cls):
+        """
+        set up test, run communities from a synthetic data repo with full and
+        slim results, once for all of the tests
+        """
+        cls.directory = tempfile.mkdtemp()
+        data_repo = synthetic_data.make_data_repo(
+            os.path.join(cls.directory, 'data'))
+        model_root = os.path.join(cls.directory, 'model')
+        cls.communities = ['Nome', 'Sitka']
+        Setup(model_root, data_repo, cls.communities, 'test').setup(
+            force = True, ng_coms = ['Barrow', 'Nuiqsut'])
+        cls.model = os.path.join(model_root, 'test')
+        for tag, slim in [('full', False), ('slim', True)]:
+            driver = Driver(cls.model, slim_results = slim)
+            for com in cls.communities:
+                driver.run(benchmark.get_config(cls.model, com),
+                    benchmark.get_global_config(cls.model), tag = tag)
+            driver.save_summaries(tag)
+
+    @classmethod
+    def tearDownClass (cls):
+        shutil.rmtree(cls.directory)
+
+    def get_store (self, tag):
+        return ResultsStore(os.path.join(self.model, 'results_' + tag))
+
+    def test_size (self):
+        """
+        test slim results are smaller than full results
+        """
+        sizes = {}
+        for tag in ['full', 'slim']:
+            store = self.get_store(tag)
+            components = sum([b[2] for entry in store.index \
+                for b in entry[1] if not b[0] in NON_COMPONENT_BLOCKS])
+            sizes[tag] = (os.path.getsize(store.data_file), components)
+        self.assertTrue(sizes['slim'][0] < .7 * sizes['full'][0])
+        self.assertTrue(sizes['slim'][1] < .5 * sizes['full'][1])
+
+    def test_records (self):
+        """
+        test the component records have the summary values of the components
+        """
+        full = self.get_store('full')
+        slim = self.get_store('slim')
+        for com in self.communities:
+            for comp in full.components(com):
+                component = full.get(com, comp)
+                record = slim.get(com, comp)
+                self.assertTrue(isinstance(record, ComponentRecord))
+                self.assertFalse(hasattr(record, 'prerequisites'))
+                for getter in ['get_NPV_benefits', 'get_NPV_costs',
+                        'get_NPV_net_benefit', 'get_BC_ratio']:
+                    np.testing.assert_equal(getattr(record, getter)(),
+                        getattr(component, getter)())
+                for key in component.record_attributes:
+                    if not key in component.__dict__:
+                        continue
+                    value = getattr(component, key)
+                    if hasattr(value, 'equals'):
+                        ## tables
+                        self.assertTrue(value.equals(getattr(record, key)))
+                    else:
+                        np.testing.assert_equal(getattr(record, key), value)
+
+    def test_summaries (self):
+        """
+        test the summaries saved from slim results are the same as those
+        saved from full results
+        """
+        full_dir = os.path.join(self.model, 'results_full')
+        slim_dir = os.path.join(self.model, 'results_slim')
+        summaries = [f for f in os.listdir(full_dir) if f.endswith('.csv')]
+        self.assertTrue(len(summaries) > 0)
+        for summary in summaries:
+            with open(os.path.join(full_dir, summary)) as f:
+                expected = f.read()
+            with open(os.path.join(slim_dir, summary)) as f:
+                self.assertEqual(f.read(), expected)
@@ -0,0 +1,75 @@
+import os.path
+import shutil
+import tempfile
+import unittest
+
+from aaem.run_manifest import RunManifest, run_digest
+
+
+class TestRunManifest(unittest.TestCase):
+    def setUp (self):
+        """
+        set up test
+        """
+        self.directory = tempfile.mkdtemp()
+        self.config = os.path.join(self.directory, 'Adak.yaml')
+        with open(self.config, 'w') as fd:
+            fd.write('community:\n  name: Adak\n')
+        self.run = {'community_config': self.config, 'tag': '',
+            'scalers': {'capital costs': 1.0}}
+
+    def tearDown (self):
+        shutil.rmtree(self.directory)
+
+    def test_digest (self):
+        """
+        test run_manifest.run_digest changes with the inputs
+        """
+        digest = run_digest(self.run)
+        self.assertEqual(digest, run_digest(dict(self.run)))
+
+        scaled = dict(self.run)
+        scaled['scalers'] = {'capital costs': 1.1}
+        self.assertNotEqual(digest, run_digest(scaled))
+
+        with open(self.config, 'a') as fd:
+            fd.write('  region: Aleutians\n')
+        self.assertNotEqual(digest, run_digest(self.run))
+
+    def test_record (self):
+        """
+        test run_manifest.RunManifest records runs
+        """
+        results = os.path.join(self.directory, 'results')
+        manifest = RunManifest(results)
+        self.assertFalse(manifest.is_current(self.run))
+        manifest.record(self.run, 'Adak')
+
+        manifest = RunManifest(results)
+        self.assertTrue(manifest.is_current(self.run))
+        self.assertEqual(manifest.get_name(self.config), 'Adak')
+        manifest.remove(self.config)
+        self.assertFalse(RunManifest(results).is_current(self.run))
+
+    def test_digest_transmission (self):
+        """
+        test run_manifest.run_digest changes with the config of the community
+        the Transmission component connects to
+        """
+        other = os.path.join(self.directory, 'Atka.yaml')
+        with open(other, 'w') as fd:
+            fd.write('community:\n  name: Atka\n')
+        with open(self.config, 'a') as fd:
+            fd.write('Transmission and Interties:\n'
+                '  nearest community with lower price: Atka\n')
+        digest = run_digest(self.run)
+
+        with open(other, 'a') as fd:
+            fd.write('  region: Aleutians\n')
+        self.assertNotEqual(digest, run_digest(self.run))
+        digest = run_digest(self.run)
+
+        with open(os.path.join(self.directory, 'Atka_intertie.yaml'),
+                'w') as fd:
+            fd.write('community:\n  name: Atka_intertie\n')
+        self.assertNotEqual(digest, run_digest(self.run))
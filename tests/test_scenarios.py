@@ -0,0 +1,138 @@
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from aaem import scenarios
+from aaem.driver import Driver
+from aaem.components.annual_savings import AnnualSavings
+from aaem.components.annual_savings import financial
+
+
+class FakeForecast (object):
+    def __init__ (self):
+        self.cpi = np.ones(20) * 1.02 ** np.arange(20)
+
+class FakeProject (AnnualSavings):
+    def __init__ (self):
+        self.cd = {'discount rate': 3.0, 'interest rate': 5.0,
+            'current year': 2016}
+        self.forecast = FakeForecast()
+        self.set_project_life_details(2017, 20)
+        self.annual_electric_savings = np.linspace(20000, 30000, 20)
+        self.annual_heating_savings = np.zeros(20) + 5000
+
+    def calc_capital_costs (self):
+        self.capital_costs = 250000.0
+
+    def calc_annual_electric_savings (self):
+        pass
+
+    def calc_annual_heating_savings (self):
+        pass
+
+    def get_fuel_total_saved (self):
+        return 1000.0
+
+    def get_total_energy_produced (self):
+        return 50000.0
+
+    def run (self, scalers = {'capital costs':1.0}):
+        self.calc_capital_costs()
+        self.calc_annual_total_savings()
+        self.calc_annual_costs(self.cd['interest rate'],
+            scalers['capital costs'])
+        self.calc_annual_net_benefit()
+        self.calc_npv(self.cd['discount rate'], self.cd["current year"])
+        self.calc_levelized_costs(100.0)
+        self.calc_internal_rate_of_return()
+
+
+class TestFinancial(unittest.TestCase):
+    def test_matches_numpy (self):
+        """
+        test financial functions against numpy
+        """
+        values = np.array([-100000.0] + [12000.0] * 15)
+        self.assertAlmostEqual(financial.npv(0.03, values),
+            np.npv(0.03, values), 6)
+        self.assertAlmostEqual(financial.pmt(0.05, 20, 100000),
+            np.pmt(0.05, 20, 100000), 6)
+        self.assertAlmostEqual(financial.irr(values), np.irr(values), 8)
+
+    def test_batched (self):
+        """
+        test financial functions on 2-D arrays of cash flows
+        """
+        values = np.array([[-1000.0] + [150.0] * 10,
+                           [-2000.0] + [150.0] * 10])
+        irr = financial.irr(values)
+        self.assertAlmostEqual(irr[0], np.irr(values[0]), 8)
+        self.assertTrue(np.isnan(irr[1]) or \
+            abs(irr[1] - np.irr(values[1])) < 1e-8)
+        npv = financial.npv(0.05, values)
+        self.assertAlmostEqual(npv[1], np.npv(0.05, values[1]), 6)
+
+    def test_delay (self):
+        """
+        test financial.npv and financial.cost_of_energy with years before
+        the first cash flow
+        """
+        values = np.array([100.0, 200.0, 300.0])
+        self.assertAlmostEqual(financial.npv(0.03, values, 2),
+            np.npv(0.03, np.append(np.zeros(2), values)), 8)
+        cost = financial.cost_of_energy(0.03, np.array([1000.0, 2000.0]),
+            np.ones(3) * 10.0, values, 2)
+        expected = (1000.0 + np.npv(0.03, [0, 0, 10.0, 10.0, 10.0])) / \
+            np.npv(0.03, np.append(np.zeros(2), values))
+        self.assertAlmostEqual(cost[0], expected, 8)
+        self.assertEqual(len(cost), 2)
+
+
+class TestScenarios(unittest.TestCase):
+    def test_group_scenarios (self):
+        """
+        test scenarios.group_scenarios
+        """
+        default = {'diesel price': 1.0, 'diesel price adder': 0.0,
+            'capital costs': 1.0, 'kWh consumption': 1.0}
+        scns = [scenarios.fill_scalers(s, default) for s in [
+            {'capital costs': .5},
+            {'diesel price': .5},
+            {'capital costs': 2},
+        ]]
+        groups = scenarios.group_scenarios(scns)
+        self.assertEqual([g[1] for g in groups], [[0, 2], [1]])
+        self.assertEqual(groups[1][0]['diesel price'], .5)
+
+    def test_no_scenarios (self):
+        """
+        test Driver.run_scenarios raises a ValueError without scenarios
+        """
+        directory = tempfile.mkdtemp()
+        try:
+            self.assertRaises(ValueError, Driver(directory).run_scenarios,
+                'Adak.yaml', [])
+        finally:
+            shutil.rmtree(directory)
+
+    def test_capital_cost_scenarios (self):
+        """
+        test AnnualSavings.calc_capital_cost_scenarios matches runs for
+        each capital cost scaler
+        """
+        base = FakeProject()
+        base.run()
+        scalers = [.5, 1.0, 1.5]
+        results = base.calc_capital_cost_scenarios(scalers)
+        for i, s in enumerate(scalers):
+            project = FakeProject()
+            project.run({'capital costs': s})
+            self.assertAlmostEqual(results['net npv'][i],
+                project.net_npv, 6)
+            self.assertAlmostEqual(results['benefit cost ratio'][i],
+                project.benefit_cost_ratio, 8)
+            self.assertAlmostEqual(results['irr'][i], project.irr, 8)
+            self.assertAlmostEqual(results['levelized cost of energy'][i],
+                project.levelized_cost_of_energy, 8)
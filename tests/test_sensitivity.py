@@ -0,0 +1,200 @@
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+from pandas import DataFrame
+
+from aaem import sensitivity
+import aaem.driver
+from aaem.components.non_residential.inventory import BuildingInventory
+
+
+class FakeInfo (object):
+    def __init__ (self, prereqs):
+        self.prereqs = prereqs
+
+REGISTRY = {
+    'Non-residential Energy Efficiency': FakeInfo([]),
+    'Wind Power': FakeInfo([]),
+    'Biomass for Heat (Cordwood)': 
+        FakeInfo(['Non-residential Energy Efficiency']),
+    'Hydropower': FakeInfo(['Non-residential Energy Efficiency']),
+}
+RUN_ORDER = ['Non-residential Energy Efficiency', 'Wind Power',
+    'Biomass for Heat (Cordwood)', 'Hydropower']
+
+
+class FakeCommunityData (object):
+    def __init__ (self):
+        self.data = {
+            'community': {
+                'diesel prices': DataFrame({'prices': [1.0, 2.0]}),
+                'electric prices': DataFrame({'prices': [.5, .5]}),
+                'electric non-fuel price': .25,
+            },
+            'Wind Power': {'lifetime': 20, 'capacity factor': .3},
+        }
+    
+    def get_item (self, section, key):
+        return self.data[section][key]
+    
+    def get_section (self, section):
+        return self.data[section]
+    
+    def set_item (self, section, key, data):
+        self.data[section][key] = data
+    
+    def apply_scalers (self, scalers):
+        self.data['community']['diesel prices'] = \
+            self.data['community']['diesel prices'] * scalers['diesel price']
+
+
+class TestSensitivity(unittest.TestCase):
+
+    def test_get_dependents (self):
+        """
+        test sensitivity.get_dependents follows the prerequisites
+        """
+        self.assertEqual(sensitivity.get_dependents(REGISTRY, RUN_ORDER,
+                'Non-residential Energy Efficiency'),
+            ['Non-residential Energy Efficiency',
+                'Biomass for Heat (Cordwood)', 'Hydropower'])
+        self.assertEqual(
+            sensitivity.get_dependents(REGISTRY, RUN_ORDER, 'Wind Power'),
+            ['Wind Power'])
+
+    def test_change_value (self):
+        """
+        test sensitivity.change_value keeps ints as ints
+        """
+        self.assertEqual(sensitivity.change_value(20, 1.1), 22)
+        self.assertEqual(sensitivity.change_value(3, .9), 2)
+        self.assertEqual(sensitivity.change_value(3, 1.1), 4)
+        self.assertAlmostEqual(sensitivity.change_value(.3, 1.1), .33)
+        self.assertFalse(sensitivity.is_numeric(True))
+        self.assertFalse(sensitivity.is_numeric(0.0))
+        self.assertFalse(sensitivity.is_numeric('UNKNOWN'))
+
+    def test_change_input (self):
+        """
+        test sensitivity.change_input changes prices, and restore_inputs
+        restores them
+        """
+        cd = FakeCommunityData()
+        value, originals = sensitivity.change_input(cd, 'community',
+            'diesel prices', 1.5)
+        self.assertEqual(value, 1.5)
+        self.assertEqual(cd.get_item('community','diesel prices')\
+            ['prices'].tolist(), [1.5, 3.0])
+        sensitivity.restore_inputs(cd, originals)
+        self.assertEqual(cd.get_item('community','diesel prices')\
+            ['prices'].tolist(), [1.0, 2.0])
+        
+        value, originals = sensitivity.change_input(cd, 'community',
+            'electric non-fuel price', 2.0)
+        self.assertEqual(cd.get_item('community','electric prices')\
+            ['prices'].tolist(), [.75, .75])
+        sensitivity.restore_inputs(cd, originals)
+        self.assertEqual(cd.get_item('community','electric non-fuel price'),
+            .25)
+        self.assertEqual(cd.get_item('community','electric prices')\
+            ['prices'].tolist(), [.5, .5])
+
+    def test_to_dataframe (self):
+        """
+        test sensitivity.to_dataframe ranks inputs by swing and drops inputs
+        with no swing
+        """
+        rows = []
+        for key, swing in [('lifetime', 10.0), ('capacity factor', 30.0),
+                ('percent o&m', 0.0), ('wind class', np.nan)]:
+            rows.append({'component': 'Wind Power', 'metric': 'net npv',
+                'section': 'Wind Power', 'input': key, 'swing': swing})
+        rows.append({'component': 'Wind Power', 
+            'metric': 'benefit cost ratio', 'section': 'community', 
+            'input': 'diesel prices', 'swing': 1.0})
+        table = sensitivity.to_dataframe(rows, RUN_ORDER)
+        self.assertEqual(table['input'].tolist(),
+            ['capacity factor', 'lifetime', 'diesel prices'])
+        self.assertEqual(table['rank'].tolist(), [1, 2, 1])
+
+
+NON_RES = 'Non-residential Energy Efficiency'
+
+class FakeConfig (object):
+    order = ['average refit cost']
+
+class FakeBuildings (object):
+    """
+    fills the unknown implementation costs of its building inventory like
+    the Non-residential Energy Efficiency component
+    """
+    def __init__ (self, community_data, forecast, diag, prerequisites):
+        self.comp_specs = community_data.get_section(NON_RES)
+
+    def run (self, scalers):
+        data = self.comp_specs['building inventory']
+        inventory = BuildingInventory([data],
+            [DataFrame({'Sqft': [1.0]}, index = ['Other'])])
+        inventory.estimate_implementation_cost(
+            self.comp_specs['average refit cost'])
+        inventory.update([data], ['implementation cost'])
+        self.capital_costs = inventory.totals('implementation cost')[0]
+
+    def calc_internal_rate_of_return (self):
+        pass
+
+    def get_NPV_net_benefit (self):
+        return 100000.0 - self.capital_costs
+
+    def get_BC_ratio (self):
+        return 100000.0 / self.capital_costs
+
+class FakeBuildingsCommunityData (FakeCommunityData):
+    def __init__ (self, *args):
+        super(FakeBuildingsCommunityData, self).__init__()
+        self.data['community']['file id'] = 'Adak'
+        self.data[NON_RES] = {
+            'enabled': True,
+            'average refit cost': 5.0,
+            'building inventory': DataFrame(
+                {'Square Feet': [1000.0, 2000.0],
+                    'implementation cost': [np.nan, 1000.0]},
+                index = ['Office', 'School']),
+        }
+
+
+class TestRunSensitivity(unittest.TestCase):
+    def setUp (self):
+        """
+        set up test
+        """
+        self.directory = tempfile.mkdtemp()
+        self.patched = (aaem.driver.CommunityData, aaem.driver.Forecast)
+        aaem.driver.CommunityData = FakeBuildingsCommunityData
+        aaem.driver.Forecast = lambda *args: None
+        info = FakeInfo([])
+        info.component = FakeBuildings
+        info.config = FakeConfig
+        self.driver = aaem.driver.Driver(self.directory)
+        self.driver.registry = {NON_RES: info}
+        self.driver.comp_order = [NON_RES]
+        self.driver.global_configs = {None: None}
+
+    def tearDown (self):
+        aaem.driver.CommunityData, aaem.driver.Forecast = self.patched
+        shutil.rmtree(self.directory)
+
+    def test_estimates_are_not_inputs (self):
+        """
+        test Driver.run_sensitivity changes an input that a component fills
+        estimates with from the original inputs each time
+        """
+        table = self.driver.run_sensitivity('Adak.yaml',
+            {'prices': False})
+        table = table.set_index('metric')
+        self.assertEqual(table['input']['net npv'], 'average refit cost')
+        self.assertEqual(table['base result']['net npv'], 94000.0)
+        self.assertAlmostEqual(table['low result']['net npv'], 94500.0)
+        self.assertAlmostEqual(table['high result']['net npv'], 93500.0)
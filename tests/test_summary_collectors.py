@@ -0,0 +1,137 @@
+import os.path
+import shutil
+import tempfile
+import unittest
+
+from aaem.summary_collectors import RowCollector, RegionalCollector
+from aaem.summary_collectors import run_collectors
+from aaem.summary_collectors import run_collectors_incremental
+
+
+def row (name, results):
+    if results['skip']:
+        return None
+    return [name, results['value']]
+
+def project_row (name, results):
+    if not results['skip']:
+        return None
+    return [name, results['value']]
+
+def contribution (name, results):
+    return results['region'], [1, results['value']]
+
+RESULTS = [
+    ('Bethel', {'skip': False, 'value': 2.0, 'region': 'Yukon'}),
+    ('Adak', {'skip': False, 'value': 1.0, 'region': 'Aleutians'}),
+    ('Adak+Wind', {'skip': True, 'value': 5.0, 'region': 'Aleutians'}),
+    ('Akiak', {'skip': False, 'value': 3.0, 'region': 'Yukon'}),
+]
+
+
+class TestSummaryCollectors(unittest.TestCase):
+    def setUp (self):
+        """
+        set up test
+        """
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown (self):
+        shutil.rmtree(self.directory)
+
+    def test_rows (self):
+        """
+        test summary_collectors.RowCollector rows are sorted, and communities
+        that are skipped or raise an error are left out
+        """
+        collector = RowCollector(row, None)
+        for name, results in RESULTS + [('Aniak', {'skip': False})]:
+            collector.add(name, results)
+        self.assertEqual(collector.get_rows(),
+            [['Adak', 1.0], ['Akiak', 3.0], ['Bethel', 2.0]])
+
+    def test_regional (self):
+        """
+        test summary_collectors.RegionalCollector totals by region
+        """
+        collector = RegionalCollector(contribution, ['count', 'value'], None)
+        for name, results in RESULTS:
+            collector.add(name, results)
+        summary = collector.get_summary()
+        self.assertEqual(summary['count']['Yukon'], 2)
+        self.assertEqual(summary['value']['Aleutians'], 6.0)
+        self.assertEqual(summary['value']['All Regions'], 11.0)
+
+    def test_run_collectors (self):
+        """
+        test summaries are made in one pass, and a regional summary is not
+        saved if a community could not be added
+        """
+        saved = []
+        def save_rows (rows, res_dir):
+            saved.append(rows)
+            open(os.path.join(res_dir, 'rows.csv'), 'w').close()
+        def save_summary (summary, res_dir):
+            saved.append(summary)
+
+        def results ():
+            for item in RESULTS + [('Aniak', {'skip': False})]:
+                yield item
+        run_collectors([
+                RowCollector(row, save_rows),
+                RegionalCollector(contribution, ['count', 'value'],
+                    save_summary)
+            ], results(), self.directory)
+        self.assertEqual(len(saved), 1)
+        self.assertEqual(len(saved[0]), 3)
+        self.assertTrue(
+            os.path.exists(os.path.join(self.directory, 'rows.csv')))
+
+    def test_run_collectors_incremental (self):
+        """
+        test only the summaries fed by the changed communities are made
+        again, and only the results they need are loaded
+        """
+        saved = {}
+        def save_rows (rows, res_dir):
+            saved['rows'] = rows
+        def save_projects (rows, res_dir):
+            saved['projects'] = rows
+        def get_collectors ():
+            return [RowCollector(row, save_rows),
+                RowCollector(project_row, save_projects)]
+
+        loaded = []
+        class Store (object):
+            def __init__ (self, results):
+                self.results = results
+            def keys (self):
+                return [name for name, results in self.results]
+            def get (self, name):
+                loaded.append(name)
+                return dict(self.results)[name]
+
+        contributors = run_collectors(get_collectors(), RESULTS,
+            self.directory)
+        self.assertEqual(contributors[__name__ + '.save_rows'],
+            ['Adak', 'Akiak', 'Bethel'])
+
+        saved.clear()
+        results = [(n, dict(r)) for n, r in RESULTS]
+        results[0][1]['value'] = 4.0
+        contributors, made = run_collectors_incremental(get_collectors,
+            Store(results), ['Bethel'], contributors, self.directory)
+        self.assertEqual(made, [__name__ + '.save_rows'])
+        self.assertEqual(saved.keys(), ['rows'])
+        self.assertEqual(saved['rows'][-1], ['Bethel', 4.0])
+        self.assertEqual(sorted(loaded), ['Adak', 'Akiak', 'Bethel'])
+
+        ## Bethel becomes a project, and feeds the other summary
+        saved.clear()
+        results[0][1]['skip'] = True
+        contributors, made = run_collectors_incremental(get_collectors,
+            Store(results), ['Bethel'], contributors, self.directory)
+        self.assertEqual(len(made), 2)
+        self.assertEqual(saved['rows'], [['Adak', 1.0], ['Akiak', 3.0]])
+        self.assertEqual(saved['projects'],
+            [['Adak+Wind', 5.0], ['Bethel', 4.0]])
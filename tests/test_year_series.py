@@ -0,0 +1,60 @@
+import unittest
+
+from pandas import Series, DataFrame
+
+from aaem.year_series import YearSeries
+from aaem.forecast import Forecast
+
+
+class TestYearSeries(unittest.TestCase):
+    def setUp (self):
+        """
+        set up test
+        """
+        self.series = YearSeries(
+            Series([1.0, 2.0, 3.0, 4.0], index = range(2016, 2020)))
+
+    def test_get_range (self):
+        """
+        test YearSeries.get_range is extended with the last known value
+        """
+        series = self.series
+        self.assertEqual(series.get_range(2017, 2018).tolist(), [2.0, 3.0])
+        self.assertEqual(series.get_range(2018, 2022).tolist(),
+            [3.0, 4.0, 4.0, 4.0, 4.0])
+        self.assertEqual(len(series.get_range(2016, 2100)), 85)
+        ## known values are used from the first known year
+        self.assertEqual(series.get_range(2015, 2017).tolist(),
+            [1.0, 2.0, 4.0])
+        self.assertRaises(IndexError, series.get_range, 2020, 2030)
+
+    def test_get (self):
+        """
+        test YearSeries.get only finds known years
+        """
+        self.assertEqual(self.series.get(2018), 3.0)
+        self.assertRaises(KeyError, self.series.get, 2020)
+        self.assertRaises(KeyError, self.series.get, 2015)
+        gaps = YearSeries(Series([1, 2], index = [2016, 2018]))
+        self.assertEqual(gaps.get(2018), 2)
+        self.assertRaises(KeyError, gaps.get, 2017)
+        self.assertEqual(gaps.get_range(2016, 2019).tolist(), [1, 2, 2, 2])
+
+class TestForecastSeries(unittest.TestCase):
+    def test_forecast (self):
+        """
+        test the Forecast getters use shared, read only, series
+        """
+        fc = Forecast.__new__(Forecast)
+        fc.population = DataFrame({'population': [10.0, 11.0, 12.0]},
+            index = range(2016, 2019))
+        fc.yearly_average_diesel_load = Series([5.0, 6.0, 7.0],
+            index = range(2016, 2019))
+        self.assertEqual(fc.get_population(2017), 11.0)
+        self.assertEqual(fc.get_population(2017, 2020).tolist(),
+            [11.0, 12.0, 12.0, 12.0])
+        self.assertIs(fc.get_series('population'),
+            fc.get_series('population'))
+        self.assertFalse(fc.get_population(2016, 2017).flags.writeable)
+        self.assertEqual(fc.get_average_diesel_load(2018), 7.0)
+        self.assertNotIn('series', fc.__getstate__())